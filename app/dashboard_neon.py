@@ -1,6 +1,7 @@
 """
 Dashboard Streamlit - Análise Copa 2026
-Conectado ao Neon PostgreSQL
+Conectado ao Neon PostgreSQL (lê do cache colunar local match_cache.py
+quando disponível; consultas ao Neon só como fallback)
 """
 
 import streamlit as st
@@ -11,6 +12,9 @@ import numpy as np
 from scipy.stats import poisson
 import glob
 import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
 
 # Configuração
 PROJECT_ID = "restless-glitter-71170845"
@@ -50,6 +54,41 @@ def run_sql(sql):
     
     return pd.DataFrame()
 
+@st.cache_data(ttl=300)
+def load_perspective():
+    """
+    Jogos do cache local em perspectiva (uma linha por seleção e jogo)
+
+    Sincroniza o cache com o Neon (só linhas alteradas) e segue com o cache
+    existente sem rede.
+
+    Returns:
+        (DataFrame team_id, name, goals_for, goals_against, result,
+         DataFrame id, name dos times) ou (None, None) sem cache
+    """
+    from match_cache import load_matches, load_matches_df
+    try:
+        df = load_matches_df(refresh=True)
+    except FileNotFoundError:
+        return None, None
+
+    sides = []
+    for side, other in (('home', 'away'), ('away', 'home')):
+        sides.append(pd.DataFrame({
+            'team_id': df[f'{side}_team_id'],
+            'name': df[f'{side}_team'],
+            'goals_for': df[f'{side}_goals'].astype(int),
+            'goals_against': df[f'{other}_goals'].astype(int),
+        }))
+    perspective = pd.concat(sides, ignore_index=True)
+    perspective['result'] = np.select(
+        [perspective['goals_for'] > perspective['goals_against'],
+         perspective['goals_for'] == perspective['goals_against']], ['W', 'D'], 'L')
+
+    team_names = load_matches()['team_names']
+    teams = pd.DataFrame(sorted(team_names.items(), key=lambda item: item[1]), columns=['id', 'name'])
+    return perspective, teams
+
 def predict_match(home_id, away_id, stats_df):
     """Prever placar de um jogo"""
     
@@ -107,15 +146,21 @@ page = st.sidebar.radio("Escolha uma página:",
 
 # Carregar dados
 with st.spinner("Carregando dados do Neon..."):
-    # Total de jogos
-    total_sql = "SELECT COUNT(*) as total FROM matches"
-    total_df = run_sql(total_sql)
-    total_jogos = int(total_df.iloc[0]['total']) if not total_df.empty else 0
-    
-    # Total de times
-    teams_sql = "SELECT COUNT(*) as total FROM teams"
-    teams_df = run_sql(teams_sql)
-    total_times = int(teams_df.iloc[0]['total']) if not teams_df.empty else 0
+    perspective, cached_teams = load_perspective()
+    
+    if perspective is not None:
+        total_jogos = len(perspective) // 2
+        total_times = len(cached_teams)
+    else:
+        # Total de jogos
+        total_sql = "SELECT COUNT(*) as total FROM matches"
+        total_df = run_sql(total_sql)
+        total_jogos = int(total_df.iloc[0]['total']) if not total_df.empty else 0
+        
+        # Total de times
+        teams_sql = "SELECT COUNT(*) as total FROM teams"
+        teams_df = run_sql(teams_sql)
+        total_times = int(teams_df.iloc[0]['total']) if not teams_df.empty else 0
 
 # === HOME ===
 if page == "🏠 Home":
@@ -155,14 +200,17 @@ if page == "🏠 Home":
     
     top_sql = """
     SELECT t.name, COUNT(*) as jogos
-    FROM matches m
-    JOIN teams t ON (m.home_team_id = t.id OR m.away_team_id = t.id)
+    FROM team_match_perspective p
+    JOIN teams t ON t.id = p.team_id
     GROUP BY t.name
     ORDER BY jogos DESC
     LIMIT 10
     """
     
-    top_df = run_sql(top_sql)
+    if perspective is not None:
+        top_df = perspective.groupby('name').size().nlargest(10).rename('jogos').reset_index()
+    else:
+        top_df = run_sql(top_sql)
     if not top_df.empty:
         st.bar_chart(top_df.set_index('name')['jogos'])
 
@@ -172,7 +220,7 @@ elif page == "🎯 Previsões":
     
     # Buscar times
     teams_list_sql = "SELECT id, name FROM teams ORDER BY name"
-    teams_list = run_sql(teams_list_sql)
+    teams_list = cached_teams if cached_teams is not None else run_sql(teams_list_sql)
     
     if teams_list.empty:
         st.warning("Nenhum time encontrado no banco de dados.")
@@ -198,15 +246,21 @@ elif page == "🎯 Previsões":
                     stats_sql = """
                     SELECT 
                         t.id as team_id,
-                        COALESCE(AVG(CASE WHEN m.home_team_id = t.id THEN m.home_goals ELSE m.away_goals END), 1.5) as avg_gf,
-                        COALESCE(AVG(CASE WHEN m.home_team_id = t.id THEN m.away_goals ELSE m.home_goals END), 1.5) as avg_ga
+                        COALESCE(AVG(p.goals_for), 1.5) as avg_gf,
+                        COALESCE(AVG(p.goals_against), 1.5) as avg_ga
                     FROM teams t
-                    LEFT JOIN matches m ON (m.home_team_id = t.id OR m.away_team_id = t.id)
+                    LEFT JOIN team_match_perspective p ON p.team_id = t.id
                     WHERE t.id IN ({}, {})
                     GROUP BY t.id
                     """.format(home_id, away_id)
                     
-                    stats_df = run_sql(stats_sql)
+                    if perspective is not None:
+                        stats_df = (perspective[perspective['team_id'].isin([home_id, away_id])]
+                                    .groupby('team_id')
+                                    .agg(avg_gf=('goals_for', 'mean'), avg_ga=('goals_against', 'mean'))
+                                    .reset_index())
+                    else:
+                        stats_df = run_sql(stats_sql)
                     
                     # Prever
                     pred = predict_match(home_id, away_id, stats_df)
@@ -252,25 +306,34 @@ elif page == "🎯 Previsões":
 elif page == "📈 Estatísticas":
     st.header("Estatísticas das Seleções")
     
-    # Buscar estatísticas
+    # Buscar estatísticas (tabela de perspectiva: uma linha por seleção e jogo)
     stats_sql = """
     SELECT 
         t.name,
         COUNT(*) as jogos,
-        SUM(CASE WHEN (m.home_team_id = t.id AND m.home_goals > m.away_goals) OR 
-                      (m.away_team_id = t.id AND m.away_goals > m.home_goals) THEN 1 ELSE 0 END) as vitorias,
-        SUM(CASE WHEN m.home_goals = m.away_goals THEN 1 ELSE 0 END) as empates,
-        SUM(CASE WHEN m.home_team_id = t.id THEN m.home_goals ELSE m.away_goals END) as gols_pro,
-        SUM(CASE WHEN m.home_team_id = t.id THEN m.away_goals ELSE m.home_goals END) as gols_contra
+        SUM(CASE WHEN p.result = 'W' THEN 1 ELSE 0 END) as vitorias,
+        SUM(CASE WHEN p.result = 'D' THEN 1 ELSE 0 END) as empates,
+        SUM(p.goals_for) as gols_pro,
+        SUM(p.goals_against) as gols_contra
     FROM teams t
-    JOIN matches m ON (m.home_team_id = t.id OR m.away_team_id = t.id)
+    JOIN team_match_perspective p ON p.team_id = t.id
     GROUP BY t.name
     HAVING COUNT(*) >= 5
     ORDER BY vitorias DESC
     LIMIT 20
     """
     
-    stats_df = run_sql(stats_sql)
+    if perspective is not None:
+        stats_df = (perspective.groupby('name')
+                    .agg(jogos=('result', 'size'),
+                         vitorias=('result', lambda r: (r == 'W').sum()),
+                         empates=('result', lambda r: (r == 'D').sum()),
+                         gols_pro=('goals_for', 'sum'),
+                         gols_contra=('goals_against', 'sum'))
+                    .reset_index())
+        stats_df = stats_df[stats_df['jogos'] >= 5].nlargest(20, 'vitorias').reset_index(drop=True)
+    else:
+        stats_df = run_sql(stats_sql)
     
     if not stats_df.empty:
         # Calcular métricas adicionais
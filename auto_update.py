@@ -9,11 +9,19 @@ import pandas as pd
 import json
 from datetime import datetime
 import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from instrumentation import span, incr, run, profile_run
 
 PROJECT_ID = "restless-glitter-71170845"
 DATABASE_NAME = "neondb"
 GITHUB_CSV_URL = "https://raw.githubusercontent.com/martj42/international_results/master/results.csv"
 LOCAL_CSV_PATH = "/home/ubuntu/analise-copa-2026/data/raw/results.csv"
+GITHUB_SHOOTOUTS_URL = "https://raw.githubusercontent.com/martj42/international_results/master/shootouts.csv"
+LOCAL_SHOOTOUTS_PATH = "/home/ubuntu/analise-copa-2026/data/raw/shootouts.csv"
+# Primeiro dia do mata-mata da Copa 2026 (fase de 32 avos)
+KNOCKOUT_START = pd.Timestamp('2026-06-28')
 LOG_FILE = "/home/ubuntu/analise-copa-2026/auto_update.log"
 
 def log(message):
@@ -39,7 +47,11 @@ def run_sql(sql):
         "--input", json.dumps(input_data)
     ]
     
-    result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+    incr("neon.run_sql")
+    with span("neon.run_sql"):
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+    if result.returncode != 0:
+        incr("neon.errors")
     return result.returncode == 0, result.stdout
 
 def get_last_match_date():
@@ -78,6 +90,11 @@ def download_latest_csv():
     
     if result.returncode == 0:
         log("✅ CSV baixado com sucesso")
+        # Vencedores nos pênaltis (mata-mata empatado); falha aqui não aborta
+        shootouts = subprocess.run(["wget", "-q", "-O", LOCAL_SHOOTOUTS_PATH, GITHUB_SHOOTOUTS_URL],
+                                   capture_output=True)
+        if shootouts.returncode != 0:
+            log(f"⚠️  Erro ao baixar disputas de pênaltis: {shootouts.stderr.decode()}")
         return True
     else:
         log(f"❌ Erro ao baixar CSV: {result.stderr.decode()}")
@@ -143,8 +160,15 @@ def get_team_id(team_name):
     except:
         return None
 
-def insert_new_matches(df_new):
-    """Insere jogos novos no banco"""
+def insert_new_matches(df_new, inserted_rows=None):
+    """
+    Insere jogos novos no banco
+    
+    Args:
+        df_new: jogos novos (formato do CSV)
+        inserted_rows: lista opcional que recebe (id, data, mandante,
+                       visitante, gols, gols, competição) dos jogos inseridos
+    """
     if len(df_new) == 0:
         log("ℹ️  Nenhum jogo novo para inserir")
         return 0
@@ -164,6 +188,7 @@ def insert_new_matches(df_new):
     
     inserted = 0
     batch_values = []
+    batch_rows = []
     BATCH_SIZE = 100
     
     for idx, row in df_new.iterrows():
@@ -175,7 +200,7 @@ def insert_new_matches(df_new):
                 log(f"⚠️  Time não encontrado: {row['home_team']} vs {row['away_team']}")
                 continue
             
-            match_id = next_id + inserted
+            match_id = next_id + inserted + len(batch_values)
             date = row['date'].strftime("%Y-%m-%d")
             home_goals = int(row['home_score'])
             away_goals = int(row['away_score'])
@@ -189,6 +214,7 @@ def insert_new_matches(df_new):
                 '{city}', '{country}', {neutral}, 'finished')"""
             
             batch_values.append(value)
+            batch_rows.append((match_id, date, home_id, away_id, home_goals, away_goals, str(row['tournament'])))
             
             if len(batch_values) >= BATCH_SIZE:
                 sql = f"""
@@ -201,11 +227,14 @@ def insert_new_matches(df_new):
                 
                 if run_sql(sql)[0]:
                     inserted += len(batch_values)
+                    if inserted_rows is not None:
+                        inserted_rows.extend(batch_rows)
                     log(f"  ✅ {inserted} jogos inseridos...")
                 else:
                     log(f"  ❌ Erro ao inserir lote")
                 
                 batch_values = []
+                batch_rows = []
         
         except Exception as e:
             log(f"⚠️  Erro no jogo {idx}: {e}")
@@ -223,10 +252,90 @@ def insert_new_matches(df_new):
         
         if run_sql(sql)[0]:
             inserted += len(batch_values)
+            if inserted_rows is not None:
+                inserted_rows.extend(batch_rows)
     
     log(f"✅ Total inserido: {inserted} jogos")
     return inserted
 
+def update_elo(new_rows):
+    """Aplica os jogos inseridos aos ratings Elo salvos (O(1) por jogo)"""
+    try:
+        from elo import EloEngine
+        from config import ELO_PATH
+        
+        if not ELO_PATH.exists():
+            log("ℹ️  Ratings Elo ainda não calculados (python src/elo.py), pulando")
+            return
+        
+        # Sem coluna neutral: mesmo critério da réplica SQLite que alimenta o Elo
+        engine = EloEngine.load(ELO_PATH)
+        engine.add_matches(pd.DataFrame(new_rows, columns=[
+            'id', 'date', 'home_team_id', 'away_team_id', 'home_goals', 'away_goals', 'competition'
+        ]))
+        engine.save(ELO_PATH)
+        log(f"📈 Elo atualizado com {len(new_rows)} jogos ({len(engine)} no histórico)")
+    except Exception as e:
+        # Falha no Elo não invalida a atualização do banco
+        log(f"⚠️  Erro ao atualizar ratings Elo: {e}")
+
+def load_shootout_winners(since):
+    """Vencedores nos pênaltis desde a data: {(mandante, visitante): vencedor}"""
+    if not os.path.exists(LOCAL_SHOOTOUTS_PATH):
+        return {}
+    df = pd.read_csv(LOCAL_SHOOTOUTS_PATH)
+    df = df[pd.to_datetime(df['date']) >= since]
+    return {(row['home_team'], row['away_team']): row['winner'] for _, row in df.iterrows()}
+
+def update_tournament_simulation(df_new):
+    """Fixa os resultados novos da Copa 2026 na amostra incremental de torneios"""
+    try:
+        from incremental_simulation import IncrementalSimulation
+        
+        copa = df_new[(df_new['tournament'] == 'FIFA World Cup') & (df_new['date'] >= pd.Timestamp('2026-06-01'))]
+        if len(copa) == 0:
+            return
+        
+        sim = IncrementalSimulation.load()
+        if sim is None:
+            from snapshot_builder import build_team_stats
+            sim = IncrementalSimulation.load_or_start(build_team_stats()[0])
+        
+        # Fase pela data: reencontro de rivais de grupo no mata-mata não
+        # sobrescreve o placar do grupo; empate no mata-mata usa os pênaltis
+        winners = load_shootout_winners(KNOCKOUT_START)
+        changed = 0
+        for _, row in copa.sort_values('date').iterrows():
+            try:
+                changed += sim.apply_results([(row['home_team'], row['away_team'],
+                                               int(row['home_score']), int(row['away_score']),
+                                               bool(row['date'] >= KNOCKOUT_START))], winners)
+            except (KeyError, ValueError) as e:
+                log(f"⚠️  Resultado ignorado na simulação: {e}")
+        
+        sim.save()
+        log(f"🎲 Simulação incremental: {len(copa)} resultados da Copa, {changed} chaves refeitas")
+    except Exception as e:
+        # Falha na simulação não invalida a atualização do banco
+        log(f"⚠️  Erro na simulação incremental: {e}")
+
+def run_pipeline():
+    """Executa o pipeline diário (estatísticas, previsões, simulação, snapshot) só nas etapas com entradas novas"""
+    try:
+        from pipeline import Pipeline
+        results = Pipeline().run()
+        ran = [name for name, result in results.items() if result['status'] == 'ran']
+        skipped = sum(result['status'] == 'skipped' for result in results.values())
+        log(f"🔄 Pipeline: {len(ran)} etapas executadas ({', '.join(ran)}), {skipped} puladas")
+        for name, result in results.items():
+            if 'error' in result:
+                log(f"⚠️  Etapa {name} ({result['status']}): {result['error']}")
+        if 'publish' in ran:
+            log(f"📸 Snapshot do Streamlit atualizado: {results['publish']['output']}")
+    except Exception as e:
+        # Falha no pipeline não invalida a atualização do banco
+        log(f"⚠️  Erro no pipeline diário: {e}")
+
 def main():
     """Processo principal de atualização"""
     log("=" * 80)
@@ -252,13 +361,19 @@ def main():
         
         if len(df_new) == 0:
             log("✅ Banco de dados já está atualizado!")
+            # Sem jogos novos as etapas são puladas (só refaz artefatos ausentes)
+            run_pipeline()
             return True
         
         # 4. Inserir jogos novos
-        inserted = insert_new_matches(df_new)
+        inserted_rows = []
+        inserted = insert_new_matches(df_new, inserted_rows)
         
         if inserted > 0:
             log(f"✅ Atualização concluída: {inserted} jogos adicionados")
+            update_elo(inserted_rows)
+            update_tournament_simulation(df_new)
+            run_pipeline()
             return True
         else:
             log("⚠️  Nenhum jogo foi inserido")
@@ -274,5 +389,9 @@ def main():
         log("=" * 80)
 
 if __name__ == "__main__":
-    success = main()
+    # Tempos/contadores da execução (INSTRUMENTATION_PROFILE ativa o profiler)
+    with run("auto_update") as recorder:
+        with profile_run():
+            success = main()
+    log(f"⏱️  Instrumentação salva em: {recorder.export_json()}")
     exit(0 if success else 1)
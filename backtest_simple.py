@@ -2,79 +2,26 @@
 Backtesting Simplificado - Dados Reais do Neon
 """
 
-import subprocess
-import json
 import pandas as pd
 import numpy as np
 from scipy.stats import poisson
-import glob
-import os
 
-PROJECT_ID = "restless-glitter-71170845"
-DATABASE_NAME = "neondb"
+from match_cache import load_matches_df
 
 print("=" * 80)
 print("BACKTESTING COM DADOS REAIS DO NEON")
 print("=" * 80)
 
-def run_sql_and_get_result(sql):
-    """Executar SQL e ler resultado do arquivo"""
-    input_data = {
-        "projectId": PROJECT_ID,
-        "databaseName": DATABASE_NAME,
-        "sql": sql
-    }
-    
-    cmd = [
-        "manus-mcp-cli", "tool", "call", "run_sql",
-        "--server", "neon",
-        "--input", json.dumps(input_data)
-    ]
-    
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    
-    # Encontrar arquivo de resultado mais recente
-    result_files = glob.glob("/home/ubuntu/.mcp/tool-results/*_neon_run_sql.json")
-    if result_files:
-        latest_file = max(result_files, key=os.path.getctime)
-        with open(latest_file, 'r') as f:
-            data = json.load(f)
-            return data if isinstance(data, list) else []
-    
-    return []
-
-# 1. Buscar jogos
-print("\n📊 Buscando jogos do Neon...")
-
-sql = """
-SELECT 
-    m.id,
-    m.date,
-    m.home_team_id,
-    m.away_team_id,
-    m.home_goals,
-    m.away_goals,
-    ht.name as home_team,
-    at.name as away_team
-FROM matches m
-JOIN teams ht ON m.home_team_id = ht.id
-JOIN teams at ON m.away_team_id = at.id
-ORDER BY m.date
-"""
+# 1. Buscar jogos (cache colunar local, sincronizado incrementalmente)
+print("\n📊 Carregando jogos do cache local (sync incremental com Neon)...")
 
-matches = run_sql_and_get_result(sql)
-print(f"✅ {len(matches)} jogos encontrados")
+df = load_matches_df(refresh=True)
+print(f"✅ {len(df)} jogos encontrados")
 
-if len(matches) < 50:
+if len(df) < 50:
     print("\n⚠️  Poucos jogos. Aguardando importação...")
     exit(0)
 
-# Converter para DataFrame
-df = pd.DataFrame(matches)
-df['date'] = pd.to_datetime(df['date'])
-df['home_goals'] = pd.to_numeric(df['home_goals'])
-df['away_goals'] = pd.to_numeric(df['away_goals'])
-
 print(f"📅 Período: {df['date'].min().date()} até {df['date'].max().date()}")
 
 # Dividir treino/teste (70/30)
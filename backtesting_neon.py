@@ -3,85 +3,28 @@ Backtesting com Dados Reais do Neon PostgreSQL
 Valida precisão do modelo com dados históricos
 """
 
-import subprocess
-import json
 import pandas as pd
 from datetime import datetime, timedelta
 import numpy as np
 from scipy.stats import poisson
 
-PROJECT_ID = "restless-glitter-71170845"
-DATABASE_NAME = "neondb"
+from match_cache import load_matches_df
 
 print("=" * 80)
 print("BACKTESTING COM DADOS REAIS DO NEON")
 print("=" * 80)
 
-def run_sql(sql):
-    """Executar SQL no Neon"""
-    input_data = {
-        "projectId": PROJECT_ID,
-        "databaseName": DATABASE_NAME,
-        "sql": sql
-    }
-    
-    cmd = [
-        "manus-mcp-cli", "tool", "call", "run_sql",
-        "--server", "neon",
-        "--input", json.dumps(input_data)
-    ]
-    
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    
-    if result.returncode == 0:
-        try:
-            # Parse JSON from stdout
-            data = json.loads(result.stdout)
-            if isinstance(data, list):
-                return data
-            elif isinstance(data, dict) and 'rows' in data:
-                return data['rows']
-            else:
-                return data if isinstance(data, list) else []
-        except Exception as e:
-            print(f"Erro ao parsear resposta: {e}")
-            print(f"Stdout: {result.stdout[:200]}")
-            return []
-    return []
+# 1. Buscar todos os jogos (cache colunar local, sincronizado incrementalmente)
+print("\n📊 Carregando jogos do cache local (sync incremental com Neon)...")
 
-# 1. Buscar todos os jogos
-print("\n📊 Buscando jogos do Neon...")
+df = load_matches_df(refresh=True)
+print(f"✅ {len(df)} jogos encontrados")
 
-sql_matches = """
-SELECT 
-    m.id,
-    m.date,
-    m.home_team_id,
-    m.away_team_id,
-    m.home_goals,
-    m.away_goals,
-    ht.name as home_team,
-    at.name as away_team
-FROM matches m
-JOIN teams ht ON m.home_team_id = ht.id
-JOIN teams at ON m.away_team_id = at.id
-ORDER BY m.date
-"""
-
-matches = run_sql(sql_matches)
-print(f"✅ {len(matches)} jogos encontrados")
-
-if len(matches) < 50:
+if len(df) < 50:
     print("\n⚠️  Poucos jogos disponíveis. Aguardando importação completa...")
     print("Execute novamente após a importação terminar.")
     exit(0)
 
-# Converter para DataFrame
-df = pd.DataFrame(matches)
-df['date'] = pd.to_datetime(df['date'])
-df['home_goals'] = df['home_goals'].astype(int)
-df['away_goals'] = df['away_goals'].astype(int)
-
 print(f"\n📅 Período: {df['date'].min().date()} até {df['date'].max().date()}")
 
 # 2. Dividir em treino e teste (70% treino, 30% teste)
@@ -0,0 +1,300 @@
+"""
+Benchmark dos Caminhos Críticos de Previsão e Simulação
+Mede tempos com dados sintéticos fixos e salva JSON para comparação
+
+Uso:
+    python benchmark.py                          # 10k jogos, salva JSON
+    python benchmark.py --matches 100000         # base maior
+    python benchmark.py --baseline antigo.json   # compara com execução anterior
+    python benchmark.py --only simulate_group_stage predict_match_optimized
+
+Dados sintéticos (semente fixa):
+- Tabela de 200 seleções (inclui os 48 times da Copa 2026)
+- 10k a 100k jogos com gols Poisson a partir de forças latentes
+- Ensemble falso (pickle) com a mesma interface do Voting Soft
+"""
+
+import sys
+import os
+import json
+import time
+import pickle
+import sqlite3
+import argparse
+import platform
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+SEED = 2026
+N_TEAMS = 200
+DEFAULT_OUTPUT_DIR = Path(__file__).parent / "data" / "processed" / "benchmarks"
+REGRESSION_THRESHOLD = 1.20  # 20% mais lento = regressão
+
+
+class FakeVotingEnsemble:
+    """
+    Ensemble falso com a interface usada por model_ml_voting
+    (predict, predict_proba, classes_) - softmax linear sobre as 12 features
+    """
+
+    def __init__(self, seed=SEED, max_goals=4):
+        rng = np.random.default_rng(seed)
+        self.classes_ = np.array([f"{h}x{a}" for h in range(max_goals + 1) for a in range(max_goals + 1)])
+        self.weights = rng.normal(0, 0.01, size=(12, len(self.classes_)))
+        self.bias = rng.normal(0, 0.5, size=len(self.classes_))
+
+    def predict_proba(self, features):
+        logits = np.asarray(features, dtype=float) @ self.weights + self.bias
+        logits -= logits.max(axis=1, keepdims=True)
+        proba = np.exp(logits)
+        return proba / proba.sum(axis=1, keepdims=True)
+
+    def predict(self, features):
+        return self.classes_[np.argmax(self.predict_proba(features), axis=1)]
+
+
+def build_synthetic_dataset(n_matches, workdir, seed=SEED):
+    """
+    Cria banco SQLite sintético (schema do DatabaseManager) e estatísticas
+
+    Returns:
+        dict com 'db_path', 'team_ids', 'team_stats' (por nome), 'model_path'
+    """
+    from utils import DatabaseManager
+    from copa_2026_structure import get_all_teams
+
+    rng = np.random.default_rng(seed)
+    copa_teams = get_all_teams()
+    names = copa_teams + [f"Team {i:03d}" for i in range(N_TEAMS - len(copa_teams))]
+    team_ids = np.arange(1, N_TEAMS + 1)
+
+    attack = rng.normal(0.3, 0.25, N_TEAMS)
+    defense = rng.normal(0.0, 0.25, N_TEAMS)
+
+    db_path = Path(workdir) / "benchmark.db"
+    DatabaseManager(db_path)  # cria o schema
+
+    conn = sqlite3.connect(db_path)
+    now = datetime.now()
+    conn.executemany(
+        "INSERT OR REPLACE INTO teams (id, name, country, fifa_rank, elo_rating, last_updated) VALUES (?, ?, ?, ?, ?, ?)",
+        [(int(team_ids[i]), names[i], names[i], i + 1, None, now) for i in range(N_TEAMS)]
+    )
+
+    home = rng.integers(0, N_TEAMS, n_matches)
+    away = (home + rng.integers(1, N_TEAMS, n_matches)) % N_TEAMS
+    home_goals = rng.poisson(np.exp(attack[home] - defense[away]))
+    away_goals = rng.poisson(np.exp(attack[away] - defense[home]))
+    start = datetime(2015, 1, 1)
+    days = np.sort(rng.integers(0, 365 * 11, n_matches))
+
+    conn.executemany(
+        "INSERT INTO matches (id, date, home_team_id, away_team_id, home_goals, away_goals, competition, stage, last_updated) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            (k + 1, (start + timedelta(days=int(days[k]))).strftime("%Y-%m-%d"),
+             int(team_ids[home[k]]), int(team_ids[away[k]]),
+             int(home_goals[k]), int(away_goals[k]), "Friendly", "", now)
+            for k in range(n_matches)
+        ]
+    )
+    conn.commit()
+    conn.close()
+
+    # Estatísticas no formato de team_strength.get_team_strength_stats
+    team_stats = {}
+    for i, name in enumerate(names):
+        strength = float(np.clip(50 + (attack[i] - defense[i]) * 60, 0, 100))
+        team_stats[name] = {
+            'avg_goals_scored': float(np.exp(attack[i])),
+            'avg_goals_conceded': float(np.exp(-defense[i] + 0.3)),
+            'fifa_ranking': 1370 + strength * 5.1,
+            'strength': strength,
+            'recent_form': 0.5,
+            'total_games': 50
+        }
+
+    # Ensemble falso serializado como o modelo real
+    model_path = Path(workdir) / "model_voting_soft.pkl"
+    with open(model_path, 'wb') as f:
+        pickle.dump(FakeVotingEnsemble(seed), f)
+
+    return {
+        'db_path': db_path,
+        'team_ids': [int(t) for t in team_ids],
+        'names': names,
+        'team_stats': team_stats,
+        'model_path': model_path
+    }
+
+
+def time_call(fn, repeat, warmup=1):
+    """Executa fn repetidamente e retorna estatísticas de tempo (segundos)"""
+    for _ in range(warmup):
+        fn()
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    timings = np.array(timings)
+    return {
+        'repeat': repeat,
+        'min': float(timings.min()),
+        'median': float(np.median(timings)),
+        'mean': float(timings.mean()),
+        'max': float(timings.max())
+    }
+
+
+def build_cases(dataset, quick=False):
+    """
+    Monta os casos do benchmark: nome -> (função sem argumentos, repetições)
+    """
+    import model_ml_voting
+    import tournament_simulator
+    from model_optimized import predict_match_optimized
+    from data_processing import DataProcessor
+    from model import MatchPredictor, PodiumPredictor
+
+    # Ensemble falso no lugar do pickle real
+    with open(dataset['model_path'], 'rb') as f:
+        model_ml_voting.voting_model = pickle.load(f)
+    model_ml_voting.MODEL_LOADED = True
+
+    processor = _build(DataProcessor, dataset)
+    match_predictor = _build(MatchPredictor, dataset)
+    podium_predictor = _build(PodiumPredictor, dataset)
+
+    stats = dataset['team_stats']
+    brazil, haiti = stats['Brazil'], stats['Haiti']
+    team_ids = dataset['team_ids']
+    n_sims = 5 if quick else 20
+
+    return {
+        'predict_match_optimized': (lambda: predict_match_optimized(brazil, haiti), 200),
+        'predict_match_voting': (lambda: model_ml_voting.predict_match_voting(brazil, haiti), 200),
+        'MatchPredictor.predict_match_score': (
+            lambda: match_predictor.predict_match_score(team_ids[0], team_ids[1]), 3 if quick else 10),
+        'simulate_group_stage': (lambda: tournament_simulator.simulate_group_stage(stats), 5 if quick else 20),
+        'simulate_full_tournament': (
+            lambda: tournament_simulator.simulate_full_tournament(stats, n_simulations=n_sims), 3),
+        'PodiumPredictor.predict_podium': (
+            lambda: podium_predictor.predict_podium(team_ids[:4], n_simulations=2), 1 if quick else 3),
+        'DataProcessor.get_all_teams_data': (lambda: processor.get_all_teams_data(), 1 if quick else 3),
+    }
+
+
+def _build(cls, dataset):
+    """
+    Instancia classes de src/ apontando para o banco sintético
+
+    O DatabaseManager real não é alterado: só o nome importado pelos
+    módulos que o instanciam é trocado, e apenas durante a construção.
+    """
+    import functools
+    from contextlib import ExitStack
+    from unittest import mock
+    import data_processing
+    import elo
+    import model
+    import utils
+
+    factory = functools.partial(utils.DatabaseManager, dataset['db_path'])
+    with ExitStack() as stack:
+        for module in (data_processing, elo, model):
+            stack.enter_context(mock.patch.object(module, 'DatabaseManager', factory))
+        return cls()
+
+
+def compare_with_baseline(results, baseline_path, threshold=REGRESSION_THRESHOLD):
+    """
+    Compara medianas com uma execução anterior
+
+    Returns:
+        lista de casos com regressão (razão > threshold)
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    regressions = []
+    print(f"\n📊 Comparação com {baseline_path} ({baseline.get('created_at', '?')}):")
+    for name, current in results['cases'].items():
+        old = baseline.get('cases', {}).get(name)
+        if not old:
+            print(f"  {name:40s} (novo)")
+            continue
+        ratio = current['median'] / old['median'] if old['median'] > 0 else float('inf')
+        status = "❌" if ratio > threshold else ("✅" if ratio < 1 / threshold else "  ")
+        print(f"  {status} {name:40s} {old['median'] * 1000:10.2f} ms -> {current['median'] * 1000:10.2f} ms ({ratio:5.2f}x)")
+        if ratio > threshold:
+            regressions.append(name)
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dos caminhos críticos do bolão")
+    parser.add_argument('--matches', type=int, default=10000, help="jogos sintéticos (10k-100k)")
+    parser.add_argument('--output', type=Path, default=None, help="arquivo JSON de saída")
+    parser.add_argument('--baseline', type=Path, default=None, help="JSON anterior para comparação")
+    parser.add_argument('--only', nargs='*', default=None, help="rodar apenas estes casos")
+    parser.add_argument('--quick', action='store_true', help="menos repetições")
+    args = parser.parse_args(argv)
+
+    print("=" * 80)
+    print("BENCHMARK - PREVISÃO E SIMULAÇÃO")
+    print("=" * 80)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        print(f"\n🏗️  Gerando dados sintéticos ({args.matches} jogos, {N_TEAMS} seleções)...")
+        start = time.perf_counter()
+        dataset = build_synthetic_dataset(args.matches, workdir)
+        print(f"✅ Dados prontos em {time.perf_counter() - start:.1f} s")
+
+        cases = build_cases(dataset, quick=args.quick)
+        if args.only:
+            cases = {name: case for name, case in cases.items() if name in args.only}
+
+        results = {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'n_matches': args.matches,
+            'n_teams': N_TEAMS,
+            'seed': SEED,
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'cases': {}
+        }
+
+        print("\n⏱️  Tempos (mediana):")
+        for name, (fn, repeat) in cases.items():
+            results['cases'][name] = time_call(fn, repeat)
+            print(f"  {name:40s} {results['cases'][name]['median'] * 1000:10.2f} ms")
+
+    output = args.output
+    if output is None:
+        DEFAULT_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+        output = DEFAULT_OUTPUT_DIR / f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n💾 Resultados salvos em: {output}")
+
+    regressions = []
+    if args.baseline:
+        regressions = compare_with_baseline(results, args.baseline)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regressões acima de {REGRESSION_THRESHOLD - 1:.0%}: {', '.join(regressions)}")
+
+    print("=" * 80)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""
+Benchmark: OR-join em matches vs team_match_perspective no Neon
+Compara o tempo de execução (EXPLAIN ANALYZE) das consultas por seleção
+sobre o histórico completo
+
+Uso:
+    python benchmark_team_perspective.py              # 10 seleções da Copa
+    python benchmark_team_perspective.py --teams 48   # todas as seleções da Copa
+"""
+
+import sys
+import json
+import argparse
+import subprocess
+import numpy as np
+
+from copa_2026_structure import get_all_teams
+
+PROJECT_ID = "restless-glitter-71170845"
+DATABASE_NAME = "neondb"
+
+# Últimos 50 jogos de uma seleção (mesma consulta de streamlit_app.get_team_stats)
+OLD_TEAM_QUERY = """
+SELECT date,
+    CASE WHEN home_team_id = {team_id} THEN home_goals ELSE away_goals END as goals_scored,
+    CASE WHEN home_team_id = {team_id} THEN away_goals ELSE home_goals END as goals_conceded
+FROM matches
+WHERE home_team_id = {team_id} OR away_team_id = {team_id}
+ORDER BY date DESC
+LIMIT 50
+"""
+
+NEW_TEAM_QUERY = """
+SELECT date, goals_for as goals_scored, goals_against as goals_conceded, result
+FROM team_match_perspective
+WHERE team_id = {team_id}
+ORDER BY date DESC
+LIMIT 50
+"""
+
+# Agregado de todas as seleções (mesma consulta de query_team_stats.sql)
+OLD_AGGREGATE_QUERY = """
+SELECT t.name, COUNT(*),
+    AVG(CASE WHEN m.home_team_id = t.id THEN m.home_goals ELSE m.away_goals END),
+    AVG(CASE WHEN m.home_team_id = t.id THEN m.away_goals ELSE m.home_goals END)
+FROM teams t
+JOIN matches m ON (m.home_team_id = t.id OR m.away_team_id = t.id)
+WHERE t.name IN ({names})
+GROUP BY t.name
+"""
+
+NEW_AGGREGATE_QUERY = """
+SELECT t.name, COUNT(*), AVG(p.goals_for), AVG(p.goals_against)
+FROM teams t
+JOIN team_match_perspective p ON p.team_id = t.id
+WHERE t.name IN ({names})
+GROUP BY t.name
+"""
+
+
+def run_sql(sql):
+    """Executar SQL no Neon e retornar as linhas"""
+    input_data = {
+        "projectId": PROJECT_ID,
+        "databaseName": DATABASE_NAME,
+        "sql": sql
+    }
+
+    cmd = [
+        "manus-mcp-cli", "tool", "call", "run_sql",
+        "--server", "neon",
+        "--input", json.dumps(input_data)
+    ]
+
+    result = subprocess.run(cmd, capture_output=True, text=True)
+
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr[:200])
+
+    data = json.loads(result.stdout)
+    if isinstance(data, dict) and 'rows' in data:
+        return data['rows']
+    return data if isinstance(data, list) else []
+
+
+def explain_time(sql):
+    """
+    Tempo de execução no servidor (ms) via EXPLAIN ANALYZE
+
+    Returns:
+        (execution_ms, nó raiz do plano)
+    """
+    rows = run_sql("EXPLAIN (ANALYZE, FORMAT JSON) " + sql)
+    plan = rows[0]['QUERY PLAN']
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]['Execution Time'], plan[0]['Plan']
+
+
+def scan_types(node):
+    """Tipos de scan usados no plano (ex.: 'Index Scan on team_match_perspective')"""
+    scans = []
+    if 'Scan' in node.get('Node Type', ''):
+        scans.append(f"{node['Node Type']} on {node.get('Relation Name', '?')}")
+    for child in node.get('Plans', []):
+        scans.extend(scan_types(child))
+    return scans
+
+
+def compare(label, old_sql, new_sql, repeat):
+    """Executa as duas consultas `repeat` vezes e imprime as medianas"""
+    old_times, new_times = [], []
+    for _ in range(repeat):
+        old_ms, old_plan = explain_time(old_sql)
+        new_ms, new_plan = explain_time(new_sql)
+        old_times.append(old_ms)
+        new_times.append(new_ms)
+
+    old_median, new_median = float(np.median(old_times)), float(np.median(new_times))
+    speedup = old_median / new_median if new_median > 0 else float('inf')
+    print(f"  {label:30s} {old_median:10.2f} ms -> {new_median:10.2f} ms ({speedup:5.1f}x)")
+    return {
+        'old_ms': old_median,
+        'new_ms': new_median,
+        'old_scans': scan_types(old_plan),
+        'new_scans': scan_types(new_plan)
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de team_match_perspective")
+    parser.add_argument('--teams', type=int, default=10, help="seleções da Copa a medir")
+    parser.add_argument('--repeat', type=int, default=3, help="execuções por consulta")
+    args = parser.parse_args(argv)
+
+    print("=" * 80)
+    print("BENCHMARK - OR-JOIN vs TEAM_MATCH_PERSPECTIVE")
+    print("=" * 80)
+
+    names = get_all_teams()
+    names_sql = ", ".join("'" + n.replace("'", "''") + "'" for n in names)
+    teams = run_sql(f"SELECT id, name FROM teams WHERE name IN ({names_sql}) ORDER BY name")[:args.teams]
+
+    counts = run_sql("SELECT (SELECT COUNT(*) FROM matches) AS matches, "
+                     "(SELECT COUNT(*) FROM team_match_perspective) AS perspective")[0]
+    print(f"\n📊 matches: {counts['matches']} | team_match_perspective: {counts['perspective']}")
+
+    print("\n⏱️  Tempo de execução (mediana, EXPLAIN ANALYZE):")
+    results = {}
+    for team in teams:
+        results[team['name']] = compare(
+            team['name'],
+            OLD_TEAM_QUERY.format(team_id=int(team['id'])),
+            NEW_TEAM_QUERY.format(team_id=int(team['id'])),
+            args.repeat
+        )
+
+    results['_aggregate'] = compare(
+        "Agregado (48 seleções)",
+        OLD_AGGREGATE_QUERY.format(names=names_sql),
+        NEW_AGGREGATE_QUERY.format(names=names_sql),
+        args.repeat
+    )
+
+    sample = results['_aggregate']
+    print("\n🔍 Scans do agregado:")
+    print(f"  Antes:  {', '.join(sample['old_scans'])}")
+    print(f"  Depois: {', '.join(sample['new_scans'])}")
+
+    per_team = [r for name, r in results.items() if name != '_aggregate']
+    if per_team:
+        old_total = sum(r['old_ms'] for r in per_team)
+        new_total = sum(r['new_ms'] for r in per_team)
+        print(f"\n✅ Consultas por seleção: {old_total:.1f} ms -> {new_total:.1f} ms "
+              f"({old_total / max(new_total, 1e-9):.1f}x)")
+
+    print("=" * 80)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -119,56 +119,63 @@ def get_all_group_matches():
 
 def get_knockout_structure():
     """
-    Estrutura do mata-mata
-    - Oitavas: 16 jogos (1º vs 2º de outros grupos + 8 melhores 3º)
-    - Quartas: 8 jogos
-    - Semi: 4 jogos
+    Estrutura do mata-mata (formato de 48 times)
+    - 16-avos: 16 jogos (12 primeiros, 12 segundos e 8 melhores 3º)
+    - Oitavas: 8 jogos
+    - Quartas: 4 jogos
+    - Semi: 2 jogos
     - 3º lugar: 1 jogo
     - Final: 1 jogo
-    Total: 30 jogos
+    Total: 32 jogos
+    
+    Terceiros aparecem como '3º ABCDF' (grupos elegíveis); o grupo de cada
+    vaga depende da combinação de grupos classificados (ver
+    third_place_allocation.py)
     """
     knockout = {
+        'dezesseisavos': [
+            {'match': 1, 'team1': '2A', 'team2': '2B'},
+            {'match': 2, 'team1': '1E', 'team2': '3º ABCDF'},
+            {'match': 3, 'team1': '1F', 'team2': '2C'},
+            {'match': 4, 'team1': '1C', 'team2': '2F'},
+            {'match': 5, 'team1': '1I', 'team2': '3º CDFGH'},
+            {'match': 6, 'team1': '2E', 'team2': '2I'},
+            {'match': 7, 'team1': '1A', 'team2': '3º CEFHI'},
+            {'match': 8, 'team1': '1L', 'team2': '3º EHIJK'},
+            {'match': 9, 'team1': '1D', 'team2': '3º BEFIJ'},
+            {'match': 10, 'team1': '1G', 'team2': '3º AEHIJ'},
+            {'match': 11, 'team1': '2K', 'team2': '2L'},
+            {'match': 12, 'team1': '1H', 'team2': '2J'},
+            {'match': 13, 'team1': '1B', 'team2': '3º EFGIJ'},
+            {'match': 14, 'team1': '1J', 'team2': '2H'},
+            {'match': 15, 'team1': '1K', 'team2': '3º DEIJL'},
+            {'match': 16, 'team1': '2D', 'team2': '2G'},
+        ],
         'oitavas': [
-            {'match': 1, 'team1': '1A', 'team2': '2B'},
-            {'match': 2, 'team1': '1C', 'team2': '2D'},
-            {'match': 3, 'team1': '1E', 'team2': '2F'},
-            {'match': 4, 'team1': '1G', 'team2': '2H'},
-            {'match': 5, 'team1': '1I', 'team2': '2J'},
-            {'match': 6, 'team1': '1K', 'team2': '2L'},
-            {'match': 7, 'team1': '1B', 'team2': '2A'},
-            {'match': 8, 'team1': '1D', 'team2': '2C'},
-            {'match': 9, 'team1': '1F', 'team2': '2E'},
-            {'match': 10, 'team1': '1H', 'team2': '2G'},
-            {'match': 11, 'team1': '1J', 'team2': '2I'},
-            {'match': 12, 'team1': '1L', 'team2': '2K'},
-            {'match': 13, 'team1': '2º melhor 3º', 'team2': '3º melhor 3º'},
-            {'match': 14, 'team1': '1º melhor 3º', 'team2': '4º melhor 3º'},
-            {'match': 15, 'team1': '5º melhor 3º', 'team2': '6º melhor 3º'},
-            {'match': 16, 'team1': '7º melhor 3º', 'team2': '8º melhor 3º'},
+            {'match': 1, 'team1': 'V Dezesseisavos 2', 'team2': 'V Dezesseisavos 5'},
+            {'match': 2, 'team1': 'V Dezesseisavos 1', 'team2': 'V Dezesseisavos 3'},
+            {'match': 3, 'team1': 'V Dezesseisavos 4', 'team2': 'V Dezesseisavos 6'},
+            {'match': 4, 'team1': 'V Dezesseisavos 7', 'team2': 'V Dezesseisavos 8'},
+            {'match': 5, 'team1': 'V Dezesseisavos 11', 'team2': 'V Dezesseisavos 12'},
+            {'match': 6, 'team1': 'V Dezesseisavos 9', 'team2': 'V Dezesseisavos 10'},
+            {'match': 7, 'team1': 'V Dezesseisavos 14', 'team2': 'V Dezesseisavos 16'},
+            {'match': 8, 'team1': 'V Dezesseisavos 13', 'team2': 'V Dezesseisavos 15'},
         ],
         'quartas': [
             {'match': 1, 'team1': 'V Oitava 1', 'team2': 'V Oitava 2'},
-            {'match': 2, 'team1': 'V Oitava 3', 'team2': 'V Oitava 4'},
-            {'match': 3, 'team1': 'V Oitava 5', 'team2': 'V Oitava 6'},
+            {'match': 2, 'team1': 'V Oitava 5', 'team2': 'V Oitava 6'},
+            {'match': 3, 'team1': 'V Oitava 3', 'team2': 'V Oitava 4'},
             {'match': 4, 'team1': 'V Oitava 7', 'team2': 'V Oitava 8'},
-            {'match': 5, 'team1': 'V Oitava 9', 'team2': 'V Oitava 10'},
-            {'match': 6, 'team1': 'V Oitava 11', 'team2': 'V Oitava 12'},
-            {'match': 7, 'team1': 'V Oitava 13', 'team2': 'V Oitava 14'},
-            {'match': 8, 'team1': 'V Oitava 15', 'team2': 'V Oitava 16'},
         ],
         'semi': [
             {'match': 1, 'team1': 'V Quarta 1', 'team2': 'V Quarta 2'},
             {'match': 2, 'team1': 'V Quarta 3', 'team2': 'V Quarta 4'},
-            {'match': 3, 'team1': 'V Quarta 5', 'team2': 'V Quarta 6'},
-            {'match': 4, 'team1': 'V Quarta 7', 'team2': 'V Quarta 8'},
         ],
         'terceiro': [
             {'match': 1, 'team1': 'P Semi 1', 'team2': 'P Semi 2'},
-            {'match': 2, 'team1': 'P Semi 3', 'team2': 'P Semi 4'},
         ],
         'final': [
             {'match': 1, 'team1': 'V Semi 1', 'team2': 'V Semi 2'},
-            {'match': 2, 'team1': 'V Semi 3', 'team2': 'V Semi 4'},
         ]
     }
     return knockout
@@ -177,16 +184,18 @@ def count_total_matches():
     """Conta total de jogos"""
     grupos = len(get_all_group_matches())  # 72
     knockout = get_knockout_structure()
-    oitavas = len(knockout['oitavas'])  # 16
-    quartas = len(knockout['quartas'])  # 8
-    semi = len(knockout['semi'])  # 4
-    terceiro = len(knockout['terceiro'])  # 2
-    final = len(knockout['final'])  # 2
+    dezesseisavos = len(knockout['dezesseisavos'])  # 16
+    oitavas = len(knockout['oitavas'])  # 8
+    quartas = len(knockout['quartas'])  # 4
+    semi = len(knockout['semi'])  # 2
+    terceiro = len(knockout['terceiro'])  # 1
+    final = len(knockout['final'])  # 1
     
-    total = grupos + oitavas + quartas + semi + terceiro + final
+    total = grupos + dezesseisavos + oitavas + quartas + semi + terceiro + final
     
     return {
         'grupos': grupos,
+        'dezesseisavos': dezesseisavos,
         'oitavas': oitavas,
         'quartas': quartas,
         'semi': semi,
@@ -127,6 +127,20 @@ sql_statements = [
         submitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
     )""",
     
+    # Tabela team_match_perspective (2 linhas por jogo, uma por seleção)
+    """CREATE TABLE IF NOT EXISTS team_match_perspective (
+        match_id BIGINT NOT NULL REFERENCES matches(id) ON DELETE CASCADE,
+        team_id INTEGER NOT NULL REFERENCES teams(id),
+        opponent_id INTEGER NOT NULL REFERENCES teams(id),
+        date DATE NOT NULL,
+        is_home BOOLEAN NOT NULL,
+        goals_for INTEGER NOT NULL,
+        goals_against INTEGER NOT NULL,
+        result CHAR(1) NOT NULL,
+        competition VARCHAR(200),
+        PRIMARY KEY (match_id, team_id)
+    )""",
+    
     # Tabela update_log
     """CREATE TABLE IF NOT EXISTS update_log (
         id SERIAL PRIMARY KEY,
@@ -150,6 +164,62 @@ indexes = [
     "CREATE INDEX IF NOT EXISTS idx_matches_competition ON matches(competition)",
     "CREATE INDEX IF NOT EXISTS idx_predictions_match ON predictions(match_id)",
     "CREATE INDEX IF NOT EXISTS idx_update_log_started ON update_log(started_at DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_perspective_team_date ON team_match_perspective(team_id, date DESC) "
+    "INCLUDE (goals_for, goals_against, result)",
+]
+
+# Manutenção de team_match_perspective: os importadores só escrevem em
+# matches; triggers por statement replicam cada lote na tabela de perspectiva
+PERSPECTIVE_ROWS_SQL = """
+    SELECT
+        n.id, v.team_id, v.opponent_id, n.date, v.is_home,
+        v.goals_for, v.goals_against,
+        CASE
+            WHEN v.goals_for > v.goals_against THEN 'W'
+            WHEN v.goals_for = v.goals_against THEN 'D'
+            ELSE 'L'
+        END,
+        n.competition
+    FROM {source} n
+    CROSS JOIN LATERAL (VALUES
+        (n.home_team_id, n.away_team_id, TRUE, n.home_goals, n.away_goals),
+        (n.away_team_id, n.home_team_id, FALSE, n.away_goals, n.home_goals)
+    ) AS v(team_id, opponent_id, is_home, goals_for, goals_against)
+    WHERE n.home_goals IS NOT NULL AND n.away_goals IS NOT NULL
+"""
+
+PERSPECTIVE_COLUMNS = "match_id, team_id, opponent_id, date, is_home, goals_for, goals_against, result, competition"
+
+triggers = [
+    ("função sync_team_match_perspective", f"""CREATE OR REPLACE FUNCTION sync_team_match_perspective()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            DELETE FROM team_match_perspective p USING old_rows o WHERE p.match_id = o.id;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO team_match_perspective ({PERSPECTIVE_COLUMNS})
+            {PERSPECTIVE_ROWS_SQL.format(source='new_rows')};
+        END IF;
+        RETURN NULL;
+    END;
+    $$ language 'plpgsql'"""),
+
+    ("trigger sync_perspective_insert", """CREATE OR REPLACE TRIGGER sync_perspective_insert AFTER INSERT ON matches
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION sync_team_match_perspective()"""),
+
+    ("trigger sync_perspective_update", """CREATE OR REPLACE TRIGGER sync_perspective_update AFTER UPDATE ON matches
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION sync_team_match_perspective()"""),
+
+    ("trigger sync_perspective_delete", """CREATE OR REPLACE TRIGGER sync_perspective_delete AFTER DELETE ON matches
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION sync_team_match_perspective()"""),
+
+    ("carga inicial de team_match_perspective", f"""INSERT INTO team_match_perspective ({PERSPECTIVE_COLUMNS})
+    {PERSPECTIVE_ROWS_SQL.format(source='matches')}
+    ON CONFLICT (match_id, team_id) DO NOTHING"""),
 ]
 
 def run_sql(sql):
@@ -195,6 +265,18 @@ for i, sql in enumerate(indexes, 1):
     else:
         print(f"   ❌ Erro: {stderr[:200]}")
 
+# Criar triggers de manutenção
+print("\n⚙️  Criando triggers de team_match_perspective...")
+for i, (name, sql) in enumerate(triggers, 1):
+    print(f"\n{i}. Criando {name}...")
+    
+    success, stdout, stderr = run_sql(sql)
+    
+    if success:
+        print(f"   ✅ {name} ok")
+    else:
+        print(f"   ❌ Erro: {stderr[:200]}")
+
 # Verificar tabelas criadas
 print("\n" + "=" * 80)
 print("VERIFICANDO TABELAS CRIADAS")
@@ -234,8 +316,8 @@ print(f"""
 📊 Banco de Dados Configurado:
   - Project ID: {PROJECT_ID}
   - Database: {DATABASE_NAME}
-  - Tabelas: 9 tabelas principais
-  - Índices: 7 índices para performance
+  - Tabelas: 10 tabelas principais
+  - Índices: 8 índices para performance
 
 🚀 Próximo Passo: Coletar dados via API-Football
 """)
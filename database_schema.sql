@@ -42,6 +42,25 @@ CREATE INDEX idx_matches_away_team ON matches(away_team_id);
 CREATE INDEX idx_matches_competition ON matches(competition);
 CREATE INDEX idx_matches_status ON matches(status);
 
+-- Tabela de Jogos na Perspectiva de Cada Seleção (2 linhas por jogo)
+-- Evita o OR-join (home_team_id = t.id OR away_team_id = t.id) nas
+-- consultas por seleção: tudo vira range scan em (team_id, date DESC)
+CREATE TABLE IF NOT EXISTS team_match_perspective (
+    match_id BIGINT NOT NULL REFERENCES matches(id) ON DELETE CASCADE,
+    team_id INTEGER NOT NULL REFERENCES teams(id),
+    opponent_id INTEGER NOT NULL REFERENCES teams(id),
+    date DATE NOT NULL,
+    is_home BOOLEAN NOT NULL,
+    goals_for INTEGER NOT NULL,
+    goals_against INTEGER NOT NULL,
+    result CHAR(1) NOT NULL, -- 'W', 'D', 'L'
+    competition VARCHAR(200),
+    PRIMARY KEY (match_id, team_id)
+);
+
+CREATE INDEX idx_perspective_team_date ON team_match_perspective(team_id, date DESC)
+    INCLUDE (goals_for, goals_against, result);
+
 -- Tabela de Estatísticas de Times (cache)
 CREATE TABLE IF NOT EXISTS team_stats (
     team_id INTEGER PRIMARY KEY REFERENCES teams(id),
@@ -222,6 +241,78 @@ CREATE TRIGGER update_teams_updated_at BEFORE UPDATE ON teams
 CREATE TRIGGER update_matches_updated_at BEFORE UPDATE ON matches
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+-- Função: Manter team_match_perspective sincronizada com matches
+-- Triggers por statement com transition tables: um lote de INSERT dos
+-- importadores gera um único INSERT ... SELECT na tabela de perspectiva
+CREATE OR REPLACE FUNCTION sync_team_match_perspective()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        DELETE FROM team_match_perspective p
+        USING old_rows o
+        WHERE p.match_id = o.id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO team_match_perspective (
+            match_id, team_id, opponent_id, date, is_home,
+            goals_for, goals_against, result, competition
+        )
+        SELECT
+            n.id, v.team_id, v.opponent_id, n.date, v.is_home,
+            v.goals_for, v.goals_against,
+            CASE
+                WHEN v.goals_for > v.goals_against THEN 'W'
+                WHEN v.goals_for = v.goals_against THEN 'D'
+                ELSE 'L'
+            END,
+            n.competition
+        FROM new_rows n
+        CROSS JOIN LATERAL (VALUES
+            (n.home_team_id, n.away_team_id, TRUE, n.home_goals, n.away_goals),
+            (n.away_team_id, n.home_team_id, FALSE, n.away_goals, n.home_goals)
+        ) AS v(team_id, opponent_id, is_home, goals_for, goals_against)
+        WHERE n.home_goals IS NOT NULL AND n.away_goals IS NOT NULL;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE TRIGGER sync_perspective_insert AFTER INSERT ON matches
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION sync_team_match_perspective();
+
+CREATE TRIGGER sync_perspective_update AFTER UPDATE ON matches
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION sync_team_match_perspective();
+
+CREATE TRIGGER sync_perspective_delete AFTER DELETE ON matches
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION sync_team_match_perspective();
+
+-- Carga inicial de team_match_perspective a partir do histórico existente
+INSERT INTO team_match_perspective (
+    match_id, team_id, opponent_id, date, is_home,
+    goals_for, goals_against, result, competition
+)
+SELECT
+    m.id, v.team_id, v.opponent_id, m.date, v.is_home,
+    v.goals_for, v.goals_against,
+    CASE
+        WHEN v.goals_for > v.goals_against THEN 'W'
+        WHEN v.goals_for = v.goals_against THEN 'D'
+        ELSE 'L'
+    END,
+    m.competition
+FROM matches m
+CROSS JOIN LATERAL (VALUES
+    (m.home_team_id, m.away_team_id, TRUE, m.home_goals, m.away_goals),
+    (m.away_team_id, m.home_team_id, FALSE, m.away_goals, m.home_goals)
+) AS v(team_id, opponent_id, is_home, goals_for, goals_against)
+WHERE m.home_goals IS NOT NULL AND m.away_goals IS NOT NULL
+ON CONFLICT (match_id, team_id) DO NOTHING;
+
 -- Comentários nas tabelas
 COMMENT ON TABLE teams IS 'Seleções participantes da Copa 2026';
 COMMENT ON TABLE matches IS 'Histórico de jogos das seleções';
@@ -232,3 +323,4 @@ COMMENT ON TABLE user_predictions IS 'Palpites do usuário para os jogos';
 COMMENT ON TABLE group_predictions IS 'Palpites de classificação dos grupos';
 COMMENT ON TABLE podium_prediction IS 'Palpite de pódio (1º, 2º, 3º)';
 COMMENT ON TABLE update_log IS 'Log de atualizações do banco de dados';
+COMMENT ON TABLE team_match_perspective IS 'Jogos na perspectiva de cada seleção (mantida por trigger)';
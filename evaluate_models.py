@@ -0,0 +1,263 @@
+"""
+Avaliação Comparativa de Modelos - Uma Única Passada
+Carrega o conjunto de teste uma vez, roda todos os modelos registrados em
+lote e pontua todos com o kernel vetorizado do Bolão (bolao_points)
+
+Uso:
+    python evaluate_models.py                         # corte 70/30
+    python evaluate_models.py --cutoff 2024-01-01
+    python evaluate_models.py --models optimized voting
+    python evaluate_models.py --with-match-predictor  # inclui src/model.py (lento)
+
+Estatísticas dos times: médias de gols da janela de treino (anterior ao
+corte), ranking FIFA de team_strength.FIFA_RANKING quando disponível e
+força calculada com a mesma fórmula de team_strength.calculate_team_strength
+"""
+
+import sys
+import os
+import time
+import argparse
+from pathlib import Path
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from model_optimized import bolao_points, BOLAO_POINTS
+
+DEFAULT_OUTPUT_DIR = Path(__file__).parent / "data" / "processed" / "evaluations"
+DEFAULT_FIFA_POINTS = 1500.0
+
+# Registro de modelos: nome -> {'fn': fn(eval_set) -> (home, away), 'needs_db': bool}
+MODEL_REGISTRY = {}
+
+
+def register_model(name, needs_db=False):
+    """Registra um modelo no harness (decorator)"""
+    def decorator(fn):
+        MODEL_REGISTRY[name] = {'fn': fn, 'needs_db': needs_db}
+        return fn
+    return decorator
+
+
+def team_strength_batch(avg_scored, avg_conceded, fifa_points):
+    """Mesma fórmula de team_strength.calculate_team_strength, vetorizada"""
+    scored_component = np.clip((avg_scored - 0.5) / 2.5 * 100, 0, 100)
+    conceded_component = np.clip((2.0 - avg_conceded) / 1.5 * 100, 0, 100)
+    fifa_component = np.clip((fifa_points - 1370) / 510 * 100, 0, 100)
+    return np.round(0.10 * scored_component + 0.10 * conceded_component + 0.80 * fifa_component, 1)
+
+
+def build_eval_set(dataset, cutoff=None, train_years=None, team_names=None):
+    """
+    Monta o conjunto de avaliação (estatísticas por lado em arrays)
+
+    Args:
+        dataset: saída de walk_forward.build_dataset / load_dataset
+        cutoff: data de corte (padrão: 70% dos jogos no treino)
+        train_years: janela de treino (None = todo o histórico anterior)
+        team_names: {ID original: nome} para buscar o ranking FIFA
+
+    Returns:
+        dict com 'home'/'away' (stats em arrays), gols reais, IDs e nomes
+    """
+    from walk_forward import team_features
+    from team_strength import FIFA_RANKING
+
+    dates = dataset['date']
+    if cutoff is None:
+        train_end = int(len(dates) * 0.7)
+    else:
+        train_end = int(np.searchsorted(dates, np.datetime64(cutoff, 'D'), side='left'))
+    train_start = 0
+    if train_years:
+        start_day = (dates[train_end].astype('datetime64[M]') - 12 * train_years).astype('datetime64[D]')
+        train_start = int(np.searchsorted(dates, start_day, side='left'))
+
+    avg_for, avg_against, games = team_features(dataset, train_start, train_end)
+
+    team_ids = dataset['team_ids']
+    team_names = team_names or {}
+    names = np.array([team_names.get(int(t), str(t)) for t in team_ids], dtype=object)
+    fifa = np.array([FIFA_RANKING.get(name, DEFAULT_FIFA_POINTS) for name in names], dtype=float)
+    strength = team_strength_batch(avg_for, avg_against, fifa)
+
+    sl = slice(train_end, None)
+    home, away = dataset['home'][sl], dataset['away'][sl]
+
+    def side(idx):
+        return {
+            'avg_goals_scored': avg_for[idx],
+            'avg_goals_conceded': avg_against[idx],
+            'fifa_ranking': fifa[idx],
+            'strength': strength[idx],
+            'total_games': games[idx],
+        }
+
+    return {
+        'cutoff': str(dates[train_end]) if train_end < len(dates) else None,
+        'n_train': train_end - train_start,
+        'home': side(home),
+        'away': side(away),
+        'home_team_id': team_ids[home],
+        'away_team_id': team_ids[away],
+        'home_team': names[home],
+        'away_team': names[away],
+        'real_home': dataset['home_goals'][sl],
+        'real_away': dataset['away_goals'][sl],
+    }
+
+
+def _row_stats(side, k):
+    """Dict de estatísticas de um jogo (para modelos sem versão em lote)"""
+    return {key: float(values[k]) for key, values in side.items()}
+
+
+@register_model('optimized')
+def _optimized(eval_set):
+    from model_optimized import predict_match_optimized_batch
+    pred = predict_match_optimized_batch(eval_set['home'], eval_set['away'])
+    return pred['home_goals'], pred['away_goals']
+
+
+@register_model('adaptive')
+def _adaptive(eval_set):
+    # predict_match_adaptive só muda max_goals, que não altera os placares
+    # candidatos de predict_match_optimized: mesma previsão em lote
+    from model_optimized import predict_match_optimized_batch
+    pred = predict_match_optimized_batch(eval_set['home'], eval_set['away'])
+    return pred['home_goals'], pred['away_goals']
+
+
+@register_model('expected_points')
+def _expected_points(eval_set):
+    from model_optimized import calculate_lambdas, score_probability_matrix, optimize_picks
+    home, away = eval_set['home'], eval_set['away']
+    lambda_home, lambda_away = calculate_lambdas(
+        home['avg_goals_scored'], home['avg_goals_conceded'], home['fifa_ranking'],
+        away['avg_goals_scored'], away['avg_goals_conceded'], away['fifa_ranking']
+    )
+    picks = optimize_picks(score_probability_matrix(lambda_home, lambda_away))
+    return picks['home_goals'], picks['away_goals']
+
+
+@register_model('voting')
+def _voting(eval_set):
+    from model_ml_voting import predict_match_voting_batch
+    pred = predict_match_voting_batch(eval_set['home'], eval_set['away'])
+    return pred['home_goals'], pred['away_goals']
+
+
+@register_model('ml')
+def _ml(eval_set):
+    from model_ml import predict_match_ml_batch
+    pred = predict_match_ml_batch(eval_set['home'], eval_set['away'])
+    return pred['home_goals'], pred['away_goals']
+
+
+@register_model('match_predictor', needs_db=True)
+def _match_predictor(eval_set):
+    # MatchPredictor lê o histórico do SQLite local (ver src/neon_mirror.py)
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+    from model import MatchPredictor
+
+    predictor = MatchPredictor()
+    home_goals, away_goals = [], []
+    for home_id, away_id in zip(eval_set['home_team_id'], eval_set['away_team_id']):
+        pred = predictor.predict_match_score(int(home_id), int(away_id))
+        home_goals.append(pred['predicted_home_goals'])
+        away_goals.append(pred['predicted_away_goals'])
+    return np.array(home_goals), np.array(away_goals)
+
+
+def evaluate(eval_set, models=None, with_db=False):
+    """
+    Roda e pontua todos os modelos sobre o mesmo conjunto de teste
+
+    Returns:
+        (DataFrame comparativo, {modelo: (palpites mandante, visitante)})
+    """
+    if models is None:
+        models = [name for name, spec in MODEL_REGISTRY.items() if with_db or not spec['needs_db']]
+
+    real_home, real_away = eval_set['real_home'], eval_set['real_away']
+    n_matches = len(real_home)
+
+    picks = {}
+    runtimes = {}
+    for name in models:
+        start = time.perf_counter()
+        pred_home, pred_away = MODEL_REGISTRY[name]['fn'](eval_set)
+        runtimes[name] = time.perf_counter() - start
+        picks[name] = (np.asarray(pred_home), np.asarray(pred_away))
+
+    # Um único broadcast: (modelos, jogos)
+    pred_home = np.stack([picks[name][0] for name in models])
+    pred_away = np.stack([picks[name][1] for name in models])
+    points = bolao_points(pred_home, pred_away, real_home[None, :], real_away[None, :])
+    same_result = np.sign(pred_home - pred_away) == np.sign(real_home - real_away)[None, :]
+
+    table = pd.DataFrame({
+        'model': models,
+        'matches': n_matches,
+        'points_per_match': points.mean(axis=1),
+        'exact_rate': (points == BOLAO_POINTS['exact']).mean(axis=1),
+        'result_accuracy': same_result.mean(axis=1),
+        'runtime_s': [runtimes[name] for name in models],
+        'ms_per_match': [runtimes[name] * 1000 / max(n_matches, 1) for name in models],
+    }).sort_values('points_per_match', ascending=False).reset_index(drop=True)
+
+    return table, picks
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Avaliação comparativa dos modelos do Bolão")
+    parser.add_argument('--cutoff', default=None, help="data de corte treino/teste (padrão: 70/30)")
+    parser.add_argument('--train-years', type=int, default=None, help="janela de treino em anos")
+    parser.add_argument('--models', nargs='*', default=None, help=f"modelos ({', '.join(MODEL_REGISTRY)})")
+    parser.add_argument('--with-match-predictor', action='store_true', help="incluir MatchPredictor (SQLite)")
+    parser.add_argument('--refresh', action='store_true', help="sincronizar cache com o Neon antes")
+    parser.add_argument('--output', type=Path, default=None, help="CSV da tabela comparativa")
+    args = parser.parse_args(argv)
+
+    from walk_forward import build_dataset
+    from match_cache import load_matches, refresh_cache, MISSING_GOALS
+
+    print("=" * 80)
+    print("AVALIAÇÃO COMPARATIVA DE MODELOS")
+    print("=" * 80)
+
+    if args.refresh:
+        refresh_cache()
+    matches = load_matches()
+    finished = (matches['home_goals'] != MISSING_GOALS) & (matches['away_goals'] != MISSING_GOALS)
+    dataset = build_dataset(
+        matches['date'][finished], matches['home_team_id'][finished], matches['away_team_id'][finished],
+        matches['home_goals'][finished], matches['away_goals'][finished], matches['neutral'][finished]
+    )
+    eval_set = build_eval_set(dataset, args.cutoff, args.train_years, matches['team_names'])
+
+    print(f"\n📊 Treino: {eval_set['n_train']} jogos | Teste: {len(eval_set['real_home'])} jogos "
+          f"(a partir de {eval_set['cutoff']})")
+
+    table, _ = evaluate(eval_set, args.models, with_db=args.with_match_predictor)
+
+    print("\n🏆 Comparação (ordenada por pontos/jogo):")
+    print(f"  {'Modelo':18s} {'Pts/jogo':>9s} {'Exato':>7s} {'Resultado':>10s} {'Tempo':>10s} {'ms/jogo':>9s}")
+    for _, row in table.iterrows():
+        print(f"  {row['model']:18s} {row['points_per_match']:9.2f} {row['exact_rate']:7.1%} "
+              f"{row['result_accuracy']:10.1%} {row['runtime_s']:9.2f}s {row['ms_per_match']:9.4f}")
+
+    output = args.output
+    if output is None:
+        DEFAULT_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+        output = DEFAULT_OUTPUT_DIR / f"evaluation_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    table.to_csv(output, index=False)
+    print(f"\n💾 Tabela salva em: {output}")
+    print("=" * 80)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,241 @@
+"""
+Motor Exato da Fase de Grupos - Copa do Mundo 2026
+Enumera todas as combinações de placares dos 6 jogos de cada grupo
+(distribuições truncadas em 0..max_goals) em vez de amostrar
+
+LÓGICA:
+1. Cada jogo tem (max_goals + 1)^2 placares possíveis (9 com 0-2 gols)
+2. As combinações dos 6 jogos (9^6 = 531.441) e a classificação resultante
+   são as mesmas para todos os grupos: calculadas uma única vez
+3. Só as probabilidades mudam por grupo: P(combinação) = Π P(placar do jogo)
+4. Distribuição de posições = probabilidades (12 × N) @ one-hot (N × 16)
+
+Critérios de desempate iguais a simulate_group_stage:
+pontos, saldo de gols, gols feitos, vitórias (empate total mantém a
+ordem original do grupo, como o sort estável do simulador)
+"""
+
+import numpy as np
+from copa_2026_structure import GRUPOS_COPA_2026
+from model_optimized import predict_match_optimized, poisson_pmf
+
+# Jogos do grupo na mesma ordem de simulate_group_stage: (i, j) com i < j
+GROUP_PAIRS = [(i, j) for i in range(4) for j in range(i + 1, 4)]
+
+# Tamanho do bloco de combinações processado por vez (controla memória)
+CHUNK_SIZE = 1 << 19
+
+# Cache das classificações por max_goals (independem dos times)
+_OUTCOME_CACHE = {}
+
+
+def score_matrix(team1_stats, team2_stats, max_goals=2):
+    """
+    Matriz de probabilidades de placar truncada em 0..max_goals
+
+    Usa os lambdas de predict_match_optimized (Poisson independente) e
+    renormaliza após o truncamento.
+
+    Returns:
+        np.ndarray (max_goals + 1, max_goals + 1): P[gols time 1, gols time 2]
+    """
+    prediction = predict_match_optimized(team1_stats, team2_stats)
+    goals = range(max_goals + 1)
+    p1 = np.array([poisson_pmf(k, prediction['lambda_team1']) for k in goals])
+    p2 = np.array([poisson_pmf(k, prediction['lambda_team2']) for k in goals])
+    matrix = np.outer(p1, p2)
+    return matrix / matrix.sum()
+
+
+def _group_outcome_stats(digits, max_goals):
+    """
+    Classificação de cada combinação de placares
+
+    Args:
+        digits: np.ndarray (n, 6) com o índice do placar de cada jogo
+
+    Returns:
+        positions: (n, 4) posição final (0 = 1º) de cada time do grupo
+        third_code: (n,) código (time, pontos, saldo, gols) do 3º colocado
+    """
+    n_goals = max_goals + 1
+    home = digits // n_goals
+    away = digits % n_goals
+
+    points = np.zeros((len(digits), 4), dtype=np.int16)
+    gf = np.zeros_like(points)
+    ga = np.zeros_like(points)
+    wins = np.zeros_like(points)
+
+    for m, (i, j) in enumerate(GROUP_PAIRS):
+        h, a = home[:, m], away[:, m]
+        gf[:, i] += h
+        ga[:, i] += a
+        gf[:, j] += a
+        ga[:, j] += h
+        home_win = h > a
+        away_win = a > h
+        draw = h == a
+        points[:, i] += 3 * home_win + draw
+        points[:, j] += 3 * away_win + draw
+        wins[:, i] += home_win
+        wins[:, j] += away_win
+
+    gd = gf - ga
+    max_gf = 3 * max_goals
+    gd_range = 2 * max_gf + 1
+
+    # Chave única: pontos > saldo > gols feitos > vitórias > ordem original
+    key = (((points.astype(np.int64) * gd_range + (gd + max_gf)) * (max_gf + 1) + gf) * 4 + wins)
+    key = key * 4 + (3 - np.arange(4))
+    order = np.argsort(-key, axis=1)
+    positions = np.argsort(order, axis=1).astype(np.int8)
+
+    third = order[:, 2]
+    rows = np.arange(len(digits))
+    third_code = (
+        ((third * 10 + points[rows, third]) * gd_range + (gd[rows, third] + max_gf)) * (max_gf + 1)
+        + gf[rows, third]
+    )
+
+    return positions, third_code
+
+
+def _decode_third(code, max_goals):
+    """Decodifica third_code em (índice do time, pontos, saldo, gols feitos)"""
+    max_gf = 3 * max_goals
+    gd_range = 2 * max_gf + 1
+    gf = code % (max_gf + 1)
+    code //= (max_gf + 1)
+    gd = code % gd_range - max_gf
+    code //= gd_range
+    return code // 10, code % 10, gd, gf
+
+
+def _outcome_chunks(max_goals):
+    """Gera (início, positions, third_code) por bloco, com cache em memória"""
+    if max_goals not in _OUTCOME_CACHE:
+        n_scores = (max_goals + 1) ** 2
+        n_outcomes = n_scores ** len(GROUP_PAIRS)
+        powers = n_scores ** np.arange(len(GROUP_PAIRS) - 1, -1, -1)
+
+        chunks = []
+        for start in range(0, n_outcomes, CHUNK_SIZE):
+            idx = np.arange(start, min(start + CHUNK_SIZE, n_outcomes))
+            digits = (idx[:, None] // powers) % n_scores
+            positions, third_code = _group_outcome_stats(digits, max_goals)
+            chunks.append((digits.astype(np.int8), positions, third_code))
+        _OUTCOME_CACHE[max_goals] = chunks
+
+    return _OUTCOME_CACHE[max_goals]
+
+
+def exact_group_stage(team_stats_dict, groups=None, max_goals=2, score_fn=None,
+                      default_stats=None):
+    """
+    Distribuição exata das posições finais em todos os grupos
+
+    Args:
+        team_stats_dict: estatísticas por time
+        groups: dict {grupo: [4 times]} (padrão: GRUPOS_COPA_2026)
+        max_goals: truncamento dos placares por time (padrão: 2, conservador)
+        score_fn: função (stats1, stats2, max_goals) -> matriz de placares
+        default_stats: estatísticas para times sem dados
+
+    Returns:
+        dict {grupo: {
+            'teams': [...],
+            'position_probs': np.ndarray (4, 4) P[time, posição],
+            'first'/'second'/'third'/'fourth': time mais provável em cada posição,
+            'third_distribution': [(time, pontos, saldo, gols, prob), ...]
+        }}
+    """
+    if groups is None:
+        groups = GRUPOS_COPA_2026
+    if score_fn is None:
+        score_fn = score_matrix
+    if default_stats is None:
+        default_stats = {'avg_goals_scored': 1.3, 'avg_goals_conceded': 1.3, 'strength': 50}
+
+    group_names = sorted(groups)
+    n_groups = len(group_names)
+    n_scores = (max_goals + 1) ** 2
+
+    # Probabilidades de placar por grupo e jogo: (grupos, 6, placares)
+    match_probs = np.zeros((n_groups, len(GROUP_PAIRS), n_scores))
+    for g, grupo in enumerate(group_names):
+        teams = groups[grupo]
+        for m, (i, j) in enumerate(GROUP_PAIRS):
+            stats_i = team_stats_dict.get(teams[i], default_stats)
+            stats_j = team_stats_dict.get(teams[j], default_stats)
+            match_probs[g, m] = np.asarray(score_fn(stats_i, stats_j, max_goals)).ravel()
+
+    max_gf = 3 * max_goals
+    n_third_codes = 4 * 10 * (2 * max_gf + 1) * (max_gf + 1)
+
+    position_probs = np.zeros((n_groups, 4, 4))
+    third_probs = np.zeros((n_groups, n_third_codes))
+
+    for digits, positions, third_code in _outcome_chunks(max_goals):
+        # P(combinação) para todos os grupos de uma vez: (grupos, n)
+        probs = np.ones((n_groups, len(digits)))
+        for m in range(len(GROUP_PAIRS)):
+            probs *= match_probs[:, m, digits[:, m]]
+
+        # One-hot (n, 16) das posições -> (grupos, 4 times, 4 posições)
+        onehot = np.zeros((len(digits), 16))
+        onehot[np.arange(len(digits))[:, None], np.arange(4) * 4 + positions] = 1.0
+        position_probs += (probs @ onehot).reshape(n_groups, 4, 4)
+
+        for g in range(n_groups):
+            third_probs[g] += np.bincount(third_code, weights=probs[g], minlength=n_third_codes)
+
+    results = {}
+    for g, grupo in enumerate(group_names):
+        teams = groups[grupo]
+        probs = position_probs[g]
+
+        codes = np.nonzero(third_probs[g] > 0)[0]
+        team_idx, pts, gd, gf = _decode_third(codes.copy(), max_goals)
+        third_distribution = sorted(
+            ((teams[t], int(p), int(d), int(f), float(third_probs[g, c]))
+             for t, p, d, f, c in zip(team_idx, pts, gd, gf, codes)),
+            key=lambda x: x[4],
+            reverse=True
+        )
+
+        results[grupo] = {
+            'teams': teams,
+            'position_probs': probs,
+            'first': teams[int(np.argmax(probs[:, 0]))],
+            'second': teams[int(np.argmax(probs[:, 1]))],
+            'third': teams[int(np.argmax(probs[:, 2]))],
+            'fourth': teams[int(np.argmax(probs[:, 3]))],
+            'third_distribution': third_distribution
+        }
+
+    return results
+
+
+if __name__ == "__main__":
+    import time
+    from team_strength import get_team_strength_stats
+
+    print("=" * 80)
+    print("MOTOR EXATO DA FASE DE GRUPOS")
+    print("=" * 80)
+
+    team_stats = {t: get_team_strength_stats(t) for teams in GRUPOS_COPA_2026.values() for t in teams}
+
+    start = time.perf_counter()
+    results = exact_group_stage(team_stats)
+    elapsed = time.perf_counter() - start
+
+    print(f"\n⏱️  12 grupos calculados em {elapsed:.2f} s (inclui montagem do cache)")
+
+    for grupo in sorted(results):
+        r = results[grupo]
+        print(f"\nGrupo {grupo}:")
+        for t, team in enumerate(r['teams']):
+            p = r['position_probs'][t]
+            print(f"  {team:30s} 1º {p[0]:5.1%} | 2º {p[1]:5.1%} | 3º {p[2]:5.1%} | 4º {p[3]:5.1%}")
@@ -187,8 +187,8 @@ if success:
 # Top 10 seleções
 sql_top = """
 SELECT t.name, COUNT(*) as jogos
-FROM matches m
-JOIN teams t ON (m.home_team_id = t.id OR m.away_team_id = t.id)
+FROM team_match_perspective p
+JOIN teams t ON t.id = p.team_id
 GROUP BY t.name
 ORDER BY jogos DESC
 LIMIT 10
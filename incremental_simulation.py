@@ -0,0 +1,308 @@
+"""
+Re-simulação Incremental - Copa do Mundo 2026
+Quando sai um resultado real, só o grupo do jogo e os caminhos do
+mata-mata que dependem dele são recalculados; o resto da amostra é reusado
+
+LÓGICA:
+1. A amostra guarda os números uniformes sorteados (grupos e mata-mata),
+   os placares, a classificação de cada grupo e o resultado do mata-mata
+2. Resultado de grupo: o placar real é fixado em todas as amostras e só o
+   grupo do jogo é reclassificado
+3. Mata-mata refeito apenas nas amostras em que a classificação do grupo
+   (ou o conjunto de grupos dos melhores terceiros) mudou, com os mesmos
+   uniformes de antes (números aleatórios comuns: a variação vem do
+   resultado, não do sorteio)
+4. Resultado do mata-mata: P(vencedor elimina perdedor) = 1 e o mata-mata
+   é refeito nas amostras em que os dois times se enfrentam (a fase vem do
+   chamador; sem ela, reencontro de rivais de grupo só conta como mata-mata
+   se o grupo já tiver todos os placares fixados)
+5. Estado gravado em .npz junto com os parâmetros do modelo, que ficam
+   congelados entre atualizações (refresh=True refaz a amostra com as
+   estatísticas atuais e reaplica os resultados conhecidos)
+
+Uso:
+    sim = IncrementalSimulation.load_or_start(team_stats)
+    sim.apply_result("Brazil", "Morocco", 1, 1)
+    sim.save()
+    sim.outcomes.podium_probabilities()
+"""
+
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+from team_registry import TeamRegistry
+from tournament_sampler import (KNOCKOUT_DRAWS, Outcomes, TournamentModel, best_thirds, draw_uniforms,
+                                group_positions, play_knockout, rank_groups, sample_cells)
+
+# Estado gravado entre execuções (auto_update, LiveUpdater)
+DEFAULT_STATE_PATH = Path(__file__).parent / "data" / "processed" / "incremental_simulation.npz"
+
+# Torneios na amostra
+DEFAULT_SAMPLES = 20000
+
+# Nomes do CSV de resultados que diferem de GRUPOS_COPA_2026
+TEAM_ALIASES = {
+    "South Korea": "Korea Republic",
+    "Ivory Coast": "Côte d'Ivoire",
+    "Cape Verde": "Cabo Verde",
+    "Curacao": "Curaçao",
+    "USA": "United States",
+}
+
+# Arrays do estado gravado
+STATE_ARRAYS = ('group_uniforms', 'knockout_uniforms', 'cells', 'order', 'third_key',
+                'stage', 'champion', 'runner_up', 'third', 'win_matrix')
+
+
+class IncrementalSimulation:
+    """Amostra de torneios que absorve resultados reais sem re-simular tudo"""
+
+    def __init__(self, model, group_uniforms, knockout_uniforms, fixed_results=None, knockout_results=None):
+        """
+        Args:
+            model: TournamentModel
+            group_uniforms: (n, jogos de grupo) uniformes dos placares
+            knockout_uniforms: (n, KNOCKOUT_DRAWS) uniformes do mata-mata
+            fixed_results: {índice do jogo: (gols mandante, gols visitante)}
+            knockout_results: [(vencedor, perdedor)] em IDs
+        """
+        self.model = model
+        self.group_uniforms = group_uniforms
+        self.knockout_uniforms = knockout_uniforms
+        self.fixed_results = dict(fixed_results or {})
+        self.knockout_results = list(knockout_results or [])
+
+        self.win_matrix = model.win_matrix.copy()
+        for winner, loser in self.knockout_results:
+            self._fix_knockout(winner, loser)
+
+        self.cells = sample_cells(model.score_probs, group_uniforms)
+        for k, (home_goals, away_goals) in self.fixed_results.items():
+            self.cells[:, k] = model.cell(home_goals, away_goals)
+        self.order, self.third_key = rank_groups(model, self.cells)
+        self.stage, self.champion, self.runner_up, self.third = play_knockout(
+            model, self.order, self.third_key, knockout_uniforms, self.win_matrix)
+
+    @classmethod
+    def start(cls, model, n_samples=DEFAULT_SAMPLES, rng=None, scheme='plain'):
+        """Amostra nova (nenhum resultado real fixado)"""
+        n_fixtures = len(model.fixture_teams)
+        uniforms = draw_uniforms(np.random.default_rng(rng), n_samples, n_fixtures + KNOCKOUT_DRAWS, scheme)
+        return cls(model, uniforms[:, :n_fixtures].copy(), uniforms[:, n_fixtures:].copy())
+
+    def __len__(self):
+        return len(self.cells)
+
+    @property
+    def outcomes(self):
+        """Amostra atual no formato de tournament_sampler.Outcomes"""
+        return Outcomes(self.model, self.cells, group_positions(self.model, self.order),
+                        self.stage, self.champion, self.runner_up, self.third)
+
+    def _fix_knockout(self, winner, loser):
+        self.win_matrix[winner, loser] = 1.0
+        self.win_matrix[loser, winner] = 0.0
+
+    def _resolve(self, team):
+        name = TEAM_ALIASES.get(team, team)
+        if name not in self.model.registry.index:
+            raise KeyError(f"Time fora da Copa: {team}")
+        return name
+
+    def apply_result(self, home, away, home_goals, away_goals, knockout=None):
+        """
+        Fixar um resultado real (jogo de grupo ou mata-mata)
+
+        Returns:
+            número de amostras cujo mata-mata foi refeito
+        """
+        return self.apply_results([(home, away, home_goals, away_goals, knockout)])
+
+    def _group_complete(self, k):
+        """Todos os jogos do grupo do jogo k já têm placar real"""
+        fixtures = np.flatnonzero(self.model.fixture_group == self.model.fixture_group[k])
+        return all(int(j) in self.fixed_results for j in fixtures)
+
+    def apply_results(self, results, knockout_winners=None):
+        """
+        Fixar vários resultados reais de uma vez (uma única propagação)
+
+        Confronto que também é jogo de grupo (reencontro no mata-mata) só é
+        tratado como mata-mata se o 5º campo indicar (knockout=True) ou,
+        sem essa indicação, se o grupo já tiver todos os placares fixados.
+
+        Args:
+            results: [(mandante, visitante, gols mandante, gols visitante[, knockout])]
+            knockout_winners: {(time1, time2): vencedor} para mata-mata
+                              decidido nos pênaltis (empate no placar)
+
+        Returns:
+            número de amostras cujo mata-mata foi refeito
+        """
+        model = self.model
+        # Nomes do CSV de pênaltis normalizados como os dos resultados
+        knockout_winners = {frozenset(TEAM_ALIASES.get(team, team) for team in pair): winner
+                            for pair, winner in (knockout_winners or {}).items()}
+        groups = set()
+        knockout_pairs = []
+
+        for result in results:
+            home, away, home_goals, away_goals = result[:4]
+            knockout = result[4] if len(result) > 4 else None
+            home, away = self._resolve(home), self._resolve(away)
+            try:
+                k, swapped = model.find_fixture(home, away)
+            except KeyError:
+                k = None
+            if knockout is None:
+                knockout = k is None or self._group_complete(k)
+
+            if knockout:
+                # Jogo de mata-mata: vencedor pelo placar ou pelos pênaltis
+                if home_goals == away_goals:
+                    winner = knockout_winners.get(frozenset((home, away)))
+                    if winner is None:
+                        raise ValueError(f"Empate no mata-mata sem vencedor: {home} x {away}")
+                    winner = self._resolve(winner)
+                else:
+                    winner = home if home_goals > away_goals else away
+                loser = away if winner == home else home
+                pair = (model.registry.id(winner), model.registry.id(loser))
+                if pair not in self.knockout_results:
+                    self.knockout_results.append(pair)
+                    self._fix_knockout(*pair)
+                    knockout_pairs.append(pair)
+                continue
+
+            if k is None:
+                raise KeyError(f"Jogo de grupo inexistente: {home} x {away}")
+            if swapped:
+                home_goals, away_goals = away_goals, home_goals
+            if home_goals > model.max_goals or away_goals > model.max_goals:
+                raise ValueError(f"Placar acima de MAX_GOALS ({model.max_goals}): {home} x {away}")
+            if self.fixed_results.get(k) == (home_goals, away_goals):
+                continue
+            self.fixed_results[k] = (home_goals, away_goals)
+            self.cells[:, k] = model.cell(home_goals, away_goals)
+            groups.add(int(model.fixture_group[k]))
+
+        return self._propagate(sorted(groups), knockout_pairs)
+
+    def _propagate(self, groups, knockout_pairs=()):
+        """Reclassificar os grupos afetados e refazer o mata-mata onde mudou"""
+        changed = np.zeros(len(self), dtype=bool)
+
+        if groups:
+            order, third_key = rank_groups(self.model, self.cells, groups)
+            changed |= (order != self.order[:, groups]).any(axis=(1, 2))
+            # Chave do 3º só importa se muda o conjunto de grupos dos melhores
+            # terceiros (a tabela de alocação depende só da máscara)
+            previous_mask = (1 << best_thirds(self.third_key)).sum(axis=1)
+            self.order[:, groups] = order
+            self.third_key[:, groups] = third_key
+            changed |= (1 << best_thirds(self.third_key)).sum(axis=1) != previous_mask
+
+        # Amostras em que os dois times do jogo de mata-mata se classificaram
+        for winner, loser in knockout_pairs:
+            changed |= (self.stage[:, winner] > 0) & (self.stage[:, loser] > 0)
+
+        rows = np.flatnonzero(changed)
+        if rows.size:
+            stage, champion, runner_up, third = play_knockout(
+                self.model, self.order[rows], self.third_key[rows], self.knockout_uniforms[rows],
+                self.win_matrix)
+            self.stage[rows] = stage
+            self.champion[rows] = champion
+            self.runner_up[rows] = runner_up
+            self.third[rows] = third
+        return int(rows.size)
+
+    def results(self):
+        """Resultados reais já fixados (nomes), no formato de apply_results() com a fase explícita"""
+        names = self.model.registry.names
+        results = []
+        for k, (home_goals, away_goals) in sorted(self.fixed_results.items()):
+            home, away = self.model.fixture_teams[k]
+            results.append((names[home], names[away], home_goals, away_goals, False))
+        # Mata-mata com placar simbólico 1x0 para o vencedor
+        results.extend((names[winner], names[loser], 1, 0, True) for winner, loser in self.knockout_results)
+        return results
+
+    def save(self, path=None):
+        """Gravar o estado com os parâmetros do modelo (atômico: temporário + rename)"""
+        path = Path(path or DEFAULT_STATE_PATH)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {
+            'teams': self.model.registry.names,
+            'max_goals': self.model.max_goals,
+            'results': self.results(),
+        }
+        tmp_path = path.with_suffix('.tmp.npz')
+        np.savez(tmp_path, meta=np.array(json.dumps(meta)), score_probs=self.model.score_probs,
+                 model_win_matrix=self.model.win_matrix,
+                 **{name: getattr(self, name) for name in STATE_ARRAYS})
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path=None):
+        """
+        Carregar o estado gravado (com o modelo congelado no início)
+
+        Returns:
+            IncrementalSimulation ou None se não há estado
+        """
+        path = Path(path or DEFAULT_STATE_PATH)
+        if not path.exists():
+            return None
+
+        with np.load(path) as data:
+            meta = json.loads(str(data['meta']))
+            arrays = {name: data[name] for name in STATE_ARRAYS}
+            score_probs, model_win_matrix = data['score_probs'], data['model_win_matrix']
+
+        registry = TeamRegistry(meta['teams'], [{}] * len(meta['teams']))
+        model = TournamentModel(registry, score_probs, model_win_matrix, meta['max_goals'])
+
+        sim = cls.__new__(cls)
+        sim.model = model
+        for name, values in arrays.items():
+            setattr(sim, name, values)
+        sim.fixed_results, sim.knockout_results = {}, []
+        for home, away, home_goals, away_goals, *stage in meta['results']:
+            # Estados antigos (sem o 5º campo): jogo de grupo se existe o confronto
+            if stage:
+                knockout = stage[0]
+            else:
+                try:
+                    model.find_fixture(home, away)
+                    knockout = False
+                except KeyError:
+                    knockout = True
+            if knockout:
+                sim.knockout_results.append((registry.id(home), registry.id(away)))
+            else:
+                k, _ = model.find_fixture(home, away)
+                sim.fixed_results[k] = (home_goals, away_goals)
+        return sim
+
+    @classmethod
+    def load_or_start(cls, team_stats_dict, path=None, n_samples=DEFAULT_SAMPLES, rng=None, refresh=False):
+        """
+        Estado gravado ou amostra nova
+
+        O modelo fica congelado entre atualizações (só os resultados reais
+        mudam a amostra). refresh=True refaz a amostra com as estatísticas
+        atuais e reaplica os resultados já conhecidos.
+        """
+        previous = cls.load(path)
+        if previous is not None and not refresh:
+            return previous
+
+        sim = cls.start(TournamentModel.from_stats(team_stats_dict), n_samples, rng)
+        if previous is not None:
+            sim.apply_results(previous.results())
+        return sim
@@ -0,0 +1,297 @@
+"""
+Motor Exato do Mata-Mata - Copa do Mundo 2026
+Propaga probabilidades pelo chaveamento (programação dinâmica) em vez de
+amostrar milhares de chaves via Monte Carlo
+
+LÓGICA:
+1. Matriz W[i, j] = P(time i elimina time j) = P(vitória) + P(empate) * P(pênaltis)
+2. Para cada rodada, P(i avança) = P(i chegou) * Σ_j P(j chegou) * W[i, j],
+   somando apenas os adversários possíveis (outra metade da sub-chave)
+3. 3º lugar: perdedores das semifinais vêm de metades opostas (independentes)
+"""
+
+import re
+import numpy as np
+from copa_2026_structure import get_knockout_structure
+from third_place_allocation import THIRD_SLOT_PATTERN, allocation_table, group_mask, third_place_slots
+
+# Ordem das fases em get_knockout_structure()
+ROUND_KEYS = ['dezesseisavos', 'oitavas', 'quartas', 'semi', 'final']
+
+# Prefixo usado nas referências "V Oitava 3" -> fase 'oitavas'
+ROUND_PREFIXES = {
+    'Dezesseisavos': 'dezesseisavos',
+    'Oitava': 'oitavas',
+    'Quarta': 'quartas',
+    'Semi': 'semi',
+}
+
+# Nome da fase pelo número de times que ainda restam
+STAGE_NAMES = {
+    32: 'round_of_32',
+    16: 'round_of_16',
+    8: 'quarter_finals',
+    4: 'semi_finals',
+    2: 'final',
+    1: 'champion',
+}
+
+
+def get_bracket_slots(structure=None):
+    """
+    Retorna os slots da primeira fase na ordem do chaveamento
+
+    Expande recursivamente as referências "V <Fase> N" a partir da última
+    fase do layout, de modo que slots vizinhos se enfrentam e cada bloco
+    de 2^k slots forma uma sub-chave.
+
+    Args:
+        structure: layout no formato de get_knockout_structure() (padrão: oficial)
+
+    Returns:
+        lista de rótulos ('1A', '2B', '3º ABCDF', ...)
+    """
+    if structure is None:
+        structure = get_knockout_structure()
+
+    matches_by_round = {
+        key: {m['match']: m for m in structure[key]}
+        for key in ROUND_KEYS if key in structure
+    }
+
+    def expand(round_key, match_number):
+        match = matches_by_round[round_key][match_number]
+        slots = []
+        for label in (match['team1'], match['team2']):
+            ref = re.match(r'^V (\w+) (\d+)$', label)
+            if ref and ref.group(1) in ROUND_PREFIXES:
+                slots.extend(expand(ROUND_PREFIXES[ref.group(1)], int(ref.group(2))))
+            else:
+                slots.append(label)
+        return slots
+
+    last_round = [key for key in ROUND_KEYS if key in matches_by_round][-1]
+    slots = []
+    for match_number in sorted(matches_by_round[last_round]):
+        slots.extend(expand(last_round, match_number))
+
+    n_slots = len(slots)
+    if n_slots < 2 or n_slots & (n_slots - 1):
+        raise ValueError(f"Chaveamento precisa de 2^k slots, recebeu {n_slots}")
+
+    return slots
+
+
+def bracket_layout(letters, slots=None):
+    """
+    Origem de cada slot do chaveamento em índices (sem rótulos)
+
+    Args:
+        letters: letras dos grupos em ordem (índice = bit da máscara)
+        slots: rótulos de get_bracket_slots() (padrão: oficial)
+
+    Returns:
+        group: índice do grupo (-1 para vaga de 3º)
+        position: posição no grupo (0 = 1º)
+        third: coluna da vaga em allocation_table() (-1 para slots de grupo)
+    """
+    slots = get_bracket_slots() if slots is None else slots
+    third_columns = {label: k for k, label in enumerate(third_place_slots())}
+
+    group, position, third = [], [], []
+    for label in slots:
+        group_slot = re.match(r'^([1-4])([A-Z])$', label)
+        if group_slot:
+            group.append(letters.index(group_slot.group(2)))
+            position.append(int(group_slot.group(1)) - 1)
+            third.append(-1)
+        elif THIRD_SLOT_PATTERN.match(label) and label in third_columns:
+            group.append(-1)
+            position.append(2)
+            third.append(third_columns[label])
+        else:
+            raise ValueError(f"Slot desconhecido no chaveamento: {label}")
+    return np.array(group), np.array(position), np.array(third)
+
+
+def resolve_bracket_teams(slots, group_results):
+    """
+    Substitui os rótulos dos slots pelos times classificados
+
+    Args:
+        slots: rótulos de get_bracket_slots()
+        group_results: saída de simulate_group_stage()
+
+    Returns:
+        lista de times na ordem do chaveamento
+    """
+    letters = sorted(group_results)
+
+    # Melhores terceiros com o mesmo critério de simulate_knockout_stage
+    thirds = sorted(
+        range(len(letters)),
+        key=lambda g: tuple(group_results[letters[g]]['standings'][2][1][k] for k in ('points', 'gd', 'gf')),
+        reverse=True
+    )[:8]
+    allocation = allocation_table()[group_mask(thirds)]
+
+    group, position, third = bracket_layout(letters, slots)
+    position_keys = ['first', 'second', 'third', 'fourth']
+    return [
+        group_results[letters[g if g >= 0 else allocation[t]]][position_keys[p]]
+        for g, p, t in zip(group.tolist(), position.tolist(), third.tolist())
+    ]
+
+
+def pairwise_win_matrix(stats_list, predict_fn, shootout=0.5):
+    """
+    Monta a matriz de probabilidade de eliminação entre todos os pares
+
+    Args:
+        stats_list: estatísticas de cada time (mesma ordem do chaveamento)
+        predict_fn: função (stats1, stats2) -> dict com prob_home_win,
+                    prob_draw, prob_away_win (frações ou percentuais)
+        shootout: P(time 1 vencer nos pênaltis) - float ou função (stats1, stats2)
+
+    Returns:
+        np.ndarray (n, n) com W[i, j] + W[j, i] = 1
+    """
+    n = len(stats_list)
+    win_matrix = np.full((n, n), 0.5)
+
+    for i in range(n):
+        for j in range(i + 1, n):
+            prediction = predict_fn(stats_list[i], stats_list[j])
+            p_win = prediction['prob_home_win']
+            p_draw = prediction['prob_draw']
+            p_loss = prediction['prob_away_win']
+
+            # Normalizar (modelos ML retornam percentuais)
+            total = p_win + p_draw + p_loss
+            if total > 0:
+                p_win, p_draw = p_win / total, p_draw / total
+            else:
+                p_win, p_draw = 1 / 3, 1 / 3
+
+            p_shootout = shootout(stats_list[i], stats_list[j]) if callable(shootout) else shootout
+
+            win_matrix[i, j] = p_win + p_draw * p_shootout
+            win_matrix[j, i] = 1.0 - win_matrix[i, j]
+
+    return win_matrix
+
+
+def _opponent_mask(n, block):
+    """Máscara (n, n): j é adversário possível de i na rodada com blocos de tamanho `block`"""
+    idx = np.arange(n)
+    half = block // 2
+    same_block = (idx[:, None] // block) == (idx[None, :] // block)
+    other_half = (idx[:, None] // half) != (idx[None, :] // half)
+    return same_block & other_half
+
+
+def knockout_reach_probabilities(win_matrix):
+    """
+    Probabilidade exata de cada slot vencer r jogos no chaveamento
+
+    Args:
+        win_matrix: matriz (n, n) na ordem do chaveamento, n = 2^k
+
+    Returns:
+        np.ndarray (k + 1, n): linha r = P(vencer os r primeiros jogos)
+    """
+    win_matrix = np.asarray(win_matrix, dtype=float)
+    n = win_matrix.shape[0]
+    n_rounds = int(np.log2(n))
+
+    reach = np.zeros((n_rounds + 1, n))
+    reach[0] = 1.0
+
+    for r in range(n_rounds):
+        mask = _opponent_mask(n, 2 ** (r + 1))
+        reach[r + 1] = reach[r] * ((win_matrix * mask) @ reach[r])
+
+    return reach
+
+
+def third_place_probabilities(win_matrix, reach):
+    """
+    Probabilidade exata de vencer a disputa de 3º lugar
+
+    Os perdedores das semifinais saem de metades opostas da chave, que
+    evoluem de forma independente.
+    """
+    n = reach.shape[1]
+    if n < 4:
+        return np.zeros(n)
+
+    semi_round = reach.shape[0] - 3  # rodada em que restam 4 times
+    semi_losers = reach[semi_round] - reach[semi_round + 1]
+    mask = _opponent_mask(n, n)
+
+    return semi_losers * ((np.asarray(win_matrix) * mask) @ semi_losers)
+
+
+def exact_knockout_probabilities(teams, win_matrix):
+    """
+    Probabilidades exatas por time para todas as fases do mata-mata
+
+    Args:
+        teams: times na ordem do chaveamento
+        win_matrix: matriz de pairwise_win_matrix()
+
+    Returns:
+        dict {time: {'prob_round_of_16': ..., 'prob_champion': ..., ...}}
+    """
+    reach = knockout_reach_probabilities(win_matrix)
+    third = third_place_probabilities(win_matrix, reach)
+    n = len(teams)
+
+    results = {}
+    for i, team in enumerate(teams):
+        probs = {}
+        for r in range(1, reach.shape[0]):
+            stage = STAGE_NAMES.get(n >> r, f'last_{n >> r}')
+            probs[f'prob_{stage}'] = float(reach[r, i])
+        probs['prob_runner_up'] = float(reach[-2, i] - reach[-1, i]) if reach.shape[0] > 1 else 0.0
+        probs['prob_third'] = float(third[i])
+        probs['prob_podium'] = probs['prob_champion'] + probs['prob_runner_up'] + probs['prob_third']
+        results[team] = probs
+
+    return results
+
+
+if __name__ == "__main__":
+    import time
+    from model_optimized import predict_match_optimized
+    from team_strength import get_team_strength_stats
+    from copa_2026_structure import GRUPOS_COPA_2026
+
+    print("=" * 80)
+    print("MOTOR EXATO DO MATA-MATA")
+    print("=" * 80)
+
+    # Chave de exemplo: 1º e 2º pela ordem do grupo, terceiros pela ordem alfabética
+    group_results = {}
+    for grupo, teams in GRUPOS_COPA_2026.items():
+        standing = {'points': 4, 'gd': 0, 'gf': 3}
+        group_results[grupo] = {
+            'standings': [(t, standing) for t in teams],
+            'first': teams[0], 'second': teams[1], 'third': teams[2], 'fourth': teams[3]
+        }
+
+    slots = get_bracket_slots()
+    bracket = resolve_bracket_teams(slots, group_results)
+
+    start = time.perf_counter()
+    W = pairwise_win_matrix([get_team_strength_stats(t) for t in bracket], predict_match_optimized)
+    probs = exact_knockout_probabilities(bracket, W)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    print(f"\n⏱️  {len(bracket)} times calculados em {elapsed:.1f} ms")
+    print(f"   Soma P(campeão): {sum(p['prob_champion'] for p in probs.values()):.4f}")
+
+    print("\n🏆 Top 10 candidatos ao título:")
+    top = sorted(probs.items(), key=lambda x: x[1]['prob_champion'], reverse=True)[:10]
+    for team, p in top:
+        print(f"  {team:25s} Campeão {p['prob_champion']:6.1%} | Pódio {p['prob_podium']:6.1%}")
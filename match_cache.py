@@ -0,0 +1,368 @@
+"""
+Cache Colunar Local de Jogos - Neon PostgreSQL
+Guarda `matches` e `teams` em arrays NumPy (.npy) memory-mapped e
+atualiza apenas as linhas alteradas desde a última marca d'água (updated_at);
+jogos apagados no Neon saem do cache quando a contagem de linhas diverge
+
+Uso:
+    python match_cache.py            # sincroniza com o Neon
+    python match_cache.py --full     # descarta o cache e baixa tudo
+
+    from match_cache import load_matches, load_matches_df
+    matches = load_matches()         # dict de arrays tipados (milissegundos)
+    df = load_matches_df()           # DataFrame no formato dos backtests
+
+Colunas (ordenadas por data, id):
+- id (int64), date (datetime64[D]), home_team_id / away_team_id (int32)
+- home_goals / away_goals (int16, -1 = jogo sem placar), neutral (bool)
+"""
+
+import os
+import sys
+import json
+import glob
+import argparse
+import subprocess
+from pathlib import Path
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from instrumentation import span, incr
+
+PROJECT_ID = "restless-glitter-71170845"
+DATABASE_NAME = "neondb"
+
+DEFAULT_CACHE_DIR = Path(__file__).parent / "data" / "processed" / "match_cache"
+PAGE_SIZE = 5000
+MISSING_GOALS = -1
+
+# Tipo de cada coluna do cache
+COLUMNS = {
+    'id': np.int64,
+    'date': 'datetime64[D]',
+    'home_team_id': np.int32,
+    'away_team_id': np.int32,
+    'home_goals': np.int16,
+    'away_goals': np.int16,
+    'neutral': np.bool_,
+}
+
+MATCHES_PAGE_SQL = """
+SELECT id, date, home_team_id, away_team_id, home_goals, away_goals,
+       COALESCE(neutral, FALSE) AS neutral, updated_at
+FROM matches
+{where}
+ORDER BY updated_at, id
+LIMIT {limit}
+"""
+
+MATCHES_COUNT_SQL = "SELECT COUNT(*) AS n_rows FROM matches"
+
+MATCH_IDS_PAGE_SQL = """
+SELECT id
+FROM matches
+WHERE id > {last_id}
+ORDER BY id
+LIMIT {limit}
+"""
+
+# Ids por página na reconciliação de exclusões
+ID_PAGE_SIZE = 50000
+
+TEAMS_SQL = """
+SELECT id, name, updated_at
+FROM teams
+{where}
+ORDER BY updated_at, id
+"""
+
+
+def run_sql(sql):
+    """Executar SQL no Neon via MCP e retornar lista de linhas (dicts)"""
+    input_data = {
+        "projectId": PROJECT_ID,
+        "databaseName": DATABASE_NAME,
+        "sql": sql
+    }
+
+    cmd = [
+        "manus-mcp-cli", "tool", "call", "run_sql",
+        "--server", "neon",
+        "--input", json.dumps(input_data)
+    ]
+
+    incr("neon.run_sql")
+    with span("neon.run_sql"):
+        result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        incr("neon.errors")
+        raise RuntimeError(f"Erro no Neon: {result.stderr[:200]}")
+
+    try:
+        data = json.loads(result.stdout)
+    except json.JSONDecodeError:
+        # Resultados grandes vão para o arquivo de tool-results
+        result_files = glob.glob("/home/ubuntu/.mcp/tool-results/*_neon_run_sql.json")
+        if not result_files:
+            return []
+        with open(max(result_files, key=os.path.getctime)) as f:
+            data = json.load(f)
+
+    if isinstance(data, dict) and 'rows' in data:
+        return data['rows']
+    return data if isinstance(data, list) else []
+
+
+def _sql_literal(value):
+    """Literal SQL para a marca d'água (timestamp em texto)"""
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _read_meta(cache_dir):
+    meta_path = Path(cache_dir) / "meta.json"
+    if not meta_path.exists():
+        return {'matches_watermark': None, 'matches_last_id': None, 'teams_watermark': None, 'n_rows': 0}
+    with open(meta_path) as f:
+        return json.load(f)
+
+
+def _write_atomic(path, write_fn):
+    """Escreve em arquivo temporário e renomeia (leitores nunca veem arquivo parcial)"""
+    tmp_path = path.with_name(path.name + ".tmp")
+    write_fn(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _save_array(path, array):
+    with open(path, 'wb') as f:
+        np.save(f, array)
+
+
+def _rows_to_columns(rows):
+    """Converte linhas do Neon em arrays tipados"""
+    def goals(value):
+        return MISSING_GOALS if value is None else int(value)
+
+    return {
+        'id': np.array([int(r['id']) for r in rows], dtype=np.int64),
+        'date': np.array([str(r['date'])[:10] for r in rows], dtype='datetime64[D]'),
+        'home_team_id': np.array([int(r['home_team_id']) for r in rows], dtype=np.int32),
+        'away_team_id': np.array([int(r['away_team_id']) for r in rows], dtype=np.int32),
+        'home_goals': np.array([goals(r['home_goals']) for r in rows], dtype=np.int16),
+        'away_goals': np.array([goals(r['away_goals']) for r in rows], dtype=np.int16),
+        'neutral': np.array([bool(r.get('neutral')) for r in rows], dtype=np.bool_),
+    }
+
+
+def _fetch_changed_matches(fetch_fn, watermark, last_id):
+    """
+    Busca jogos alterados desde (watermark, last_id) em páginas (keyset)
+
+    Returns:
+        (linhas, nova marca d'água, último id)
+    """
+    rows = []
+    while True:
+        where = ""
+        if watermark is not None:
+            where = f"WHERE (updated_at, id) > ({_sql_literal(watermark)}::timestamp, {int(last_id or 0)})"
+        page = fetch_fn(MATCHES_PAGE_SQL.format(where=where, limit=PAGE_SIZE))
+        if not page:
+            break
+        rows.extend(page)
+        watermark, last_id = str(page[-1]['updated_at']), int(page[-1]['id'])
+        if len(page) < PAGE_SIZE:
+            break
+    return rows, watermark, last_id
+
+
+def _fetch_match_ids(fetch_fn):
+    """Todos os ids de jogos do Neon (keyset por id)"""
+    pages, last_id = [], -1
+    while True:
+        page = fetch_fn(MATCH_IDS_PAGE_SQL.format(last_id=last_id, limit=ID_PAGE_SIZE))
+        if not page:
+            break
+        pages.append(np.array([int(r['id']) for r in page], dtype=np.int64))
+        last_id = int(pages[-1][-1])
+        if len(page) < ID_PAGE_SIZE:
+            break
+    return np.concatenate(pages) if pages else np.empty(0, dtype=np.int64)
+
+
+def _reconcile_deleted(cache_dir, fetch_fn, n_rows):
+    """
+    Remove do cache os jogos apagados no Neon
+
+    O keyset por updated_at só enxerga inserções e alterações. Depois do
+    merge o cache contém todas as linhas do Neon, então uma contagem
+    diferente significa exclusões: só nesse caso os ids são comparados.
+
+    Returns:
+        (jogos removidos, linhas no cache)
+    """
+    remote_rows = fetch_fn(MATCHES_COUNT_SQL)
+    if not remote_rows or int(remote_rows[0]['n_rows']) == n_rows:
+        return 0, n_rows
+
+    existing = load_matches(cache_dir, mmap=False, missing_ok=True)
+    if existing is None:
+        return 0, n_rows
+    keep = np.isin(existing['id'], _fetch_match_ids(fetch_fn))
+    deleted = int((~keep).sum())
+    if deleted:
+        for name in COLUMNS:
+            _write_atomic(cache_dir / f"{name}.npy", lambda p, a=existing[name][keep]: _save_array(p, a))
+    return deleted, int(keep.sum())
+
+
+def _merge(existing, changed):
+    """Substitui linhas alteradas (mesmo id) e mantém a ordem (date, id)"""
+    if existing is None or len(existing['id']) == 0:
+        merged = changed
+    else:
+        keep = ~np.isin(existing['id'], changed['id'])
+        merged = {name: np.concatenate([np.asarray(existing[name])[keep], changed[name]]) for name in COLUMNS}
+
+    # Último valor de cada id vence (a página vem ordenada por updated_at)
+    _, last = np.unique(merged['id'][::-1], return_index=True)
+    unique_rows = len(merged['id']) - 1 - last
+    merged = {name: values[unique_rows] for name, values in merged.items()}
+
+    order = np.lexsort((merged['id'], merged['date']))
+    return {name: values[order] for name, values in merged.items()}
+
+
+def refresh_cache(cache_dir=None, fetch_fn=None, full=False):
+    """
+    Sincroniza o cache local com o Neon (apenas linhas novas/alteradas)
+
+    Args:
+        cache_dir: diretório do cache (padrão: data/processed/match_cache)
+        fetch_fn: função (sql) -> lista de dicts (padrão: run_sql via MCP)
+        full: descartar marcas d'água e baixar tudo
+
+    Returns:
+        dict com 'matches_changed', 'matches_deleted', 'teams_changed', 'n_rows'
+    """
+    cache_dir = Path(cache_dir or DEFAULT_CACHE_DIR)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    fetch_fn = fetch_fn or run_sql
+
+    meta = {'matches_watermark': None, 'matches_last_id': None, 'teams_watermark': None, 'n_rows': 0} \
+        if full else _read_meta(cache_dir)
+
+    # Times
+    where = f"WHERE updated_at > {_sql_literal(meta['teams_watermark'])}::timestamp" if meta['teams_watermark'] else ""
+    team_rows = fetch_fn(TEAMS_SQL.format(where=where))
+    teams_path = cache_dir / "teams.json"
+    teams = {}
+    if teams_path.exists() and not full:
+        with open(teams_path) as f:
+            teams = json.load(f)
+    for row in team_rows:
+        teams[str(int(row['id']))] = row['name']
+    if team_rows:
+        meta['teams_watermark'] = str(team_rows[-1]['updated_at'])
+        _write_atomic(teams_path, lambda p: p.write_text(json.dumps(teams, ensure_ascii=False)))
+
+    # Jogos
+    rows, watermark, last_id = _fetch_changed_matches(fetch_fn, meta['matches_watermark'], meta['matches_last_id'])
+    if rows:
+        existing = None if full else load_matches(cache_dir, mmap=False, missing_ok=True)
+        merged = _merge(existing, _rows_to_columns(rows))
+        for name in COLUMNS:
+            _write_atomic(cache_dir / f"{name}.npy", lambda p, a=merged[name]: _save_array(p, a))
+        meta.update(matches_watermark=watermark, matches_last_id=last_id, n_rows=int(len(merged['id'])))
+
+    deleted, meta['n_rows'] = _reconcile_deleted(cache_dir, fetch_fn, meta['n_rows'])
+
+    meta['synced_at'] = datetime.now().isoformat(timespec='seconds')
+    _write_atomic(cache_dir / "meta.json", lambda p: p.write_text(json.dumps(meta, indent=2)))
+
+    return {'matches_changed': len(rows), 'matches_deleted': deleted, 'teams_changed': len(team_rows),
+            'n_rows': meta['n_rows']}
+
+
+def load_matches(cache_dir=None, mmap=True, missing_ok=False):
+    """
+    Carrega o cache como arrays tipados (memory-mapped por padrão)
+
+    Returns:
+        dict {coluna: np.ndarray} + 'team_names' {id: nome}, ou None se
+        o cache não existir e missing_ok=True
+    """
+    cache_dir = Path(cache_dir or DEFAULT_CACHE_DIR)
+    if not (cache_dir / "id.npy").exists():
+        if missing_ok:
+            return None
+        raise FileNotFoundError(f"Cache não encontrado em {cache_dir}. Execute: python match_cache.py")
+
+    mmap_mode = 'r' if mmap else None
+    matches = {name: np.load(cache_dir / f"{name}.npy", mmap_mode=mmap_mode) for name in COLUMNS}
+
+    teams_path = cache_dir / "teams.json"
+    team_names = {}
+    if teams_path.exists():
+        with open(teams_path) as f:
+            team_names = {int(k): v for k, v in json.load(f).items()}
+    matches['team_names'] = team_names
+
+    return matches
+
+
+def load_matches_df(cache_dir=None, refresh=False, finished_only=True):
+    """
+    DataFrame no formato usado pelos backtests (id, date, times, gols, nomes)
+
+    Args:
+        refresh: sincronizar com o Neon antes de carregar (falha de rede
+                 não impede a leitura do cache existente)
+        finished_only: descartar jogos sem placar
+    """
+    if refresh:
+        try:
+            refresh_cache(cache_dir)
+        except (RuntimeError, OSError) as e:
+            # Sem rede: segue com o cache existente
+            print(f"⚠️  Não foi possível sincronizar com o Neon ({e}); usando cache local")
+
+    matches = load_matches(cache_dir)
+    team_names = matches.pop('team_names')
+    df = pd.DataFrame({name: np.asarray(values) for name, values in matches.items()})
+    df['date'] = pd.to_datetime(df['date'])
+
+    if finished_only:
+        df = df[(df['home_goals'] != MISSING_GOALS) & (df['away_goals'] != MISSING_GOALS)].reset_index(drop=True)
+
+    df['home_team'] = df['home_team_id'].map(team_names)
+    df['away_team'] = df['away_team_id'].map(team_names)
+    return df
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cache colunar local dos jogos do Neon")
+    parser.add_argument('--full', action='store_true', help="descartar o cache e baixar tudo")
+    parser.add_argument('--cache-dir', type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    print("=" * 80)
+    print("CACHE LOCAL DE JOGOS - SINCRONIZAÇÃO COM NEON")
+    print("=" * 80)
+
+    start = datetime.now()
+    summary = refresh_cache(args.cache_dir, full=args.full)
+    elapsed = (datetime.now() - start).total_seconds()
+
+    print(f"\n✅ {summary['matches_changed']} jogos e {summary['teams_changed']} times atualizados, "
+          f"{summary['matches_deleted']} jogos removidos em {elapsed:.1f} s")
+    print(f"📊 Cache com {summary['n_rows']} jogos em {args.cache_dir or DEFAULT_CACHE_DIR}")
+    print("=" * 80)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
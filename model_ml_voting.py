@@ -110,6 +110,39 @@ def predict_match_voting(team1_stats, team2_stats):
         'model': 'Voting Soft Ensemble (RF+ET)'
     }
 
+def predict_match_voting_batch(team1_stats, team2_stats):
+    """
+    Predição em lote: uma única chamada ao modelo para todos os jogos.
+    
+    Args:
+        team1_stats, team2_stats: dicts de arrays (uma posição por jogo)
+            com strength, avg_goals_scored, avg_goals_conceded, fifa_ranking
+    
+    Returns:
+        dict com arrays 'home_goals' e 'away_goals'
+    """
+    columns = []
+    for key in ('strength', 'avg_goals_scored', 'avg_goals_conceded', 'fifa_ranking'):
+        team1 = np.asarray(team1_stats[key], dtype=float)
+        team2 = np.asarray(team2_stats[key], dtype=float)
+        columns.extend([team1, team2, team1 - team2])
+    features = np.column_stack(columns)
+    
+    if not MODEL_LOADED or voting_model is None:
+        # Fallback vetorizado (mesmas faixas de predict_match_fallback)
+        strength_diff = features[:, 2]
+        bins = np.digitize(strength_diff, [-40, -20, 20, 40], right=True)
+        home_goals = np.array([0, 0, 1, 1, 2])[bins]
+        away_goals = np.array([2, 1, 1, 0, 0])[bins]
+        return {'home_goals': home_goals, 'away_goals': away_goals}
+    
+    predicted = np.asarray(voting_model.predict(features)).astype(str)
+    parts = np.char.partition(predicted, 'x')
+    return {
+        'home_goals': parts[:, 0].astype(int),
+        'away_goals': parts[:, 2].astype(int)
+    }
+
 def predict_match_fallback(team1_stats, team2_stats):
     """
     Fallback simples se modelo não carregar.
@@ -24,64 +24,97 @@ def poisson_pmf(k, lam):
     return np.exp(log_prob)
 
 
-def predict_match_optimized(team1_stats, team2_stats, max_goals=2):
+# Constantes de calculate_lambdas (ajustáveis via tune_model.py)
+DEFAULT_LAMBDA_PARAMS = {
+    'fifa_scale': 0.2,        # ajuste por 1000 pontos FIFA de diferença
+    'fifa_factor_min': 0.8,   # limites do fator FIFA
+    'fifa_factor_max': 1.2,
+    'regression': 0.05,       # peso da regressão à média
+    'mean_goals': 1.3,        # média para onde os lambdas regridem
+    'lambda_min': 0.3,        # limites dos lambdas
+    'lambda_max': 3.0,
+}
+
+
+def calculate_lambdas(team1_attack, team1_defense, fifa_team1,
+                      team2_attack, team2_defense, fifa_team2, params=None):
     """
-    Prevê placar com estratégia conservadora
-    
-    LÓGICA:
-    1. Lambda base = médias históricas
-    2. Ajuste por defesa do oponente
-    3. Ajuste pequeno por ranking FIFA (10-20%)
+    Calcula os lambdas (gols esperados) dos dois times
     
-    Args:
-        team1_stats: dict com estatísticas do time 1
-        team2_stats: dict com estatísticas do time 2
-        max_goals: máximo de gols a considerar (padrão: 2)
+    Aceita escalares ou arrays numpy (um elemento por jogo), de modo que o
+    mesmo cálculo serve para um jogo ou para todos os 104 de uma vez.
+    Os valores de params também podem ser arrays: params com formato
+    (P, 1) e jogos com formato (N,) geram lambdas (P, N).
     
     Returns:
-        dict com placar previsto e probabilidades
+        (lambda_team1, lambda_team2)
     """
+    if params is None:
+        params = DEFAULT_LAMBDA_PARAMS
     
     # 1. LAMBDA BASE = Médias históricas
-    team1_attack = team1_stats.get('avg_goals_scored', 1.5)  # Gols marcados
-    team1_defense = team1_stats.get('avg_goals_conceded', 1.0)  # Gols sofridos
-    
-    team2_attack = team2_stats.get('avg_goals_scored', 1.5)
-    team2_defense = team2_stats.get('avg_goals_conceded', 1.0)
-    
     # 2. AJUSTE POR DEFESA DO OPONENTE
     # Time 1 marca contra defesa do Time 2
-    lambda_team1 = (team1_attack + team2_defense) / 2
+    lambda_team1 = (np.asarray(team1_attack, dtype=float) + team2_defense) / 2
     # Time 2 marca contra defesa do Time 1
-    lambda_team2 = (team2_attack + team1_defense) / 2
+    lambda_team2 = (np.asarray(team2_attack, dtype=float) + team1_defense) / 2
     
     # 3. AJUSTE PEQUENO POR RANKING FIFA (10-20%)
     # Ranking FIFA define quem é favorito, mas não domina o cálculo
-    fifa_team1 = team1_stats.get('fifa_ranking', 1500)
-    fifa_team2 = team2_stats.get('fifa_ranking', 1500)
-    
     # Calcular fator FIFA (0.9 a 1.1)
     # Diferença de 100 pontos FIFA = 10% de ajuste
-    fifa_diff = (fifa_team1 - fifa_team2) / 1000  # -0.5 a +0.5
-    fifa_factor_team1 = 1.0 + (fifa_diff * 0.2)  # 0.9 a 1.1
-    fifa_factor_team2 = 1.0 - (fifa_diff * 0.2)  # 1.1 a 0.9
+    fifa_diff = (np.asarray(fifa_team1, dtype=float) - fifa_team2) / 1000  # -0.5 a +0.5
     
     # Limitar fatores
-    fifa_factor_team1 = max(0.8, min(1.2, fifa_factor_team1))
-    fifa_factor_team2 = max(0.8, min(1.2, fifa_factor_team2))
+    fifa_factor_team1 = np.clip(1.0 + (fifa_diff * params['fifa_scale']),
+                                params['fifa_factor_min'], params['fifa_factor_max'])  # 0.9 a 1.1
+    fifa_factor_team2 = np.clip(1.0 - (fifa_diff * params['fifa_scale']),
+                                params['fifa_factor_min'], params['fifa_factor_max'])  # 1.1 a 0.9
     
     # Aplicar ajuste FIFA
-    lambda_team1 *= fifa_factor_team1
-    lambda_team2 *= fifa_factor_team2
+    lambda_team1 = lambda_team1 * fifa_factor_team1
+    lambda_team2 = lambda_team2 * fifa_factor_team2
     
     # 4. REGRESSÃO MÍNIMA À MÉDIA (apenas 5%)
-    mean_goals = 1.3
-    lambda_team1 = 0.95 * lambda_team1 + 0.05 * mean_goals
-    lambda_team2 = 0.95 * lambda_team2 + 0.05 * mean_goals
+    regression = params['regression']
+    lambda_team1 = (1 - regression) * lambda_team1 + regression * params['mean_goals']
+    lambda_team2 = (1 - regression) * lambda_team2 + regression * params['mean_goals']
     
     # 5. LIMITAR LAMBDAS (evitar placares extremos)
-    lambda_team1 = max(0.3, min(3.0, lambda_team1))
-    lambda_team2 = max(0.3, min(3.0, lambda_team2))
+    lambda_team1 = np.clip(lambda_team1, params['lambda_min'], params['lambda_max'])
+    lambda_team2 = np.clip(lambda_team2, params['lambda_min'], params['lambda_max'])
+    
+    if lambda_team1.ndim == 0:
+        return float(lambda_team1), float(lambda_team2)
+    return lambda_team1, lambda_team2
+
+
+def predict_match_optimized(team1_stats, team2_stats, max_goals=2):
+    """
+    Prevê placar com estratégia conservadora
+    
+    LÓGICA:
+    1. Lambda base = médias históricas
+    2. Ajuste por defesa do oponente
+    3. Ajuste pequeno por ranking FIFA (10-20%)
+    
+    Args:
+        team1_stats: dict com estatísticas do time 1
+        team2_stats: dict com estatísticas do time 2
+        max_goals: máximo de gols a considerar (padrão: 2)
+    
+    Returns:
+        dict com placar previsto e probabilidades
+    """
+    
+    lambda_team1, lambda_team2 = calculate_lambdas(
+        team1_stats.get('avg_goals_scored', 1.5),  # Gols marcados
+        team1_stats.get('avg_goals_conceded', 1.0),  # Gols sofridos
+        team1_stats.get('fifa_ranking', 1500),
+        team2_stats.get('avg_goals_scored', 1.5),
+        team2_stats.get('avg_goals_conceded', 1.0),
+        team2_stats.get('fifa_ranking', 1500)
+    )
     
     # Calcular probabilidades para placares conservadores
     placares_conservadores = [
@@ -138,6 +171,72 @@ def predict_match_optimized(team1_stats, team2_stats, max_goals=2):
     }
 
 
+def conservative_picks(lambda_team1, lambda_team2):
+    """
+    Escolha de placar de predict_match_optimized a partir dos lambdas
+
+    Args:
+        lambda_team1, lambda_team2: arrays 1D (um elemento por jogo)
+
+    Returns:
+        dict de arrays: home_goals, away_goals, prob_home_win, prob_draw,
+        prob_away_win
+    """
+    # Placares conservadores 0..2, na ordem de predict_match_optimized
+    scores = np.array([(0, 0), (1, 0), (0, 1), (2, 0), (0, 2), (1, 1), (2, 1), (1, 2), (2, 2)])
+    probs = score_probability_matrix(lambda_team1, lambda_team2, max_goals=2)
+    probs = probs[:, scores[:, 0], scores[:, 1]]
+
+    diff = np.sign(scores[:, 0] - scores[:, 1])
+    prob_team1_win = probs[:, diff > 0].sum(axis=1)
+    prob_draw = probs[:, diff == 0].sum(axis=1)
+    prob_team2_win = probs[:, diff < 0].sum(axis=1)
+
+    # Resultado mais provável (empate nos casos sem maioria estrita)
+    result = np.where((prob_team1_win > prob_draw) & (prob_team1_win > prob_team2_win), 1,
+                      np.where((prob_team2_win > prob_draw) & (prob_team2_win > prob_team1_win), -1, 0))
+
+    # Melhor placar dentro do resultado
+    masked = np.where(diff[None, :] == result[:, None], probs, -1.0)
+    best = scores[np.argmax(masked, axis=1)]
+
+    return {
+        'home_goals': best[:, 0],
+        'away_goals': best[:, 1],
+        'prob_home_win': prob_team1_win,
+        'prob_draw': prob_draw,
+        'prob_away_win': prob_team2_win
+    }
+
+
+def predict_match_optimized_batch(team1_stats, team2_stats):
+    """
+    Versão vetorizada de predict_match_optimized (mesma escolha de placar)
+
+    Args:
+        team1_stats, team2_stats: dicts de arrays (uma posição por jogo)
+            com avg_goals_scored, avg_goals_conceded e fifa_ranking
+
+    Returns:
+        dict de arrays: home_goals, away_goals, prob_home_win, prob_draw,
+        prob_away_win, lambda_team1, lambda_team2
+    """
+    def column(stats, key, default):
+        return np.asarray(stats.get(key, default), dtype=float)
+
+    lambda_team1, lambda_team2 = calculate_lambdas(
+        column(team1_stats, 'avg_goals_scored', 1.5), column(team1_stats, 'avg_goals_conceded', 1.0),
+        column(team1_stats, 'fifa_ranking', 1500),
+        column(team2_stats, 'avg_goals_scored', 1.5), column(team2_stats, 'avg_goals_conceded', 1.0),
+        column(team2_stats, 'fifa_ranking', 1500)
+    )
+
+    picks = conservative_picks(lambda_team1, lambda_team2)
+    picks['lambda_team1'] = np.atleast_1d(lambda_team1)
+    picks['lambda_team2'] = np.atleast_1d(lambda_team2)
+    return picks
+
+
 def calculate_expected_points(prob_scores, pred_home, pred_away):
     """
     Calcula pontuação esperada considerando todas as possibilidades
@@ -174,6 +273,200 @@ def calculate_expected_points(prob_scores, pred_home, pred_away):
     return expected
 
 
+# Regras do Bolão (PALPITES_NECESSARIOS.md)
+BOLAO_POINTS = {
+    'exact': 20,          # Placar exato
+    'result_goals': 15,   # Resultado + gols de um time
+    'result': 10,         # Apenas resultado
+    'goals': 5,           # Apenas gols de um time
+}
+
+_PAYOFF_CACHE = {}
+
+
+def bolao_payoff_matrix(max_goals=6, rules=None):
+    """
+    Matriz de pontos do Bolão para todos os pares (palpite, placar real)
+    
+    Placares indexados por h * (max_goals + 1) + a. Montada uma única vez
+    por (max_goals, regras) e reutilizada.
+    
+    Returns:
+        np.ndarray (S, S) com S = (max_goals + 1)^2: payoff[palpite, real]
+    """
+    if rules is None:
+        rules = BOLAO_POINTS
+    key = (max_goals, tuple(sorted(rules.items())))
+    
+    if key not in _PAYOFF_CACHE:
+        goals = np.arange(max_goals + 1)
+        home = np.repeat(goals, max_goals + 1)
+        away = np.tile(goals, max_goals + 1)
+        
+        # [palpite, real]
+        same_home = home[:, None] == home[None, :]
+        same_away = away[:, None] == away[None, :]
+        same_result = np.sign(home - away)[:, None] == np.sign(home - away)[None, :]
+        one_goal = same_home | same_away
+        
+        payoff = np.where(
+            same_home & same_away, rules['exact'],
+            np.where(same_result & one_goal, rules['result_goals'],
+                     np.where(same_result, rules['result'],
+                              np.where(one_goal, rules['goals'], 0)))
+        ).astype(float)
+        
+        payoff.setflags(write=False)
+        _PAYOFF_CACHE[key] = payoff
+    
+    return _PAYOFF_CACHE[key]
+
+
+def bolao_points(pred_home, pred_away, real_home, real_away, rules=None):
+    """
+    Pontos do Bolão para arrays de palpites e placares reais (vetorizado)
+
+    Aceita qualquer formato compatível por broadcasting, ex.: palpites
+    (n_modelos, n_jogos) contra placares reais (n_jogos,).
+
+    Returns:
+        np.ndarray de pontos com o formato do broadcast
+    """
+    if rules is None:
+        rules = BOLAO_POINTS
+
+    pred_home, pred_away = np.asarray(pred_home), np.asarray(pred_away)
+    real_home, real_away = np.asarray(real_home), np.asarray(real_away)
+
+    same_home = pred_home == real_home
+    same_away = pred_away == real_away
+    same_result = np.sign(pred_home - pred_away) == np.sign(real_home - real_away)
+    one_goal = same_home | same_away
+
+    return np.select(
+        [same_home & same_away, same_result & one_goal, same_result, one_goal],
+        [rules['exact'], rules['result_goals'], rules['result'], rules['goals']],
+        default=0
+    )
+
+
+def score_probability_matrix(lambda_team1, lambda_team2, max_goals=6):
+    """
+    Matrizes de probabilidade de placar (Poisson independente, truncada)
+    
+    Args:
+        lambda_team1, lambda_team2: escalares ou arrays (um por jogo)
+        max_goals: gols máximos por time
+    
+    Returns:
+        np.ndarray (n_jogos, max_goals + 1, max_goals + 1), normalizada
+    """
+    lambda_team1 = np.atleast_1d(np.asarray(lambda_team1, dtype=float))
+    lambda_team2 = np.atleast_1d(np.asarray(lambda_team2, dtype=float))
+    
+    goals = np.arange(max_goals + 1)
+    log_fact = np.cumsum(np.log(np.maximum(goals, 1)))
+    
+    p1 = np.exp(goals * np.log(lambda_team1[:, None]) - lambda_team1[:, None] - log_fact)
+    p2 = np.exp(goals * np.log(lambda_team2[:, None]) - lambda_team2[:, None] - log_fact)
+    
+    matrices = p1[:, :, None] * p2[:, None, :]
+    return matrices / matrices.sum(axis=(1, 2), keepdims=True)
+
+
+def optimize_picks(score_probs, pick_max_goals=None, rules=None):
+    """
+    Escolhe o palpite que maximiza os pontos esperados do Bolão
+    
+    Todos os jogos são resolvidos com um único produto de matrizes:
+    (n_jogos × placares reais) @ payoff.T -> (n_jogos × palpites)
+    
+    Args:
+        score_probs: np.ndarray (n_jogos, G + 1, G + 1) de probabilidades
+        pick_max_goals: limita os palpites candidatos (ex.: 2 = conservador)
+        rules: regras de pontuação (padrão: BOLAO_POINTS)
+    
+    Returns:
+        dict com arrays 'home_goals', 'away_goals', 'expected_points'
+        e 'expected_points_all' (n_jogos, G + 1, G + 1)
+    """
+    score_probs = np.asarray(score_probs, dtype=float)
+    if score_probs.ndim == 2:
+        score_probs = score_probs[None]
+    
+    n_matches, n_goals, _ = score_probs.shape
+    payoff = bolao_payoff_matrix(n_goals - 1, rules)
+    
+    expected = score_probs.reshape(n_matches, -1) @ payoff.T
+    expected = expected.reshape(n_matches, n_goals, n_goals)
+    
+    candidates = expected
+    if pick_max_goals is not None and pick_max_goals < n_goals - 1:
+        candidates = expected[:, :pick_max_goals + 1, :pick_max_goals + 1]
+    
+    flat = candidates.reshape(n_matches, -1)
+    best = np.argmax(flat, axis=1)
+    width = candidates.shape[2]
+    
+    return {
+        'home_goals': best // width,
+        'away_goals': best % width,
+        'expected_points': flat[np.arange(n_matches), best],
+        'expected_points_all': expected
+    }
+
+
+def predict_matches_expected_points(fixtures, max_goals=6, pick_max_goals=None):
+    """
+    Palpites de máxima pontuação esperada para vários jogos de uma vez
+    
+    Args:
+        fixtures: lista de (team1_stats, team2_stats)
+        max_goals: truncamento da distribuição de placares
+        pick_max_goals: limita os palpites candidatos (None = sem limite)
+    
+    Returns:
+        lista de dicts no formato de predict_match_optimized
+    """
+    if not fixtures:
+        return []
+    
+    def column(side, key, default):
+        return np.array([f[side].get(key, default) for f in fixtures], dtype=float)
+    
+    lambda_team1, lambda_team2 = calculate_lambdas(
+        column(0, 'avg_goals_scored', 1.5), column(0, 'avg_goals_conceded', 1.0),
+        column(0, 'fifa_ranking', 1500),
+        column(1, 'avg_goals_scored', 1.5), column(1, 'avg_goals_conceded', 1.0),
+        column(1, 'fifa_ranking', 1500)
+    )
+    probs = score_probability_matrix(lambda_team1, lambda_team2, max_goals)
+    picks = optimize_picks(probs, pick_max_goals=pick_max_goals)
+    
+    home_win = np.tril(np.ones((max_goals + 1, max_goals + 1)), k=-1)
+    prob_home_win = (probs * home_win).sum(axis=(1, 2))
+    prob_away_win = (probs * home_win.T).sum(axis=(1, 2))
+    prob_draw = np.trace(probs, axis1=1, axis2=2)
+    
+    results = []
+    for k in range(len(fixtures)):
+        h, a = int(picks['home_goals'][k]), int(picks['away_goals'][k])
+        results.append({
+            'home_goals': h,
+            'away_goals': a,
+            'prob_home_win': float(prob_home_win[k]),
+            'prob_draw': float(prob_draw[k]),
+            'prob_away_win': float(prob_away_win[k]),
+            'prob_exact': float(probs[k, h, a]),
+            'expected_points': float(picks['expected_points'][k]),
+            'strategy': 'expected_points',
+            'lambda_team1': float(lambda_team1[k]),
+            'lambda_team2': float(lambda_team2[k])
+        })
+    
+    return results
+
+
 def should_risk_high_score(team1_stats, team2_stats, threshold=200):
     """
     Decide se vale a pena arriscar placar alto (3+ gols)
@@ -0,0 +1,332 @@
+"""
+Consultas por Bitsets sobre as Simulações - Copa do Mundo 2026
+Transforma os resultados por simulação (outcome_store / tournament_sampler)
+em bitsets por (time, posição) e (time, fase) ao longo das simulações, e
+responde probabilidades marginais e conjuntas com AND + contagem de bits
+
+LÓGICA:
+1. Bit k de um bitset = simulação k satisfaz o evento; bitsets guardados
+   como palavras np.uint64 (64 simulações por palavra)
+2. Eventos pré-calculados: posição no grupo (1º..4º), fase alcançada
+   (round_of_32..champion, cumulativo) e lugar no pódio de cada time
+3. Conjunção = AND das palavras; P = popcount / simulações
+   ("A 1º e B 2º" com 100 mil simulações: 2 x 1563 palavras, ~10 µs)
+4. Eliminação na fase s = alcançou s AND NOT alcançou s + 1
+
+Uso:
+    bitsets = OutcomeBitsets.from_store(OutcomeStore.open())
+    bitsets.probability(bitsets.position("Brazil", 1), bitsets.position("Morocco", 2))
+    bitsets.final_pairings(top=5)
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from copa_2026_structure import GRUPOS_COPA_2026
+from outcome_store import NO_TEAM, PODIUM
+from tournament_sampler import STAGE_INDEX, STAGE_NAMES
+
+# Bits por palavra
+WORD_BITS = 64
+
+# Posições no grupo
+GROUP_SIZE = 4
+
+# Simulações empacotadas por vez (múltiplo de 64)
+BUILD_BATCH = 65536
+
+# Bits de cada byte (popcount sem np.bitwise_count, numpy < 2.0)
+_BYTE_COUNTS = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def popcount(words):
+    """Bits ligados ao longo do último eixo (palavras uint64)"""
+    words = np.ascontiguousarray(words)
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+    return _BYTE_COUNTS[words.view(np.uint8)].sum(axis=-1, dtype=np.int64)
+
+
+def pack_bits(flags):
+    """
+    Booleanos (..., n) -> palavras (..., ceil(n / 64)) uint64
+
+    Bit k da palavra w = simulação 64 * w + k
+    """
+    flags = np.asarray(flags, dtype=bool)
+    n_words = -(-flags.shape[-1] // WORD_BITS)
+    packed = np.packbits(flags, axis=-1, bitorder='little')
+    padding = n_words * 8 - packed.shape[-1]
+    if padding:
+        packed = np.concatenate([packed, np.zeros(packed.shape[:-1] + (padding,), dtype=np.uint8)], axis=-1)
+    return np.ascontiguousarray(packed).view(np.uint64)
+
+
+class OutcomeBitsets:
+    """Bitsets de eventos por time sobre a dimensão das simulações"""
+
+    def __init__(self, teams, positions, stages, podium, n_samples):
+        """
+        Use from_arrays(), from_store() ou from_outcomes()
+
+        Args:
+            teams: nomes dos times (posição = ID)
+            positions: (times, 4, palavras) time terminou o grupo na posição p
+            stages: (times, fases, palavras) time alcançou a fase s (cumulativo)
+            podium: (3, times, palavras) time foi campeão / vice / 3º
+            n_samples: número de simulações
+        """
+        self.teams = list(teams)
+        self.index = {name: i for i, name in enumerate(self.teams)}
+        self.positions = positions
+        self.stages = stages
+        self.podium = podium
+        self.n_samples = n_samples
+        self.n_words = positions.shape[-1]
+
+    @staticmethod
+    def _event_flags(positions, stages, podium, n_teams):
+        """Booleanos (evento, simulação) a partir de colunas (campo, simulação)"""
+        position_flags = positions[:, None, :] == np.arange(GROUP_SIZE, dtype=np.uint8)[None, :, None]
+        stage_flags = stages[:, None, :] >= np.arange(len(STAGE_NAMES), dtype=np.uint8)[None, :, None]
+        podium_flags = podium[:, None, :] == np.arange(n_teams, dtype=np.uint8)[None, :, None]
+        return position_flags, stage_flags, podium_flags
+
+    @classmethod
+    def _from_blocks(cls, teams, blocks, n_samples):
+        """
+        Empacota blocos de colunas direto na sua faixa de palavras
+
+        Args:
+            blocks: iterável de (posições, fases, pódio), cada um (campo,
+                    simulações do bloco); blocos múltiplos de 64 exceto o último
+        """
+        n_teams = len(teams)
+        n_words = -(-n_samples // WORD_BITS)
+        positions = np.zeros((n_teams, GROUP_SIZE, n_words), dtype=np.uint64)
+        stages = np.zeros((n_teams, len(STAGE_NAMES), n_words), dtype=np.uint64)
+        podium = np.zeros((len(PODIUM), n_teams, n_words), dtype=np.uint64)
+
+        word = 0
+        for columns in blocks:
+            flags = cls._event_flags(*columns, n_teams)
+            size = -(-flags[0].shape[-1] // WORD_BITS)
+            for target, values in zip((positions, stages, podium), flags):
+                target[..., word:word + size] = pack_bits(values)
+            word += size
+        return cls(teams, positions, stages, podium, n_samples)
+
+    @classmethod
+    def from_arrays(cls, teams, positions, stages, podium):
+        """
+        Args:
+            positions: (n, times) posição no grupo (0 = 1º)
+            stages: (n, times) fase alcançada (índice em STAGE_NAMES)
+            podium: (n, 3) IDs de campeão, vice e 3º (negativo = sem time)
+        """
+        podium = np.asarray(podium)
+        columns = (np.asarray(positions, dtype=np.uint8).T, np.asarray(stages, dtype=np.uint8).T,
+                   np.where(podium < 0, NO_TEAM, podium).astype(np.uint8).T)
+        blocks = (tuple(c[:, start:start + BUILD_BATCH] for c in columns)
+                  for start in range(0, len(podium), BUILD_BATCH))
+        return cls._from_blocks(teams, blocks, len(podium))
+
+    @classmethod
+    def from_outcomes(cls, outcomes, n_teams=None):
+        """Bitsets de um tournament_sampler.Outcomes (times da Copa do registro)"""
+        if n_teams is None:
+            n_teams = sum(len(teams) for teams in GRUPOS_COPA_2026.values())
+        return cls.from_arrays(outcomes.model.registry.names[:n_teams],
+                               outcomes.positions[:, :n_teams], outcomes.stage[:, :n_teams],
+                               np.stack([outcomes.champion, outcomes.runner_up, outcomes.third], axis=1))
+
+    @classmethod
+    def from_store(cls, store):
+        """Bitsets de um outcome_store.OutcomeStore, bloco a bloco (sem carregar o armazém)"""
+        if store.chunk_size % WORD_BITS:
+            raise ValueError(f"chunk_size precisa ser múltiplo de {WORD_BITS} (recebeu {store.chunk_size})")
+        # Cada bloco do armazém fatiado em janelas de BUILD_BATCH (como from_arrays)
+        blocks = (tuple(chunk[slice(*store.layout[field]), start:start + BUILD_BATCH]
+                        for field in ('position', 'stage', 'podium'))
+                  for chunk in store.iter_chunks()
+                  for start in range(0, chunk.shape[-1], BUILD_BATCH))
+        return cls._from_blocks(store.teams, blocks, len(store))
+
+    @property
+    def nbytes(self):
+        """Memória ocupada pelos bitsets"""
+        return self.positions.nbytes + self.stages.nbytes + self.podium.nbytes
+
+    # Eventos (bitsets)
+
+    def position(self, team, place):
+        """Time terminou o grupo em `place` (1 = 1º)"""
+        return self.positions[self.index[team], place - 1]
+
+    def reaches(self, team, stage):
+        """Time alcançou a fase (nome em STAGE_NAMES)"""
+        return self.stages[self.index[team], STAGE_INDEX[stage]]
+
+    def exits(self, team, stage):
+        """Time foi eliminado na fase ('group' = não passou do grupo)"""
+        s = STAGE_INDEX[stage]
+        if s + 1 >= len(STAGE_NAMES):
+            raise ValueError("O campeão não é eliminado")
+        team_id = self.index[team]
+        return self.stages[team_id, s] & ~self.stages[team_id, s + 1]
+
+    def finishes(self, team, place):
+        """Time terminou em `place` do pódio: 'champion', 'runner_up' ou 'third'"""
+        return self.podium[PODIUM.index(place), self.index[team]]
+
+    def on_podium(self, team):
+        """Time terminou entre os 3 primeiros"""
+        team_id = self.index[team]
+        return self.podium[0, team_id] | self.podium[1, team_id] | self.podium[2, team_id]
+
+    # Consultas
+
+    def count(self, *events):
+        """Simulações em que todos os eventos ocorrem"""
+        if not events:
+            return self.n_samples
+        words = events[0]
+        for event in events[1:]:
+            words = words & event
+        return int(popcount(words))
+
+    def probability(self, *events):
+        """P(todos os eventos)"""
+        return self.count(*events) / self.n_samples if self.n_samples else 0.0
+
+    def conditional(self, events, given):
+        """P(events | given) (listas de bitsets)"""
+        base = self.count(*given)
+        return self.count(*events, *given) / base if base else 0.0
+
+    def _ranked(self, counts):
+        probs = counts / max(self.n_samples, 1)
+        order = np.argsort(-probs, kind='stable')
+        return {self.teams[i]: float(probs[i]) for i in order if probs[i] > 0}
+
+    def position_probabilities(self):
+        """{time: [P(1º), P(2º), P(3º), P(4º)]}"""
+        probs = popcount(self.positions) / max(self.n_samples, 1)
+        return {team: probs[i].tolist() for i, team in enumerate(self.teams)}
+
+    def stage_probabilities(self):
+        """{time: {fase: P(alcançar)}}"""
+        probs = popcount(self.stages[:, 1:]) / max(self.n_samples, 1)
+        return {team: dict(zip(STAGE_NAMES[1:], map(float, probs[i]))) for i, team in enumerate(self.teams)}
+
+    def champion_probabilities(self):
+        """P(campeão) por time, ordenado"""
+        return self._ranked(popcount(self.podium[0]))
+
+    def podium_probabilities(self):
+        """P(pódio) por time, ordenado (os 3 lugares são disjuntos)"""
+        return self._ranked(popcount(self.podium).sum(axis=0))
+
+    def group_pairings(self, grupo, groups=None):
+        """
+        Pares (1º, 2º) de um grupo por probabilidade conjunta
+
+        Returns:
+            lista [((1º, 2º), probabilidade)] ordenada
+        """
+        teams = (groups or GRUPOS_COPA_2026)[grupo]
+        pairs = [((a, b), self.probability(self.position(a, 1), self.position(b, 2)))
+                 for a in teams for b in teams if a != b]
+        return sorted(pairs, key=lambda x: x[1], reverse=True)
+
+    def final_pairings(self, top=10):
+        """
+        Finais mais prováveis (sem ordem entre os dois times)
+
+        Returns:
+            lista [((time, time), probabilidade)] ordenada
+        """
+        final = self.stages[:, STAGE_INDEX['final']]
+        candidates = np.flatnonzero(popcount(final))
+        pairs = []
+        for k, i in enumerate(candidates):
+            others = candidates[k + 1:]
+            if others.size == 0:
+                continue
+            counts = popcount(final[i] & final[others])
+            pairs.extend(((self.teams[i], self.teams[j]), c / self.n_samples)
+                         for j, c in zip(others.tolist(), counts.tolist()) if c)
+        return sorted(pairs, key=lambda x: x[1], reverse=True)[:top]
+
+    def most_likely_podium(self):
+        """
+        Pódio mais provável passo a passo: campeão mais provável, vice mais
+        provável dado o campeão, 3º mais provável dados os dois
+
+        Returns:
+            dict {'champion', 'runner_up', 'third_place'} (None se vazio)
+        """
+        podium = {}
+        given = []
+        for place, key in zip(PODIUM, ('champion', 'runner_up', 'third_place')):
+            rows = self.podium[PODIUM.index(place)]
+            if given:
+                mask = given[0]
+                for event in given[1:]:
+                    mask = mask & event
+                rows = rows & mask
+            counts = popcount(rows)
+            if counts.max(initial=0) == 0:
+                podium[key] = None
+                continue
+            team_id = int(np.argmax(counts))
+            podium[key] = self.teams[team_id]
+            given.append(rows[team_id])
+        return podium
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Consultas por bitsets sobre as simulações")
+    parser.add_argument('--path', default=None, help='diretório do OutcomeStore (padrão: amostrar)')
+    parser.add_argument('--samples', type=int, default=100000, help='torneios amostrados sem --path')
+    parser.add_argument('--seed', type=int, default=None, help='semente')
+    args = parser.parse_args(argv)
+
+    print("=" * 80)
+    print("🧮 CONSULTAS POR BITSETS - COPA 2026")
+    print("=" * 80)
+
+    start = time.perf_counter()
+    if args.path:
+        from outcome_store import OutcomeStore
+        bitsets = OutcomeBitsets.from_store(OutcomeStore.open(args.path))
+    else:
+        from snapshot_builder import build_team_stats
+        from tournament_sampler import TournamentModel, sample_outcomes
+        team_stats, _ = build_team_stats()
+        bitsets = OutcomeBitsets.from_outcomes(sample_outcomes(TournamentModel.from_stats(team_stats),
+                                                               args.samples, rng=args.seed))
+    elapsed = time.perf_counter() - start
+    print(f"\n✅ {bitsets.n_samples:,} simulações em bitsets ({bitsets.nbytes / 1e6:.1f} MB, {elapsed:.1f}s)")
+
+    print("\n🏆 Pares (1º, 2º) mais prováveis por grupo:")
+    start = time.perf_counter()
+    pairings = {grupo: bitsets.group_pairings(grupo)[0] for grupo in sorted(GRUPOS_COPA_2026)}
+    elapsed = (time.perf_counter() - start) * 1000
+    for grupo, ((first, second), prob) in pairings.items():
+        print(f"  Grupo {grupo}: {first} / {second} ({prob:.1%})")
+    print(f"  ⏱️  {12 * 12} consultas conjuntas em {elapsed:.1f} ms")
+
+    print("\n🤝 Finais mais prováveis:")
+    for (team1, team2), prob in bitsets.final_pairings(top=5):
+        print(f"  {team1} x {team2}: {prob:.2%}")
+
+    podium = bitsets.most_likely_podium()
+    print(f"\n🥇 {podium['champion']}  🥈 {podium['runner_up']}  🥉 {podium['third_place']}")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+"""
+Armazém de Resultados por Simulação - Copa do Mundo 2026
+Guarda o resultado de cada torneio simulado (posição no grupo, fase
+alcançada e pódio) em colunas uint8 gravadas em disco com memory-map, para
+responder perguntas posteriores sem re-simular
+
+LÓGICA:
+1. Uma linha do layout = uma coluna de dados: posição no grupo de cada
+   time (0 = 1º), fase alcançada de cada time (índice em STAGE_NAMES) e
+   campeão, vice e 3º (ID do time); 99 bytes por simulação com 48 times
+2. Layout colunar: os valores de uma coluna ficam contíguos, então a
+   consulta sobre um time lê só as suas linhas do arquivo
+3. Blocos .npy de tamanho fixo (chunk_size simulações) abertos com
+   memory-map: gravação incremental e leitura bloco a bloco, sem carregar
+   tudo na memória (10 milhões de simulações ≈ 1 GB)
+4. meta.json guarda os times e o número de simulações válidas; é trocado
+   de forma atômica depois que os blocos foram gravados
+
+Uso:
+    store = OutcomeStore.create("data/processed/outcomes", team_names)
+    store.append_outcomes(sample_outcomes(model, 100000))
+    store.flush()
+    OutcomeStore.open("data/processed/outcomes").position_probabilities()
+"""
+
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+from tournament_sampler import STAGE_NAMES
+
+DEFAULT_STORE_DIR = Path(__file__).parent / "data" / "processed" / "outcomes"
+STORE_FORMAT = 1
+META_FILE = "meta.json"
+
+# Simulações por bloco (arquivo .npy)
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+# Valor das colunas de pódio sem time definido
+NO_TEAM = 255
+
+# Colunas de pódio
+PODIUM = ('champion', 'runner_up', 'third')
+
+
+def _layout(n_teams):
+    """Faixa de linhas de cada campo no bloco colunar"""
+    return {
+        'position': (0, n_teams),
+        'stage': (n_teams, 2 * n_teams),
+        'podium': (2 * n_teams, 2 * n_teams + len(PODIUM)),
+    }
+
+
+class OutcomeStore:
+    """Resultados de torneios simulados em blocos uint8 com memory-map"""
+
+    def __init__(self, path, meta, mode='r'):
+        """
+        Use OutcomeStore.create() ou OutcomeStore.open()
+
+        Args:
+            path: diretório do armazém
+            meta: conteúdo de meta.json
+            mode: 'r' (leitura) ou 'r+' (acrescentar simulações)
+        """
+        self.path = Path(path)
+        self.meta = meta
+        self.mode = mode
+        self.teams = meta['teams']
+        self.index = {name: i for i, name in enumerate(self.teams)}
+        self.chunk_size = meta['chunk_size']
+        self.layout = {field: tuple(rows) for field, rows in meta['layout'].items()}
+        self.n_columns = self.layout['podium'][1]
+        self._n_samples = meta['n_samples']
+        self._chunks = {}
+
+    @classmethod
+    def create(cls, path=None, teams=(), chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Armazém novo e vazio (apaga os blocos de um armazém anterior)
+
+        Args:
+            teams: nomes dos times (posição = ID; no máximo 255)
+        """
+        teams = list(teams)
+        if not 0 < len(teams) < NO_TEAM:
+            raise ValueError(f"O armazém precisa de 1 a {NO_TEAM - 1} times, recebeu {len(teams)}")
+
+        path = Path(path or DEFAULT_STORE_DIR)
+        path.mkdir(parents=True, exist_ok=True)
+        for old in path.glob("chunk_*.npy"):
+            old.unlink()
+
+        meta = {
+            'format': STORE_FORMAT,
+            'teams': teams,
+            'stage_names': STAGE_NAMES,
+            'chunk_size': int(chunk_size),
+            'layout': _layout(len(teams)),
+            'n_samples': 0,
+        }
+        store = cls(path, meta, mode='r+')
+        store._write_meta()
+        return store
+
+    @classmethod
+    def open(cls, path=None, mode='r'):
+        """Abre um armazém existente"""
+        path = Path(path or DEFAULT_STORE_DIR)
+        with open(path / META_FILE) as f:
+            meta = json.load(f)
+        if meta.get('format') != STORE_FORMAT:
+            raise ValueError(f"Formato de armazém incompatível: {meta.get('format')}")
+        return cls(path, meta, mode)
+
+    def __len__(self):
+        return self._n_samples
+
+    @property
+    def nbytes(self):
+        """Bytes ocupados pelas simulações gravadas"""
+        return self._n_samples * self.n_columns
+
+    def _chunk(self, k):
+        """Bloco k como memmap (n_columns, chunk_size), criado se necessário"""
+        if k not in self._chunks:
+            chunk_path = self.path / f"chunk_{k:05d}.npy"
+            if self.mode == 'r':
+                self._chunks[k] = np.load(chunk_path, mmap_mode='r')
+            elif chunk_path.exists():
+                self._chunks[k] = np.load(chunk_path, mmap_mode='r+')
+            else:
+                self._chunks[k] = np.lib.format.open_memmap(
+                    chunk_path, mode='w+', dtype=np.uint8, shape=(self.n_columns, self.chunk_size))
+        return self._chunks[k]
+
+    def _write_meta(self):
+        self.meta['n_samples'] = self._n_samples
+        tmp_path = self.path / f".{META_FILE}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.meta, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path / META_FILE)
+
+    def append(self, positions, stages, podium):
+        """
+        Acrescenta simulações
+
+        Args:
+            positions: (n, times) posição no grupo de cada time (0 = 1º)
+            stages: (n, times) fase alcançada (índice em STAGE_NAMES)
+            podium: (n, 3) IDs de campeão, vice e 3º (negativo = sem time)
+        """
+        if self.mode == 'r':
+            raise ValueError("Armazém aberto só para leitura")
+
+        podium = np.asarray(podium)
+        block = np.concatenate([
+            np.asarray(positions, dtype=np.uint8),
+            np.asarray(stages, dtype=np.uint8),
+            np.where(podium < 0, NO_TEAM, podium).astype(np.uint8),
+        ], axis=1)
+        if block.shape[1] != self.n_columns:
+            raise ValueError(f"Esperadas {self.n_columns} colunas, recebeu {block.shape[1]}")
+
+        start = 0
+        while start < len(block):
+            k, offset = divmod(self._n_samples, self.chunk_size)
+            size = min(len(block) - start, self.chunk_size - offset)
+            self._chunk(k)[:, offset:offset + size] = block[start:start + size].T
+            start += size
+            self._n_samples += size
+
+    def append_outcomes(self, outcomes):
+        """Acrescenta um tournament_sampler.Outcomes (times do registro na ordem do armazém)"""
+        names = outcomes.model.registry.names
+        if names[:len(self.teams)] != self.teams:
+            raise ValueError("Times do modelo diferem dos times do armazém")
+        n_teams = len(self.teams)
+        self.append(outcomes.positions[:, :n_teams], outcomes.stage[:, :n_teams],
+                    np.stack([outcomes.champion, outcomes.runner_up, outcomes.third], axis=1))
+
+    def flush(self):
+        """Grava os blocos em disco e publica o novo número de simulações"""
+        if self.mode == 'r':
+            return
+        for chunk in self._chunks.values():
+            chunk.flush()
+        self._write_meta()
+
+    def iter_chunks(self, field=None):
+        """
+        Blocos gravados (memmap, sem cópia)
+
+        Args:
+            field: 'position', 'stage' ou 'podium' (padrão: todas as linhas)
+
+        Yields:
+            np.ndarray (linhas do campo, simulações do bloco)
+        """
+        first, last = self.layout[field] if field else (0, self.n_columns)
+        n_chunks = -(-self._n_samples // self.chunk_size)
+        for k in range(n_chunks):
+            size = min(self.chunk_size, self._n_samples - k * self.chunk_size)
+            yield self._chunk(k)[first:last, :size]
+
+    def column(self, field, team=None):
+        """
+        Valores de uma coluna em todas as simulações (carregados na memória)
+
+        Args:
+            field: 'position', 'stage' ou um de PODIUM
+            team: nome do time (obrigatório para 'position' e 'stage')
+        """
+        if field in PODIUM:
+            field, offset = 'podium', PODIUM.index(field)
+        else:
+            offset = self.index[team]
+        parts = [chunk[offset] for chunk in self.iter_chunks(field)]
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.uint8)
+
+    def _value_counts(self, field, n_values):
+        """Contagem de cada valor (0..n_values-1) por linha do campo"""
+        first, last = self.layout[field]
+        counts = np.zeros((last - first, n_values), dtype=np.int64)
+        for chunk in self.iter_chunks(field):
+            for i, row in enumerate(chunk):
+                counts[i] += np.bincount(row, minlength=NO_TEAM + 1)[:n_values]
+        return counts
+
+    def position_probabilities(self):
+        """
+        P(terminar o grupo em cada posição)
+
+        Returns:
+            dict {time: [P(1º), P(2º), P(3º), P(4º)]}
+        """
+        probs = self._value_counts('position', 4) / max(len(self), 1)
+        return {team: probs[i].tolist() for i, team in enumerate(self.teams)}
+
+    def stage_probabilities(self):
+        """
+        P(alcançar cada fase do mata-mata)
+
+        Returns:
+            dict {time: {fase: probabilidade}}
+        """
+        counts = self._value_counts('stage', len(STAGE_NAMES))
+        reached = counts[:, ::-1].cumsum(axis=1)[:, ::-1] / max(len(self), 1)
+        return {team: dict(zip(STAGE_NAMES[1:], map(float, reached[i, 1:])))
+                for i, team in enumerate(self.teams)}
+
+    def _ranked(self, counts):
+        probs = counts / max(len(self), 1)
+        order = np.argsort(-probs, kind='stable')
+        return {self.teams[i]: float(probs[i]) for i in order if probs[i] > 0}
+
+    def champion_probabilities(self):
+        """P(campeão) por time, ordenado"""
+        return self._ranked(self._value_counts('podium', len(self.teams))[0])
+
+    def podium_probabilities(self):
+        """P(pódio) por time, ordenado"""
+        return self._ranked(self._value_counts('podium', len(self.teams)).sum(axis=0))
+
+
+def record_samples(store, model, n_samples, batch_size=200_000, rng=None, scheme='plain'):
+    """
+    Amostra torneios em lotes e grava cada lote no armazém
+
+    Returns:
+        número de simulações gravadas
+    """
+    from tournament_sampler import sample_outcomes
+
+    rng = np.random.default_rng(rng)
+    done = 0
+    while done < n_samples:
+        size = min(batch_size, n_samples - done)
+        store.append_outcomes(sample_outcomes(model, size, rng=rng, scheme=scheme))
+        done += size
+    store.flush()
+    return done
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Armazém de resultados por simulação")
+    parser.add_argument('--samples', type=int, default=1_000_000, help='torneios a simular')
+    parser.add_argument('--batch', type=int, default=200_000, help='torneios por lote')
+    parser.add_argument('--seed', type=int, default=None, help='semente')
+    parser.add_argument('--path', default=None, help='diretório do armazém')
+    parser.add_argument('--append', action='store_true', help='acrescentar ao armazém existente')
+    args = parser.parse_args(argv)
+
+    from snapshot_builder import build_team_stats
+    from tournament_sampler import TournamentModel
+    from copa_2026_structure import GRUPOS_COPA_2026
+
+    print("=" * 80)
+    print("💾 ARMAZÉM DE RESULTADOS POR SIMULAÇÃO - COPA 2026")
+    print("=" * 80)
+
+    team_stats, _ = build_team_stats()
+    model = TournamentModel.from_stats(team_stats)
+    n_teams = sum(len(teams) for teams in GRUPOS_COPA_2026.values())
+    teams = model.registry.names[:n_teams]
+
+    if args.append:
+        store = OutcomeStore.open(args.path, mode='r+')
+    else:
+        store = OutcomeStore.create(args.path, teams)
+
+    start = time.perf_counter()
+    record_samples(store, model, args.samples, args.batch, args.seed)
+    elapsed = time.perf_counter() - start
+    print(f"\n✅ {args.samples:,} torneios gravados em {elapsed:.1f}s "
+          f"({len(store):,} no total, {store.nbytes / 1e6:,.0f} MB)")
+
+    start = time.perf_counter()
+    reader = OutcomeStore.open(store.path)
+    winners = {team: probs[0] for team, probs in reader.position_probabilities().items()}
+    champions = reader.champion_probabilities()
+    elapsed = time.perf_counter() - start
+    print(f"⏱️  Consultas sobre o armazém em {elapsed * 1000:.0f} ms")
+
+    print("\n🏆 Top 10 candidatos ao título:")
+    for team, prob in list(champions.items())[:10]:
+        print(f"  {team:30s} Campeão {prob:6.1%} | 1º do grupo {winners[team]:6.1%}")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
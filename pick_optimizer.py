@@ -0,0 +1,348 @@
+"""
+Otimizador de Palpites do Bolão - Copa do Mundo 2026
+Escolhe os palpites de classificação (1º e 2º de cada grupo) e de pódio
+que maximizam os pontos esperados sobre torneios simulados, ou a
+probabilidade de vencer um campo de adversários simulado
+
+LÓGICA:
+1. Pontuação de PALPITES_NECESSARIOS.md (regras configuráveis):
+   - Grupo: 1º e 2º na ordem = 20, os dois invertidos = 10, só um
+     classificado = 5
+   - Pódio: campeão 100, vice 50, 3º 30 (somados); pódio completo na ordem
+     exata soma o bônus de 150; os três certos fora de ordem = 20
+2. Pontos por simulação de todos os palpites candidatos em arrays
+   (pares, simulações): os 12 pares ordenados de cada grupo e todas as
+   trincas ordenadas de times que chegam ao pódio em alguma simulação
+3. Pontos esperados são somas independentes: o melhor par de cada grupo e
+   a melhor trinca saem de um argmax (exato)
+4. Contra um campo simulado (pontos de cada adversário por simulação), o
+   objetivo é P(vencer) com empates divididos; busca por coordenadas a
+   partir dos palpites de maior esperança, trocando um componente por vez
+
+Uso:
+    optimizer = PickOptimizer.from_outcomes(sample_outcomes(model, 100000))
+    picks = optimizer.optimize()
+    picks = optimizer.optimize(field_scores=field)  # (simulações, adversários)
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from copa_2026_structure import GRUPOS_COPA_2026
+
+# Pontos dos palpites de classificação de grupo
+GROUP_POINTS = {
+    'exact': 20,          # 1º e 2º na ordem correta
+    'swapped': 10,        # os dois classificados, ordem invertida
+    'one_in_place': 5,    # só um classificado, na posição palpitada
+    'one_misplaced': 5,   # só um classificado, na outra posição
+}
+
+# Pontos do palpite de pódio
+PODIUM_POINTS = {
+    'champion': 100,
+    'runner_up': 50,
+    'third': 30,
+    'exact': 150,         # bônus: pódio completo na ordem exata
+    'out_of_order': 20,   # os três do pódio, fora de ordem
+}
+
+# Trincas de pódio avaliadas por simulação na busca contra o campo
+FIELD_PODIUM_CANDIDATES = 200
+
+# Rodadas máximas da busca por coordenadas
+MAX_SWEEPS = 5
+
+
+def group_pick_points(positions, first, second, rules=GROUP_POINTS):
+    """
+    Pontos de palpites de grupo por simulação
+
+    Args:
+        positions: (n, times) posição no grupo de cada time (0 = 1º)
+        first, second: arrays (pares,) de IDs palpitados em 1º e 2º
+
+    Returns:
+        np.ndarray (pares, n) int16
+    """
+    pos_first = positions[:, first].T
+    pos_second = positions[:, second].T
+    exact = (pos_first == 0) & (pos_second == 1)
+    swapped = (pos_first == 1) & (pos_second == 0)
+    in_place = (pos_first == 0) | (pos_second == 1)
+    qualified = (pos_first < 2) | (pos_second < 2)
+
+    points = np.where(in_place, rules['one_in_place'], rules['one_misplaced']) * qualified
+    points = np.where(swapped, rules['swapped'], points)
+    points = np.where(exact, rules['exact'], points)
+    return points.astype(np.int16)
+
+
+def podium_pick_points(podium, triples, rules=PODIUM_POINTS):
+    """
+    Pontos de palpites de pódio por simulação
+
+    Args:
+        podium: (n, 3) IDs reais de campeão, vice e 3º
+        triples: (trincas, 3) IDs palpitados
+
+    Returns:
+        np.ndarray (trincas, n) int16
+    """
+    triples = np.asarray(triples)
+    hits = podium.T[None, :, :] == triples[:, :, None]          # (trincas, 3, n)
+    points = (rules['champion'] * hits[:, 0] + rules['runner_up'] * hits[:, 1]
+              + rules['third'] * hits[:, 2])
+    exact = hits.all(axis=1)
+    same_set = np.ones_like(exact)
+    for k in range(3):
+        same_set &= (podium.T[None, :, :] == triples[:, k, None, None]).any(axis=1)
+    points = points + rules['exact'] * exact + rules['out_of_order'] * (same_set & ~exact)
+    return points.astype(np.int16)
+
+
+def win_share(scores, field_best, field_ties):
+    """
+    P(vencer) por candidato: 1 se supera o melhor adversário, 1/(k+1) se
+    empata com k adversários no topo
+
+    Args:
+        scores: (candidatos, n) ou (n,) pontos nossos
+        field_best: (n,) maior pontuação do campo
+        field_ties: (n,) adversários com a maior pontuação
+    """
+    share = np.where(scores > field_best, 1.0, np.where(scores == field_best, 1.0 / (field_ties + 1), 0.0))
+    return share.mean(axis=-1)
+
+
+class PickOptimizer:
+    """Busca dos palpites de grupo e pódio sobre torneios simulados"""
+
+    def __init__(self, teams, letters, group_ids, positions, podium, group_rules=None, podium_rules=None):
+        """
+        Args:
+            teams: nomes dos times (posição = ID)
+            letters: letras dos grupos
+            group_ids: (grupos, 4) IDs de cada grupo
+            positions: (n, times) posição no grupo (0 = 1º)
+            podium: (n, 3) IDs de campeão, vice e 3º
+            group_rules / podium_rules: pontuação (padrão: GROUP_POINTS / PODIUM_POINTS)
+        """
+        self.teams = list(teams)
+        self.letters = list(letters)
+        self.group_ids = np.asarray(group_ids)
+        self.positions = np.asarray(positions)
+        self.podium = np.asarray(podium, dtype=np.int64)
+        self.group_rules = dict(GROUP_POINTS, **(group_rules or {}))
+        self.podium_rules = dict(PODIUM_POINTS, **(podium_rules or {}))
+        self.n_samples = len(self.podium)
+
+        # Pares ordenados (1º, 2º) de cada grupo e seus pontos por simulação
+        self.group_pairs = []
+        self.group_scores = []
+        for ids in self.group_ids:
+            pairs = np.array([(a, b) for a in ids for b in ids if a != b])
+            self.group_pairs.append(pairs)
+            self.group_scores.append(group_pick_points(self.positions, pairs[:, 0], pairs[:, 1],
+                                                       self.group_rules))
+
+    @classmethod
+    def from_outcomes(cls, outcomes, **rules):
+        """A partir de tournament_sampler.Outcomes"""
+        model = outcomes.model
+        n_teams = model.group_ids.size
+        podium = np.stack([outcomes.champion, outcomes.runner_up, outcomes.third], axis=1)
+        return cls(model.registry.names[:n_teams], model.letters, model.group_ids,
+                   outcomes.positions[:, :n_teams], podium, **rules)
+
+    @classmethod
+    def from_store(cls, store, groups=None, **rules):
+        """A partir de um outcome_store.OutcomeStore (carrega posições e pódio)"""
+        from outcome_store import NO_TEAM
+
+        groups = groups or GRUPOS_COPA_2026
+        letters = sorted(groups)
+        group_ids = [[store.index[team] for team in groups[g]] for g in letters]
+        positions = np.concatenate([chunk.T for chunk in store.iter_chunks('position')])
+        podium = np.concatenate([chunk.T for chunk in store.iter_chunks('podium')]).astype(np.int64)
+        podium[podium == NO_TEAM] = -1
+        return cls(store.teams, letters, group_ids, positions, podium, **rules)
+
+    def podium_expected_points(self):
+        """
+        Pontos esperados de todas as trincas ordenadas de times que chegam
+        ao pódio em alguma simulação (contagens conjuntas, sem laço por trinca)
+
+        Returns:
+            (trincas (m, 3), pontos esperados (m,)) em ordem decrescente
+        """
+        n_teams = len(self.teams)
+        rules = self.podium_rules
+        valid = (self.podium >= 0).all(axis=1)
+        podium = self.podium[valid]
+
+        counts = [np.bincount(podium[:, k], minlength=n_teams) for k in range(3)]
+        exact_codes, exact_counts = np.unique(
+            (podium[:, 0] * n_teams + podium[:, 1]) * n_teams + podium[:, 2], return_counts=True)
+        ordered = np.sort(podium, axis=1)
+        set_codes, set_counts = np.unique(
+            (ordered[:, 0] * n_teams + ordered[:, 1]) * n_teams + ordered[:, 2], return_counts=True)
+
+        candidates = np.flatnonzero(counts[0] + counts[1] + counts[2])
+        a, b, c = np.meshgrid(candidates, candidates, candidates, indexing='ij')
+        distinct = (a != b) & (a != c) & (b != c)
+        triples = np.stack([a[distinct], b[distinct], c[distinct]], axis=1)
+
+        def lookup(codes, table, values):
+            k = np.clip(np.searchsorted(table, codes), 0, max(len(table) - 1, 0))
+            return np.where(table[k] == codes, values[k], 0) if len(table) else np.zeros(len(codes))
+
+        exact = lookup((triples[:, 0] * n_teams + triples[:, 1]) * n_teams + triples[:, 2],
+                       exact_codes, exact_counts)
+        sorted_triples = np.sort(triples, axis=1)
+        same_set = lookup((sorted_triples[:, 0] * n_teams + sorted_triples[:, 1]) * n_teams + sorted_triples[:, 2],
+                          set_codes, set_counts)
+
+        total = (rules['champion'] * counts[0][triples[:, 0]] + rules['runner_up'] * counts[1][triples[:, 1]]
+                 + rules['third'] * counts[2][triples[:, 2]] + rules['exact'] * exact
+                 + rules['out_of_order'] * (same_set - exact))
+        expected = total / max(self.n_samples, 1)
+        order = np.argsort(-expected, kind='stable')
+        return triples[order], expected[order]
+
+    def _result(self, group_choice, triple, scores, field=None):
+        groups = {
+            letter: tuple(self.teams[t] for t in self.group_pairs[g][group_choice[g]])
+            for g, letter in enumerate(self.letters)
+        }
+        result = {
+            'groups': groups,
+            'podium': tuple(self.teams[t] for t in triple),
+            'expected_points': float(scores.mean()),
+            'group_points': {letter: float(self.group_scores[g][group_choice[g]].mean())
+                             for g, letter in enumerate(self.letters)},
+        }
+        if field is not None:
+            result['win_probability'] = float(win_share(scores, *field))
+        return result
+
+    def score(self, picks):
+        """
+        Pontos por simulação de um conjunto de palpites
+
+        Args:
+            picks: {'groups': {letra: (1º, 2º)}, 'podium': (campeão, vice, 3º)} em nomes
+
+        Returns:
+            np.ndarray (n,) int32
+        """
+        index = {name: i for i, name in enumerate(self.teams)}
+        total = np.zeros(self.n_samples, dtype=np.int32)
+        for first, second in picks.get('groups', {}).values():
+            total += group_pick_points(self.positions, np.array([index[first]]), np.array([index[second]]),
+                                       self.group_rules)[0]
+        if picks.get('podium'):
+            total += podium_pick_points(self.podium, [[index[t] for t in picks['podium']]], self.podium_rules)[0]
+        return total
+
+    def optimize(self, field_scores=None, base_scores=None, podium_candidates=FIELD_PODIUM_CANDIDATES,
+                 max_sweeps=MAX_SWEEPS):
+        """
+        Melhores palpites de grupo e pódio
+
+        Args:
+            field_scores: (n, adversários) pontos de cada adversário por
+                          simulação; None = maximizar pontos esperados
+            base_scores: (n,) nossos pontos já garantidos por outros palpites
+                         (ex.: placares), somados antes de comparar com o campo
+            podium_candidates: trincas de maior esperança avaliadas contra o campo
+            max_sweeps: rodadas da busca por coordenadas
+
+        Returns:
+            dict com 'groups' {letra: (1º, 2º)}, 'podium' (campeão, vice, 3º),
+            'expected_points', 'group_points' e 'win_probability' (com campo)
+        """
+        triples, podium_expected = self.podium_expected_points()
+        group_choice = [int(np.argmax(scores.mean(axis=1))) for scores in self.group_scores]
+
+        base = np.zeros(self.n_samples, dtype=np.int32) if base_scores is None else np.asarray(base_scores, np.int32)
+        if field_scores is None:
+            triple = triples[0]
+            scores = base + sum(s[c] for s, c in zip(self.group_scores, group_choice)) \
+                + podium_pick_points(self.podium, triple[None], self.podium_rules)[0]
+            return self._result(group_choice, triple, scores)
+
+        field_scores = np.asarray(field_scores)
+        field_best = field_scores.max(axis=1)
+        field = (field_best, (field_scores == field_best[:, None]).sum(axis=1))
+
+        triples = triples[:podium_candidates]
+        podium_scores = podium_pick_points(self.podium, triples, self.podium_rules)
+        podium_choice = 0
+        total = base + sum(s[c] for s, c in zip(self.group_scores, group_choice)) + podium_scores[podium_choice]
+        best = win_share(total, *field)
+
+        # Busca por coordenadas: trocar um componente por vez (grupos e pódio)
+        components = [(s, g) for g, s in enumerate(self.group_scores)] + [(podium_scores, None)]
+        for _ in range(max_sweeps):
+            improved = False
+            for scores, g in components:
+                current = group_choice[g] if g is not None else podium_choice
+                candidates = total[None, :] - scores[current][None, :] + scores
+                shares = win_share(candidates, *field)
+                choice = int(np.argmax(shares))
+                if shares[choice] > best + 1e-12:
+                    best = shares[choice]
+                    total = candidates[choice]
+                    if g is None:
+                        podium_choice = choice
+                    else:
+                        group_choice[g] = choice
+                    improved = True
+            if not improved:
+                break
+
+        return self._result(group_choice, triples[podium_choice], total, field)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Otimizador de palpites do bolão")
+    parser.add_argument('--samples', type=int, default=100000, help='torneios simulados')
+    parser.add_argument('--seed', type=int, default=None, help='semente')
+    parser.add_argument('--path', default=None, help='usar um OutcomeStore em vez de amostrar')
+    args = parser.parse_args(argv)
+
+    print("=" * 80)
+    print("🎯 OTIMIZADOR DE PALPITES DO BOLÃO - COPA 2026")
+    print("=" * 80)
+
+    if args.path:
+        from outcome_store import OutcomeStore
+        optimizer = PickOptimizer.from_store(OutcomeStore.open(args.path))
+    else:
+        from snapshot_builder import build_team_stats
+        from tournament_sampler import TournamentModel, sample_outcomes
+        team_stats, _ = build_team_stats()
+        outcomes = sample_outcomes(TournamentModel.from_stats(team_stats), args.samples, rng=args.seed)
+        optimizer = PickOptimizer.from_outcomes(outcomes)
+
+    start = time.perf_counter()
+    picks = optimizer.optimize()
+    elapsed = time.perf_counter() - start
+
+    print(f"\n✅ Palpites otimizados sobre {optimizer.n_samples:,} torneios em {elapsed:.2f}s")
+    print("\n🏆 Classificação dos grupos:")
+    for letter, (first, second) in picks['groups'].items():
+        print(f"  Grupo {letter}: 1º {first:28s} 2º {second:28s} "
+              f"({picks['group_points'][letter]:.1f} pts esperados)")
+
+    champion, runner_up, third = picks['podium']
+    print(f"\n🥇 {champion}  🥈 {runner_up}  🥉 {third}")
+    print(f"\n📈 Pontos esperados (grupos + pódio): {picks['expected_points']:.1f}")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,505 @@
+"""
+Pipeline Diário com Cache por Etapa - Copa do Mundo 2026
+Declara as etapas do fluxo diário (ingestão -> estatísticas -> previsões ->
+armazém de resultados -> publicação) e as entradas de cada uma; só executa as etapas
+cujas entradas mudaram desde a última execução
+
+LÓGICA:
+1. Cada etapa declara dependências, configuração e se usa o modelo ativo
+2. Impressão digital da etapa = SHA-1 de (nome, configuração, versão do
+   modelo, saídas das dependências); a saída de cada etapa é um hash do
+   conteúdo produzido, não da hora em que rodou
+3. Mesma impressão digital e artefatos presentes: etapa pulada e a saída
+   gravada no estado alimenta as etapas seguintes
+4. A ingestão sempre roda (sincronização incremental do cache de jogos);
+   sem jogos novos a marca d'água não muda e todo o resto é pulado
+5. Previsões refeitas só para os confrontos dos times cujas estatísticas
+   mudaram; jogo sem times da Copa não muda as estatísticas, e previsões,
+   simulações e snapshot nem rodam
+6. Armazém de resultados amostrado com as probabilidades da tabela de
+   previsões (modelo ativo); a publicação lê posição, fase, pódio e finais
+   do armazém em bitsets (outcome_bitsets)
+7. Etapas independentes (backtest, previsões) rodam em paralelo em um pool
+   de threads; falha de uma etapa só bloqueia as que dependem dela
+
+Estado e artefatos em data/processed/pipeline/ (state.json, team_stats.json,
+predictions.npz, backtest.json); armazém em data/processed/outcomes/.
+
+Uso:
+    python pipeline.py                      # executa só o que mudou
+    python pipeline.py --offline            # sem sincronizar com o Neon
+    python pipeline.py --only publish       # etapa e suas dependências
+    python pipeline.py --force outcomes     # refaz a etapa mesmo sem mudanças
+"""
+
+import argparse
+import contextvars
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from instrumentation import span, incr
+
+DEFAULT_PIPELINE_DIR = Path(__file__).parent / "data" / "processed" / "pipeline"
+STATE_FILE = "state.json"
+
+# Threads para as etapas independentes
+WORKERS = 4
+
+# Artefato de cada modelo (muda a versão do modelo quando é retreinado)
+MODEL_FILES = {
+    'voting_soft': Path(__file__).parent / "model_voting_soft.pkl",
+    'ml': Path("/home/ubuntu/analise-copa-2026/rf_score_model.pkl"),
+}
+
+# Configuração padrão de cada etapa (entra na impressão digital)
+DEFAULT_CONFIG = {
+    'ingest': {'offline': False},
+    'backtest': {'start': '2016-01-01', 'step_months': 3, 'test_months': 3, 'train_years': 4,
+                 'strategy': 'rounded'},
+    'outcomes': {'samples': 200_000, 'seed': 2026},
+}
+
+
+def _digest(value):
+    """Hash curto e estável de um valor serializável em JSON"""
+    payload = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def _write_json(path, value):
+    """Grava JSON em arquivo temporário e renomeia (leitores nunca veem arquivo parcial)"""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(value, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def copa_teams():
+    """Times da Copa na ordem dos grupos (mesma ordem do snapshot)"""
+    from copa_2026_structure import GRUPOS_COPA_2026
+    return [team for grupo in sorted(GRUPOS_COPA_2026) for team in GRUPOS_COPA_2026[grupo]]
+
+
+def model_version():
+    """
+    Versão do modelo ativo: tipo + tamanho e data do artefato treinado
+
+    Returns:
+        dict serializável em JSON
+    """
+    from tournament_simulator import MODEL_TYPE
+
+    path = MODEL_FILES.get(MODEL_TYPE)
+    artifact = None
+    if path is not None and path.exists():
+        stat = path.stat()
+        artifact = [stat.st_size, stat.st_mtime_ns]
+    return {'model_type': MODEL_TYPE, 'artifact': artifact}
+
+
+# Etapas: função(workdir, **config) -> hash do conteúdo produzido
+# (None = saída determinada pelas entradas; usa a impressão digital)
+
+def ingest_stage(workdir, offline=False):
+    """Sincroniza o cache local de jogos com o Neon (só linhas novas/alteradas)"""
+    from match_cache import DEFAULT_CACHE_DIR, refresh_cache
+
+    if not offline:
+        try:
+            changes = refresh_cache()
+            incr("pipeline.matches_changed", changes['matches_changed'])
+        except (RuntimeError, OSError) as e:
+            print(f"⚠️  Não foi possível sincronizar com o Neon ({e}); usando cache local")
+
+    meta_path = DEFAULT_CACHE_DIR / "meta.json"
+    meta = _read_json(meta_path) if meta_path.exists() else {}
+    return _digest({key: meta.get(key) for key in
+                    ('matches_watermark', 'matches_last_id', 'teams_watermark', 'n_rows')})
+
+
+def stats_stage(workdir):
+    """Estatísticas dos 48 times a partir do cache de jogos"""
+    from match_cache import load_matches
+    from snapshot_builder import build_team_stats
+
+    team_stats, stats_loaded = build_team_stats(load_matches(missing_ok=True))
+    _write_json(workdir / "team_stats.json", {'team_stats': team_stats, 'stats_loaded': stats_loaded})
+    return _digest([team_stats, stats_loaded])
+
+
+def load_team_stats(workdir=None):
+    """
+    Estatísticas gravadas pela etapa stats
+
+    Returns:
+        (team_stats, número de times com dados reais)
+    """
+    data = _read_json(Path(workdir or DEFAULT_PIPELINE_DIR) / "team_stats.json")
+    return data['team_stats'], data['stats_loaded']
+
+
+def backtest_stage(workdir, start, step_months, test_months, train_years, strategy):
+    """Backtest walk-forward do modelo de placares sobre o cache de jogos"""
+    from walk_forward import load_dataset, make_folds, run_walk_forward, summarize
+
+    dataset = load_dataset()
+    folds = make_folds(dataset['date'], start, None, step_months, test_months, train_years or None)
+    folds_df, _ = run_walk_forward(dataset, folds, strategy)
+    summary = summarize(folds_df)
+    _write_json(workdir / "backtest.json", {'strategy': strategy, 'summary': summary})
+    return _digest(summary)
+
+
+def predict_stage(workdir):
+    """
+    Tabela de previsões de todos os confrontos entre os times da Copa
+
+    Reaproveita a tabela anterior (mesmo modelo) e só refaz as linhas e
+    colunas dos times cujas estatísticas mudaram.
+    """
+    from prediction_service import PAIR_FIELDS, pair_row
+
+    team_stats, _ = load_team_stats(workdir)
+    teams = copa_teams()
+    team_hashes = np.array([_digest(team_stats[team]) for team in teams])
+    version = _digest(model_version())
+    path = workdir / "predictions.npz"
+
+    n = len(teams)
+    table = np.full((n, n, len(PAIR_FIELDS)), np.nan)
+    changed = np.ones(n, dtype=bool)
+    if path.exists():
+        with np.load(path) as previous:
+            if str(previous['model']) == version and previous['teams'].tolist() == teams:
+                table = previous['table'].copy()
+                changed = previous['team_hashes'] != team_hashes
+
+    for i, j in zip(*np.nonzero(changed[:, None] | changed[None, :])):
+        if i != j:
+            table[i, j] = pair_row(team_stats[teams[i]], team_stats[teams[j]])
+    incr("pipeline.predict.teams_changed", int(changed.sum()))
+
+    tmp_path = path.with_name(path.name + ".tmp.npz")
+    np.savez(tmp_path, table=table, teams=np.array(teams), team_hashes=team_hashes, model=np.array(version))
+    os.replace(tmp_path, path)
+    return hashlib.sha1(table.tobytes()).hexdigest()[:16]
+
+
+def load_predictions(workdir=None):
+    """
+    Placares previstos gravados pela etapa predict
+
+    Returns:
+        dict {(mandante, visitante): (gols, gols)}
+    """
+    with np.load(Path(workdir or DEFAULT_PIPELINE_DIR) / "predictions.npz") as data:
+        teams, table = data['teams'].tolist(), data['table']
+    return {
+        (home, away): (int(table[i, j, 0]), int(table[i, j, 1]))
+        for i, home in enumerate(teams) for j, away in enumerate(teams) if i != j
+    }
+
+
+def load_pair_table(workdir=None, teams=None):
+    """
+    Tabela de confrontos gravada pela etapa predict
+
+    Args:
+        teams: ordem desejada dos times (padrão: a gravada)
+
+    Returns:
+        np.ndarray (times, times, PAIR_FIELDS)
+    """
+    with np.load(Path(workdir or DEFAULT_PIPELINE_DIR) / "predictions.npz") as data:
+        saved, table = data['teams'].tolist(), data['table']
+    if teams is None:
+        return table
+    order = [saved.index(team) for team in teams]
+    return table[np.ix_(order, order)]
+
+
+def outcomes_stage(workdir, samples, seed):
+    """Armazém de resultados por simulação (bolões, consultas condicionais, snapshot)"""
+    from outcome_store import OutcomeStore, record_samples
+    from prediction_service import pair_table_model
+    from tournament_sampler import TournamentModel
+
+    team_stats, _ = load_team_stats(workdir)
+    model = TournamentModel.from_stats(team_stats)
+    teams = model.registry.names[:model.group_ids.size]
+    # Mesmas probabilidades do modelo ativo usadas nas previsões
+    model = pair_table_model(model, load_pair_table(workdir, teams))
+    store = OutcomeStore.create(teams=teams)
+    record_samples(store, model, samples, rng=seed)
+    return None
+
+
+def publish_stage(workdir):
+    """Snapshot das páginas do Streamlit a partir dos artefatos das etapas anteriores"""
+    from outcome_bitsets import OutcomeBitsets
+    from outcome_store import OutcomeStore
+    from snapshot_builder import build_snapshot, write_snapshot
+
+    team_stats, stats_loaded = load_team_stats(workdir)
+    outcomes = OutcomeBitsets.from_store(OutcomeStore.open())
+    arrays, meta = build_snapshot(team_stats, predictions=load_predictions(workdir), outcomes=outcomes)
+    meta['stats_loaded'] = stats_loaded
+    return write_snapshot(arrays, meta)
+
+
+class Stage:
+    """Etapa do pipeline: função, dependências e entradas da impressão digital"""
+
+    def __init__(self, name, fn, deps=(), uses_model=False, always_run=False, artifacts=()):
+        """
+        Args:
+            name: nome da etapa (chave da configuração e do estado)
+            fn: função(workdir, **config) -> hash da saída (ou None)
+            deps: etapas cujas saídas são entradas desta
+            uses_model: versão do modelo ativo entra na impressão digital
+            always_run: executa sempre (ex.: sincronização com a fonte)
+            artifacts: arquivos que precisam existir para pular a etapa
+                       (relativos ao diretório do pipeline)
+        """
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+        self.uses_model = uses_model
+        self.always_run = always_run
+        self.artifacts = tuple(artifacts)
+
+
+def default_stages():
+    """Etapas do fluxo diário na ordem de declaração"""
+    from outcome_store import DEFAULT_STORE_DIR, META_FILE
+    from snapshot_builder import DEFAULT_SNAPSHOT_DIR, LATEST_FILE
+
+    return [
+        Stage('ingest', ingest_stage, always_run=True),
+        Stage('stats', stats_stage, deps=('ingest',), artifacts=("team_stats.json",)),
+        Stage('backtest', backtest_stage, deps=('ingest',), artifacts=("backtest.json",)),
+        Stage('predict', predict_stage, deps=('stats',), uses_model=True, artifacts=("predictions.npz",)),
+        Stage('outcomes', outcomes_stage, deps=('stats', 'predict'), uses_model=True,
+              artifacts=(DEFAULT_STORE_DIR / META_FILE,)),
+        Stage('publish', publish_stage, deps=('stats', 'predict', 'outcomes'),
+              artifacts=(DEFAULT_SNAPSHOT_DIR / LATEST_FILE,)),
+    ]
+
+
+class Pipeline:
+    """Executa as etapas com cache por impressão digital e paralelismo entre etapas independentes"""
+
+    def __init__(self, stages=None, workdir=None, config=None, workers=WORKERS):
+        """
+        Args:
+            stages: lista de Stage (padrão: default_stages())
+            workdir: diretório do estado e dos artefatos
+            config: {etapa: {parâmetro: valor}} sobre DEFAULT_CONFIG
+            workers: threads para etapas independentes
+        """
+        self.stages = {stage.name: stage for stage in (stages or default_stages())}
+        for stage in self.stages.values():
+            missing = [dep for dep in stage.deps if dep not in self.stages]
+            if missing:
+                raise ValueError(f"Etapa {stage.name} depende de etapas inexistentes: {missing}")
+
+        self.workdir = Path(workdir or DEFAULT_PIPELINE_DIR)
+        self.workdir.mkdir(parents=True, exist_ok=True)
+        self.config = {name: dict(DEFAULT_CONFIG.get(name, {})) for name in self.stages}
+        for name, values in (config or {}).items():
+            self.config[name].update(values)
+        self.workers = workers
+        self.state = self._load_state()
+        self._lock = threading.Lock()
+
+    def _load_state(self):
+        try:
+            return _read_json(self.workdir / STATE_FILE)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self):
+        _write_json(self.workdir / STATE_FILE, self.state)
+
+    def plan(self, only=None):
+        """
+        Etapas a considerar em ordem topológica
+
+        Args:
+            only: nomes das etapas desejadas (inclui as dependências)
+        """
+        wanted = set(self.stages)
+        if only:
+            unknown = set(only) - wanted
+            if unknown:
+                raise ValueError(f"Etapas desconhecidas: {sorted(unknown)}")
+            wanted, stack = set(), list(only)
+            while stack:
+                name = stack.pop()
+                if name not in wanted:
+                    wanted.add(name)
+                    stack.extend(self.stages[name].deps)
+
+        order, visiting = [], set()
+
+        def visit(name):
+            if name in order:
+                return
+            if name in visiting:
+                raise ValueError(f"Ciclo de dependências na etapa {name}")
+            visiting.add(name)
+            for dep in self.stages[name].deps:
+                visit(dep)
+            order.append(name)
+
+        for name in self.stages:
+            if name in wanted:
+                visit(name)
+        return order
+
+    def fingerprint(self, stage, inputs, model):
+        """Impressão digital das entradas de uma etapa"""
+        return _digest({
+            'stage': stage.name,
+            'config': self.config[stage.name],
+            'model': model if stage.uses_model else None,
+            'inputs': inputs,
+        })
+
+    def _artifacts_exist(self, stage):
+        return all((self.workdir / path).exists() for path in stage.artifacts)
+
+    def _run_stage(self, stage, inputs, model, force):
+        """Executa ou pula uma etapa; exceções viram status 'failed'"""
+        fingerprint = self.fingerprint(stage, inputs, model)
+        previous = self.state.get(stage.name)
+        if (not stage.always_run and stage.name not in force and previous
+                and previous['fingerprint'] == fingerprint and self._artifacts_exist(stage)):
+            incr("pipeline.skipped")
+            return {'status': 'skipped', 'output': previous['output'], 'seconds': 0.0}
+
+        start = time.perf_counter()
+        try:
+            with span(f"pipeline.{stage.name}"):
+                output = stage.fn(self.workdir, **self.config[stage.name])
+        except Exception as e:
+            incr("pipeline.failed")
+            return {'status': 'failed', 'error': f"{type(e).__name__}: {e}",
+                    'seconds': time.perf_counter() - start}
+        seconds = time.perf_counter() - start
+        incr("pipeline.ran")
+
+        output = output or fingerprint
+        with self._lock:
+            self.state[stage.name] = {
+                'fingerprint': fingerprint,
+                'output': output,
+                'seconds': round(seconds, 3),
+                'finished_at': datetime.now().isoformat(timespec='seconds'),
+            }
+            self._save_state()
+        return {'status': 'ran', 'output': output, 'seconds': seconds}
+
+    def run(self, only=None, force=()):
+        """
+        Executa as etapas necessárias (dependências primeiro, independentes em paralelo)
+
+        Args:
+            only: nomes das etapas desejadas (inclui as dependências)
+            force: nomes das etapas a refazer mesmo sem mudanças ('all' = todas)
+
+        Returns:
+            dict {etapa: {'status': 'ran'|'skipped'|'failed'|'blocked', 'seconds', 'output'|'error'}}
+            na ordem de execução planejada
+        """
+        order = self.plan(only)
+        force = set(self.stages) if 'all' in force else set(force)
+        model = model_version() if any(self.stages[name].uses_model for name in order) else None
+
+        results, outputs = {}, {}
+        pending = list(order)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            running = {}
+            while pending or running:
+                for name in list(pending):
+                    deps = self.stages[name].deps
+                    if any(results.get(dep, {}).get('status') in ('failed', 'blocked') for dep in deps):
+                        results[name] = {'status': 'blocked', 'seconds': 0.0,
+                                         'error': "dependência falhou"}
+                        pending.remove(name)
+                    elif all(dep in outputs for dep in deps):
+                        inputs = {dep: outputs[dep] for dep in deps}
+                        # Cada thread herda o contexto (spans no registro da execução)
+                        future = pool.submit(contextvars.copy_context().run, self._run_stage,
+                                             self.stages[name], inputs, model, force)
+                        running[future] = name
+                        pending.remove(name)
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    results[name] = future.result()
+                    if results[name]['status'] in ('ran', 'skipped'):
+                        outputs[name] = results[name]['output']
+
+        return {name: results[name] for name in order}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pipeline diário com cache por etapa")
+    parser.add_argument('--only', nargs='+', default=None, help='etapas desejadas (com dependências)')
+    parser.add_argument('--force', nargs='+', default=(), help="etapas a refazer ('all' = todas)")
+    parser.add_argument('--offline', action='store_true', help='não sincronizar com o Neon')
+    parser.add_argument('--samples', type=int, default=DEFAULT_CONFIG['outcomes']['samples'],
+                        help='torneios do armazém de resultados (probabilidades do snapshot)')
+    parser.add_argument('--workers', type=int, default=WORKERS, help='threads para etapas independentes')
+    args = parser.parse_args(argv)
+
+    print("=" * 80)
+    print("🔄 PIPELINE DIÁRIO - COPA 2026")
+    print("=" * 80)
+
+    pipeline = Pipeline(config={
+        'ingest': {'offline': args.offline},
+        'outcomes': {'samples': args.samples},
+    }, workers=args.workers)
+
+    start = time.perf_counter()
+    results = pipeline.run(only=args.only, force=args.force)
+    elapsed = time.perf_counter() - start
+
+    icons = {'ran': '✅', 'skipped': '⏭️ ', 'failed': '❌', 'blocked': '⛔'}
+    print()
+    for name, result in results.items():
+        line = f"  {icons[result['status']]} {name:<10} {result['status']:<8} {result['seconds']:6.2f}s"
+        if 'error' in result:
+            line += f"  {result['error']}"
+        print(line)
+
+    ran = sum(result['status'] == 'ran' for result in results.values())
+    skipped = sum(result['status'] == 'skipped' for result in results.values())
+    print(f"\n⏱️  {ran} etapas executadas e {skipped} puladas em {elapsed:.1f}s")
+    print(f"💾 Estado em: {pipeline.workdir / STATE_FILE}")
+    print("=" * 80)
+    return all(result['status'] in ('ran', 'skipped') for result in results.values())
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
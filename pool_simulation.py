@@ -0,0 +1,331 @@
+"""
+Simulação do Campo do Bolão - Copa do Mundo 2026
+Maximizar pontos esperados não é o mesmo que maximizar a chance de vencer
+um bolão com N participantes: aqui os palpites dos adversários são
+simulados, todos são pontuados contra cada torneio amostrado e os nossos
+palpites são escolhidos para maximizar P(vencer)
+
+LÓGICA:
+1. Consenso = previsão do modelo ativo do simulador (Voting Soft quando
+   disponível, ver tournament_simulator.predict_match): placar previsto
+   de cada jogo, classificação dos grupos e pódio do chaveamento previsto
+2. Modelo de popularidade por palpite: com probabilidade FIELD_HERDING o
+   participante copia o consenso; senão sorteia pela distribuição simulada
+   (placar pela distribuição do jogo, par 1º/2º pela frequência conjunta,
+   pódio pelas probabilidades de campeão, vice e 3º)
+3. Pontuação vetorizada: placares pela tabela (palpite, placar real) de
+   model_optimized.bolao_points com as regras de
+   analyze_scores.calculate_points (MATCH_RULES: sem os 5 pontos de
+   "apenas gols de um time"); grupos e pódio com as regras
+   de pick_optimizer. Pontos do campo em lotes de torneios: (torneios,
+   participantes) int16
+4. Nossos palpites: placar de maior esperança em cada jogo e busca por
+   coordenadas (grupos, pódio e placares) maximizando P(vencer), com
+   empates divididos
+
+Uso:
+    pool = PoolSimulation(model, outcomes, n_entrants=1000, rng=42)
+    picks = pool.optimize()
+    picks['win_probability'], picks['expected_points']
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from model_optimized import BOLAO_POINTS, bolao_points
+from pick_optimizer import PickOptimizer, podium_pick_points, win_share
+
+# Probabilidade de um participante copiar o palpite de consenso
+FIELD_HERDING = {
+    'match': 0.5,
+    'group': 0.6,
+    'podium': 0.4,
+}
+
+# Participantes do bolão (sem contar a gente)
+DEFAULT_ENTRANTS = 1000
+
+# Torneios pontuados por lote (memória do lote: lote x participantes int16)
+SCORE_BATCH = 8192
+
+# Placares candidatos por jogo na busca contra o campo
+MATCH_CANDIDATES = 6
+
+# Rodadas alternando placares e grupos/pódio
+MAX_ROUNDS = 2
+
+# Regras dos placares: as de analyze_scores.calculate_points, que NÃO dão
+# os 5 pontos de "apenas gols de um time" previstos em PALPITES_NECESSARIOS.md
+# (só 20 / 15 / 10 / 0); para a tabela completa do bolão use BOLAO_POINTS
+MATCH_RULES = dict(BOLAO_POINTS, goals=0)
+
+
+def match_points_table(max_goals, rules=MATCH_RULES):
+    """
+    Tabela (palpite, placar real) de pontos sobre os placares achatados
+    (model_optimized.bolao_points, sem cópia das regras)
+
+    Returns:
+        np.ndarray (células, células) int16
+    """
+    goals = np.arange(max_goals + 1)
+    home, away = (g.ravel() for g in np.meshgrid(goals, goals, indexing='ij'))
+    return bolao_points(home[:, None], away[:, None], home[None, :], away[None, :], rules=rules).astype(np.int16)
+
+
+def _sample_rows(rng, probs, size):
+    """Índices sorteados por linha de uma matriz de probabilidades (linhas, opções) -> (size, linhas)"""
+    cdf = np.cumsum(probs, axis=1)
+    cdf /= cdf[:, -1:]
+    uniforms = rng.random((size, len(probs)))
+    return np.minimum((uniforms[:, :, None] > cdf[None, :, :]).sum(axis=2), probs.shape[1] - 1)
+
+
+class PoolSimulation:
+    """Campo de participantes simulado e busca dos palpites que maximizam P(vencer)"""
+
+    def __init__(self, model, outcomes, n_entrants=DEFAULT_ENTRANTS, rng=None, herding=None):
+        """
+        Args:
+            model: TournamentModel (registro com a função de previsão do consenso)
+            outcomes: tournament_sampler.Outcomes com os torneios simulados
+            n_entrants: adversários no bolão
+            rng: semente ou np.random.Generator dos palpites do campo
+            herding: probabilidades de copiar o consenso (padrão: FIELD_HERDING)
+        """
+        self.model = model
+        self.outcomes = outcomes
+        self.n_entrants = n_entrants
+        self.herding = dict(FIELD_HERDING, **(herding or {}))
+        self.rng = np.random.default_rng(rng)
+
+        self.optimizer = PickOptimizer.from_outcomes(outcomes)
+        self.table = match_points_table(model.max_goals)
+        self.cells = np.asarray(outcomes.cells, dtype=np.intp)
+        self.consensus = self.consensus_picks()
+        self.field = self.simulate_field()
+        self._field_scores = None
+
+    def consensus_picks(self):
+        """
+        Palpites de consenso do modelo ativo
+
+        Returns:
+            dict com 'match_cells' (jogos,), 'group_pairs' (grupos,) índice em
+            optimizer.group_pairs e 'podium' (3,) IDs
+        """
+        from tournament_simulator import _bracket_ids, _bracket_plan, _simulate_group_ids, _simulate_knockout_ids
+
+        model, registry = self.model, self.model.registry
+        home, away = model.fixture_teams[:, 0], model.fixture_teams[:, 1]
+        home_goals, away_goals = registry.predict_pairs(home, away)
+        match_cells = model.cell(np.clip(home_goals, 0, model.max_goals), np.clip(away_goals, 0, model.max_goals))
+
+        order, table = _simulate_group_ids(registry, model.group_ids, model.fixtures)
+        group_pairs = np.array([
+            int(np.flatnonzero((pairs[:, 0] == order[g, 0]) & (pairs[:, 1] == order[g, 1]))[0])
+            for g, pairs in enumerate(self.optimizer.group_pairs)
+        ])
+
+        bracket = _bracket_ids(order, table[:, 2, :3], _bracket_plan(model.letters))
+        knockout = _simulate_knockout_ids(registry, bracket, registry.stats['strength'].tolist())
+        podium = np.array([knockout['champion'], knockout['runner_up'], knockout['third_place']])
+        return {'match_cells': np.asarray(match_cells, dtype=np.intp), 'group_pairs': group_pairs, 'podium': podium}
+
+    def simulate_field(self):
+        """
+        Palpites dos adversários pelo modelo de popularidade
+
+        Returns:
+            dict com 'match_cells' (m, jogos), 'group_pairs' (m, grupos) e
+            'podium' (m, 3)
+        """
+        rng, m = self.rng, self.n_entrants
+        herd = self.herding
+
+        # Placares: consenso ou sorteio pela distribuição do jogo
+        sampled = _sample_rows(rng, self.model.score_probs, m)
+        copy = rng.random((m, len(sampled[0]))) < herd['match']
+        match_cells = np.where(copy, self.consensus['match_cells'][None, :], sampled)
+
+        # Grupos: consenso ou par (1º, 2º) pela frequência conjunta simulada
+        positions = self.optimizer.positions
+        pair_freq = np.stack([((positions[:, pairs[:, 0]] == 0) & (positions[:, pairs[:, 1]] == 1)).mean(axis=0)
+                              for pairs in self.optimizer.group_pairs])
+        sampled = _sample_rows(rng, pair_freq + 1e-12, m)
+        copy = rng.random((m, len(pair_freq))) < herd['group']
+        group_pairs = np.where(copy, self.consensus['group_pairs'][None, :], sampled)
+
+        # Pódio: consenso ou campeão, vice e 3º sorteados sem repetição
+        n_teams = len(self.optimizer.teams)
+        podium = np.empty((m, 3), dtype=np.int64)
+        available = np.ones((m, n_teams), dtype=bool)
+        for k in range(3):
+            column = self.optimizer.podium[:, k]
+            probs = np.bincount(column[column >= 0], minlength=n_teams) + 1e-9
+            weights = probs[None, :] * available
+            cdf = np.cumsum(weights, axis=1)
+            uniforms = rng.random(m)[:, None] * cdf[:, -1:]
+            podium[:, k] = np.minimum((uniforms > cdf).sum(axis=1), n_teams - 1)
+            available[np.arange(m), podium[:, k]] = False
+        copy = rng.random(m) < herd['podium']
+        podium[copy] = self.consensus['podium']
+
+        return {'match_cells': match_cells, 'group_pairs': group_pairs, 'podium': podium}
+
+    def field_scores(self, batch_size=SCORE_BATCH):
+        """
+        Pontos de cada adversário em cada torneio simulado
+
+        Returns:
+            np.ndarray (torneios, m) int16
+        """
+        if self._field_scores is not None:
+            return self._field_scores
+
+        field, optimizer = self.field, self.optimizer
+        n = optimizer.n_samples
+        scores = np.empty((n, self.n_entrants), dtype=np.int16)
+
+        # Pódio: pontos só das trincas distintas, depois indexados por participante
+        triples, triple_index = np.unique(field['podium'], axis=0, return_inverse=True)
+        triple_index = triple_index.ravel()
+
+        for start in range(0, n, batch_size):
+            stop = min(start + batch_size, n)
+            total = np.zeros((self.n_entrants, stop - start), dtype=np.int16)
+
+            # Placares: linha da tabela de cada palpite x placar real do torneio
+            for k in range(self.cells.shape[1]):
+                points = self.table[:, self.cells[start:stop, k]]       # (células, lote)
+                total += points[field['match_cells'][:, k]]
+
+            for g, pair_scores in enumerate(optimizer.group_scores):
+                total += pair_scores[:, start:stop][field['group_pairs'][:, g]]
+
+            podium_scores = podium_pick_points(optimizer.podium[start:stop], triples, optimizer.podium_rules)
+            total += podium_scores[triple_index]
+            scores[start:stop] = total.T
+
+        self._field_scores = scores
+        return scores
+
+    def match_expected_points(self):
+        """(jogos, células) pontos esperados de cada palpite de placar"""
+        return self.model.score_probs @ self.table.T
+
+    def _match_totals(self, match_cells):
+        """Nossos pontos de placar por torneio"""
+        total = np.zeros(self.optimizer.n_samples, dtype=np.int32)
+        for k, cell in enumerate(match_cells):
+            total += self.table[cell, self.cells[:, k]]
+        return total
+
+    def optimize(self, max_rounds=MAX_ROUNDS, match_candidates=MATCH_CANDIDATES):
+        """
+        Palpites (placares, grupos e pódio) que maximizam P(vencer o bolão)
+
+        Returns:
+            dict de PickOptimizer.optimize() + 'match_picks' {(mandante,
+            visitante): (gols, gols)}, 'match_points', 'win_probability' e
+            'baseline' (P(vencer) e pontos dos palpites de maior esperança)
+        """
+        field_scores = self.field_scores()
+        field_best = field_scores.max(axis=1)
+        field = (field_best, (field_scores == field_best[:, None]).sum(axis=1))
+
+        expected = self.match_expected_points()
+        candidates = np.argsort(-expected, axis=1, kind='stable')[:, :match_candidates]
+        match_cells = candidates[:, 0].copy()
+        match_total = self._match_totals(match_cells)
+
+        baseline = self.optimizer.optimize()
+        baseline_scores = match_total + self.optimizer.score(baseline)
+        baseline = {
+            'win_probability': float(win_share(baseline_scores, *field)),
+            'expected_points': float(baseline_scores.mean()),
+        }
+
+        for _ in range(max_rounds):
+            picks = self.optimizer.optimize(field_scores=field_scores, base_scores=match_total)
+            others = self.optimizer.score(picks)
+            best = picks['win_probability']
+
+            # Placares: trocar um jogo por vez entre os mais prováveis de pontuar
+            improved = False
+            for k in range(len(match_cells)):
+                current = self.table[match_cells[k], self.cells[:, k]]
+                options = self.table[candidates[k]][:, self.cells[:, k]]
+                shares = win_share(match_total - current + options + others, *field)
+                choice = int(np.argmax(shares))
+                if shares[choice] > best + 1e-12:
+                    best = shares[choice]
+                    match_total += options[choice] - current
+                    match_cells[k] = candidates[k, choice]
+                    improved = True
+            if not improved:
+                break
+
+        picks = self.optimizer.optimize(field_scores=field_scores, base_scores=match_total)
+        total = match_total + self.optimizer.score(picks)
+
+        names = self.model.registry.names
+        size = self.model.max_goals + 1
+        picks['match_picks'] = {
+            (names[h], names[a]): divmod(int(cell), size)
+            for (h, a), cell in zip(self.model.fixture_teams.tolist(), match_cells)
+        }
+        picks['match_points'] = float(match_total.mean())
+        picks['expected_points'] = float(total.mean())
+        picks['win_probability'] = float(win_share(total, *field))
+        picks['baseline'] = baseline
+        return picks
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulação do campo do bolão")
+    parser.add_argument('--samples', type=int, default=100000, help='torneios simulados')
+    parser.add_argument('--entrants', type=int, default=DEFAULT_ENTRANTS, help='adversários no bolão')
+    parser.add_argument('--seed', type=int, default=None, help='semente')
+    args = parser.parse_args(argv)
+
+    from snapshot_builder import build_team_stats
+    from tournament_sampler import TournamentModel, sample_outcomes
+
+    print("=" * 80)
+    print("🎲 SIMULAÇÃO DO CAMPO DO BOLÃO - COPA 2026")
+    print("=" * 80)
+
+    team_stats, _ = build_team_stats()
+    model = TournamentModel.from_stats(team_stats)
+    rng = np.random.default_rng(args.seed)
+
+    start = time.perf_counter()
+    outcomes = sample_outcomes(model, args.samples, rng=rng)
+    pool = PoolSimulation(model, outcomes, n_entrants=args.entrants, rng=rng)
+    pool.field_scores()
+    elapsed = time.perf_counter() - start
+    print(f"\n✅ {args.entrants:,} participantes x {args.samples:,} torneios pontuados em {elapsed:.1f}s")
+
+    start = time.perf_counter()
+    picks = pool.optimize()
+    elapsed = time.perf_counter() - start
+    print(f"⏱️  Busca dos palpites em {elapsed:.1f}s")
+
+    baseline = picks['baseline']
+    print(f"\n📈 Palpites de maior esperança: P(vencer) {baseline['win_probability']:.2%} | "
+          f"{baseline['expected_points']:.1f} pts")
+    print(f"🏆 Palpites otimizados:         P(vencer) {picks['win_probability']:.2%} | "
+          f"{picks['expected_points']:.1f} pts")
+
+    champion, runner_up, third = picks['podium']
+    print(f"\n🥇 {champion}  🥈 {runner_up}  🥉 {third}")
+    for letter, (first, second) in picks['groups'].items():
+        print(f"  Grupo {letter}: 1º {first:28s} 2º {second}")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
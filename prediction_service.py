@@ -0,0 +1,382 @@
+"""
+Serviço Local de Previsões (HTTP) - Copa do Mundo 2026
+Processo único e "quente" que carrega modelo, estatísticas e a tabela de
+previsões 48 x 48 uma vez, e atende dashboards e scripts via HTTP/JSON
+
+LÓGICA:
+1. Na subida: estatísticas dos times (snapshot_builder.build_team_stats),
+   TournamentModel e a tabela de todos os confrontos (mandante, visitante)
+   com gols e probabilidades do modelo ativo (tournament_simulator.predict_match)
+2. Amostrador de /groups e /odds alinhado à tabela: placares de cada jogo
+   de grupo reponderados para as P(vitória/empate/derrota) do modelo ativo
+   (formato dos placares continua o da Poisson) e P(eliminar) do
+   mata-mata tirada da tabela (ver pair_table_model); classificação
+   prevista dos grupos calculada uma vez na subida com os placares da tabela
+3. Handlers assíncronos (asyncio, só biblioteca padrão); cálculos pesados
+   rodam em um pool de threads sem travar o loop
+4. Coalescência: pedidos idênticos simultâneos aguardam o mesmo cálculo
+5. Cache LRU das respostas por (endpoint, parâmetros já interpretados:
+   /odds e /groups por (samples, seed))
+
+Endpoints (GET, respostas JSON):
+    /health
+    /predict?home=Brazil&away=Morocco
+    /groups                       classificação prevista + P(posição)
+    /odds?samples=20000&seed=1    P(campeão), P(pódio), P(fase)
+
+Uso:
+    python prediction_service.py --port 8765
+    curl "http://127.0.0.1:8765/predict?home=Brazil&away=Morocco"
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Respostas mantidas no cache LRU
+RESPONSE_CACHE_SIZE = 256
+
+# Torneios amostrados por padrão em /groups e /odds (e máximo aceito)
+DEFAULT_SAMPLES = 20000
+MAX_SAMPLES = 500000
+
+# Threads para os cálculos pesados
+WORKERS = 2
+
+# Campos da tabela de confrontos
+PAIR_FIELDS = ('home_goals', 'away_goals', 'prob_home_win', 'prob_draw', 'prob_away_win')
+
+
+def pair_row(home_stats, away_stats):
+    """
+    Previsão de um confronto no formato da tabela (PAIR_FIELDS)
+
+    Returns:
+        lista [gols mandante, gols visitante, P(mandante), P(empate), P(visitante)]
+        com probabilidades em frações
+    """
+    from tournament_simulator import predict_match
+
+    prediction = predict_match(home_stats, away_stats)
+    probs = np.array([prediction['prob_home_win'], prediction['prob_draw'], prediction['prob_away_win']],
+                     dtype=float)
+    # Modelos ML retornam percentuais
+    probs = probs / probs.sum() if probs.sum() > 0 else np.full(3, 1 / 3)
+    return [prediction['home_goals'], prediction['away_goals'], *probs]
+
+
+def pair_table_model(model, pair_table, shootout=None):
+    """
+    TournamentModel com as probabilidades da tabela de confrontos
+
+    Args:
+        model: TournamentModel.from_stats (placares Poisson)
+        pair_table: (times, times, PAIR_FIELDS) do modelo ativo
+        shootout: P(time 1 vencer nos pênaltis) (padrão: tournament_sampler.SHOOTOUT)
+
+    Returns:
+        TournamentModel com placares de grupo reponderados por resultado e
+        P(i elimina j) = P(vitória) + P(empate) * shootout entre os times da tabela
+    """
+    from tournament_sampler import SHOOTOUT, TournamentModel
+
+    shootout = SHOOTOUT if shootout is None else shootout
+    probs = pair_table[..., 2:5]
+
+    # Região de cada placar: 0 = vitória do mandante, 1 = empate, 2 = visitante
+    goals = np.arange(model.max_goals + 1)
+    region = (1 - np.sign(goals[:, None] - goals[None, :])).ravel()
+    home, away = model.fixture_teams[:, 0], model.fixture_teams[:, 1]
+    poisson = np.stack([model.score_probs[:, region == r].sum(axis=1) for r in range(3)], axis=1)
+    weights = np.divide(probs[home, away], poisson, out=np.zeros_like(poisson), where=poisson > 0)
+    score_probs = model.score_probs * weights[:, region]
+    score_probs /= score_probs.sum(axis=1, keepdims=True)
+
+    # Decisão do par é única: W[j, i] = 1 - W[i, j] (mandante = menor ID)
+    n = len(pair_table)
+    upper = np.triu(np.nan_to_num(probs[..., 0] + probs[..., 1] * shootout), 1)
+    win_matrix = model.win_matrix.copy()
+    win_matrix[:n, :n] = upper + np.tril(1.0 - upper.T, -1) + np.eye(n) * 0.5
+    return TournamentModel(model.registry, score_probs, win_matrix, model.max_goals)
+
+
+class ServiceError(Exception):
+    """Erro do pedido com status HTTP"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class PredictionService:
+    """Modelo, estatísticas e tabela de confrontos carregados uma vez, com cache e coalescência"""
+
+    # Caminho -> (método, resposta pode ir para o cache)
+    ENDPOINTS = {
+        '/health': ('health', False),
+        '/predict': ('predict', True),
+        '/groups': ('groups', True),
+        '/odds': ('odds', True),
+    }
+
+    def __init__(self, team_stats=None, cache_size=RESPONSE_CACHE_SIZE, workers=WORKERS):
+        """
+        Args:
+            team_stats: {time: stats} (padrão: snapshot_builder.build_team_stats)
+            cache_size: respostas no cache LRU
+            workers: threads dos cálculos pesados
+        """
+        self.cache_size = cache_size
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self._cache = OrderedDict()
+        self._inflight = {}
+        self.stats = {'requests': 0, 'cache_hits': 0, 'coalesced': 0, 'computed': 0}
+        self.load(team_stats)
+
+    def load(self, team_stats=None):
+        """(Re)carrega estatísticas, modelo e tabela de confrontos e limpa o cache"""
+        from tournament_sampler import TournamentModel
+        from tournament_simulator import MODEL_TYPE
+
+        if team_stats is None:
+            from snapshot_builder import build_team_stats
+            team_stats, _ = build_team_stats()
+
+        start = time.perf_counter()
+        self.team_stats = team_stats
+        self.model = TournamentModel.from_stats(team_stats)
+        self.model_type = MODEL_TYPE
+        self.teams = self.model.registry.names[:self.model.group_ids.size]
+        self.pair_table = self.build_pair_table()
+        self.sampler_model = pair_table_model(self.model, self.pair_table)
+        self.standings = self.build_standings()
+        self.loaded_at = time.time()
+        self.load_seconds = time.perf_counter() - start
+        self._cache.clear()
+
+    def build_pair_table(self):
+        """
+        Previsões de todos os confrontos entre os times da Copa
+
+        Returns:
+            np.ndarray (times, times, campos) float com PAIR_FIELDS
+            (probabilidades em frações; diagonal = NaN)
+        """
+        records = self.model.registry.records
+        n = len(self.teams)
+        table = np.full((n, n, len(PAIR_FIELDS)), np.nan)
+        for i in range(n):
+            for j in range(n):
+                if i == j:
+                    continue
+                table[i, j] = pair_row(records[i], records[j])
+        return table
+
+    def build_standings(self):
+        """
+        Classificação prevista dos grupos com os placares da tabela de confrontos
+        (mesmos critérios de tournament_simulator.simulate_group_stage)
+
+        Returns:
+            {grupo: {'standings', 'first', ...}} no formato de simulate_group_stage
+        """
+        from copa_2026_structure import GRUPOS_COPA_2026
+        from tournament_simulator import _group_fixtures, _group_results_from_ids, _simulate_group_ids
+
+        registry = self.model.registry
+        registry.seed_goals(self.pair_table[..., 0], self.pair_table[..., 1])
+        letters, group_ids = registry.group_ids()
+        order, table = _simulate_group_ids(registry, group_ids, _group_fixtures(group_ids))
+        results = _group_results_from_ids(registry, letters, order, table)
+        return {grupo: results[grupo] for grupo in GRUPOS_COPA_2026}
+
+    # Endpoints (síncronos, executados no pool de threads)
+
+    def _team(self, params, key):
+        name = params.get(key)
+        if not name:
+            raise ServiceError(400, f"Parâmetro obrigatório: {key}")
+        index = self.model.registry.index.get(name)
+        if index is None or index >= len(self.teams):
+            raise ServiceError(404, f"Time fora da Copa: {name}")
+        return index
+
+    def _samples(self, params):
+        try:
+            samples = int(params.get('samples', DEFAULT_SAMPLES))
+            seed = int(params['seed']) if 'seed' in params else 0
+        except ValueError:
+            raise ServiceError(400, "samples e seed precisam ser inteiros")
+        if not 0 < samples <= MAX_SAMPLES:
+            raise ServiceError(400, f"samples precisa estar entre 1 e {MAX_SAMPLES}")
+        return samples, seed
+
+    def _outcomes(self, samples, seed):
+        from tournament_sampler import sample_outcomes
+        return sample_outcomes(self.sampler_model, samples, rng=seed)
+
+    def health(self, params):
+        return {
+            'status': 'ok',
+            'model_type': self.model_type,
+            'teams': len(self.teams),
+            'loaded_at': self.loaded_at,
+            'load_seconds': round(self.load_seconds, 3),
+            'cache_entries': len(self._cache),
+            **self.stats,
+        }
+
+    def predict(self, params):
+        home, away = self._team(params, 'home'), self._team(params, 'away')
+        if home == away:
+            raise ServiceError(400, "Mandante e visitante precisam ser diferentes")
+        row = self.pair_table[home, away]
+        return {
+            'home': self.teams[home],
+            'away': self.teams[away],
+            'home_goals': int(row[0]),
+            'away_goals': int(row[1]),
+            'prob_home_win': float(row[2]),
+            'prob_draw': float(row[3]),
+            'prob_away_win': float(row[4]),
+        }
+
+    def groups(self, params):
+        positions = self._outcomes(*self._samples(params)).position_probabilities()
+        return {
+            grupo: {
+                'standings': [{'team': team, **row} for team, row in result['standings']],
+                'position_probabilities': {team: positions[team] for team, _ in result['standings']},
+            }
+            for grupo, result in self.standings.items()
+        }
+
+    def odds(self, params):
+        samples, seed = self._samples(params)
+        outcomes = self._outcomes(samples, seed)
+        return {
+            'samples': samples,
+            'model_type': self.model_type,
+            'champion_probabilities': outcomes.champion_probabilities(),
+            'podium_probabilities': outcomes.podium_probabilities(),
+            'stage_probabilities': outcomes.stage_probabilities(),
+        }
+
+    # Camada assíncrona
+
+    def _cache_key(self, path, params):
+        """Chave do cache e da coalescência com os parâmetros já interpretados"""
+        if path in ('/groups', '/odds'):
+            return path, self._samples(params)
+        return path, tuple(sorted(params.items()))
+
+    async def handle(self, path, params):
+        """
+        Resposta de um endpoint (cache LRU + coalescência de pedidos idênticos)
+
+        Returns:
+            dict serializável em JSON
+        """
+        if path not in self.ENDPOINTS:
+            raise ServiceError(404, f"Endpoint desconhecido: {path}")
+        name, cacheable = self.ENDPOINTS[path]
+        handler = getattr(self, name)
+        self.stats['requests'] += 1
+        if not cacheable:
+            return handler(params)
+
+        key = self._cache_key(path, params)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.stats['cache_hits'] += 1
+            return self._cache[key]
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats['coalesced'] += 1
+            return await asyncio.shield(future)
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.executor, handler, params)
+        self._inflight[key] = future
+        try:
+            response = await future
+        finally:
+            del self._inflight[key]
+        self.stats['computed'] += 1
+
+        self._cache[key] = response
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return response
+
+    async def handle_connection(self, reader, writer):
+        """Um pedido HTTP/1.1 GET por conexão (Connection: close)"""
+        try:
+            request_line = (await reader.readline()).decode('latin-1').split()
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass  # cabeçalhos ignorados
+
+            if len(request_line) < 2:
+                raise ServiceError(400, "Pedido HTTP inválido")
+            if request_line[0] != 'GET':
+                raise ServiceError(405, "Só GET é suportado")
+            url = urlsplit(request_line[1])
+            status, body = 200, await self.handle(url.path, dict(parse_qsl(url.query)))
+        except ServiceError as e:
+            status, body = e.status, {'error': str(e)}
+        except Exception as e:
+            status, body = 500, {'error': f"{type(e).__name__}: {e}"}
+
+        payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        reason = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed'}.get(status, 'Error')
+        writer.write(f"HTTP/1.1 {status} {reason}\r\n"
+                     f"Content-Type: application/json; charset=utf-8\r\n"
+                     f"Content-Length: {len(payload)}\r\n"
+                     f"Connection: close\r\n\r\n".encode('latin-1') + payload)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """Servidor HTTP até ser interrompido"""
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serviço local de previsões da Copa 2026")
+    parser.add_argument('--host', default=DEFAULT_HOST, help='endereço')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='porta')
+    parser.add_argument('--cache-size', type=int, default=RESPONSE_CACHE_SIZE, help='respostas no cache LRU')
+    args = parser.parse_args(argv)
+
+    print("=" * 80)
+    print("🌐 SERVIÇO DE PREVISÕES - COPA 2026")
+    print("=" * 80)
+
+    service = PredictionService(cache_size=args.cache_size)
+    print(f"\n✅ Modelo {service.model_type} e {len(service.teams)} times carregados "
+          f"em {service.load_seconds:.1f}s")
+    print(f"🚀 Ouvindo em http://{args.host}:{args.port} (/health, /predict, /groups, /odds)")
+    print("=" * 80)
+
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\n👋 Serviço encerrado")
+
+
+if __name__ == "__main__":
+    main()
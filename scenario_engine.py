@@ -0,0 +1,317 @@
+"""
+Cenários "E se...?" - Copa do Mundo 2026
+Responde perguntas condicionais ("chances do Brasil se empatar com o
+Marrocos?") reaproveitando torneios já amostrados, sem re-simular
+
+LÓGICA:
+1. Uma amostra base de N torneios (tournament_sampler) é gerada uma vez
+2. Condições sobre jogos de grupo (placar fixo, resultado fixo ou nova
+   distribuição de placares) viram pesos de importância por amostra:
+   w = Q(placar amostrado) / P(placar amostrado)
+3. Condições sobre posições no grupo e fases alcançadas filtram amostras
+   (peso 0 para quem não cumpre)
+4. Tamanho efetivo da amostra ESS = (Σw)² / Σw²; abaixo de min_ess, os
+   jogos condicionados são re-amostrados direto de Q (amostra nova, em
+   cache por combinação de condições) e só os filtros continuam valendo
+
+Uso:
+    engine = ScenarioEngine(team_stats, n_samples=20000)
+    scenario = Scenario().result("Brazil", "Morocco", "D")
+    engine.evaluate(scenario)['champion_probabilities']['Brazil']
+
+    python scenario_engine.py --score Brazil Morocco 1 1 --team Brazil
+"""
+
+import argparse
+from collections import OrderedDict
+
+import numpy as np
+
+from tournament_sampler import STAGE_INDEX, TournamentModel, sample_outcomes
+
+# Amostras por cenário
+DEFAULT_SAMPLES = 20000
+
+# ESS mínimo antes de re-amostrar (fração de n_samples)
+MIN_ESS_FRACTION = 0.1
+
+# Amostras re-geradas mantidas em cache (por combinação de jogos condicionados)
+RESAMPLE_CACHE_SIZE = 8
+
+# Resultado do ponto de vista do primeiro time informado
+RESULTS = {'H': 'vitória', 'D': 'empate', 'A': 'derrota'}
+
+
+class Scenario:
+    """
+    Conjunto de condições de um cenário (encadeável)
+
+    Exemplo:
+        Scenario().score("Brazil", "Morocco", 1, 1).position("Brazil", 2)
+    """
+
+    def __init__(self):
+        self.match_conditions = []   # (time1, time2, tipo, valor)
+        self.filters = []            # (tipo, time, valor)
+
+    def score(self, team1, team2, goals1, goals2):
+        """Placar fixo de um jogo de grupo"""
+        self.match_conditions.append((team1, team2, 'score', (goals1, goals2)))
+        return self
+
+    def result(self, team1, team2, outcome):
+        """Resultado fixo de um jogo de grupo: 'H' (team1 vence), 'D' ou 'A'"""
+        if outcome not in RESULTS:
+            raise ValueError(f"Resultado deve ser um de {list(RESULTS)}, recebeu {outcome}")
+        self.match_conditions.append((team1, team2, 'result', outcome))
+        return self
+
+    def match_probabilities(self, team1, team2, score_matrix):
+        """Nova distribuição de placares do jogo (matriz [gols team1, gols team2])"""
+        self.match_conditions.append((team1, team2, 'probs', np.asarray(score_matrix, dtype=float)))
+        return self
+
+    def position(self, team, position):
+        """Time termina o grupo na posição (1 a 4)"""
+        self.filters.append(('position', team, position))
+        return self
+
+    def reaches(self, team, stage):
+        """Time alcança a fase (nome em tournament_sampler.STAGE_NAMES)"""
+        if stage not in STAGE_INDEX:
+            raise ValueError(f"Fase desconhecida: {stage}")
+        self.filters.append(('reaches', team, stage))
+        return self
+
+    def eliminated_in(self, team, stage):
+        """Time é eliminado exatamente na fase"""
+        if stage not in STAGE_INDEX:
+            raise ValueError(f"Fase desconhecida: {stage}")
+        self.filters.append(('eliminated_in', team, stage))
+        return self
+
+    def describe(self):
+        """Texto curto do cenário"""
+        parts = []
+        for team1, team2, kind, value in self.match_conditions:
+            if kind == 'score':
+                parts.append(f"{team1} {value[0]}x{value[1]} {team2}")
+            elif kind == 'result':
+                parts.append(f"{team1} x {team2}: {RESULTS[value]} de {team1}")
+            else:
+                parts.append(f"{team1} x {team2}: nova distribuição")
+        for kind, team, value in self.filters:
+            if kind == 'position':
+                parts.append(f"{team} {value}º no grupo")
+            elif kind == 'reaches':
+                parts.append(f"{team} chega a {value}")
+            else:
+                parts.append(f"{team} eliminado em {value}")
+        return "; ".join(parts) or "sem condições"
+
+
+class ScenarioEngine:
+    """Amostra base + avaliação de cenários por filtro/repesagem"""
+
+    def __init__(self, team_stats_dict, n_samples=DEFAULT_SAMPLES, min_ess=None, seed=None, model=None):
+        """
+        Args:
+            team_stats_dict: estatísticas por time
+            n_samples: torneios na amostra base
+            min_ess: ESS mínimo antes de re-amostrar (padrão: 10% de n_samples)
+            seed: semente do gerador
+            model: TournamentModel já montado (opcional)
+        """
+        self.model = model or TournamentModel.from_stats(team_stats_dict)
+        self.n_samples = n_samples
+        self.min_ess = min_ess if min_ess is not None else MIN_ESS_FRACTION * n_samples
+        self.rng = np.random.default_rng(seed)
+        self.base = sample_outcomes(self.model, n_samples, self.rng)
+        self._resampled = OrderedDict()
+
+    def _match_distributions(self, scenario):
+        """
+        Distribuição condicionada de cada jogo de grupo do cenário
+
+        Returns:
+            dict {índice do jogo: Q achatada (células,)}
+        """
+        model = self.model
+        size = model.max_goals + 1
+        diff = np.arange(size)[:, None] - np.arange(size)[None, :]
+        bases, masks = {}, {}
+
+        for team1, team2, kind, value in scenario.match_conditions:
+            k, swapped = model.find_fixture(team1, team2)
+            bases.setdefault(k, model.score_probs[k].reshape(size, size))
+            mask = masks.setdefault(k, np.ones((size, size)))
+
+            # Condição montada do ponto de vista de team1 e transposta se
+            # team1 é o visitante do jogo
+            if kind == 'score':
+                goals1, goals2 = value
+                if max(goals1, goals2) > model.max_goals:
+                    raise ValueError(f"Placar acima de MAX_GOALS ({model.max_goals})")
+                condition = np.zeros((size, size))
+                condition[goals1, goals2] = 1.0
+            elif kind == 'result':
+                condition = {'H': diff > 0, 'D': diff == 0, 'A': diff < 0}[value].astype(float)
+            else:
+                condition = np.zeros((size, size))
+                rows, cols = min(size, value.shape[0]), min(size, value.shape[1])
+                condition[:rows, :cols] = value[:rows, :cols]
+
+            if swapped:
+                condition = condition.T
+            if kind == 'probs':
+                bases[k] = condition
+            else:
+                mask *= condition
+
+        distributions = {}
+        for k, base in bases.items():
+            q = (base * masks[k]).ravel()
+            if q.sum() <= 0:
+                home, away = (model.registry.name(int(t)) for t in model.fixture_teams[k])
+                raise ValueError(f"Condições incompatíveis para {home} x {away}")
+            distributions[k] = q / q.sum()
+
+        return distributions
+
+    def _filter_mask(self, outcomes, scenario):
+        """Amostras que cumprem os filtros de posição/fase"""
+        mask = np.ones(len(outcomes), dtype=bool)
+        for kind, team, value in scenario.filters:
+            team_id = self.model.registry.id(team)
+            if kind == 'position':
+                mask &= outcomes.positions[:, team_id] == value - 1
+            elif kind == 'reaches':
+                mask &= outcomes.stage[:, team_id] >= STAGE_INDEX[value]
+            else:
+                mask &= outcomes.stage[:, team_id] == STAGE_INDEX[value]
+        return mask
+
+    def _resample(self, distributions):
+        """Amostra nova com os jogos condicionados sorteados direto de Q (em cache)"""
+        key = tuple(sorted((k, q.tobytes()) for k, q in distributions.items()))
+        if key in self._resampled:
+            self._resampled.move_to_end(key)
+            return self._resampled[key]
+
+        score_probs = self.model.score_probs.copy()
+        for k, q in distributions.items():
+            score_probs[k] = q
+        outcomes = sample_outcomes(self.model, self.n_samples, self.rng, score_probs=score_probs)
+
+        self._resampled[key] = outcomes
+        if len(self._resampled) > RESAMPLE_CACHE_SIZE:
+            self._resampled.popitem(last=False)
+        return outcomes
+
+    def weights(self, scenario, outcomes=None):
+        """
+        Pesos de importância de cada amostra para o cenário
+
+        Returns:
+            np.ndarray (n,) (não normalizado)
+        """
+        if outcomes is None:
+            outcomes = self.base
+        weights = self._filter_mask(outcomes, scenario).astype(float)
+        for k, q in self._match_distributions(scenario).items():
+            ratio = q / self.model.score_probs[k]
+            weights *= ratio[outcomes.cells[:, k]]
+        return weights
+
+    def evaluate(self, scenario=None):
+        """
+        Probabilidades condicionadas ao cenário
+
+        Returns:
+            dict com champion_probabilities, podium_probabilities,
+            stage_probabilities, position_probabilities, ess, resampled
+        """
+        scenario = scenario or Scenario()
+        outcomes = self.base
+        weights = self.weights(scenario, outcomes)
+        ess = effective_sample_size(weights)
+        resampled = False
+
+        distributions = self._match_distributions(scenario)
+        if ess < self.min_ess and distributions:
+            outcomes = self._resample(distributions)
+            weights = self._filter_mask(outcomes, scenario).astype(float)
+            ess = effective_sample_size(weights)
+            resampled = True
+
+        return {
+            'scenario': scenario.describe(),
+            'champion_probabilities': outcomes.champion_probabilities(weights),
+            'podium_probabilities': outcomes.podium_probabilities(weights),
+            'stage_probabilities': outcomes.stage_probabilities(weights),
+            'position_probabilities': outcomes.position_probabilities(weights),
+            'ess': ess,
+            'n_samples': len(outcomes),
+            'resampled': resampled
+        }
+
+
+def effective_sample_size(weights):
+    """ESS = (Σw)² / Σw² (0 se nenhuma amostra cumpre o cenário)"""
+    total_sq = np.dot(weights, weights)
+    return float(weights.sum() ** 2 / total_sq) if total_sq > 0 else 0.0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cenários 'E se...?' da Copa 2026")
+    parser.add_argument('--score', nargs=4, action='append', default=[],
+                        metavar=('TIME1', 'TIME2', 'GOLS1', 'GOLS2'), help='placar fixo de um jogo de grupo')
+    parser.add_argument('--result', nargs=3, action='append', default=[],
+                        metavar=('TIME1', 'TIME2', 'H|D|A'), help='resultado fixo de um jogo de grupo')
+    parser.add_argument('--position', nargs=2, action='append', default=[],
+                        metavar=('TIME', 'POSICAO'), help='posição final no grupo (1-4)')
+    parser.add_argument('--reaches', nargs=2, action='append', default=[],
+                        metavar=('TIME', 'FASE'), help='fase alcançada')
+    parser.add_argument('--team', action='append', default=[], help='times para detalhar')
+    parser.add_argument('--samples', type=int, default=DEFAULT_SAMPLES, help='torneios amostrados')
+    parser.add_argument('--seed', type=int, default=None, help='semente')
+    args = parser.parse_args(argv)
+
+    from snapshot_builder import build_team_stats
+
+    scenario = Scenario()
+    for team1, team2, goals1, goals2 in args.score:
+        scenario.score(team1, team2, int(goals1), int(goals2))
+    for team1, team2, outcome in args.result:
+        scenario.result(team1, team2, outcome.upper())
+    for team, position in args.position:
+        scenario.position(team, int(position))
+    for team, stage in args.reaches:
+        scenario.reaches(team, stage)
+
+    print("=" * 80)
+    print("🔮 CENÁRIOS - COPA 2026")
+    print("=" * 80)
+
+    team_stats, stats_loaded = build_team_stats()
+    print(f"📊 Times com dados reais: {stats_loaded}/{len(team_stats)}")
+
+    engine = ScenarioEngine(team_stats, n_samples=args.samples, seed=args.seed)
+    base = engine.evaluate()
+    result = engine.evaluate(scenario)
+
+    print(f"\n🎯 Cenário: {result['scenario']}")
+    print(f"   ESS: {result['ess']:.0f} de {result['n_samples']}"
+          f"{' (re-amostrado)' if result['resampled'] else ''}")
+
+    teams = args.team or list(result['champion_probabilities'])[:10]
+    print(f"\n{'Time':30s} {'Campeão':>10s} {'(base)':>10s} {'Pódio':>10s} {'(base)':>10s}")
+    for team in teams:
+        print(f"{team:30s} "
+              f"{result['champion_probabilities'].get(team, 0):10.1%} {base['champion_probabilities'].get(team, 0):10.1%} "
+              f"{result['podium_probabilities'].get(team, 0):10.1%} {base['podium_probabilities'].get(team, 0):10.1%}")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
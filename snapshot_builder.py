@@ -0,0 +1,433 @@
+"""
+Snapshots Pré-calculados das Páginas do Streamlit
+Calcula uma única vez os dados de "Jogos da Copa" e "Classificação & Pódio"
+(72 previsões, classificação dos grupos, probabilidades de título/pódio e
+pódio mais provável) e grava um artefato versionado que o app abre com
+memory-map: o carregamento da página vira uma leitura pura.
+
+LÓGICA:
+1. Estatísticas dos times a partir do cache local de jogos (match_cache),
+   mesmas fórmulas de streamlit_app.get_team_stats (últimos 50 jogos);
+   times sem histórico usam team_strength.get_team_strength_stats
+2. Previsões, fase de grupos e torneio completo (Monte Carlo) calculados aqui;
+   na etapa publish do pipeline as probabilidades (posição no grupo, fase,
+   pódio, finais mais prováveis) vêm do armazém de resultados em bitsets
+   (outcome_bitsets.OutcomeBitsets.from_store)
+3. Artefato em data/processed/snapshots/snapshot_<versão>/ (meta.json +
+   arrays .npy); o arquivo LATEST aponta para a versão atual e só é trocado
+   depois que o diretório está completo
+
+Executado pela etapa publish de pipeline.py (ao final de auto_update.py);
+também pode rodar sozinho:
+    python snapshot_builder.py
+    python snapshot_builder.py --simulations 5000 --refresh
+"""
+
+import os
+import sys
+import json
+import shutil
+import hashlib
+import argparse
+from pathlib import Path
+from datetime import datetime
+
+import numpy as np
+
+DEFAULT_SNAPSHOT_DIR = Path(__file__).parent / "data" / "processed" / "snapshots"
+LATEST_FILE = "LATEST"
+SNAPSHOT_FORMAT = 1
+KEEP_SNAPSHOTS = 3
+RECENT_MATCHES = 50
+RECENT_FORM_MATCHES = 10
+NO_TEAM = -1
+
+# Arrays gravados em cada snapshot (nome -> dtype)
+ARRAYS = {
+    'matches': np.int16,          # (72, 2) índices mandante/visitante
+    'predicted_goals': np.int8,   # (72, 2) placar previsto
+    'standings': np.int16,        # (grupos, 4, 4) time, pontos, saldo, gols
+    'champion_probs': np.float32, # (times,)
+    'podium_probs': np.float32,   # (times,)
+    'likely_podium': np.int16,    # (3,) campeão, vice, 3º (NO_TEAM = a definir)
+}
+
+# Arrays gravados só quando o snapshot vem do armazém de resultados (bitsets)
+OPTIONAL_ARRAYS = {
+    'position_probs': np.float32, # (times, 4) P(1º..4º no grupo)
+    'stage_probs': np.float32,    # (times, fases) P(alcançar), fases em meta['stage_names']
+    'final_pairs': np.int16,      # (k, 2) finais mais prováveis
+    'final_probs': np.float32,    # (k,)
+}
+
+# Finais mais prováveis gravadas
+FINAL_PAIRINGS = 10
+
+
+def team_stats_from_cache(team_names, matches=None, window=RECENT_MATCHES):
+    """
+    Estatísticas dos times a partir do cache local de jogos
+
+    Mesmas fórmulas de streamlit_app.get_team_stats aplicadas aos últimos
+    `window` jogos de cada time.
+
+    Args:
+        team_names: nomes dos times desejados
+        matches: saída de match_cache.load_matches (padrão: carrega o cache)
+        window: número de jogos recentes considerados
+
+    Returns:
+        dict {nome: stats} apenas para os times com jogos no cache
+    """
+    from match_cache import load_matches, MISSING_GOALS
+
+    if matches is None:
+        matches = load_matches(missing_ok=True)
+    if not matches or len(matches.get('id', ())) == 0:
+        return {}
+
+    ids_by_name = {name: team_id for team_id, name in matches['team_names'].items()}
+    finished = (matches['home_goals'] != MISSING_GOALS) & (matches['away_goals'] != MISSING_GOALS)
+    dates = matches['date'][finished]
+    home_ids = matches['home_team_id'][finished]
+    away_ids = matches['away_team_id'][finished]
+    home_goals = matches['home_goals'][finished].astype(float)
+    away_goals = matches['away_goals'][finished].astype(float)
+
+    team_stats = {}
+    for name in team_names:
+        team_id = ids_by_name.get(name)
+        if team_id is None:
+            continue
+
+        is_home = home_ids == team_id
+        rows = np.flatnonzero(is_home | (away_ids == team_id))
+        if len(rows) == 0:
+            continue
+
+        # Mais recentes primeiro (ORDER BY date DESC LIMIT window)
+        rows = rows[np.argsort(dates[rows], kind='stable')[::-1][:window]]
+        scored = np.where(is_home[rows], home_goals[rows], away_goals[rows])
+        conceded = np.where(is_home[rows], away_goals[rows], home_goals[rows])
+        wins = scored > conceded
+
+        team_stats[name] = {
+            'avg_goals_scored': float(scored.mean()),
+            'avg_goals_conceded': float(conceded.mean()),
+            'win_rate': float(wins.mean()),
+            'strength': float(50 + (scored.mean() - conceded.mean()) * 10),
+            'recent_form': float(wins[:RECENT_FORM_MATCHES].sum() / RECENT_FORM_MATCHES),
+            'total_games': int(len(rows)),
+        }
+
+    return team_stats
+
+
+def build_team_stats(matches=None):
+    """
+    Estatísticas dos 48 times da Copa (cache local + força estimada)
+
+    Returns:
+        (team_stats, número de times com dados reais)
+    """
+    from copa_2026_structure import GRUPOS_COPA_2026
+    from team_strength import get_team_strength_stats
+
+    copa_teams = [team for grupo in sorted(GRUPOS_COPA_2026) for team in GRUPOS_COPA_2026[grupo]]
+    team_stats = team_stats_from_cache(copa_teams, matches)
+    stats_loaded = len(team_stats)
+
+    for team in copa_teams:
+        if team not in team_stats:
+            team_stats[team] = get_team_strength_stats(team)
+
+    return team_stats, stats_loaded
+
+
+def build_snapshot(team_stats, n_simulations=1000, predictions=None, tournament=None, outcomes=None):
+    """
+    Calcula os dados das páginas a partir das estatísticas dos times
+
+    Args:
+        predictions: {(mandante, visitante): (gols, gols)} já calculados
+                     (padrão: predict_match de cada jogo)
+        tournament: saída de simulate_full_tournament já calculada
+        outcomes: OutcomeBitsets do armazém de resultados; quando informado,
+                  probabilidades e pódio mais provável vêm dele (n_simulations
+                  e tournament são ignorados)
+
+    Returns:
+        (arrays no formato de ARRAYS, metadados)
+    """
+    from copa_2026_structure import GRUPOS_COPA_2026
+    from tournament_simulator import (predict_match, simulate_group_stage, simulate_knockout_stage,
+                                      simulate_full_tournament, get_default_stats, MODEL_TYPE)
+
+    groups = sorted(GRUPOS_COPA_2026)
+    teams = [team for grupo in groups for team in GRUPOS_COPA_2026[grupo]]
+    index = {team: i for i, team in enumerate(teams)}
+
+    # Jogos da fase de grupos na ordem exibida pela página
+    match_rows, goal_rows = [], []
+    for grupo in groups:
+        group_teams = GRUPOS_COPA_2026[grupo]
+        for i in range(len(group_teams)):
+            for j in range(i + 1, len(group_teams)):
+                home, away = group_teams[i], group_teams[j]
+                if predictions is not None:
+                    goals = predictions[(home, away)]
+                else:
+                    prediction = predict_match(team_stats.get(home, get_default_stats()),
+                                               team_stats.get(away, get_default_stats()))
+                    goals = (prediction['home_goals'], prediction['away_goals'])
+                match_rows.append((index[home], index[away]))
+                goal_rows.append(goals)
+
+    group_results = simulate_group_stage(team_stats)
+    standings = np.array([
+        [(index[team], s['points'], s['gd'], s['gf']) for team, s in group_results[grupo]['standings']]
+        for grupo in groups
+    ])
+
+    if outcomes is not None:
+        tournament = {
+            'champion_probabilities': outcomes.champion_probabilities(),
+            'podium_probabilities': outcomes.podium_probabilities(),
+        }
+        knockout = outcomes.most_likely_podium()
+        n_simulations = outcomes.n_samples
+    else:
+        if tournament is None:
+            tournament = simulate_full_tournament(team_stats, n_simulations=n_simulations)
+        knockout = simulate_knockout_stage(group_results, team_stats)
+
+    champion_probs = np.zeros(len(teams))
+    podium_probs = np.zeros(len(teams))
+    for team, prob in tournament['champion_probabilities'].items():
+        champion_probs[index[team]] = prob
+    for team, prob in tournament['podium_probabilities'].items():
+        podium_probs[index[team]] = prob
+
+    likely_podium = [index[team] if team else NO_TEAM
+                     for team in (knockout['champion'], knockout['runner_up'], knockout['third_place'])]
+
+    arrays = {
+        'matches': np.array(match_rows),
+        'predicted_goals': np.array(goal_rows),
+        'standings': standings,
+        'champion_probs': champion_probs,
+        'podium_probs': podium_probs,
+        'likely_podium': np.array(likely_podium),
+    }
+    meta = {
+        'format': SNAPSHOT_FORMAT,
+        'model_type': MODEL_TYPE,
+        'n_simulations': int(n_simulations),
+        'groups': groups,
+        'teams': teams,
+    }
+
+    if outcomes is not None:
+        from tournament_sampler import STAGE_NAMES
+
+        positions = outcomes.position_probabilities()
+        stages = outcomes.stage_probabilities()
+        finals = outcomes.final_pairings(top=FINAL_PAIRINGS)
+        arrays['position_probs'] = np.array([positions[team] for team in teams])
+        arrays['stage_probs'] = np.array([[stages[team][stage] for stage in STAGE_NAMES[1:]] for team in teams])
+        arrays['final_pairs'] = np.array([(index[a], index[b]) for (a, b), _ in finals]).reshape(-1, 2)
+        arrays['final_probs'] = np.array([prob for _, prob in finals])
+        meta['stage_names'] = STAGE_NAMES[1:]
+        meta['probability_source'] = 'outcome_store'
+
+    dtypes = dict(ARRAYS, **OPTIONAL_ARRAYS)
+    arrays = {name: np.ascontiguousarray(values, dtype=dtypes[name]) for name, values in arrays.items()}
+    return arrays, meta
+
+
+def _content_hash(arrays, meta):
+    """Hash curto do conteúdo (identifica snapshots iguais)"""
+    digest = hashlib.sha1(json.dumps(meta, sort_keys=True).encode())
+    for name in (*ARRAYS, *OPTIONAL_ARRAYS):
+        if name in arrays:
+            digest.update(arrays[name].tobytes())
+    return digest.hexdigest()[:8]
+
+
+def write_snapshot(arrays, meta, snapshot_dir=None, keep=KEEP_SNAPSHOTS):
+    """
+    Grava um snapshot versionado e aponta LATEST para ele
+
+    O diretório é montado em um nome temporário e renomeado quando completo;
+    LATEST é trocado com os.replace, então o app nunca vê um snapshot parcial.
+
+    Returns:
+        versão gravada
+    """
+    snapshot_dir = Path(snapshot_dir or DEFAULT_SNAPSHOT_DIR)
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+
+    created_at = datetime.now()
+    version = f"{created_at.strftime('%Y%m%d_%H%M%S')}_{_content_hash(arrays, meta)}"
+    meta = dict(meta, version=version, created_at=created_at.isoformat(timespec='seconds'))
+
+    final_path = snapshot_dir / f"snapshot_{version}"
+    tmp_path = snapshot_dir / f".snapshot_{version}.tmp"
+    if not final_path.exists():
+        # Mesmo nome = mesmo segundo e mesmo conteúdo: reaproveita o existente
+        if tmp_path.exists():
+            shutil.rmtree(tmp_path)
+        tmp_path.mkdir()
+
+        for name, values in arrays.items():
+            np.save(tmp_path / f"{name}.npy", values)
+        with open(tmp_path / "meta.json", 'w') as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, final_path)
+
+    latest_tmp = snapshot_dir / f".{LATEST_FILE}.tmp"
+    latest_tmp.write_text(final_path.name)
+    os.replace(latest_tmp, snapshot_dir / LATEST_FILE)
+
+    # Manter só as versões mais recentes
+    old = sorted(p for p in snapshot_dir.glob("snapshot_*") if p.is_dir() and p != final_path)
+    for path in old[:max(0, len(old) - (keep - 1))]:
+        shutil.rmtree(path, ignore_errors=True)
+
+    return version
+
+
+def latest_snapshot_path(snapshot_dir=None):
+    """Diretório do snapshot atual (None se ainda não existe)"""
+    snapshot_dir = Path(snapshot_dir or DEFAULT_SNAPSHOT_DIR)
+    try:
+        name = (snapshot_dir / LATEST_FILE).read_text().strip()
+    except OSError:
+        return None
+    path = snapshot_dir / name
+    return path if (path / "meta.json").exists() else None
+
+
+def load_snapshot(path, mmap=True):
+    """
+    Abre um snapshot e monta as estruturas usadas pelas páginas
+
+    Returns:
+        dict com 'meta', arrays brutos e as visões:
+        - 'group_matches': {grupo: [(mandante, visitante, gols, gols), ...]}
+        - 'group_results': {grupo: {'standings': [(time, {'points','gd','gf'})]}}
+        - 'champion_probabilities' / 'podium_probabilities': ordenados
+        - 'knockout': {'champion', 'runner_up', 'third_place'}
+        - 'position_probabilities': {time: [P(1º)..P(4º)]}, 'stage_probabilities':
+          {time: {fase: P}} e 'final_pairings': [((time, time), P)]
+          (None se o snapshot não veio do armazém de resultados)
+    """
+    path = Path(path)
+    with open(path / "meta.json") as f:
+        meta = json.load(f)
+    if meta.get('format') != SNAPSHOT_FORMAT:
+        raise ValueError(f"Formato de snapshot incompatível: {meta.get('format')}")
+
+    mmap_mode = 'r' if mmap else None
+    arrays = {name: np.load(path / f"{name}.npy", mmap_mode=mmap_mode) for name in ARRAYS}
+    arrays.update({name: np.load(path / f"{name}.npy", mmap_mode=mmap_mode)
+                   for name in OPTIONAL_ARRAYS if (path / f"{name}.npy").exists()})
+
+    teams = meta['teams']
+    groups = meta['groups']
+    group_of = {}
+    for grupo, rows in zip(groups, arrays['standings']):
+        for row in rows:
+            group_of[teams[row[0]]] = grupo
+
+    group_matches = {grupo: [] for grupo in groups}
+    for (home, away), (home_goals, away_goals) in zip(arrays['matches'], arrays['predicted_goals']):
+        group_matches[group_of[teams[home]]].append((teams[home], teams[away], int(home_goals), int(away_goals)))
+
+    group_results = {}
+    for grupo, rows in zip(groups, arrays['standings']):
+        standings = [(teams[t], {'points': int(pts), 'gd': int(gd), 'gf': int(gf)}) for t, pts, gd, gf in rows]
+        group_results[grupo] = {'standings': standings}
+
+    def ranked(probs):
+        order = np.argsort(-np.asarray(probs), kind='stable')
+        return {teams[i]: float(probs[i]) for i in order if probs[i] > 0}
+
+    podium = [teams[i] if i != NO_TEAM else None for i in arrays['likely_podium']]
+
+    position_probabilities = stage_probabilities = final_pairings = None
+    if 'position_probs' in arrays:
+        position_probabilities = {team: arrays['position_probs'][i].tolist() for i, team in enumerate(teams)}
+        stage_probabilities = {team: dict(zip(meta['stage_names'], map(float, arrays['stage_probs'][i])))
+                               for i, team in enumerate(teams)}
+        final_pairings = [((teams[a], teams[b]), float(prob))
+                          for (a, b), prob in zip(arrays['final_pairs'], arrays['final_probs'])]
+
+    return {
+        'meta': meta,
+        'version': meta['version'],
+        'arrays': arrays,
+        'group_matches': group_matches,
+        'group_results': group_results,
+        'champion_probabilities': ranked(arrays['champion_probs']),
+        'podium_probabilities': ranked(arrays['podium_probs']),
+        'knockout': dict(zip(('champion', 'runner_up', 'third_place'), podium)),
+        'position_probabilities': position_probabilities,
+        'stage_probabilities': stage_probabilities,
+        'final_pairings': final_pairings,
+    }
+
+
+def load_latest_snapshot(snapshot_dir=None, mmap=True):
+    """Snapshot atual ou None se ainda não foi gerado"""
+    path = latest_snapshot_path(snapshot_dir)
+    if path is None:
+        return None
+    return load_snapshot(path, mmap=mmap)
+
+
+def build_and_write(n_simulations=1000, snapshot_dir=None, refresh=False):
+    """
+    Pipeline completo: cache de jogos -> estatísticas -> snapshot gravado
+
+    Returns:
+        versão gravada
+    """
+    from match_cache import load_matches, refresh_cache
+
+    if refresh:
+        try:
+            refresh_cache()
+        except (RuntimeError, OSError) as e:
+            print(f"⚠️  Não foi possível sincronizar com o Neon ({e}); usando cache local")
+
+    matches = load_matches(missing_ok=True)
+    team_stats, stats_loaded = build_team_stats(matches)
+    arrays, meta = build_snapshot(team_stats, n_simulations)
+    meta['stats_loaded'] = stats_loaded
+    return write_snapshot(arrays, meta, snapshot_dir)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera o snapshot das páginas do Streamlit")
+    parser.add_argument('--simulations', type=int, default=1000, help="simulações do torneio completo")
+    parser.add_argument('--snapshot-dir', type=Path, default=None)
+    parser.add_argument('--refresh', action='store_true', help="sincronizar cache com o Neon antes")
+    args = parser.parse_args(argv)
+
+    print("=" * 80)
+    print("SNAPSHOT DAS PÁGINAS DO STREAMLIT")
+    print("=" * 80)
+
+    start = datetime.now()
+    version = build_and_write(args.simulations, args.snapshot_dir, args.refresh)
+    elapsed = (datetime.now() - start).total_seconds()
+
+    print(f"\n✅ Snapshot {version} gerado em {elapsed:.1f} s")
+    print(f"💾 {latest_snapshot_path(args.snapshot_dir)}")
+    print("=" * 80)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,6 +10,7 @@ from datetime import datetime, timedelta
 
 from config import API_FOOTBALL_BASE_URL, API_FOOTBALL_KEY, WORLD_CUP_2026_ID
 from utils import DatabaseManager, get_logger
+from instrumentation import span, incr
 
 logger = get_logger(__name__)
 
@@ -38,19 +39,24 @@ class APIFootballCollector:
         """
         try:
             url = f"{self.base_url}/{endpoint}"
-            response = requests.get(url, headers=self.headers, params=params, timeout=10)
+            incr("api.requests")
+            with span("api.request"):
+                response = requests.get(url, headers=self.headers, params=params, timeout=10)
             
             if response.status_code == 200:
                 time.sleep(self.rate_limit_delay)
                 return response.json()
             elif response.status_code == 429:
+                incr("api.rate_limited")
                 logger.warning("Rate limit atingido. Aguardando...")
                 time.sleep(60)
                 return self._make_request(endpoint, params)
             else:
+                incr("api.errors")
                 logger.error(f"Erro na API: {response.status_code} - {response.text}")
                 return None
         except requests.RequestException as e:
+            incr("api.errors")
             logger.error(f"Erro na requisição: {e}")
             return None
 
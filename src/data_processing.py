@@ -8,7 +8,9 @@ import numpy as np
 from datetime import datetime, timedelta
 
 from utils import DatabaseManager, calculate_team_stats, get_logger
-from config import RECENT_MATCHES_WINDOW, MIN_MATCHES_FOR_ANALYSIS
+from h2h_index import HeadToHeadIndex
+from elo import EloEngine
+from config import RECENT_MATCHES_WINDOW, MIN_MATCHES_FOR_ANALYSIS, ELO_INITIAL_RATING
 
 logger = get_logger(__name__)
 
@@ -19,6 +21,51 @@ class DataProcessor:
     def __init__(self):
         """Inicializar processador"""
         self.db = DatabaseManager()
+        self._h2h_index: Optional[HeadToHeadIndex] = None
+        self._elo: Optional[EloEngine] = None
+
+    @property
+    def h2h_index(self) -> HeadToHeadIndex:
+        """Índice de confrontos diretos (montado uma vez, sob demanda)"""
+        if self._h2h_index is None:
+            self._h2h_index = HeadToHeadIndex.from_database(self.db)
+        return self._h2h_index
+
+    @property
+    def elo(self) -> EloEngine:
+        """Ratings Elo (estado salvo + jogos novos, carregado sob demanda)"""
+        if self._elo is None:
+            self._elo = EloEngine.load_or_build(self.db)
+        return self._elo
+
+    def refresh_elo(self) -> int:
+        """
+        Aplicar ao Elo os jogos inseridos desde a última atualização e
+        gravar os ratings (arquivo + teams.elo_rating)
+        
+        Returns:
+            Número de jogos aplicados
+        """
+        applied = self.elo.sync(self.db)
+        if applied:
+            self.elo.save()
+            self.elo.write_team_ratings(self.db)
+        return applied
+
+    def refresh_head_to_head(self) -> int:
+        """
+        Aplicar ao índice H2H os jogos inseridos/atualizados desde a última
+        marca (last_updated, id); inserções de outros processos (LiveUpdater,
+        coleta, réplica do Neon) também são vistas. Chamar uma vez por lote
+        (depois das inserções ou antes do laço de features), não por jogo
+        
+        Returns:
+            Número de jogos aplicados (0 se o índice acabou de ser montado)
+        """
+        if self._h2h_index is None:
+            self._h2h_index = HeadToHeadIndex.from_database(self.db)
+            return 0
+        return self._h2h_index.sync(self.db)
 
     def get_team_recent_form(self, team_id: int, window: int = RECENT_MATCHES_WINDOW) -> Dict:
         """
@@ -80,7 +127,9 @@ class DataProcessor:
 
     def get_head_to_head(self, team1_id: int, team2_id: int) -> Dict:
         """
-        Calcular confronto direto entre duas seleções
+        Calcular confronto direto entre duas seleções (consulta O(1) no índice H2H,
+        sem acesso ao banco; jogos gravados depois da montagem só entram após
+        refresh_head_to_head(), chamado uma vez por lote)
         
         Args:
             team1_id: ID da primeira seleção
@@ -89,42 +138,7 @@ class DataProcessor:
         Returns:
             Dicionário com estatísticas do confronto
         """
-        matches_df = self.db.get_team_matches(team1_id, limit=1000)
-        
-        # Filtrar apenas jogos entre as duas seleções
-        h2h_matches = matches_df[
-            ((matches_df["home_team_id"] == team1_id) & (matches_df["away_team_id"] == team2_id)) |
-            ((matches_df["home_team_id"] == team2_id) & (matches_df["away_team_id"] == team1_id))
-        ]
-        
-        h2h_stats = {
-            "total_matches": len(h2h_matches),
-            "team1_wins": 0,
-            "team1_draws": 0,
-            "team1_losses": 0,
-            "team1_goals_for": 0,
-            "team1_goals_against": 0,
-        }
-        
-        for _, match in h2h_matches.iterrows():
-            if match["home_team_id"] == team1_id:
-                goals_for = match["home_goals"]
-                goals_against = match["away_goals"]
-            else:
-                goals_for = match["away_goals"]
-                goals_against = match["home_goals"]
-            
-            h2h_stats["team1_goals_for"] += goals_for
-            h2h_stats["team1_goals_against"] += goals_against
-            
-            if goals_for > goals_against:
-                h2h_stats["team1_wins"] += 1
-            elif goals_for == goals_against:
-                h2h_stats["team1_draws"] += 1
-            else:
-                h2h_stats["team1_losses"] += 1
-        
-        return h2h_stats
+        return self.h2h_index.get(team1_id, team2_id)
 
     def calculate_team_strength(self, team_id: int, fifa_rank: Optional[int] = None, 
                                elo_rating: Optional[float] = None) -> float:
@@ -134,7 +148,7 @@ class DataProcessor:
         Args:
             team_id: ID da seleção
             fifa_rank: Ranking FIFA (opcional)
-            elo_rating: Rating ELO (opcional)
+            elo_rating: Rating ELO (padrão: rating atual do motor Elo)
             
         Returns:
             Score de força (0-100)
@@ -156,7 +170,14 @@ class DataProcessor:
             # Quanto melhor o ranking (menor número), maior o bônus
             ranking_bonus = max(0, (200 - fifa_rank) / 2)
         
-        total_score = win_rate_score + recent_form_score + goals_score + ranking_bonus
+        # Ajustar pelo Elo (±10 pontos; 20 pontos de Elo = 1 ponto de força)
+        if elo_rating is None and self.elo.games.get(int(team_id)):
+            elo_rating = self.elo.rating(team_id)
+        elo_bonus = 0
+        if elo_rating is not None:
+            elo_bonus = max(-10, min(10, (elo_rating - ELO_INITIAL_RATING) / 20))
+        
+        total_score = win_rate_score + recent_form_score + goals_score + ranking_bonus + elo_bonus
         
         # Normalizar para 0-100
         return min(100, max(0, total_score))
@@ -210,6 +231,11 @@ class DataProcessor:
             "home_strength": home_strength,
             "away_strength": away_strength,
             "strength_difference": home_strength - away_strength,
+            
+            # Elo
+            "home_elo": self.elo.rating(home_team_id),
+            "away_elo": self.elo.rating(away_team_id),
+            "elo_difference": self.elo.rating(home_team_id) - self.elo.rating(away_team_id),
         }
         
         return features
@@ -0,0 +1,559 @@
+"""
+Ratings Elo das seleções (estilo World Football Elo)
+
+Uma única passada cronológica sobre a tabela `matches` calcula o rating de
+cada seleção com peso pela importância do jogo (K) e multiplicador pelo
+saldo de gols. O histórico fica em colunas NumPy compactas (uma linha por
+jogo, com os ratings de antes e a variação), então:
+
+- resultados novos entram em O(1) (append no fim da passada)
+- correções ou jogos fora de ordem só refazem a passada a partir da data
+  afetada, usando os ratings "antes" gravados para voltar no tempo
+- o estado é salvo em ELO_PATH e carregado sem recalcular nada
+
+Uso:
+    python src/elo.py              # sincroniza com o SQLite e salva
+    python src/elo.py --rebuild    # recalcula toda a passada
+"""
+
+import os
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import ELO_PATH, ELO_INITIAL_RATING, ELO_HOME_ADVANTAGE
+from utils import DatabaseManager, get_logger, match_watermark
+from instrumentation import span, incr
+
+logger = get_logger(__name__)
+
+
+# Peso K por importância do jogo (eloratings.net)
+K_WORLD_CUP = 60.0
+K_CONTINENTAL = 50.0
+K_QUALIFIER = 40.0
+K_OTHER_TOURNAMENT = 30.0
+K_FRIENDLY = 20.0
+
+# Torneios continentais / intercontinentais (fases finais)
+CONTINENTAL_KEYWORDS = (
+    "euro", "copa américa", "copa america", "african cup", "africa cup",
+    "asian cup", "gold cup", "confederations cup", "oceania nations cup",
+    "ofc nations cup",
+)
+
+# Colunas do histórico (uma linha por jogo, em ordem cronológica)
+HISTORY_COLUMNS: Dict[str, object] = {
+    "match_id": np.int64,
+    "date": "datetime64[D]",
+    "home_team_id": np.int32,
+    "away_team_id": np.int32,
+    "home_goals": np.int16,
+    "away_goals": np.int16,
+    "k": np.float32,
+    "neutral": np.bool_,
+    "home_before": np.float64,
+    "away_before": np.float64,
+    "delta": np.float64,  # variação do mandante (visitante = -delta)
+}
+
+# Colunas de entrada de um jogo (ordem dos registros internos)
+RECORD_COLUMNS = ("match_id", "date", "home_team_id", "away_team_id", "home_goals", "away_goals", "k", "neutral")
+
+INITIAL_CAPACITY = 1024
+
+
+def match_importance(competition: Optional[str]) -> float:
+    """
+    Peso K de um jogo a partir do nome da competição
+
+    Args:
+        competition: nome da competição (Kaggle ou API-Football)
+
+    Returns:
+        K (60 Copa do Mundo, 50 continentais, 40 eliminatórias/Nations
+        League, 30 outros torneios, 20 amistosos)
+    """
+    if not competition or not isinstance(competition, str):
+        return K_OTHER_TOURNAMENT
+
+    name = competition.lower()
+    if "friendl" in name:
+        return K_FRIENDLY
+    if "qualif" in name or "nations league" in name:
+        return K_QUALIFIER
+    if "world cup" in name:
+        return K_WORLD_CUP
+    if any(keyword in name for keyword in CONTINENTAL_KEYWORDS):
+        return K_CONTINENTAL
+    return K_OTHER_TOURNAMENT
+
+
+def goal_difference_multiplier(goal_difference: int) -> float:
+    """Multiplicador pelo saldo de gols (1, 1.5, (11 + N) / 8)"""
+    goal_difference = abs(int(goal_difference))
+    if goal_difference <= 1:
+        return 1.0
+    if goal_difference == 2:
+        return 1.5
+    return (11.0 + goal_difference) / 8.0
+
+
+def expected_result(rating_difference: float) -> float:
+    """Resultado esperado (0-1) para uma diferença de rating"""
+    return 1.0 / (10.0 ** (-rating_difference / 400.0) + 1.0)
+
+
+def elo_delta(home_rating: float, away_rating: float, home_goals: int, away_goals: int,
+              k: float = K_OTHER_TOURNAMENT, neutral: bool = False,
+              home_advantage: float = ELO_HOME_ADVANTAGE) -> float:
+    """
+    Variação de rating do mandante em um jogo (o visitante recebe -delta)
+
+    Returns:
+        K * G * (W - We)
+    """
+    difference = home_rating - away_rating + (0.0 if neutral else home_advantage)
+    if home_goals > away_goals:
+        result = 1.0
+    elif home_goals == away_goals:
+        result = 0.5
+    else:
+        result = 0.0
+    return k * goal_difference_multiplier(home_goals - away_goals) * (result - expected_result(difference))
+
+
+def _to_day(date) -> np.datetime64:
+    """Normalizar datas (str ISO, Timestamp, datetime) para datetime64[D]"""
+    if date is None or (isinstance(date, float) and np.isnan(date)):
+        return np.datetime64("NaT", "D")
+    if isinstance(date, str):
+        return np.datetime64(date[:10], "D")
+    return np.datetime64(pd.Timestamp(date).date(), "D")
+
+
+class EloEngine:
+    """Motor de ratings Elo incremental sobre o histórico de jogos"""
+
+    def __init__(self, initial_rating: float = ELO_INITIAL_RATING,
+                 home_advantage: float = ELO_HOME_ADVANTAGE):
+        """
+        Inicializar motor vazio
+
+        Args:
+            initial_rating: rating de uma seleção na primeira partida
+            home_advantage: pontos somados ao mandante fora de campo neutro
+        """
+        self.initial_rating = float(initial_rating)
+        self.home_advantage = float(home_advantage)
+
+        self._columns = {name: np.empty(INITIAL_CAPACITY, dtype=dtype)
+                         for name, dtype in HISTORY_COLUMNS.items()}
+        self.n_matches = 0
+
+        self.ratings: Dict[int, float] = {}
+        self.games: Dict[int, int] = {}
+        self.row_by_match: Dict[int, int] = {}
+        # Marca d'água (last_updated, id) do último jogo visto (keyset do sync)
+        self.last_updated: Optional[str] = None
+        self.last_id: Optional[int] = None
+
+    def __len__(self) -> int:
+        return self.n_matches
+
+    def column(self, name: str) -> np.ndarray:
+        """Visão (sem cópia) de uma coluna do histórico"""
+        return self._columns[name][:self.n_matches]
+
+    @classmethod
+    def from_dataframe(cls, matches_df: pd.DataFrame, **kwargs) -> "EloEngine":
+        """
+        Passada cronológica completa sobre um DataFrame de jogos
+
+        Args:
+            matches_df: colunas id, date, home_team_id, away_team_id,
+                        home_goals, away_goals (competition, neutral e
+                        last_updated opcionais)
+        """
+        engine = cls(**kwargs)
+        engine.add_matches(matches_df)
+        return engine
+
+    @classmethod
+    def from_database(cls, db: DatabaseManager, **kwargs) -> "EloEngine":
+        """Passada completa lendo todos os jogos do banco"""
+        with span("elo.build"):
+            engine = cls.from_dataframe(db.get_all_matches(), **kwargs)
+        logger.info(f"Elo calculado com {len(engine)} jogos e {len(engine.ratings)} seleções")
+        return engine
+
+    @classmethod
+    def load_or_build(cls, db: Optional[DatabaseManager] = None, path: Path = ELO_PATH) -> "EloEngine":
+        """Carregar estado salvo e aplicar jogos novos; sem estado, calcula tudo"""
+        db = db or DatabaseManager()
+        if Path(path).exists():
+            engine = cls.load(path)
+            engine.sync(db)
+        else:
+            engine = cls.from_database(db)
+        return engine
+
+    def add_matches(self, matches_df: pd.DataFrame) -> int:
+        """
+        Aplicar um lote de jogos (inserções ou correções)
+
+        Returns:
+            Número de jogos aplicados
+        """
+        if matches_df.empty:
+            return 0
+
+        matches_df = matches_df.dropna(subset=["home_goals", "away_goals"])
+        n = len(matches_df)
+        competitions = matches_df["competition"].to_numpy() if "competition" in matches_df.columns else [None] * n
+        neutrals = matches_df["neutral"].fillna(False).to_numpy() if "neutral" in matches_df.columns else [False] * n
+
+        records = [
+            self._record(match_id, date, home_id, away_id, home_goals, away_goals, competition, neutral)
+            for match_id, date, home_id, away_id, home_goals, away_goals, competition, neutral in zip(
+                matches_df["id"].to_numpy(),
+                matches_df["date"].to_numpy(),
+                matches_df["home_team_id"].to_numpy(),
+                matches_df["away_team_id"].to_numpy(),
+                matches_df["home_goals"].to_numpy(),
+                matches_df["away_goals"].to_numpy(),
+                competitions,
+                neutrals,
+            )
+        ]
+        self._apply_records(records)
+
+        current = (self.last_updated, self.last_id or 0) if self.last_updated else None
+        watermark = match_watermark(matches_df, current)
+        if watermark is not None:
+            self.last_updated, self.last_id = watermark
+
+        return n
+
+    def apply_match(self, match_id: int, date, home_team_id: int, away_team_id: int,
+                    home_goals: int, away_goals: int, competition: Optional[str] = None,
+                    neutral: bool = False, k: Optional[float] = None) -> float:
+        """
+        Aplicar um resultado
+
+        Jogo novo com (data, id) após o último jogo processado: O(1).
+        Correção de um jogo já aplicado ou jogo com data anterior: volta a
+        passada até a posição afetada e reaplica os jogos seguintes.
+
+        Returns:
+            Variação de rating do mandante
+        """
+        record = self._record(match_id, date, home_team_id, away_team_id, home_goals, away_goals,
+                              competition, neutral, k)
+        self._apply_records([record])
+        return float(self._columns["delta"][self.row_by_match[record[0]]])
+
+    def _record(self, match_id, date, home_team_id, away_team_id, home_goals, away_goals,
+                competition=None, neutral=False, k=None) -> Tuple:
+        """Registro de entrada na ordem de RECORD_COLUMNS"""
+        return (
+            int(match_id),
+            _to_day(date),
+            int(home_team_id),
+            int(away_team_id),
+            int(home_goals),
+            int(away_goals),
+            float(k if k is not None else match_importance(competition)),
+            bool(neutral),
+        )
+
+    def _position(self, record: Tuple) -> Optional[int]:
+        """
+        Primeira linha da passada afetada pelo registro
+
+        Returns:
+            None se o registro já está aplicado igual ou entra no fim
+        """
+        match_id, day = record[0], record[1]
+        row = self.row_by_match.get(match_id)
+        if row is not None:
+            stored = tuple(self._columns[name][row] for name in RECORD_COLUMNS)
+            if stored[2:] == record[2:] and (stored[1] == day or np.isnat(day)):
+                return self.n_matches  # sem mudança
+            if np.isnat(day):
+                return row
+            # Correção com data anterior: os jogos entre a nova e a antiga
+            # posição também precisam ser refeitos
+            return min(row, self._insert_position(day, match_id))
+
+        if self.n_matches == 0 or np.isnat(day):
+            return None
+        last = self.n_matches - 1
+        if (day, match_id) > (self._columns["date"][last], int(self._columns["match_id"][last])):
+            return None
+        return self._insert_position(day, match_id)
+
+    def _insert_position(self, day: np.datetime64, match_id: int) -> int:
+        """Linha em que (data, id) entra na ordem da passada"""
+        dates = self.column("date")
+        left = int(np.searchsorted(dates, day, side="left"))
+        right = int(np.searchsorted(dates, day, side="right"))
+        return left + int((self.column("match_id")[left:right] < match_id).sum())
+
+    def _apply_records(self, records: List[Tuple]):
+        """Aplicar registros com no máximo um retrocesso da passada"""
+        records = sorted(records, key=lambda r: (r[1], r[0]))
+        positions = [self._position(r) for r in records]
+        affected = [p for p in positions if p is not None]
+
+        if not affected or min(affected) >= self.n_matches:
+            # Caso comum: tudo entra no fim (O(1) por jogo)
+            for record, position in zip(records, positions):
+                if position is None:
+                    self._append(record)
+            return
+
+        changed = {r[0] for r, p in zip(records, positions) if p is None or p < self.n_matches}
+        pending = [r for r in self._rewind(min(affected)) if r[0] not in changed]
+        pending.extend(r for r in records if r[0] in changed)
+        pending.sort(key=lambda r: (r[1], r[0]))
+        incr("elo.replayed", len(pending))
+        for record in pending:
+            self._append(record)
+
+    def _ensure_capacity(self, size: int):
+        capacity = len(self._columns["match_id"])
+        if size <= capacity:
+            return
+        new_capacity = max(size, capacity * 2)
+        for name, values in self._columns.items():
+            grown = np.empty(new_capacity, dtype=values.dtype)
+            grown[:self.n_matches] = values[:self.n_matches]
+            self._columns[name] = grown
+
+    def _append(self, record: Tuple) -> float:
+        """Aplicar um jogo no fim da passada (O(1) amortizado)"""
+        match_id, day, home_id, away_id, home_goals, away_goals, k, neutral = record
+        home_before = self.ratings.get(home_id, self.initial_rating)
+        away_before = self.ratings.get(away_id, self.initial_rating)
+        delta = elo_delta(home_before, away_before, home_goals, away_goals, k, neutral, self.home_advantage)
+
+        self._ensure_capacity(self.n_matches + 1)
+        row = self.n_matches
+        columns = self._columns
+        for name, value in zip(RECORD_COLUMNS, record):
+            columns[name][row] = value
+        columns["home_before"][row] = home_before
+        columns["away_before"][row] = away_before
+        columns["delta"][row] = delta
+        self.n_matches += 1
+        self.row_by_match[match_id] = row
+
+        self.ratings[home_id] = home_before + delta
+        self.ratings[away_id] = away_before - delta
+        self.games[home_id] = self.games.get(home_id, 0) + 1
+        self.games[away_id] = self.games.get(away_id, 0) + 1
+        return delta
+
+    def _rewind(self, position: int) -> List[Tuple]:
+        """
+        Desfazer os jogos a partir de `position` (ratings voltam aos valores
+        "antes" gravados)
+
+        Returns:
+            Registros desfeitos em ordem cronológica, para reaplicação
+        """
+        sl = slice(position, self.n_matches)
+        columns = self._columns
+        home_ids = columns["home_team_id"][sl].tolist()
+        away_ids = columns["away_team_id"][sl].tolist()
+        home_before = columns["home_before"][sl].tolist()
+        away_before = columns["away_before"][sl].tolist()
+
+        # Do fim para o começo: o último valor escrito é o "antes" mais antigo
+        for i in range(len(home_ids) - 1, -1, -1):
+            self.ratings[home_ids[i]] = home_before[i]
+            self.ratings[away_ids[i]] = away_before[i]
+        for team_id in home_ids + away_ids:
+            self.games[team_id] -= 1
+        for team_id in [t for t in set(home_ids + away_ids) if self.games[t] == 0]:
+            del self.games[team_id]
+            del self.ratings[team_id]
+
+        match_ids = columns["match_id"][sl].tolist()
+        for match_id in match_ids:
+            del self.row_by_match[match_id]
+
+        pending = list(zip(
+            match_ids,
+            list(columns["date"][sl]),
+            home_ids,
+            away_ids,
+            columns["home_goals"][sl].tolist(),
+            columns["away_goals"][sl].tolist(),
+            columns["k"][sl].tolist(),
+            columns["neutral"][sl].tolist(),
+        ))
+        self.n_matches = position
+        return pending
+
+    def sync(self, db: DatabaseManager) -> int:
+        """
+        Aplicar apenas jogos inseridos/atualizados depois da marca
+        (last_updated, id) do último jogo visto
+
+        Returns:
+            Número de jogos aplicados
+        """
+        new_matches = db.get_all_matches(updated_after=self.last_updated, after_id=self.last_id)
+        applied = self.add_matches(new_matches)
+        if applied:
+            logger.info(f"Elo: {applied} jogos aplicados incrementalmente")
+        return applied
+
+    def rating(self, team_id: int) -> float:
+        """Rating atual (O(1))"""
+        return self.ratings.get(int(team_id), self.initial_rating)
+
+    def rating_at(self, team_id: int, date) -> float:
+        """Rating da seleção antes dos jogos da data informada"""
+        rows = self.team_rows(team_id)
+        if len(rows) == 0:
+            return self.initial_rating
+        day = _to_day(date)
+        position = int(np.searchsorted(self.column("date")[rows], day, side="left"))
+        if position == 0:
+            return self.initial_rating
+        return float(self._rating_after(rows[position - 1], team_id))
+
+    def team_rows(self, team_id: int) -> np.ndarray:
+        """Linhas do histórico de uma seleção (ordem cronológica)"""
+        team_id = int(team_id)
+        return np.flatnonzero((self.column("home_team_id") == team_id) | (self.column("away_team_id") == team_id))
+
+    def _rating_after(self, rows, team_id: int) -> np.ndarray:
+        is_home = self._columns["home_team_id"][rows] == team_id
+        before = np.where(is_home, self._columns["home_before"][rows], self._columns["away_before"][rows])
+        return before + np.where(is_home, self._columns["delta"][rows], -self._columns["delta"][rows])
+
+    def history(self, team_id: int) -> pd.DataFrame:
+        """Evolução do rating de uma seleção jogo a jogo"""
+        team_id = int(team_id)
+        rows = self.team_rows(team_id)
+        is_home = self._columns["home_team_id"][rows] == team_id
+        after = self._rating_after(rows, team_id)
+        return pd.DataFrame({
+            "match_id": self._columns["match_id"][rows],
+            "date": self._columns["date"][rows],
+            "opponent_id": np.where(is_home, self._columns["away_team_id"][rows],
+                                    self._columns["home_team_id"][rows]),
+            "is_home": is_home,
+            "rating_before": np.where(is_home, self._columns["home_before"][rows],
+                                      self._columns["away_before"][rows]),
+            "rating": after,
+        })
+
+    def ratings_frame(self) -> pd.DataFrame:
+        """Ratings atuais de todas as seleções (maior primeiro)"""
+        return pd.DataFrame({
+            "team_id": list(self.ratings.keys()),
+            "elo_rating": list(self.ratings.values()),
+            "games": [self.games.get(t, 0) for t in self.ratings],
+        }).sort_values("elo_rating", ascending=False).reset_index(drop=True)
+
+    def save(self, path: Path = ELO_PATH) -> Path:
+        """Gravar histórico e ratings (escrita atômica)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        team_ids = np.fromiter(self.ratings.keys(), dtype=np.int64, count=len(self.ratings))
+
+        arrays = {name: self.column(name) for name in HISTORY_COLUMNS}
+        arrays["team_ids"] = team_ids
+        arrays["team_ratings"] = np.array([self.ratings[t] for t in team_ids], dtype=np.float64)
+        arrays["team_games"] = np.array([self.games[t] for t in team_ids], dtype=np.int32)
+        arrays["params"] = np.array([self.initial_rating, self.home_advantage])
+        arrays["last_updated"] = np.array(self.last_updated or "")
+        arrays["last_id"] = np.array(-1 if self.last_id is None else self.last_id)
+
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path: Path = ELO_PATH) -> "EloEngine":
+        """Carregar estado salvo por save()"""
+        with np.load(path) as data:
+            initial_rating, home_advantage = data["params"]
+            engine = cls(initial_rating=float(initial_rating), home_advantage=float(home_advantage))
+            n = len(data["match_id"])
+            engine._ensure_capacity(n)
+            for name in HISTORY_COLUMNS:
+                engine._columns[name][:n] = data[name]
+            engine.n_matches = n
+
+            team_ids = data["team_ids"].tolist()
+            engine.ratings = dict(zip(team_ids, data["team_ratings"].tolist()))
+            engine.games = dict(zip(team_ids, data["team_games"].tolist()))
+            engine.last_updated = str(data["last_updated"]) or None
+            # Estados antigos sem last_id: keyset a partir do id 0 na mesma marca
+            last_id = int(data["last_id"]) if "last_id" in data.files else 0
+            engine.last_id = None if last_id < 0 else last_id
+
+        engine.row_by_match = {match_id: row for row, match_id in enumerate(engine.column("match_id").tolist())}
+        return engine
+
+    def write_team_ratings(self, db: DatabaseManager, team_ids: Optional[Iterable[int]] = None) -> int:
+        """
+        Gravar os ratings atuais em teams.elo_rating
+
+        Args:
+            team_ids: seleções a atualizar (padrão: todas)
+
+        Returns:
+            Número de linhas atualizadas
+        """
+        team_ids = list(self.ratings) if team_ids is None else [int(t) for t in team_ids]
+        values: List[Tuple[float, int]] = [(self.rating(t), t) for t in team_ids]
+
+        conn = sqlite3.connect(db.db_path)
+        try:
+            with conn:
+                cursor = conn.executemany("UPDATE teams SET elo_rating = ? WHERE id = ?", values)
+            return cursor.rowcount
+        finally:
+            conn.close()
+
+
+if __name__ == "__main__":
+    import argparse
+    from datetime import datetime
+
+    parser = argparse.ArgumentParser(description="Ratings Elo das seleções")
+    parser.add_argument("--rebuild", action="store_true", help="recalcular toda a passada")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("RATINGS ELO - SELEÇÕES")
+    print("=" * 80)
+
+    db = DatabaseManager()
+    start = datetime.now()
+    engine = EloEngine.from_database(db) if args.rebuild else EloEngine.load_or_build(db)
+    engine.save()
+    updated = engine.write_team_ratings(db)
+    elapsed = (datetime.now() - start).total_seconds()
+
+    names = dict(db.execute_query("SELECT id, name FROM teams"))
+    print(f"\n✅ {len(engine)} jogos | {len(engine.ratings)} seleções | {updated} ratings gravados "
+          f"em {elapsed:.1f} s")
+    print(f"\n🏆 Top {args.top}:")
+    for pos, row in enumerate(engine.ratings_frame().head(args.top).itertuples(), 1):
+        print(f"  {pos:3d}. {names.get(row.team_id, row.team_id)!s:30s} {row.elo_rating:7.0f} ({row.games} jogos)")
+    print(f"\n💾 {ELO_PATH}")
+    print("=" * 80)
@@ -0,0 +1,232 @@
+"""
+Índice de confrontos diretos (head-to-head) por par de seleções
+
+O índice é montado uma única vez a partir da tabela `matches` e guarda,
+para cada par não ordenado (min_id, max_id), os agregados do confronto e
+os offsets das linhas dos jogos. Consultas passam a ser O(1) e novos
+resultados são aplicados de forma incremental.
+"""
+
+from typing import Dict, List, Tuple, Optional
+import pandas as pd
+
+from utils import DatabaseManager, get_logger, match_watermark
+
+logger = get_logger(__name__)
+
+
+def pair_key(team1_id: int, team2_id: int) -> Tuple[int, int]:
+    """Chave do par não ordenado (min_id, max_id)"""
+    team1_id, team2_id = int(team1_id), int(team2_id)
+    return (team1_id, team2_id) if team1_id <= team2_id else (team2_id, team1_id)
+
+
+def _empty_pair() -> Dict:
+    """Agregados vazios de um par, sempre na perspectiva do menor ID"""
+    return {
+        "total_matches": 0,
+        "low_wins": 0,
+        "draws": 0,
+        "high_wins": 0,
+        "low_goals": 0,
+        "high_goals": 0,
+        "rows": [],
+    }
+
+
+class HeadToHeadIndex:
+    """Índice de confrontos diretos indexado por par não ordenado"""
+
+    def __init__(self):
+        """Inicializar índice vazio"""
+        # Colunas compactas dos jogos indexados (uma posição por offset)
+        self.match_ids: List[int] = []
+        self.home_ids: List[int] = []
+        self.away_ids: List[int] = []
+        self.home_goals: List[int] = []
+        self.away_goals: List[int] = []
+        self.dates: List[Optional[str]] = []
+
+        self.pairs: Dict[Tuple[int, int], Dict] = {}
+        self.row_by_match: Dict[int, int] = {}
+        # Marca d'água (last_updated, id) do último jogo visto (keyset do sync)
+        self.last_updated: Optional[str] = None
+        self.last_id: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self.row_by_match)
+
+    @classmethod
+    def from_dataframe(cls, matches_df: pd.DataFrame) -> "HeadToHeadIndex":
+        """
+        Construir índice a partir de um DataFrame de jogos
+
+        Args:
+            matches_df: DataFrame com colunas id, home_team_id, away_team_id,
+                        home_goals, away_goals (date/last_updated opcionais)
+
+        Returns:
+            Índice preenchido
+        """
+        index = cls()
+        index.add_matches(matches_df)
+        return index
+
+    @classmethod
+    def from_database(cls, db: DatabaseManager) -> "HeadToHeadIndex":
+        """Construir índice lendo todos os jogos do banco"""
+        index = cls.from_dataframe(db.get_all_matches())
+        logger.info(f"Índice H2H montado com {len(index)} jogos e {len(index.pairs)} pares")
+        return index
+
+    def add_matches(self, matches_df: pd.DataFrame) -> int:
+        """
+        Aplicar um lote de jogos ao índice (inserção ou atualização)
+
+        Returns:
+            Número de jogos aplicados
+        """
+        if matches_df.empty:
+            return 0
+
+        current = (self.last_updated, self.last_id or 0) if self.last_updated else None
+        watermark = match_watermark(matches_df, current)
+        if watermark is not None:
+            self.last_updated, self.last_id = watermark
+
+        matches_df = matches_df.dropna(subset=["home_goals", "away_goals"])
+        has_date = "date" in matches_df.columns
+
+        applied = 0
+        for row in zip(
+            matches_df["id"].to_numpy(),
+            matches_df["home_team_id"].to_numpy(),
+            matches_df["away_team_id"].to_numpy(),
+            matches_df["home_goals"].to_numpy(),
+            matches_df["away_goals"].to_numpy(),
+            matches_df["date"].to_numpy() if has_date else [None] * len(matches_df),
+        ):
+            self.upsert_match(*row)
+            applied += 1
+
+        return applied
+
+    def upsert_match(self, match_id: int, home_team_id: int, away_team_id: int,
+                     home_goals: int, away_goals: int, date: Optional[str] = None):
+        """
+        Inserir ou atualizar um jogo no índice em O(1)
+
+        Se o jogo já estiver indexado, a contribuição antiga é removida dos
+        agregados do par antes de aplicar o novo placar.
+        """
+        match_id = int(match_id)
+        row = self.row_by_match.get(match_id)
+
+        if row is None:
+            row = len(self.match_ids)
+            self.row_by_match[match_id] = row
+            self.match_ids.append(match_id)
+            self.home_ids.append(int(home_team_id))
+            self.away_ids.append(int(away_team_id))
+            self.home_goals.append(int(home_goals))
+            self.away_goals.append(int(away_goals))
+            self.dates.append(None if date is None else str(date))
+            self.pairs.setdefault(pair_key(home_team_id, away_team_id), _empty_pair())["rows"].append(row)
+        else:
+            old_key = pair_key(self.home_ids[row], self.away_ids[row])
+            self._apply(row, sign=-1)
+            new_key = pair_key(home_team_id, away_team_id)
+            if new_key != old_key:
+                self.pairs[old_key]["rows"].remove(row)
+                self.pairs.setdefault(new_key, _empty_pair())["rows"].append(row)
+            self.home_ids[row] = int(home_team_id)
+            self.away_ids[row] = int(away_team_id)
+            self.home_goals[row] = int(home_goals)
+            self.away_goals[row] = int(away_goals)
+            if date is not None:
+                self.dates[row] = str(date)
+
+        self._apply(row, sign=1)
+
+    def _apply(self, row: int, sign: int):
+        """Somar (sign=1) ou remover (sign=-1) um jogo dos agregados do par"""
+        home_id, away_id = self.home_ids[row], self.away_ids[row]
+        home_goals, away_goals = self.home_goals[row], self.away_goals[row]
+
+        # Perspectiva do menor ID
+        if home_id <= away_id:
+            low_goals, high_goals = home_goals, away_goals
+        else:
+            low_goals, high_goals = away_goals, home_goals
+
+        pair = self.pairs[pair_key(home_id, away_id)]
+        pair["total_matches"] += sign
+        pair["low_goals"] += sign * low_goals
+        pair["high_goals"] += sign * high_goals
+
+        if low_goals > high_goals:
+            pair["low_wins"] += sign
+        elif low_goals == high_goals:
+            pair["draws"] += sign
+        else:
+            pair["high_wins"] += sign
+
+    def sync(self, db: DatabaseManager) -> int:
+        """
+        Aplicar apenas jogos inseridos/atualizados depois da marca
+        (last_updated, id) do último jogo visto
+
+        Returns:
+            Número de jogos aplicados
+        """
+        new_matches = db.get_all_matches(updated_after=self.last_updated, after_id=self.last_id)
+        applied = self.add_matches(new_matches)
+        if applied:
+            logger.info(f"Índice H2H: {applied} jogos aplicados incrementalmente")
+        return applied
+
+    def get(self, team1_id: int, team2_id: int) -> Dict:
+        """
+        Estatísticas do confronto na perspectiva de team1 (O(1))
+
+        Returns:
+            Dicionário no mesmo formato de DataProcessor.get_head_to_head
+        """
+        pair = self.pairs.get(pair_key(team1_id, team2_id))
+
+        if pair is None:
+            return {
+                "total_matches": 0,
+                "team1_wins": 0,
+                "team1_draws": 0,
+                "team1_losses": 0,
+                "team1_goals_for": 0,
+                "team1_goals_against": 0,
+            }
+
+        team1_is_low = int(team1_id) <= int(team2_id)
+        return {
+            "total_matches": pair["total_matches"],
+            "team1_wins": pair["low_wins"] if team1_is_low else pair["high_wins"],
+            "team1_draws": pair["draws"],
+            "team1_losses": pair["high_wins"] if team1_is_low else pair["low_wins"],
+            "team1_goals_for": pair["low_goals"] if team1_is_low else pair["high_goals"],
+            "team1_goals_against": pair["high_goals"] if team1_is_low else pair["low_goals"],
+        }
+
+    def get_rows(self, team1_id: int, team2_id: int) -> List[int]:
+        """Offsets das linhas dos jogos entre as duas seleções"""
+        pair = self.pairs.get(pair_key(team1_id, team2_id))
+        return list(pair["rows"]) if pair else []
+
+    def get_matches(self, team1_id: int, team2_id: int) -> pd.DataFrame:
+        """Jogos entre as duas seleções como DataFrame"""
+        rows = self.get_rows(team1_id, team2_id)
+        return pd.DataFrame({
+            "id": [self.match_ids[r] for r in rows],
+            "date": [self.dates[r] for r in rows],
+            "home_team_id": [self.home_ids[r] for r in rows],
+            "away_team_id": [self.away_ids[r] for r in rows],
+            "home_goals": [self.home_goals[r] for r in rows],
+            "away_goals": [self.away_goals[r] for r in rows],
+        })
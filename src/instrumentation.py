@@ -0,0 +1,367 @@
+"""
+Instrumentação dos caminhos críticos (tempos, contadores e profiling)
+
+Spans aninhados medem o tempo de consultas ao banco, chamadas de API,
+inferência dos modelos e rodadas de simulação. As medições são agregadas
+por caminho (ex.: "simulation.round/model.predict") em um registro por
+execução/requisição, com custo de um perf_counter por entrada e saída.
+
+Uso:
+    from instrumentation import span, incr, run
+
+    with run("auto_update") as recorder:
+        with span("db.query"):
+            ...
+        incr("db.rows", len(rows))
+    recorder.export_json()
+
+Variáveis de ambiente:
+    INSTRUMENTATION=0                   desliga spans e contadores
+    INSTRUMENTATION_PROFILE=cprofile    ativa cProfile em profile_run()
+    INSTRUMENTATION_PROFILE=sample      ativa o profiler por amostragem
+"""
+
+import cProfile
+import functools
+import io
+import json
+import logging
+import pstats
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from config import INSTRUMENTATION_ENABLED, INSTRUMENTATION_PROFILE, INSTRUMENTATION_DIR
+
+logger = logging.getLogger(__name__)
+
+# Separador dos nomes no caminho de um span aninhado
+PATH_SEPARATOR = "/"
+
+_perf_counter = time.perf_counter
+
+
+class SpanStats:
+    """Agregado de um caminho de span"""
+
+    __slots__ = ("count", "total", "min", "max", "errors")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self.errors = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_s": self.total,
+            "mean_ms": self.total * 1000 / self.count if self.count else 0.0,
+            "min_ms": self.min * 1000 if self.count else 0.0,
+            "max_ms": self.max * 1000,
+            "errors": self.errors,
+        }
+
+
+class Recorder:
+    """Registro de spans e contadores de uma execução/requisição"""
+
+    def __init__(self, name: str = "default"):
+        self.name = name
+        self.started_at = datetime.now()
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        self.spans: Dict[Tuple[str, ...], SpanStats] = {}
+        self.counters: Dict[str, float] = {}
+        self.profile: Optional[Dict[str, Any]] = None
+
+    def record(self, path: Tuple[str, ...], elapsed: float, error: bool = False):
+        """Adicionar uma medição ao caminho"""
+        # Atualização inline: este é o caminho quente de todos os spans
+        with self._lock:
+            stats = self.spans.get(path)
+            if stats is None:
+                stats = self.spans[path] = SpanStats()
+            stats.count += 1
+            stats.total += elapsed
+            if elapsed < stats.min:
+                stats.min = elapsed
+            if elapsed > stats.max:
+                stats.max = elapsed
+            if error:
+                stats.errors += 1
+
+    def incr(self, name: str, value: float = 1):
+        """Incrementar contador"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def reset(self):
+        """Descartar medições"""
+        with self._lock:
+            self.spans.clear()
+            self.counters.clear()
+            self.profile = None
+            self.started_at = datetime.now()
+            self._start = time.perf_counter()
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """
+        Spans em linhas planas ordenadas pela árvore
+
+        Cada linha tem 'path', 'name', 'depth' e os agregados de SpanStats;
+        'self_s' é o tempo total menos o dos spans filhos diretos.
+        """
+        with self._lock:
+            items = [(path, stats.to_dict()) for path, stats in self.spans.items()]
+
+        children_total: Dict[Tuple[str, ...], float] = {}
+        for path, stats in items:
+            if len(path) > 1:
+                children_total[path[:-1]] = children_total.get(path[:-1], 0.0) + stats["total_s"]
+
+        rows = []
+        for path, stats in sorted(items, key=lambda item: item[0]):
+            rows.append({
+                "path": PATH_SEPARATOR.join(path),
+                "name": path[-1],
+                "depth": len(path) - 1,
+                **stats,
+                "self_s": stats["total_s"] - children_total.get(path, 0.0),
+            })
+        return rows
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Resumo serializável da execução"""
+        with self._lock:
+            counters = dict(self.counters)
+        return {
+            "run": self.name,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "wall_s": time.perf_counter() - self._start,
+            "spans": self.rows(),
+            "counters": counters,
+            "profile": self.profile,
+        }
+
+    def export_json(self, path: Optional[Path] = None) -> Path:
+        """
+        Gravar o resumo em JSON
+
+        Args:
+            path: arquivo de destino (padrão: INSTRUMENTATION_DIR/<run>_<data>.json)
+
+        Returns:
+            Caminho gravado
+        """
+        if path is None:
+            INSTRUMENTATION_DIR.mkdir(parents=True, exist_ok=True)
+            safe_name = "".join(c if c.isalnum() or c in "-_" else "_" for c in self.name)
+            path = INSTRUMENTATION_DIR / f"{safe_name}_{self.started_at.strftime('%Y%m%d_%H%M%S')}.json"
+        path = Path(path)
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        return path
+
+    def report(self, limit: int = 30) -> str:
+        """Tabela de texto com os spans mais caros (para logs/terminal)"""
+        lines = [f"{'Span':50s} {'N':>8s} {'Total':>10s} {'Média':>10s} {'Máx':>10s}"]
+        for row in self.rows()[:limit]:
+            label = "  " * row["depth"] + row["name"]
+            lines.append(f"{label:50s} {row['count']:8d} {row['total_s']:9.3f}s "
+                         f"{row['mean_ms']:8.2f}ms {row['max_ms']:8.2f}ms")
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"{name:50s} {value:>8g}")
+        return "\n".join(lines)
+
+
+# Registro padrão (processo inteiro) e registro/caminho correntes por contexto
+_default_recorder = Recorder("process")
+_current_recorder: ContextVar[Optional[Recorder]] = ContextVar("instrumentation_recorder", default=None)
+_current_path: ContextVar[Tuple[str, ...]] = ContextVar("instrumentation_path", default=())
+
+
+def get_recorder() -> Recorder:
+    """Registro ativo no contexto atual"""
+    return _current_recorder.get() or _default_recorder
+
+
+def start_run(name: str) -> Recorder:
+    """
+    Iniciar um novo registro no contexto atual (sem bloco with)
+
+    Útil em scripts como o Streamlit, onde a página inteira é a requisição.
+    """
+    recorder = Recorder(name)
+    _current_recorder.set(recorder)
+    _current_path.set(())
+    return recorder
+
+
+@contextmanager
+def run(name: str) -> Iterator[Recorder]:
+    """Registro próprio para uma execução/requisição"""
+    recorder = Recorder(name)
+    recorder_token = _current_recorder.set(recorder)
+    path_token = _current_path.set(())
+    try:
+        yield recorder
+    finally:
+        _current_path.reset(path_token)
+        _current_recorder.reset(recorder_token)
+
+
+class span:
+    """
+    Span de tempo aninhável (context manager ou decorator)
+
+    Exemplo:
+        with span("db.query"):
+            ...
+
+        @span("model.predict")
+        def predict(...):
+            ...
+    """
+
+    __slots__ = ("name", "_token", "_start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        if INSTRUMENTATION_ENABLED:
+            self._token = _current_path.set(_current_path.get() + (self.name,))
+            self._start = _perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if INSTRUMENTATION_ENABLED:
+            elapsed = _perf_counter() - self._start
+            path = _current_path.get()
+            _current_path.reset(self._token)
+            (_current_recorder.get() or _default_recorder).record(path, elapsed, exc_type is not None)
+        return False
+
+    def __call__(self, fn: Callable) -> Callable:
+        name = self.name
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+
+
+def incr(name: str, value: float = 1):
+    """Incrementar contador no registro ativo"""
+    if INSTRUMENTATION_ENABLED:
+        get_recorder().incr(name, value)
+
+
+class SamplingProfiler:
+    """
+    Profiler por amostragem: lê a pilha da thread alvo a cada `interval`
+    segundos em uma thread separada (custo independe do número de chamadas)
+    """
+
+    def __init__(self, interval: float = 0.005, thread_id: Optional[int] = None, max_depth: int = 40):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.max_depth = max_depth
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = [f"{f.name} ({Path(f.filename).name}:{f.lineno})"
+                     for f in traceback.extract_stack(frame, limit=self.max_depth)]
+            self.stacks[";".join(stack)] += 1
+            self.samples += 1
+
+    def start(self) -> "SamplingProfiler":
+        self._thread = threading.Thread(target=self._sample, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def top_functions(self, limit: int = 25) -> List[Dict[str, Any]]:
+        """Funções mais amostradas no topo da pilha (tempo próprio)"""
+        leaf = Counter()
+        for stack, count in self.stacks.items():
+            leaf[stack.rsplit(";", 1)[-1]] += count
+        total = max(self.samples, 1)
+        return [{"function": fn, "samples": n, "share": n / total} for fn, n in leaf.most_common(limit)]
+
+    def collapsed(self) -> str:
+        """Pilhas no formato 'collapsed' (entrada de flamegraph.pl/speedscope)"""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+
+@contextmanager
+def profile_run(mode: Optional[str] = INSTRUMENTATION_PROFILE, output_dir: Optional[Path] = None,
+                limit: int = 25) -> Iterator[Optional[Any]]:
+    """
+    Profiling opcional de um bloco (desligado por padrão)
+
+    Args:
+        mode: None (desligado), "cprofile" (determinístico) ou "sample"
+        output_dir: onde gravar .prof / .collapsed (padrão: INSTRUMENTATION_DIR)
+        limit: funções no resumo anexado ao registro ativo
+
+    O resumo das funções mais caras vai para Recorder.profile e aparece no
+    JSON exportado.
+    """
+    if not mode:
+        yield None
+        return
+
+    recorder = get_recorder()
+    output_dir = Path(output_dir or INSTRUMENTATION_DIR)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    safe_name = "".join(c if c.isalnum() or c in "-_" else "_" for c in recorder.name)
+
+    if mode == "cprofile":
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield profiler
+        finally:
+            profiler.disable()
+            path = output_dir / f"{safe_name}_{stamp}.prof"
+            profiler.dump_stats(str(path))
+            buffer = io.StringIO()
+            pstats.Stats(profiler, stream=buffer).sort_stats("cumulative").print_stats(limit)
+            recorder.profile = {"mode": mode, "file": str(path), "top": buffer.getvalue()}
+            logger.info(f"Perfil cProfile gravado em {path}")
+    elif mode == "sample":
+        profiler = SamplingProfiler().start()
+        try:
+            yield profiler
+        finally:
+            profiler.stop()
+            path = output_dir / f"{safe_name}_{stamp}.collapsed"
+            path.write_text(profiler.collapsed())
+            recorder.profile = {"mode": mode, "file": str(path), "samples": profiler.samples,
+                                "top": profiler.top_functions(limit)}
+            logger.info(f"Perfil por amostragem gravado em {path} ({profiler.samples} amostras)")
+    else:
+        raise ValueError(f"Modo de profiling desconhecido: {mode}")
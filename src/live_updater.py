@@ -9,6 +9,7 @@ from typing import List, Dict, Optional
 import logging
 
 from data_collection import APIFootballCollector
+from elo import EloEngine
 from utils import DatabaseManager, get_logger
 from config import WORLD_CUP_2026_ID
 
@@ -22,6 +23,29 @@ class LiveUpdater:
         """Inicializar atualizador"""
         self.collector = APIFootballCollector()
         self.db = DatabaseManager()
+        self._elo: Optional[EloEngine] = None
+
+    @property
+    def elo(self) -> EloEngine:
+        """Ratings Elo (carregados sob demanda)"""
+        if self._elo is None:
+            self._elo = EloEngine.load_or_build(self.db)
+        return self._elo
+
+    def _update_elo(self, match_id: int, match_data: Dict, home_goals: int, away_goals: int):
+        """Aplicar o resultado ao Elo em O(1) e gravar os novos ratings"""
+        try:
+            home_id = match_data["teams"]["home"]["id"]
+            away_id = match_data["teams"]["away"]["id"]
+            self.elo.apply_match(
+                match_id, match_data["fixture"]["date"], home_id, away_id, home_goals, away_goals,
+                competition=match_data.get("league", {}).get("name")
+            )
+            self.elo.save()
+            self.elo.write_team_ratings(self.db, [home_id, away_id])
+        except Exception as e:
+            # Falha no Elo não invalida a atualização do resultado
+            logger.error(f"Erro ao atualizar Elo do jogo {match_id}: {e}")
 
     def update_match_results(self, match_id: int) -> bool:
         """
@@ -61,6 +85,7 @@ class LiveUpdater:
             """
             self.db.execute_update(query, (home_goals, away_goals, datetime.now(), match_id))
             logger.info(f"Jogo {match_id} atualizado: {home_goals} x {away_goals}")
+            self._update_elo(match_id, match_data, home_goals, away_goals)
             return True
         
         return False
@@ -10,6 +10,7 @@ from itertools import combinations
 import random
 
 from utils import DatabaseManager, get_logger
+from instrumentation import span
 from data_processing import DataProcessor
 from config import CONFIDENCE_INTERVAL, BOOTSTRAP_SAMPLES
 
@@ -75,6 +76,7 @@ class MatchPredictor:
         
         return expected_goals, std_dev
 
+    @span("model.predict")
     def predict_match_score(self, home_team_id: int, away_team_id: int) -> Dict:
         """
         Prever placar de um jogo
@@ -284,7 +286,8 @@ class PodiumPredictor:
         
         for _ in range(n_simulations):
             # Simular mata-mata completo
-            champion, runner_up, third = self._simulate_knockout_stage(qualified_teams)
+            with span("simulation.round"):
+                champion, runner_up, third = self._simulate_knockout_stage(qualified_teams)
             
             if champion:
                 podium_counts[champion]["champion"] += 1
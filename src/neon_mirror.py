@@ -0,0 +1,243 @@
+"""
+Réplica incremental do Neon PostgreSQL no SQLite local
+
+Copia para o banco do DatabaseManager apenas as linhas de `teams`,
+`matches` e `update_log` alteradas desde a última marca d'água de cada
+tabela. Cada página é gravada em uma única transação junto com o estado
+da sincronização (tabela `sync_state`), então uma execução interrompida
+recomeça exatamente de onde parou. A marca d'água do Neon (updated_at) fica
+só em `sync_state`; `last_updated` local é a hora da cópia, como nas demais
+escritas locais.
+
+Uso:
+    python src/neon_mirror.py            # usa NEON_DATABASE_URL do .env
+    python src/neon_mirror.py --full     # recomeça do zero
+"""
+
+import sqlite3
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import NEON_DATABASE_URL, MIRROR_BATCH_SIZE
+from utils import DatabaseManager, get_logger
+
+logger = get_logger(__name__)
+
+
+# Tabelas replicadas: colunas lidas no Neon, expressão da marca d'água e
+# upsert no SQLite (colunas locais como fifa_rank/elo_rating são preservadas)
+MIRROR_TABLES: Dict[str, Dict[str, str]] = {
+    "teams": {
+        "columns": "id, name, country",
+        "watermark": "updated_at",
+        "upsert": """
+            INSERT INTO teams (id, name, country, last_updated)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                name = excluded.name,
+                country = excluded.country,
+                last_updated = excluded.last_updated
+        """,
+    },
+    "matches": {
+        "columns": "id, date, home_team_id, away_team_id, home_goals, away_goals, competition, stage",
+        "watermark": "updated_at",
+        "upsert": """
+            INSERT INTO matches
+            (id, date, home_team_id, away_team_id, home_goals, away_goals, competition, stage, last_updated)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                date = excluded.date,
+                home_team_id = excluded.home_team_id,
+                away_team_id = excluded.away_team_id,
+                home_goals = excluded.home_goals,
+                away_goals = excluded.away_goals,
+                competition = excluded.competition,
+                stage = excluded.stage,
+                last_updated = excluded.last_updated
+        """,
+    },
+    "update_log": {
+        "columns": "id, update_type, records_added, records_updated, api_requests, status, "
+                   "error_message, started_at, completed_at",
+        # Linhas do log são reescritas ao concluir a atualização
+        "watermark": "COALESCE(completed_at, started_at)",
+        "upsert": """
+            INSERT OR REPLACE INTO update_log
+            (id, update_type, records_added, records_updated, api_requests, status,
+             error_message, started_at, completed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+    },
+}
+
+
+def _to_sqlite(value: Any) -> Any:
+    """Converter tipos do driver Postgres para tipos nativos do SQLite"""
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+class NeonMirror:
+    """Replicador incremental Neon -> SQLite"""
+
+    def __init__(self, source: Any = None, db: Optional[DatabaseManager] = None,
+                 batch_size: int = MIRROR_BATCH_SIZE, placeholder: str = "%s"):
+        """
+        Inicializar replicador
+
+        Args:
+            source: conexão DB-API com o Postgres ou URL de conexão
+                    (padrão: NEON_DATABASE_URL). Qualquer Postgres local serve
+                    como substituto do Neon em testes.
+            db: banco local de destino (padrão: DatabaseManager())
+            batch_size: linhas por página/transação
+            placeholder: marcador de parâmetros do driver de origem
+        """
+        self.source = source
+        self.db = db or DatabaseManager()
+        self.batch_size = batch_size
+        self.placeholder = placeholder
+
+    def _connect(self):
+        """Abrir conexão com a origem (lazy)"""
+        if self.source is not None and not isinstance(self.source, str):
+            return self.source
+
+        url = self.source or NEON_DATABASE_URL
+        if not url:
+            raise ValueError("NEON_DATABASE_URL não configurada (.env)")
+
+        import psycopg2
+        self.source = psycopg2.connect(url, connect_timeout=10)
+        return self.source
+
+    def get_sync_state(self, table: str) -> Tuple[Optional[str], Optional[int]]:
+        """Marca d'água (valor, último id) de uma tabela"""
+        rows = self.db.execute_query(
+            "SELECT watermark, last_id FROM sync_state WHERE table_name = ?", (table,)
+        )
+        return rows[0] if rows else (None, None)
+
+    def reset(self, table: Optional[str] = None):
+        """Apagar o estado de sincronização (força cópia completa)"""
+        if table is None:
+            self.db.execute_update("DELETE FROM sync_state")
+        else:
+            self.db.execute_update("DELETE FROM sync_state WHERE table_name = ?", (table,))
+
+    def _fetch_page(self, table: str, watermark: Optional[str], last_id: Optional[int]) -> List[tuple]:
+        """Próxima página de linhas alteradas (keyset por marca d'água, id)"""
+        spec = MIRROR_TABLES[table]
+        p = self.placeholder
+
+        query = f"SELECT {spec['columns']}, {spec['watermark']} AS sync_watermark FROM {table}"
+        params: tuple = ()
+        if watermark is not None:
+            query += f" WHERE ({spec['watermark']}, id) > ({p}, {p})"
+            params = (watermark, last_id or 0)
+        query += f" ORDER BY {spec['watermark']}, id LIMIT {int(self.batch_size)}"
+
+        cursor = self._connect().cursor()
+        try:
+            cursor.execute(query, params)
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def _apply_page(self, table: str, rows: List[tuple]) -> Tuple[str, int]:
+        """Gravar uma página e o novo estado na mesma transação"""
+        spec = MIRROR_TABLES[table]
+        values = [tuple(_to_sqlite(v) for v in row) for row in rows]
+
+        # teams/matches: last_updated local recebe a hora local da cópia, não o
+        # updated_at do Neon (que fica só em sync_state); assim os consumidores
+        # locais com keyset em last_updated (índice H2H, Elo) veem a linha
+        # mesmo que o Neon a tenha carimbado antes da última escrita local
+        synced_at = datetime.now().isoformat(sep=" ")
+        if table == "update_log":
+            values = [row[:-1] for row in values]
+        else:
+            values = [row[:-1] + (synced_at,) for row in values]
+        watermark = str(_to_sqlite(rows[-1][-1]))
+        last_id = int(rows[-1][0])
+
+        conn = sqlite3.connect(self.db.db_path)
+        try:
+            with conn:
+                conn.executemany(spec["upsert"], values)
+                conn.execute("""
+                    INSERT INTO sync_state (table_name, watermark, last_id, rows_synced, synced_at)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(table_name) DO UPDATE SET
+                        watermark = excluded.watermark,
+                        last_id = excluded.last_id,
+                        rows_synced = sync_state.rows_synced + excluded.rows_synced,
+                        synced_at = excluded.synced_at
+                """, (table, watermark, last_id, len(rows), synced_at))
+        finally:
+            conn.close()
+
+        return watermark, last_id
+
+    def sync_table(self, table: str) -> int:
+        """
+        Replicar as linhas alteradas de uma tabela
+
+        Returns:
+            Número de linhas copiadas
+        """
+        watermark, last_id = self.get_sync_state(table)
+        copied = 0
+
+        while True:
+            rows = self._fetch_page(table, watermark, last_id)
+            if not rows:
+                break
+            watermark, last_id = self._apply_page(table, rows)
+            copied += len(rows)
+            if len(rows) < self.batch_size:
+                break
+
+        logger.info(f"Réplica {table}: {copied} linhas copiadas (marca d'água {watermark})")
+        return copied
+
+    def sync(self) -> Dict[str, int]:
+        """
+        Replicar todas as tabelas (teams antes de matches por causa das FKs)
+
+        Returns:
+            Dicionário {tabela: linhas copiadas}
+        """
+        return {table: self.sync_table(table) for table in MIRROR_TABLES}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Réplica incremental Neon -> SQLite")
+    parser.add_argument("--full", action="store_true", help="ignorar marcas d'água e copiar tudo")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("RÉPLICA INCREMENTAL NEON -> SQLITE")
+    print("=" * 80)
+
+    mirror = NeonMirror()
+    if args.full:
+        mirror.reset()
+
+    start = datetime.now()
+    summary = mirror.sync()
+    elapsed = (datetime.now() - start).total_seconds()
+
+    for table, copied in summary.items():
+        print(f"  ✅ {table:12s} {copied:8d} linhas")
+    print(f"\n⏱️  Concluído em {elapsed:.1f} s -> {mirror.db.db_path}")
+    print("=" * 80)
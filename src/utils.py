@@ -6,10 +6,11 @@ import logging
 import sqlite3
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Tuple
 
 import pandas as pd
 from config import LOG_LEVEL, LOG_FORMAT, DATABASE_PATH
+from instrumentation import span, incr
 
 # Configurar logging
 logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
@@ -64,6 +65,9 @@ class DatabaseManager:
             )
         """)
 
+        # Sincronização incremental (índice H2H, Elo) filtra por last_updated
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_matches_last_updated ON matches(last_updated)")
+
         # Tabela de previsões
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS predictions (
@@ -80,27 +84,57 @@ class DatabaseManager:
             )
         """)
 
+        # Log de atualizações (replicado do Neon)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS update_log (
+                id INTEGER PRIMARY KEY,
+                update_type TEXT,
+                records_added INTEGER,
+                records_updated INTEGER,
+                api_requests INTEGER,
+                status TEXT,
+                error_message TEXT,
+                started_at TIMESTAMP,
+                completed_at TIMESTAMP
+            )
+        """)
+
+        # Estado da réplica do Neon (marca d'água por tabela)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS sync_state (
+                table_name TEXT PRIMARY KEY,
+                watermark TEXT,
+                last_id INTEGER,
+                rows_synced INTEGER DEFAULT 0,
+                synced_at TIMESTAMP
+            )
+        """)
+
         conn.commit()
         conn.close()
         logger.info(f"Banco de dados inicializado em {self.db_path}")
 
     def execute_query(self, query: str, params: tuple = ()) -> List[tuple]:
         """Executar query SELECT"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(query, params)
-        results = cursor.fetchall()
-        conn.close()
+        with span("db.query"):
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            results = cursor.fetchall()
+            conn.close()
+        incr("db.rows_read", len(results))
         return results
 
     def execute_update(self, query: str, params: tuple = ()) -> int:
         """Executar query INSERT/UPDATE/DELETE"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(query, params)
-        conn.commit()
-        rows_affected = cursor.rowcount
-        conn.close()
+        with span("db.update"):
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            conn.commit()
+            rows_affected = cursor.rowcount
+            conn.close()
+        incr("db.rows_written", max(rows_affected, 0))
         return rows_affected
 
     def insert_team(self, team_id: int, name: str, country: str, 
@@ -139,20 +173,82 @@ class DatabaseManager:
             ORDER BY m.date DESC
             LIMIT ?
         """
-        conn = sqlite3.connect(self.db_path)
-        df = pd.read_sql_query(query, conn, params=(team_id, team_id, limit))
-        conn.close()
+        with span("db.query"):
+            conn = sqlite3.connect(self.db_path)
+            df = pd.read_sql_query(query, conn, params=(team_id, team_id, limit))
+            conn.close()
+        incr("db.rows_read", len(df))
+        return df
+
+    def get_all_matches(self, updated_after: Optional[str] = None,
+                        after_id: Optional[int] = None) -> pd.DataFrame:
+        """
+        Obter todos os jogos (opcionalmente apenas os alterados após uma marca)
+
+        Args:
+            updated_after: Marca d'água de last_updated (None = todos)
+            after_id: id do último jogo visto na marca; com ele o filtro vira o
+                      keyset (last_updated, id) > (marca, id) e jogos gravados
+                      com o mesmo last_updated da marca não se perdem
+
+        Returns:
+            DataFrame com os jogos ordenados por data
+        """
+        query = """
+            SELECT id, date, home_team_id, away_team_id, home_goals, away_goals,
+                   competition, stage, last_updated
+            FROM matches
+        """
+        params: tuple = ()
+        if updated_after is not None and after_id is not None:
+            query += " WHERE (last_updated, id) > (?, ?)"
+            params = (updated_after, int(after_id))
+        elif updated_after is not None:
+            query += " WHERE last_updated > ?"
+            params = (updated_after,)
+        query += " ORDER BY date, id"
+
+        with span("db.query"):
+            conn = sqlite3.connect(self.db_path)
+            df = pd.read_sql_query(query, conn, params=params)
+            conn.close()
+        incr("db.rows_read", len(df))
         return df
 
     def get_all_teams(self) -> pd.DataFrame:
         """Obter todas as seleções"""
         query = "SELECT * FROM teams ORDER BY fifa_rank"
-        conn = sqlite3.connect(self.db_path)
-        df = pd.read_sql_query(query, conn)
-        conn.close()
+        with span("db.query"):
+            conn = sqlite3.connect(self.db_path)
+            df = pd.read_sql_query(query, conn)
+            conn.close()
+        incr("db.rows_read", len(df))
         return df
 
 
+def match_watermark(matches_df: pd.DataFrame,
+                    current: Optional[Tuple[str, int]] = None) -> Optional[Tuple[str, int]]:
+    """
+    Maior (last_updated, id) entre um lote de jogos e a marca atual
+
+    Args:
+        matches_df: DataFrame com colunas id e last_updated
+        current: marca (last_updated, id) já vista (None = nenhuma)
+
+    Returns:
+        Marca para o keyset de get_all_matches(updated_after, after_id)
+    """
+    if "last_updated" not in matches_df.columns or matches_df.empty:
+        return current
+    rows = matches_df.dropna(subset=["last_updated"])
+    if rows.empty:
+        return current
+    latest = max(zip(rows["last_updated"].astype(str), rows["id"].astype(int)))
+    if current is None or latest > current:
+        return latest
+    return current
+
+
 def calculate_team_stats(matches_df: pd.DataFrame, team_id: int) -> Dict[str, Any]:
     """
     Calcular estatísticas de uma seleção baseado em histórico de jogos
@@ -7,11 +7,13 @@ import streamlit as st
 import pandas as pd
 import psycopg2
 from datetime import datetime
+import json
 import sys
 import os
 
 # Adicionar diretório src ao path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+from instrumentation import span, start_run
 
 # Importar modelo ML - Voting Soft Ensemble (MELHOR MODELO)
 try:
@@ -36,6 +38,9 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Registro de tempos desta execução da página (painel de depuração na sidebar)
+run_recorder = start_run("streamlit")
+
 # Título
 st.title("⚽ Sistema de Análise - Copa do Mundo 2026")
 st.markdown("---")
@@ -68,54 +73,91 @@ def get_connection():
         st.error(f"❌ Erro ao conectar ao banco: {e}")
         return None
 
+# Cache colunar local de jogos (match_cache.py, sincronizado pelo pipeline diário)
+@st.cache_resource(ttl=300)
+def get_match_cache():
+    """Jogos e times do cache local (memory-map) ou None se o cache não existe"""
+    try:
+        from match_cache import load_matches
+        return load_matches(missing_ok=True)
+    except Exception:
+        return None
+
 # Função para buscar dados
 @st.cache_data(ttl=3600)
 def get_teams():
-    """Busca lista de times"""
+    """Busca lista de times (cache local; Neon se o cache não existe)"""
+    matches = get_match_cache()
+    if matches is not None:
+        teams = sorted(matches['team_names'].items(), key=lambda item: item[1])
+        return pd.DataFrame(teams, columns=['id', 'name'])
+
     conn = get_connection()
     if not conn:
         return []
     
     try:
-        df = pd.read_sql("SELECT id, name FROM teams ORDER BY name", conn)
+        with span("db.query"):
+            df = pd.read_sql("SELECT id, name FROM teams ORDER BY name", conn)
         return df
     except Exception as e:
         st.error(f"Erro ao buscar times: {e}")
         return pd.DataFrame()
 
+# Consulta original com OR-join (bancos criados antes de team_match_perspective)
+LEGACY_TEAM_MATCHES_QUERY = """
+SELECT 
+    date,
+    CASE 
+        WHEN home_team_id = %(team_id)s THEN home_goals
+        ELSE away_goals
+    END as goals_scored,
+    CASE 
+        WHEN home_team_id = %(team_id)s THEN away_goals
+        ELSE home_goals
+    END as goals_conceded,
+    CASE 
+        WHEN (home_team_id = %(team_id)s AND home_goals > away_goals) OR
+             (away_team_id = %(team_id)s AND away_goals > home_goals) THEN 'W'
+        WHEN home_goals = away_goals THEN 'D'
+        ELSE 'L'
+    END as result
+FROM matches
+WHERE home_team_id = %(team_id)s OR away_team_id = %(team_id)s
+ORDER BY date DESC
+LIMIT 50
+"""
+
 @st.cache_data(ttl=3600)
 def get_team_stats(team_id):
-    """Busca estatísticas de um time"""
+    """Busca estatísticas de um time (cache local; Neon se o cache não existe)"""
+    matches = get_match_cache()
+    if matches is not None:
+        from snapshot_builder import team_stats_from_cache
+        name = matches['team_names'].get(int(team_id))
+        return team_stats_from_cache([name], matches).get(name) if name else None
+
     conn = get_connection()
     if not conn:
         return None
     
     try:
-        # Buscar jogos do time
-        query = f"""
-        SELECT 
-            date,
-            CASE 
-                WHEN home_team_id = {team_id} THEN home_goals
-                ELSE away_goals
-            END as goals_scored,
-            CASE 
-                WHEN home_team_id = {team_id} THEN away_goals
-                ELSE home_goals
-            END as goals_conceded,
-            CASE 
-                WHEN (home_team_id = {team_id} AND home_goals > away_goals) OR
-                     (away_team_id = {team_id} AND away_goals > home_goals) THEN 'W'
-                WHEN home_goals = away_goals THEN 'D'
-                ELSE 'L'
-            END as result
-        FROM matches
-        WHERE home_team_id = {team_id} OR away_team_id = {team_id}
+        # Buscar jogos do time (tabela de perspectiva: range scan por team_id)
+        query = """
+        SELECT date, goals_for as goals_scored, goals_against as goals_conceded, result
+        FROM team_match_perspective
+        WHERE team_id = %(team_id)s
         ORDER BY date DESC
         LIMIT 50
         """
         
-        df = pd.read_sql(query, conn)
+        try:
+            with span("db.query"):
+                df = pd.read_sql(query, conn, params={'team_id': int(team_id)})
+        except Exception:
+            # Banco sem team_match_perspective: consulta antiga em matches
+            with span("db.query_legacy"):
+                df = pd.read_sql(LEGACY_TEAM_MATCHES_QUERY, conn, params={'team_id': int(team_id)})
         
         if len(df) == 0:
             return None
@@ -136,6 +178,33 @@ def get_team_stats(team_id):
         st.error(f"Erro ao buscar estatísticas: {e}")
         return None
 
+# Snapshot pré-calculado (gerado por snapshot_builder.py após auto_update.py)
+@st.cache_resource
+def open_snapshot(path):
+    """Abre (memory-map) um snapshot; uma vez por versão"""
+    from snapshot_builder import load_snapshot
+    return load_snapshot(path)
+
+def get_snapshot():
+    """Snapshot atual das páginas ou None (páginas recalculam ao vivo)"""
+    try:
+        from snapshot_builder import latest_snapshot_path
+        path = latest_snapshot_path()
+        if path is None:
+            return None
+        # LATEST é relido a cada execução: nova versão entra sem reiniciar o app
+        return open_snapshot(str(path))
+    except Exception as e:
+        st.warning(f"⚠️ Snapshot indisponível ({e}), calculando ao vivo")
+        return None
+
+def show_snapshot_status(snapshot):
+    """Mostra origem e data dos dados pré-calculados"""
+    meta = snapshot['meta']
+    stats_loaded = meta.get('stats_loaded', 0)
+    st.success(f"✅ {stats_loaded} times com dados reais | {48 - stats_loaded} com força estimada")
+    st.caption(f"📸 Snapshot {meta['version']} gerado em {meta['created_at']} ({meta['model_type']})")
+
 # Sidebar
 with st.sidebar:
     st.header("📊 Navegação")
@@ -190,56 +259,54 @@ elif page == "🏆 Jogos da Copa":
     st.header("🏆 Todos os Jogos da Copa 2026")
     
     from copa_2026_structure import GRUPOS_COPA_2026, get_all_group_matches
-    from tournament_simulator import simulate_group_stage
-    from team_strength import get_team_strength_stats
     
     st.info("📊 **104 jogos** | 72 da fase de grupos + 32 do mata-mata")
     
-    # Criar dicionário de estatísticas
-    team_stats = {}
-    teams_df = get_teams()
-    
-    # Buscar estatísticas reais do banco
-    stats_loaded = 0
-    if len(teams_df) > 0:
-        for _, row in teams_df.iterrows():
-            team_name = row['name']
-            team_id = row['id']
-            stats = get_team_stats(team_id)
-            if stats:
-                team_stats[team_name] = stats
-                stats_loaded += 1
-    
-    # Usar força estimada para times da Copa (mais realista que padrão)
-    for grupo, teams in GRUPOS_COPA_2026.items():
-        for team in teams:
-            if team not in team_stats:
-                team_stats[team] = get_team_strength_stats(team)
-    
-    # Mostrar quantas estatísticas foram carregadas
-    if stats_loaded > 0:
-        st.success(f"✅ {stats_loaded} times com dados reais do banco | {48 - stats_loaded} com força estimada")
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        # Dados pré-calculados pelo snapshot_builder (leitura pura)
+        group_results = snapshot['group_results']
+        group_matches = snapshot['group_matches']
+        show_snapshot_status(snapshot)
     else:
-        st.warning("⚠️ Usando força estimada para todos os times (problema de conexão com banco)")
-    
-    # Simular fase de grupos
-    with st.spinner('🔄 Simulando fase de grupos...'):
-        group_results = simulate_group_stage(team_stats)
-    
-    # Mostrar jogos por grupo
-    st.subheader("🏆 Fase de Grupos")
-    
-    for grupo in sorted(GRUPOS_COPA_2026.keys()):
-        with st.expander(f"Grupo {grupo}", expanded=False):
-            teams = GRUPOS_COPA_2026[grupo]
-            
-            # Mostrar times do grupo
-            st.markdown(f"**Times:** {', '.join(teams)}")
-            st.markdown("---")
-            
-            # Gerar e mostrar jogos
-            st.markdown("**Jogos:**")
-            
+        from tournament_simulator import simulate_group_stage
+        from team_strength import get_team_strength_stats
+        
+        # Criar dicionário de estatísticas
+        team_stats = {}
+        teams_df = get_teams()
+        
+        # Buscar estatísticas reais do banco
+        stats_loaded = 0
+        if len(teams_df) > 0:
+            for _, row in teams_df.iterrows():
+                team_name = row['name']
+                team_id = row['id']
+                stats = get_team_stats(team_id)
+                if stats:
+                    team_stats[team_name] = stats
+                    stats_loaded += 1
+        
+        # Usar força estimada para times da Copa (mais realista que padrão)
+        for grupo, teams in GRUPOS_COPA_2026.items():
+            for team in teams:
+                if team not in team_stats:
+                    team_stats[team] = get_team_strength_stats(team)
+        
+        # Mostrar quantas estatísticas foram carregadas
+        if stats_loaded > 0:
+            st.success(f"✅ {stats_loaded} times com dados reais do banco | {48 - stats_loaded} com força estimada")
+        else:
+            st.warning("⚠️ Usando força estimada para todos os times (problema de conexão com banco)")
+        
+        # Simular fase de grupos
+        with st.spinner('🔄 Simulando fase de grupos...'):
+            group_results = simulate_group_stage(team_stats)
+        
+        # Prever placares na ordem de exibição
+        group_matches = {}
+        for grupo, teams in GRUPOS_COPA_2026.items():
+            group_matches[grupo] = []
             for i in range(len(teams)):
                 for j in range(i + 1, len(teams)):
                     home = teams[i]
@@ -257,14 +324,31 @@ elif page == "🏆 Jogos da Copa":
                     else:
                         prediction = predict_match_optimized(home_stats, away_stats)
                     
-                    # Exibir previsão
-                    col1, col2, col3 = st.columns([2, 1, 2])
-                    with col1:
-                        st.markdown(f"**{home}**")
-                    with col2:
-                        st.markdown(f"<center><b>{prediction['home_goals']} x {prediction['away_goals']}</b></center>", unsafe_allow_html=True)
-                    with col3:
-                        st.markdown(f"**{away}**")
+                    group_matches[grupo].append((home, away, prediction['home_goals'], prediction['away_goals']))
+    
+    # Mostrar jogos por grupo
+    st.subheader("🏆 Fase de Grupos")
+    
+    for grupo in sorted(GRUPOS_COPA_2026.keys()):
+        with st.expander(f"Grupo {grupo}", expanded=False):
+            teams = GRUPOS_COPA_2026[grupo]
+            
+            # Mostrar times do grupo
+            st.markdown(f"**Times:** {', '.join(teams)}")
+            st.markdown("---")
+            
+            # Mostrar jogos
+            st.markdown("**Jogos:**")
+            
+            for home, away, home_goals, away_goals in group_matches[grupo]:
+                # Exibir previsão
+                col1, col2, col3 = st.columns([2, 1, 2])
+                with col1:
+                    st.markdown(f"**{home}**")
+                with col2:
+                    st.markdown(f"<center><b>{home_goals} x {away_goals}</b></center>", unsafe_allow_html=True)
+                with col3:
+                    st.markdown(f"**{away}**")
             
             # Mostrar classificação prevista
             st.markdown("---")
@@ -282,41 +366,62 @@ elif page == "📊 Classificação & Pódio":
     st.header("📊 Classificação dos Grupos & Pódio")
     
     from copa_2026_structure import GRUPOS_COPA_2026
-    from tournament_simulator import simulate_group_stage, simulate_knockout_stage, simulate_full_tournament
-    from team_strength import get_team_strength_stats
     
     st.info("🎯 **Palpites necessários para o Bolão:** Classificação de cada grupo (1º e 2º) + Pódio (1º, 2º, 3º lugar)")
     
-    # Criar dicionário de estatísticas
-    team_stats = {}
-    teams_df = get_teams()
-    
-    # Buscar estatísticas reais do banco
-    stats_loaded = 0
-    if len(teams_df) > 0:
-        for _, row in teams_df.iterrows():
-            team_name = row['name']
-            team_id = row['id']
-            stats = get_team_stats(team_id)
-            if stats:
-                team_stats[team_name] = stats
-                stats_loaded += 1
-    
-    # Usar força estimada para times da Copa
-    for grupo, teams in GRUPOS_COPA_2026.items():
-        for team in teams:
-            if team not in team_stats:
-                team_stats[team] = get_team_strength_stats(team)
-    
-    # Mostrar status
-    if stats_loaded > 0:
-        st.success(f"✅ {stats_loaded} times com dados reais | {48 - stats_loaded} com força estimada")
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        # Dados pré-calculados pelo snapshot_builder (leitura pura)
+        group_results = snapshot['group_results']
+        tournament_results = {
+            'champion_probabilities': snapshot['champion_probabilities'],
+            'podium_probabilities': snapshot['podium_probabilities'],
+        }
+        knockout_results = snapshot['knockout']
+        n_simulations = snapshot['meta']['n_simulations']
+        # Probabilidades do armazém de resultados (bitsets), quando o snapshot veio do pipeline
+        position_probs = snapshot['position_probabilities']
+        stage_probs = snapshot['stage_probabilities']
+        final_pairings = snapshot['final_pairings']
+        show_snapshot_status(snapshot)
     else:
-        st.warning("⚠️ Usando força estimada para todos os times")
-    
-    # Simular fase de grupos
-    with st.spinner('🔄 Simulando torneio completo...'):
-        group_results = simulate_group_stage(team_stats)
+        position_probs = stage_probs = final_pairings = None
+        from tournament_simulator import simulate_group_stage, simulate_knockout_stage, simulate_full_tournament
+        from team_strength import get_team_strength_stats
+        
+        # Criar dicionário de estatísticas
+        team_stats = {}
+        teams_df = get_teams()
+        
+        # Buscar estatísticas reais do banco
+        stats_loaded = 0
+        if len(teams_df) > 0:
+            for _, row in teams_df.iterrows():
+                team_name = row['name']
+                team_id = row['id']
+                stats = get_team_stats(team_id)
+                if stats:
+                    team_stats[team_name] = stats
+                    stats_loaded += 1
+        
+        # Usar força estimada para times da Copa
+        for grupo, teams in GRUPOS_COPA_2026.items():
+            for team in teams:
+                if team not in team_stats:
+                    team_stats[team] = get_team_strength_stats(team)
+        
+        # Mostrar status
+        if stats_loaded > 0:
+            st.success(f"✅ {stats_loaded} times com dados reais | {48 - stats_loaded} com força estimada")
+        else:
+            st.warning("⚠️ Usando força estimada para todos os times")
+        
+        # Simular fase de grupos e mata-mata
+        n_simulations = 1000
+        with st.spinner('🔄 Simulando torneio completo...'):
+            group_results = simulate_group_stage(team_stats)
+            tournament_results = simulate_full_tournament(team_stats, n_simulations=n_simulations)
+            knockout_results = simulate_knockout_stage(group_results, team_stats)
     
     # Mostrar classificação dos grupos
     st.subheader("🏆 Classificação dos Grupos")
@@ -329,13 +434,17 @@ elif page == "📊 Classificação & Pódio":
         primeiro = standings[0][0]
         segundo = standings[1][0]
         
-        classificacao_data.append({
+        row = {
             'Grupo': grupo,
             '1º Lugar': f"🥇 {primeiro}",
             '2º Lugar': f"🥈 {segundo}",
             'Pts 1º': standings[0][1]['points'],
             'Pts 2º': standings[1][1]['points']
-        })
+        }
+        if position_probs is not None:
+            row['P(1º)'] = f"{position_probs[primeiro][0]*100:.1f}%"
+            row['P(2º)'] = f"{position_probs[segundo][1]*100:.1f}%"
+        classificacao_data.append(row)
     
     import pandas as pd
     df_class = pd.DataFrame(classificacao_data)
@@ -355,15 +464,16 @@ elif page == "📊 Classificação & Pódio":
                     emoji = "🥇" if pos == 1 else "🥈" if pos == 2 else "🥉" if pos == 3 else "⚪"
                     color = "green" if pos <= 2 else "orange" if pos == 3 else "red"
                     st.markdown(f":{color}[{emoji} **{pos}º** {team}]")
-                    st.caption(f"{stats['points']} pts | SG {stats['gd']:+d} | {stats['gf']} gols")
+                    caption = f"{stats['points']} pts | SG {stats['gd']:+d} | {stats['gf']} gols"
+                    if position_probs is not None:
+                        caption += (f" | P(1º) {position_probs[team][0]*100:.0f}%"
+                                    f" | P(16-avos) {stage_probs[team]['round_of_32']*100:.0f}%")
+                    st.caption(caption)
     
-    # Simular torneio completo para pódio
+    # Pódio (torneio completo simulado)
     st.markdown("---")
     st.subheader("🏆 Pódio Previsto")
     
-    with st.spinner('🔄 Simulando mata-mata (1000x)...'):
-        tournament_results = simulate_full_tournament(team_stats, n_simulations=1000)
-    
     # Mostrar top 3 candidatos ao título
     st.markdown("### 🥇 Candidatos ao Título")
     champion_probs = tournament_results['champion_probabilities']
@@ -385,12 +495,17 @@ elif page == "📊 Classificação & Pódio":
         with cols[idx % 2]:
             st.metric(team, f"{prob*100:.1f}%", delta="Pódio")
     
-    # Simular mata-mata uma vez para mostrar pódio previsto
+    # Finais mais prováveis (consultas conjuntas nos bitsets)
+    if final_pairings:
+        st.markdown("---")
+        st.markdown("### 🤝 Finais Mais Prováveis")
+        for (team1, team2), prob in final_pairings[:5]:
+            st.markdown(f"**{team1}** x **{team2}** - {prob*100:.1f}%")
+
+    # Mata-mata simulado uma vez para mostrar pódio previsto
     st.markdown("---")
     st.markdown("### 🏆 Pódio Mais Provável")
     
-    knockout_results = simulate_knockout_stage(group_results, team_stats)
-    
     col1, col2, col3 = st.columns(3)
     
     with col1:
@@ -415,7 +530,7 @@ elif page == "📊 Classificação & Pódio":
             st.info("A definir")
     
     st.markdown("---")
-    st.caption("ℹ️ Previsões baseadas em 1000 simulações Monte Carlo com dados históricos")
+    st.caption(f"ℹ️ Previsões baseadas em {n_simulations} simulações Monte Carlo com dados históricos")
 
 # Página Previsões
 elif page == "🎯 Previsões":
@@ -592,3 +707,27 @@ elif page == "ℹ️ Sobre":
 # Footer
 st.markdown("---")
 st.caption("Sistema de Análise Copa 2026 | Dados atualizados automaticamente")
+
+# Painel de depuração: tempos e contadores da execução atual
+with st.sidebar:
+    st.markdown("---")
+    if st.checkbox("🐞 Depuração (tempos)", value=False):
+        run_summary = run_recorder.to_dict()
+        st.caption(f"⏱️ Execução: {run_summary['wall_s']*1000:.0f} ms")
+        if run_summary['spans']:
+            spans_df = pd.DataFrame(run_summary['spans'])
+            spans_df['span'] = spans_df['depth'].map(lambda d: "· " * d) + spans_df['name']
+            st.dataframe(
+                spans_df[['span', 'count', 'total_s', 'mean_ms', 'max_ms']],
+                use_container_width=True, hide_index=True
+            )
+        else:
+            st.caption("Nenhum span registrado (dados em cache)")
+        if run_summary['counters']:
+            st.json(run_summary['counters'])
+        st.download_button(
+            "💾 Exportar JSON",
+            data=json.dumps(run_summary, ensure_ascii=False, indent=2),
+            file_name=f"instrumentacao_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+            mime="application/json"
+        )
@@ -0,0 +1,151 @@
+"""
+Registro Compacto de Times - IDs inteiros para o simulador
+Interna os nomes dos times em inteiros 0..N-1 e guarda as estatísticas em
+um array estruturado NumPy; o simulador trabalha só com índices e arrays e
+traduz para nomes apenas na entrada e na saída.
+
+LÓGICA:
+1. Times na ordem dos grupos (GRUPOS_COPA_2026) + extras do dicionário
+2. Estatísticas: array estruturado (STATS_DTYPE) para leitura vetorizada e
+   o dict original de cada time para as funções de previsão
+3. Placar previsto de cada confronto (mandante, visitante) calculado uma
+   única vez e guardado em matrizes N x N (os modelos são determinísticos)
+
+Uso:
+    registry = TeamRegistry.from_stats(team_stats_dict, predict_fn=predict_match)
+    home_goals, away_goals = registry.goals(i, j)
+    registry.name(i), registry.id("Brazil")
+"""
+
+import numpy as np
+
+from copa_2026_structure import GRUPOS_COPA_2026
+
+# Campos numéricos das estatísticas (ausente = NaN)
+STATS_DTYPE = np.dtype([
+    ('avg_goals_scored', 'f8'),
+    ('avg_goals_conceded', 'f8'),
+    ('strength', 'f8'),
+    ('fifa_ranking', 'f8'),
+    ('recent_form', 'f8'),
+    ('win_rate', 'f8'),
+    ('total_games', 'f8'),
+])
+
+# Placar ainda não calculado na matriz de previsões
+NOT_PREDICTED = -1
+
+
+class TeamRegistry:
+    """Times internados em inteiros com estatísticas e previsões em arrays"""
+
+    __slots__ = ('names', 'index', 'stats', 'records', 'predict_fn', '_home_goals', '_away_goals')
+
+    def __init__(self, names, records, predict_fn=None):
+        """
+        Args:
+            names: nomes dos times (posição = ID)
+            records: dict de estatísticas de cada time (mesma ordem)
+            predict_fn: fn(stats1, stats2) -> {'home_goals', 'away_goals', ...}
+        """
+        self.names = list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.records = list(records)
+        self.predict_fn = predict_fn
+
+        self.stats = np.full(len(self.names), np.nan, dtype=STATS_DTYPE)
+        for i, record in enumerate(self.records):
+            for field in STATS_DTYPE.names:
+                value = record.get(field)
+                if value is not None:
+                    self.stats[field][i] = value
+
+        n = len(self.names)
+        self._home_goals = np.full((n, n), NOT_PREDICTED, dtype=np.int16)
+        self._away_goals = np.full((n, n), NOT_PREDICTED, dtype=np.int16)
+
+    @classmethod
+    def from_stats(cls, team_stats_dict, default_stats=None, predict_fn=None, groups=None):
+        """
+        Monta o registro a partir do dicionário {nome: stats} do simulador
+
+        Args:
+            team_stats_dict: estatísticas por nome
+            default_stats: stats dos times da Copa sem dados (um único dict
+                           compartilhado, em vez de um novo por consulta)
+            predict_fn: função de previsão (ver __init__)
+            groups: grupos {letra: [times]} (padrão: GRUPOS_COPA_2026)
+        """
+        groups = groups or GRUPOS_COPA_2026
+        names = [team for grupo in sorted(groups) for team in groups[grupo]]
+        seen = set(names)
+        names.extend(team for team in team_stats_dict if team not in seen)
+
+        default_stats = default_stats or {}
+        records = [team_stats_dict.get(team, default_stats) for team in names]
+        return cls(names, records, predict_fn)
+
+    def __len__(self):
+        return len(self.names)
+
+    def id(self, name):
+        """ID inteiro de um time"""
+        return self.index[name]
+
+    def name(self, team_id):
+        """Nome de um ID (None para IDs negativos = a definir)"""
+        return None if team_id is None or team_id < 0 else self.names[team_id]
+
+    def group_ids(self, groups=None):
+        """
+        Matriz (grupos, 4) de IDs na ordem de GRUPOS_COPA_2026
+
+        Returns:
+            (letras dos grupos ordenadas, np.ndarray int)
+        """
+        groups = groups or GRUPOS_COPA_2026
+        letters = sorted(groups)
+        return letters, np.array([[self.index[team] for team in groups[g]] for g in letters], dtype=np.intp)
+
+    def goals(self, home_id, away_id):
+        """
+        Placar previsto do confronto (calculado uma vez por par ordenado)
+
+        Returns:
+            (gols mandante, gols visitante) como int
+        """
+        home_goals = self._home_goals[home_id, away_id]
+        if home_goals == NOT_PREDICTED:
+            prediction = self.predict_fn(self.records[home_id], self.records[away_id])
+            home_goals = self._home_goals[home_id, away_id] = prediction['home_goals']
+            self._away_goals[home_id, away_id] = prediction['away_goals']
+        return int(home_goals), int(self._away_goals[home_id, away_id])
+
+    def seed_goals(self, home_goals, away_goals):
+        """
+        Preencher as matrizes de previsões com placares já calculados
+
+        Args:
+            home_goals, away_goals: (k, k) placares dos k primeiros IDs
+                                    (NaN = não previsto, ex.: diagonal)
+        """
+        home_goals, away_goals = np.asarray(home_goals), np.asarray(away_goals)
+        k = len(home_goals)
+        known = ~(np.isnan(home_goals) | np.isnan(away_goals))
+        self._home_goals[:k, :k][known] = home_goals[known]
+        self._away_goals[:k, :k][known] = away_goals[known]
+
+    def predict_pairs(self, home_ids, away_ids):
+        """
+        Placares previstos de vários confrontos (arrays de IDs)
+
+        Returns:
+            (np.ndarray gols mandante, np.ndarray gols visitante)
+        """
+        home_goals = self._home_goals[home_ids, away_ids]
+        missing = np.flatnonzero(home_goals == NOT_PREDICTED)
+        if missing.size:
+            for k in missing.tolist():
+                self.goals(int(home_ids[k]), int(away_ids[k]))
+            home_goals = self._home_goals[home_ids, away_ids]
+        return home_goals, self._away_goals[home_ids, away_ids]
@@ -0,0 +1,56 @@
+"""
+Testes do motor Elo incremental: correções devem dar o mesmo resultado
+de uma passada completa sobre o histórico corrigido
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+from elo import EloEngine
+
+COLUMNS = ['id', 'date', 'home_team_id', 'away_team_id', 'home_goals', 'away_goals']
+
+HISTORY = [
+    (1, '2020-01-01', 1, 2, 2, 0),
+    (2, '2020-02-01', 2, 3, 1, 0),
+    (3, '2020-03-01', 3, 1, 0, 1),
+    (4, '2020-04-01', 1, 3, 1, 1),
+]
+
+
+def _engine(rows):
+    return EloEngine.from_dataframe(pd.DataFrame(rows, columns=COLUMNS))
+
+
+def _assert_same(engine, rebuilt):
+    assert engine.column('match_id').tolist() == rebuilt.column('match_id').tolist()
+    assert engine.ratings.keys() == rebuilt.ratings.keys()
+    for team_id, rating in rebuilt.ratings.items():
+        assert engine.ratings[team_id] == pytest.approx(rating)
+    np.testing.assert_allclose(engine.column('home_before'), rebuilt.column('home_before'))
+
+
+@pytest.mark.parametrize('correction', [
+    (3, '2019-12-01', 3, 1, 0, 1),  # antes de todos os jogos
+    (4, '2020-01-15', 1, 3, 1, 1),  # entre jogos já aplicados
+    (2, '2020-03-15', 2, 3, 1, 0),  # data posterior
+    (3, '2020-03-01', 3, 1, 2, 1),  # só o placar
+])
+def test_correction_matches_full_rebuild(correction):
+    engine = _engine(HISTORY)
+    engine.apply_match(*correction)
+
+    corrected = [correction if row[0] == correction[0] else row for row in HISTORY]
+    _assert_same(engine, _engine(sorted(corrected, key=lambda row: (row[1], row[0]))))
+
+
+def test_backdated_batch_matches_full_rebuild():
+    engine = _engine(HISTORY[:3])
+    engine.add_matches(pd.DataFrame([(3, '2019-12-01', 3, 1, 0, 1), HISTORY[3]], columns=COLUMNS))
+
+    _assert_same(engine, _engine([(3, '2019-12-01', 3, 1, 0, 1)] + HISTORY[:2] + HISTORY[3:]))
@@ -0,0 +1,270 @@
+"""
+Alocação dos Melhores Terceiros - Copa do Mundo 2026
+Tabela pré-calculada que diz, para cada combinação de grupos de onde saem
+os 8 melhores terceiros, qual terceiro ocupa cada vaga dos 16-avos
+
+LÓGICA:
+1. Cada vaga de 3º nos 16-avos aceita terceiros de 5 grupos ('3º ABCDF')
+2. A combinação de grupos classificados vira uma máscara de 12 bits
+   (bit g = grupo g na ordem alfabética): C(12, 8) = 495 combinações
+3. Atribuição vaga -> grupo de cada combinação vem da tabela oficial da
+   FIFA (Anexo C do regulamento, 495 linhas) gravada em
+   data/raw/third_place_annex_c.csv: uma linha por combinação, coluna
+   'groups' com as 8 letras e uma coluna por 1º colocado ('1A', '1B', ...)
+   com o grupo do terceiro que ele enfrenta
+4. Emparelhamento bipartido derivado (na ordem das vagas, o menor grupo
+   elegível que ainda deixa as demais vagas preenchíveis) só confere a
+   tabela oficial (toda atribuição tem que respeitar as vagas elegíveis).
+   Sem o arquivo, allocation_table() falha; a tabela derivada só é usada
+   quando o chamador aceita explicitamente (allow_derived=True ou
+   THIRD_PLACE_ALLOCATION=derived no ambiente), com aviso
+5. Tabela (4096, 8) int8 indexada pela máscara: uma consulta por simulação,
+   sem interpretar rótulos; máscaras que não têm 8 bits ficam com -1
+
+Uso:
+    table = allocation_table()
+    mask = group_mask([0, 1, 2, 3, 5, 6, 8, 9])
+    table[mask]  # índice do grupo de cada vaga de 3º
+"""
+
+import csv
+import os
+import re
+from functools import lru_cache
+from itertools import combinations
+from math import comb
+from pathlib import Path
+
+import numpy as np
+
+from copa_2026_structure import GRUPOS_COPA_2026, get_knockout_structure
+
+# Terceiros que avançam ao mata-mata
+N_BEST_THIRDS = 8
+
+# Vaga de 3º nos 16-avos: '3º ' + grupos elegíveis
+THIRD_SLOT_PATTERN = re.compile(r'^3º ([A-Z]+)$')
+
+# Vaga ainda sem terceiro (máscara inválida)
+UNASSIGNED = -1
+
+# Anexo C do regulamento da Copa 2026 (tabela oficial de alocação)
+ANNEX_C_PATH = Path(__file__).parent / "data" / "raw" / "third_place_annex_c.csv"
+
+# Aceite explícito da alocação derivada no processo inteiro (sem o Anexo C)
+DERIVED_ENV = "THIRD_PLACE_ALLOCATION"
+
+
+def third_place_slots(structure=None):
+    """
+    Rótulos das vagas de 3º na ordem dos jogos dos 16-avos
+
+    Returns:
+        lista de rótulos ('3º ABCDF', ...); posição = coluna da tabela
+    """
+    if structure is None:
+        structure = get_knockout_structure()
+    return [label
+            for match in structure['dezesseisavos']
+            for label in (match['team1'], match['team2'])
+            if THIRD_SLOT_PATTERN.match(label)]
+
+
+def slot_opponents(structure=None):
+    """
+    1º colocado que enfrenta cada vaga de 3º (colunas do Anexo C)
+
+    Returns:
+        lista de rótulos ('1E', ...) na ordem de third_place_slots()
+    """
+    if structure is None:
+        structure = get_knockout_structure()
+    return [match['team1'] if THIRD_SLOT_PATTERN.match(match['team2']) else match['team2']
+            for match in structure['dezesseisavos']
+            for label in (match['team1'], match['team2'])
+            if THIRD_SLOT_PATTERN.match(label)]
+
+
+def slot_eligibility(slots=None, letters=None):
+    """
+    Grupos elegíveis de cada vaga (índices na ordem alfabética dos grupos)
+
+    Returns:
+        lista de tuplas de índices, uma por vaga
+    """
+    slots = third_place_slots() if slots is None else slots
+    letters = letters or sorted(GRUPOS_COPA_2026)
+    return [tuple(letters.index(g) for g in THIRD_SLOT_PATTERN.match(label).group(1)) for label in slots]
+
+
+def group_mask(groups):
+    """Máscara de bits dos grupos (índices) dos terceiros classificados"""
+    mask = 0
+    for g in groups:
+        mask |= 1 << int(g)
+    return mask
+
+
+def _assign(groups, eligibility):
+    """
+    Atribuição vaga -> grupo (primeira em ordem lexicográfica)
+
+    Returns:
+        lista de grupos por vaga ou None se não há atribuição válida
+    """
+    if not eligibility:
+        return []
+    for g in eligibility[0]:
+        if g in groups:
+            rest = _assign(groups - {g}, eligibility[1:])
+            if rest is not None:
+                return [g] + rest
+    return None
+
+
+def build_allocation_table(structure=None, letters=None):
+    """
+    Tabela de alocação para todas as combinações de terceiros
+
+    Args:
+        structure: layout no formato de get_knockout_structure() (padrão: oficial)
+        letters: letras dos grupos (padrão: GRUPOS_COPA_2026 em ordem)
+
+    Returns:
+        np.ndarray (2^grupos, vagas) int8 com o índice do grupo em cada vaga
+    """
+    letters = letters or sorted(GRUPOS_COPA_2026)
+    eligibility = slot_eligibility(third_place_slots(structure), letters)
+    n_slots = len(eligibility)
+
+    table = np.full((1 << len(letters), n_slots), UNASSIGNED, dtype=np.int8)
+    for groups in combinations(range(len(letters)), n_slots):
+        assignment = _assign(set(groups), eligibility)
+        if assignment is None:
+            raise ValueError(f"Sem alocação válida para os terceiros dos grupos "
+                             f"{''.join(letters[g] for g in groups)}")
+        table[group_mask(groups)] = assignment
+    return table
+
+
+def load_official_table(path=None, structure=None, letters=None):
+    """
+    Tabela oficial (Anexo C) conferida contra as vagas elegíveis
+
+    Args:
+        path: CSV com coluna 'groups' e uma coluna por 1º colocado
+              (padrão: ANNEX_C_PATH)
+
+    Returns:
+        np.ndarray (2^grupos, vagas) int8 no formato de build_allocation_table()
+
+    Raises:
+        ValueError: combinação faltando/repetida ou atribuição fora das
+                    vagas elegíveis
+    """
+    letters = letters or sorted(GRUPOS_COPA_2026)
+    eligibility = slot_eligibility(third_place_slots(structure), letters)
+    opponents = slot_opponents(structure)
+    n_slots = len(eligibility)
+
+    table = np.full((1 << len(letters), n_slots), UNASSIGNED, dtype=np.int8)
+    with open(path or ANNEX_C_PATH, newline='') as f:
+        for row in csv.DictReader(f):
+            groups = [letters.index(g) for g in row['groups'].strip()]
+            mask = group_mask(groups)
+            if len(set(groups)) != n_slots or table[mask, 0] != UNASSIGNED:
+                raise ValueError(f"Combinação inválida ou repetida no Anexo C: {row['groups']}")
+            assignment = [letters.index(row[opponent].strip().lstrip('3')) for opponent in opponents]
+            if sorted(assignment) != sorted(groups):
+                raise ValueError(f"Atribuição não usa os grupos da combinação {row['groups']}")
+            for slot, g in enumerate(assignment):
+                if g not in eligibility[slot]:
+                    raise ValueError(f"Anexo C põe 3{letters[g]} contra {opponents[slot]}, "
+                                     f"fora das vagas elegíveis ({row['groups']})")
+            table[mask] = assignment
+
+    n_rows = int((table[:, 0] != UNASSIGNED).sum())
+    expected = comb(len(letters), n_slots)
+    if n_rows != expected:
+        raise ValueError(f"Anexo C com {n_rows} combinações, esperado {expected}")
+    return table
+
+
+@lru_cache(maxsize=2)
+def allocation_table(allow_derived=None):
+    """
+    Tabela do chaveamento oficial (carregada uma vez por processo)
+
+    Args:
+        allow_derived: aceitar a alocação derivada se o Anexo C não existir
+                       (padrão: só com THIRD_PLACE_ALLOCATION=derived)
+
+    Raises:
+        FileNotFoundError: Anexo C ausente sem aceite da alocação derivada
+    """
+    if allow_derived is None:
+        allow_derived = os.environ.get(DERIVED_ENV) == "derived"
+
+    if ANNEX_C_PATH.exists():
+        table = load_official_table()
+    elif allow_derived:
+        print(f"⚠️  Anexo C não encontrado em {ANNEX_C_PATH}; usando alocação derivada "
+              f"(pode diferir da oficial)")
+        table = build_allocation_table()
+    else:
+        raise FileNotFoundError(
+            f"Anexo C não encontrado em {ANNEX_C_PATH}: transcreva a tabela oficial do regulamento "
+            f"ou aceite a alocação derivada (allow_derived=True ou {DERIVED_ENV}=derived)")
+    table.flags.writeable = False
+    return table
+
+
+def allocate_thirds(groups, letters=None, allow_derived=None):
+    """
+    Grupo de cada vaga de 3º para os grupos classificados
+
+    Args:
+        groups: letras (ou índices) dos grupos dos 8 melhores terceiros
+        allow_derived: ver allocation_table()
+
+    Returns:
+        dict {rótulo da vaga: letra do grupo}
+    """
+    letters = letters or sorted(GRUPOS_COPA_2026)
+    indices = [g if isinstance(g, (int, np.integer)) else letters.index(g) for g in groups]
+    if len(set(indices)) != N_BEST_THIRDS:
+        raise ValueError(f"São necessários {N_BEST_THIRDS} grupos distintos, recebeu {groups}")
+    row = allocation_table(allow_derived)[group_mask(indices)]
+    return {label: letters[g] for label, g in zip(third_place_slots(), row.tolist())}
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Alocação dos melhores terceiros da Copa 2026")
+    parser.add_argument('--derived', action='store_true',
+                        help='aceitar a alocação derivada se o Anexo C não existir')
+    args = parser.parse_args()
+    allow_derived = args.derived or None
+
+    print("=" * 80)
+    print("🧮 ALOCAÇÃO DOS MELHORES TERCEIROS - COPA 2026")
+    print("=" * 80)
+
+    start = time.perf_counter()
+    table = allocation_table(allow_derived)
+    elapsed = (time.perf_counter() - start) * 1000
+    n_valid = int((table[:, 0] >= 0).sum())
+    print(f"\n✅ {n_valid} combinações carregadas em {elapsed:.1f} ms")
+
+    if ANNEX_C_PATH.exists():
+        derived = build_allocation_table()
+        n_diff = int((table != derived).any(axis=1).sum())
+        print(f"🔍 Anexo C x emparelhamento derivado: {n_diff} combinações diferentes")
+
+    example = list("ABCDEFGH")
+    print(f"\n📋 Exemplo: terceiros dos grupos {''.join(example)}")
+    for label, grupo in allocate_thirds(example, allow_derived=allow_derived).items():
+        print(f"   {label:10s} -> 3{grupo}")
+    print("=" * 80)
@@ -0,0 +1,494 @@
+"""
+Amostrador Estocástico do Torneio - Copa do Mundo 2026
+Gera N torneios completos de uma vez (vetorizado) e guarda o resultado de
+cada amostra em arrays compactos, para consultas posteriores sem re-simular
+
+LÓGICA:
+1. Placar de cada jogo de grupo ~ Poisson independente com os lambdas de
+   model_optimized (truncado em 0..MAX_GOALS), amostrado por CDF inversa
+   a partir de números uniformes
+2. Classificação dos grupos com os critérios de simulate_group_stage
+   (pontos, saldo, gols feitos, vitórias; empate total = ordem do grupo)
+3. Mata-mata no chaveamento oficial (get_bracket_slots), com os terceiros
+   nas vagas da tabela de alocação (third_place_allocation) e
+   P(i elimina j) = P(vitória) + P(empate) * P(pênaltis)
+4. Por amostra ficam: placar de cada jogo de grupo (uint8), posição de
+   cada time no grupo, fase alcançada, campeão, vice e 3º colocado
+
+Uso:
+    model = TournamentModel.from_stats(team_stats)
+    outcomes = sample_outcomes(model, 20000, rng=42)
+    outcomes.champion_probabilities()
+"""
+
+import numpy as np
+
+from knockout_exact import bracket_layout, get_bracket_slots
+from model_optimized import predict_match_optimized_batch, score_probability_matrix
+from third_place_allocation import allocation_table
+from tournament_simulator import build_registry, _group_fixtures
+
+# Gols máximos por time na distribuição de placares
+MAX_GOALS = 8
+
+# P(time 1 vencer nos pênaltis), como em simulate_knockout_exact
+SHOOTOUT = 0.5
+
+# Fase alcançada (valores do array `stage`)
+STAGE_NAMES = ['group', 'round_of_32', 'round_of_16', 'quarter_finals', 'semi_finals', 'final', 'champion']
+STAGE_INDEX = {name: i for i, name in enumerate(STAGE_NAMES)}
+
+# Esquemas de amostragem (ver draw_uniforms)
+SCHEMES = ('plain', 'antithetic', 'stratified')
+
+# Sorteios do mata-mata por torneio (31 jogos + disputa de 3º)
+KNOCKOUT_DRAWS = 32
+
+# Base da chave inteira de classificação (pontos, saldo, gols, vitórias)
+_KEY_BASE = 64
+_GD_OFFSET = 32
+
+
+class TournamentModel:
+    """Parâmetros fixos do torneio: times, jogos, placares e chaveamento"""
+
+    def __init__(self, registry, score_probs, win_matrix, max_goals=MAX_GOALS):
+        """
+        Args:
+            registry: TeamRegistry (team_registry.py)
+            score_probs: (jogos de grupo, (max_goals + 1)^2) P(placar) achatada
+            win_matrix: (N, N) P(i elimina j) no mata-mata
+            max_goals: gols máximos por time
+        """
+        self.registry = registry
+        self.letters, self.group_ids = registry.group_ids()
+        self.fixtures = _group_fixtures(self.group_ids)
+        flat_ids = self.group_ids.ravel()
+        self.fixture_teams = np.stack([flat_ids[self.fixtures[0]], flat_ids[self.fixtures[1]]], axis=1)
+        self.fixture_index = {(int(h), int(a)): k for k, (h, a) in enumerate(self.fixture_teams)}
+        self.fixture_group = self.fixtures[0] // self.group_ids.shape[1]
+        self.max_goals = max_goals
+        self.score_probs = np.asarray(score_probs, dtype=float)
+        self.win_matrix = np.asarray(win_matrix, dtype=float)
+
+        # Incidência jogo -> posição no array achatado dos grupos (mandante/visitante)
+        n_slots = flat_ids.size
+        self._home_incidence = np.zeros((len(self.fixture_teams), n_slots), dtype=np.float32)
+        self._away_incidence = np.zeros_like(self._home_incidence)
+        self._home_incidence[np.arange(len(self.fixture_teams)), self.fixtures[0]] = 1
+        self._away_incidence[np.arange(len(self.fixture_teams)), self.fixtures[1]] = 1
+
+        self.bracket_group, self.bracket_position, self.bracket_third = _bracket_layout(self.letters)
+
+    @classmethod
+    def from_stats(cls, team_stats_dict, shootout=SHOOTOUT, max_goals=MAX_GOALS):
+        """
+        Monta o modelo a partir do dicionário {nome: stats} do simulador
+
+        Args:
+            team_stats_dict: estatísticas por time
+            shootout: P(time 1 vencer nos pênaltis)
+            max_goals: gols máximos por time
+        """
+        registry = build_registry(team_stats_dict)
+        n = len(registry)
+
+        columns = {}
+        for field, default in (('avg_goals_scored', 1.5), ('avg_goals_conceded', 1.0), ('fifa_ranking', 1500)):
+            values = np.array([record.get(field, default) for record in registry.records], dtype=float)
+            columns[field] = values
+
+        # Lambdas de todos os pares (i, j) de uma vez
+        team1 = {field: np.repeat(values, n) for field, values in columns.items()}
+        team2 = {field: np.tile(values, n) for field, values in columns.items()}
+        lambdas = predict_match_optimized_batch(team1, team2)
+        matrices = score_probability_matrix(lambdas['lambda_team1'], lambdas['lambda_team2'], max_goals)
+        matrices = matrices.reshape(n, n, max_goals + 1, max_goals + 1)
+
+        goals = np.arange(max_goals + 1)
+        p_win = (matrices * (goals[:, None] > goals[None, :])).sum(axis=(2, 3))
+        p_draw = (matrices * (goals[:, None] == goals[None, :])).sum(axis=(2, 3))
+        win_matrix = p_win + p_draw * shootout
+        # Decisão do par é única: W[j, i] = 1 - W[i, j] (mandante = menor ID)
+        upper = np.triu(win_matrix, 1)
+        win_matrix = upper + np.tril(1.0 - upper.T, -1) + np.eye(n) * 0.5
+
+        model = cls(registry, None, win_matrix, max_goals)
+        home, away = model.fixture_teams[:, 0], model.fixture_teams[:, 1]
+        model.score_probs = matrices[home, away].reshape(len(home), -1)
+        return model
+
+    @property
+    def n_cells(self):
+        """Placares possíveis por jogo"""
+        return (self.max_goals + 1) ** 2
+
+    def cell(self, home_goals, away_goals):
+        """Índice achatado de um placar"""
+        return home_goals * (self.max_goals + 1) + away_goals
+
+    def find_fixture(self, home, away):
+        """
+        Jogo de grupo entre dois times (em qualquer ordem)
+
+        Returns:
+            (índice do jogo, True se a ordem informada é invertida)
+        """
+        home_id, away_id = self.registry.id(home), self.registry.id(away)
+        if (home_id, away_id) in self.fixture_index:
+            return self.fixture_index[(home_id, away_id)], False
+        if (away_id, home_id) in self.fixture_index:
+            return self.fixture_index[(away_id, home_id)], True
+        raise KeyError(f"{home} x {away} não é um jogo da fase de grupos")
+
+
+def _bracket_layout(letters):
+    """
+    Origem de cada slot do chaveamento oficial (ver knockout_exact.bracket_layout)
+
+    Returns:
+        group: índice do grupo (-1 para vaga de 3º)
+        position: posição no grupo (0 = 1º)
+        third: coluna da vaga na tabela de alocação (-1 para slots de grupo)
+    """
+    return bracket_layout(letters, get_bracket_slots())
+
+
+class Outcomes:
+    """Resultado de N torneios amostrados (uma linha por amostra)"""
+
+    def __init__(self, model, cells, positions, stage, champion, runner_up, third):
+        self.model = model
+        self.cells = cells              # (n, jogos) uint8: placar achatado de cada jogo de grupo
+        self.positions = positions      # (n, times) int8: posição no grupo (0 = 1º, -1 = fora)
+        self.stage = stage              # (n, times) int8: índice em STAGE_NAMES
+        self.champion = champion        # (n,) int16
+        self.runner_up = runner_up      # (n,) int16
+        self.third = third              # (n,) int16
+
+    def __len__(self):
+        return len(self.cells)
+
+    def _weighted_counts(self, team_ids, weights):
+        total = len(self) if weights is None else weights.sum()
+        counts = np.bincount(team_ids, weights=weights, minlength=len(self.model.registry))
+        return counts / total if total > 0 else counts
+
+    def _ranked(self, probs):
+        names = self.model.registry.names
+        ranked = sorted(((names[i], float(p)) for i, p in enumerate(probs) if p > 0),
+                        key=lambda x: x[1], reverse=True)
+        return dict(ranked)
+
+    def champion_probabilities(self, weights=None):
+        """P(campeão) por time, ordenado (pesos opcionais por amostra)"""
+        return self._ranked(self._weighted_counts(self.champion, weights))
+
+    def podium_probabilities(self, weights=None):
+        """P(pódio) por time, ordenado"""
+        podium = np.concatenate([self.champion, self.runner_up, self.third])
+        podium_weights = None if weights is None else np.tile(weights, 3)
+        total = len(self) if weights is None else weights.sum()
+        counts = np.bincount(podium, weights=podium_weights, minlength=len(self.model.registry))
+        return self._ranked(counts / total if total > 0 else counts)
+
+    def stage_probabilities(self, weights=None):
+        """
+        P(alcançar cada fase) por time
+
+        Returns:
+            dict {time: {fase: probabilidade}}
+        """
+        w = np.ones(len(self)) if weights is None else weights
+        total = w.sum()
+        reached = np.stack([w @ (self.stage >= s) for s in range(1, len(STAGE_NAMES))], axis=1)
+        reached = reached / total if total > 0 else reached
+        return {
+            name: dict(zip(STAGE_NAMES[1:], map(float, reached[i])))
+            for i, name in enumerate(self.model.registry.names)
+            if self.positions[0, i] >= 0
+        }
+
+    def position_probabilities(self, weights=None):
+        """
+        P(terminar o grupo em cada posição)
+
+        Returns:
+            dict {time: [P(1º), P(2º), P(3º), P(4º)]}
+        """
+        w = np.ones(len(self)) if weights is None else weights
+        total = w.sum()
+        probs = np.stack([w @ (self.positions == p) for p in range(4)], axis=1)
+        probs = probs / total if total > 0 else probs
+        return {
+            name: probs[i].tolist()
+            for i, name in enumerate(self.model.registry.names)
+            if self.positions[0, i] >= 0
+        }
+
+
+def outcome_order(n_cells):
+    """
+    Ordem das células na CDF inversa: por saldo (mandante - visitante)
+
+    Assim o placar sorteado é monótono no uniforme (u baixo = vitória do
+    visitante, u alto = vitória do mandante), o que faz os esquemas
+    antitético e estratificado agirem sobre o resultado do jogo.
+    """
+    size = int(round(np.sqrt(n_cells)))
+    goals = np.arange(size)
+    diff = (goals[:, None] - goals[None, :]).ravel()
+    return np.argsort(diff, kind='stable')
+
+
+def sample_cells(score_probs, uniforms):
+    """
+    Placar de cada jogo por CDF inversa
+
+    Args:
+        score_probs: (jogos, células) probabilidades por jogo
+        uniforms: (n, jogos) números em [0, 1)
+
+    Returns:
+        (n, jogos) uint8 com o índice achatado do placar
+    """
+    order = outcome_order(score_probs.shape[1])
+    cdf = np.cumsum(score_probs[:, order], axis=1)
+    cdf[:, -1] = 1.0
+    cells = np.empty(uniforms.shape, dtype=np.uint8)
+    for k in range(score_probs.shape[0]):
+        cells[:, k] = order[np.searchsorted(cdf[k], uniforms[:, k], side='right')]
+    return cells
+
+
+def rank_groups(model, cells, groups=None):
+    """
+    Classificação dos grupos para cada amostra
+
+    Args:
+        model: TournamentModel
+        cells: (n, jogos de grupo) placares achatados
+        groups: índices dos grupos a classificar (padrão: todos)
+
+    Returns:
+        order: (n, grupos, 4) IDs na ordem de classificação
+        third_key: (n, grupos) chave (pontos, saldo, gols) do 3º colocado
+    """
+    n = len(cells)
+    group_ids = model.group_ids
+    home_inc, away_inc = model._home_incidence, model._away_incidence
+    if groups is not None:
+        groups = np.asarray(groups, dtype=np.intp)
+        size = group_ids.shape[1]
+        fixture_cols = np.flatnonzero(np.isin(model.fixture_group, groups))
+        slot_cols = (groups[:, None] * size + np.arange(size)).ravel()
+        home_inc = home_inc[np.ix_(fixture_cols, slot_cols)]
+        away_inc = away_inc[np.ix_(fixture_cols, slot_cols)]
+        cells = cells[:, fixture_cols]
+        group_ids = group_ids[groups]
+
+    home = (cells // (model.max_goals + 1)).astype(np.float32)
+    away = (cells % (model.max_goals + 1)).astype(np.float32)
+
+    gf = home @ home_inc + away @ away_inc
+    ga = away @ home_inc + home @ away_inc
+    wins = (home > away) @ home_inc + (away > home) @ away_inc
+    draws = (home == away) @ (home_inc + away_inc)
+    points = 3 * wins + draws
+
+    shape = (n,) + group_ids.shape
+    points, gd, gf, wins = (x.astype(np.int64).reshape(shape) for x in (points, gf - ga, gf, wins))
+
+    # Chave única: ordenação estável decrescente = sorted(..., reverse=True)
+    key = ((points * _KEY_BASE + gd + _GD_OFFSET) * _KEY_BASE + gf) * _KEY_BASE + wins
+    rank = np.argsort(-key, axis=-1, kind='stable')
+    order = np.take_along_axis(np.broadcast_to(group_ids, shape), rank, axis=-1)
+    third_key = np.take_along_axis(key, rank[..., 2:3], axis=-1)[..., 0] // _KEY_BASE
+    return order, third_key
+
+
+def best_thirds(third_key, n_best=8):
+    """
+    Grupos dos melhores terceiros, em ordem (estável: empate = ordem dos grupos)
+
+    Returns:
+        (n, n_best) índices dos grupos
+    """
+    return np.argsort(-third_key, axis=1, kind='stable')[:, :n_best]
+
+
+def bracket_teams(model, order, third_key):
+    """
+    Times de cada slot do chaveamento oficial
+
+    Returns:
+        (n, 32) IDs na ordem de get_bracket_slots()
+    """
+    # Vagas de 3º: uma consulta à tabela de alocação pela máscara dos grupos
+    masks = (1 << best_thirds(third_key)).sum(axis=1)
+    allocation = allocation_table()[masks]
+    slot_group = np.where(model.bracket_group >= 0, model.bracket_group,
+                          allocation[:, np.maximum(model.bracket_third, 0)])
+    return order[np.arange(len(order))[:, None], slot_group, model.bracket_position]
+
+
+def knockout_probabilities(model, order, third_key, win_matrix=None, batch_size=2048):
+    """
+    Probabilidades exatas do mata-mata dado o resultado dos grupos
+
+    Mesma programação dinâmica de knockout_exact, em lote sobre as amostras:
+    substitui o sorteio do mata-mata pela sua esperança (Monte Carlo
+    condicional), eliminando a variância dessa fase.
+
+    Returns:
+        champion, podium: (n, times) float32 com P(campeão) e P(pódio)
+    """
+    from knockout_exact import _opponent_mask
+
+    if win_matrix is None:
+        win_matrix = model.win_matrix
+    teams = bracket_teams(model, order, third_key)
+    n, n_slots = teams.shape
+    n_rounds = int(np.log2(n_slots))
+    masks = [_opponent_mask(n_slots, 2 ** (r + 1)) for r in range(n_rounds)]
+
+    champion = np.zeros((n, len(model.registry)), dtype=np.float32)
+    podium = np.zeros_like(champion)
+    for start in range(0, n, batch_size):
+        block = teams[start:start + batch_size]
+        rows = np.arange(len(block))[:, None]
+        matrix = win_matrix[block[:, :, None], block[:, None, :]]
+
+        reach = [np.ones(block.shape)]
+        for mask in masks:
+            reach.append(reach[-1] * np.einsum('bij,bj->bi', matrix * mask, reach[-1]))
+
+        # 3º lugar: perdedores das semifinais vêm de metades opostas
+        semi_losers = reach[-3] - reach[-2]
+        third = semi_losers * np.einsum('bij,bj->bi', matrix * masks[-1], semi_losers)
+
+        champion[start + rows, block] = reach[-1]
+        podium[start + rows, block] = reach[-2] + third
+    return champion, podium
+
+
+def play_knockout(model, order, third_key, uniforms, win_matrix=None):
+    """
+    Mata-mata de cada amostra no chaveamento oficial
+
+    Args:
+        order, third_key: saída de rank_groups()
+        uniforms: (n, KNOCKOUT_DRAWS) números em [0, 1)
+        win_matrix: P(i elimina j) (padrão: a do modelo)
+
+    Returns:
+        stage (n, times), champion, runner_up, third
+    """
+    n = len(order)
+    rows = np.arange(n)[:, None]
+    if win_matrix is None:
+        win_matrix = model.win_matrix
+
+    teams = bracket_teams(model, order, third_key)
+
+    stage = np.zeros((n, len(model.registry)), dtype=np.int8)
+    stage[rows, teams] = 1
+
+    offset = 0
+    losers = semi_losers = None
+    while teams.shape[1] > 1:
+        team1, team2 = teams[:, 0::2], teams[:, 1::2]
+        n_matches = team1.shape[1]
+        team1_wins = uniforms[:, offset:offset + n_matches] < win_matrix[team1, team2]
+        offset += n_matches
+        winners = np.where(team1_wins, team1, team2)
+        losers = np.where(team1_wins, team2, team1)
+        if n_matches == 2:
+            semi_losers = losers
+        stage[rows, winners] += 1
+        teams = winners
+
+    champion = teams[:, 0].astype(np.int16)
+    runner_up = losers[:, 0].astype(np.int16)
+
+    # Disputa de 3º lugar entre os perdedores das semifinais
+    third_wins = uniforms[:, offset] < win_matrix[semi_losers[:, 0], semi_losers[:, 1]]
+    third = np.where(third_wins, semi_losers[:, 0], semi_losers[:, 1]).astype(np.int16)
+    return stage, champion, runner_up, third
+
+
+def group_positions(model, order):
+    """(n, times) int8 com a posição de cada time no grupo (-1 = fora da Copa)"""
+    n = len(order)
+    positions = np.full((n, len(model.registry)), -1, dtype=np.int8)
+    flat = order.reshape(n, -1)
+    positions[np.arange(n)[:, None], flat] = np.tile(np.arange(order.shape[-1]), order.shape[1])
+    return positions
+
+
+def simulate_outcomes(model, group_uniforms, knockout_uniforms, score_probs=None):
+    """
+    Torneios completos a partir de números uniformes já sorteados
+
+    Args:
+        model: TournamentModel
+        group_uniforms: (n, jogos de grupo)
+        knockout_uniforms: (n, KNOCKOUT_DRAWS)
+        score_probs: distribuição de placares por jogo (padrão: a do modelo)
+
+    Returns:
+        Outcomes
+    """
+    cells = sample_cells(model.score_probs if score_probs is None else score_probs, group_uniforms)
+    order, third_key = rank_groups(model, cells)
+    stage, champion, runner_up, third = play_knockout(model, order, third_key, knockout_uniforms)
+    return Outcomes(model, cells, group_positions(model, order), stage, champion, runner_up, third)
+
+
+def draw_uniforms(rng, n_samples, n_dims, scheme='plain'):
+    """
+    Números uniformes em [0, 1) com o esquema de redução de variância
+
+    Args:
+        rng: np.random.Generator
+        n_samples: linhas (torneios)
+        n_dims: colunas (sorteios por torneio)
+        scheme: 'plain' (independente), 'antithetic' (pares u, 1 - u em
+                linhas consecutivas) ou 'stratified' (hipercubo latino:
+                cada coluna tem exatamente um valor em cada faixa 1/n)
+
+    Returns:
+        np.ndarray (n_samples, n_dims)
+    """
+    if scheme == 'plain':
+        return rng.random((n_samples, n_dims))
+    if scheme == 'antithetic':
+        half = rng.random(((n_samples + 1) // 2, n_dims))
+        pairs = np.stack([half, 1.0 - half], axis=1).reshape(-1, n_dims)
+        # 1 - u pode ser exatamente 1.0 quando u = 0
+        return np.minimum(pairs[:n_samples], np.nextafter(1.0, 0.0))
+    if scheme == 'stratified':
+        strata = rng.permuted(np.tile(np.arange(n_samples)[:, None], (1, n_dims)), axis=0)
+        return (strata + rng.random((n_samples, n_dims))) / n_samples
+    raise ValueError(f"Esquema desconhecido: {scheme} (use um de {SCHEMES})")
+
+
+def sample_outcomes(model, n_samples, rng=None, score_probs=None, scheme='plain'):
+    """
+    Amostrar N torneios completos
+
+    Args:
+        model: TournamentModel
+        n_samples: número de torneios
+        rng: semente ou np.random.Generator
+        score_probs: distribuição de placares por jogo (padrão: a do modelo)
+        scheme: esquema de redução de variância (ver draw_uniforms)
+
+    Returns:
+        Outcomes
+    """
+    rng = np.random.default_rng(rng)
+    uniforms = draw_uniforms(rng, n_samples, len(model.fixture_teams) + KNOCKOUT_DRAWS, scheme)
+    group_uniforms = uniforms[:, :len(model.fixture_teams)]
+    knockout_uniforms = uniforms[:, len(model.fixture_teams):]
+    return simulate_outcomes(model, group_uniforms, knockout_uniforms, score_probs)
@@ -3,9 +3,17 @@ Simulador de Torneio - Copa do Mundo 2026
 Usa Monte Carlo para simular todo o torneio e gerar previsões
 """
 
+import os
+import sys
+
 import numpy as np
 from copa_2026_structure import GRUPOS_COPA_2026, get_all_group_matches
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from instrumentation import span
+from team_registry import TeamRegistry
+from third_place_allocation import allocation_table
+
 # Tentar usar Voting Soft Ensemble (melhor modelo), fallback para outros
 try:
     from model_ml_voting import predict_match_voting
@@ -18,78 +26,115 @@ except:
         from model_optimized import predict_match_optimized
         MODEL_TYPE = 'optimized'
 
+# Simulações acumuladas antes de cada gravação no OutcomeStore
+STORE_BATCH = 10000
+
+def predict_match(team1_stats, team2_stats):
+    """
+    Retorna a previsão completa do modelo ativo para um jogo
+    """
+    with span("model.predict"):
+        if MODEL_TYPE == 'voting_soft':
+            return predict_match_voting(team1_stats, team2_stats)
+        elif MODEL_TYPE == 'ml':
+            return predict_match_ml(team1_stats, team2_stats)
+        else:
+            return predict_match_optimized(team1_stats, team2_stats)
+
 def simulate_match(team1_stats, team2_stats):
     """
     Simula um jogo e retorna o resultado
     """
-    if MODEL_TYPE == 'voting_soft':
-        prediction = predict_match_voting(team1_stats, team2_stats)
-    elif MODEL_TYPE == 'ml':
-        prediction = predict_match_ml(team1_stats, team2_stats)
-    else:
-        prediction = predict_match_optimized(team1_stats, team2_stats)
+    prediction = predict_match(team1_stats, team2_stats)
     return prediction['home_goals'], prediction['away_goals']
 
-def simulate_group_stage(team_stats_dict):
+def build_registry(team_stats_dict):
     """
-    Simula toda a fase de grupos
-    Retorna classificação de cada grupo
+    Registro de IDs inteiros dos times (ver team_registry.py)
+    Times sem dados usam get_default_stats() (um único dict compartilhado)
+    """
+    return TeamRegistry.from_stats(team_stats_dict, default_stats=get_default_stats(), predict_fn=predict_match)
+
+def _group_fixtures(group_ids):
     """
-    group_results = {}
+    Jogos da fase de grupos como posições no array achatado de grupos
+    Mesma ordem de simulate_group_stage: (i, j) com i < j em cada grupo
+    """
+    n_groups, size = group_ids.shape
+    pairs = [(i, j) for i in range(size) for j in range(i + 1, size)]
+    home_slots = np.array([g * size + i for g in range(n_groups) for i, _ in pairs], dtype=np.intp)
+    away_slots = np.array([g * size + j for g in range(n_groups) for _, j in pairs], dtype=np.intp)
+    return home_slots, away_slots
+
+def _simulate_group_ids(registry, group_ids, fixtures):
+    """
+    Fase de grupos sobre IDs (sem dicts por simulação)
     
-    for grupo, teams in GRUPOS_COPA_2026.items():
-        # Inicializar tabela do grupo
-        standings = {team: {'points': 0, 'gf': 0, 'ga': 0, 'gd': 0, 'wins': 0} for team in teams}
-        
-        # Simular todos os jogos do grupo
-        for i in range(len(teams)):
-            for j in range(i + 1, len(teams)):
-                home = teams[i]
-                away = teams[j]
-                
-                # Obter estatísticas dos times
-                home_stats = team_stats_dict.get(home, get_default_stats())
-                away_stats = team_stats_dict.get(away, get_default_stats())
-                
-                # Simular jogo
-                home_goals, away_goals = simulate_match(home_stats, away_stats)
-                
-                # Atualizar tabela
-                standings[home]['gf'] += home_goals
-                standings[home]['ga'] += away_goals
-                standings[away]['gf'] += away_goals
-                standings[away]['ga'] += home_goals
-                
-                if home_goals > away_goals:
-                    standings[home]['points'] += 3
-                    standings[home]['wins'] += 1
-                elif away_goals > home_goals:
-                    standings[away]['points'] += 3
-                    standings[away]['wins'] += 1
-                else:
-                    standings[home]['points'] += 1
-                    standings[away]['points'] += 1
-        
-        # Calcular saldo de gols
-        for team in standings:
-            standings[team]['gd'] = standings[team]['gf'] - standings[team]['ga']
-        
-        # Ordenar por pontos, saldo de gols, gols feitos
-        sorted_teams = sorted(
-            standings.items(),
-            key=lambda x: (x[1]['points'], x[1]['gd'], x[1]['gf'], x[1]['wins']),
-            reverse=True
-        )
-        
-        group_results[grupo] = {
+    Returns:
+        order: (grupos, 4) IDs na ordem de classificação
+        table: (grupos, 4, 5) [pontos, saldo, gols pró, vitórias, gols contra]
+               alinhado com order
+    """
+    flat_ids = group_ids.ravel()
+    home_slots, away_slots = fixtures
+    home_goals, away_goals = registry.predict_pairs(flat_ids[home_slots], flat_ids[away_slots])
+    
+    n_slots = flat_ids.size
+    gf = np.bincount(home_slots, home_goals, n_slots) + np.bincount(away_slots, away_goals, n_slots)
+    ga = np.bincount(home_slots, away_goals, n_slots) + np.bincount(away_slots, home_goals, n_slots)
+    wins = (np.bincount(home_slots, home_goals > away_goals, n_slots)
+            + np.bincount(away_slots, away_goals > home_goals, n_slots))
+    draws = (np.bincount(home_slots, home_goals == away_goals, n_slots)
+             + np.bincount(away_slots, home_goals == away_goals, n_slots))
+    
+    table = np.stack([3 * wins + draws, gf - ga, gf, wins, ga], axis=-1).astype(np.int64)
+    table = table.reshape(group_ids.shape + (5,))
+    
+    # Ordenar por pontos, saldo de gols, gols feitos, vitórias (lexsort é
+    # estável: empates mantêm a ordem do grupo, como sorted(reverse=True))
+    keys = -table[..., [3, 2, 1, 0]].transpose(2, 0, 1)
+    rank = np.lexsort(keys, axis=-1)
+    order = np.take_along_axis(group_ids, rank, axis=1)
+    table = np.take_along_axis(table, rank[..., None], axis=1)
+    return order, table
+
+def _group_results_from_ids(registry, letters, order, table):
+    """Converte a fase de grupos em IDs para o formato de simulate_group_stage"""
+    results = {}
+    for g, grupo in enumerate(letters):
+        names = [registry.names[team] for team in order[g].tolist()]
+        sorted_teams = [
+            (name, {'points': points, 'gf': gf, 'ga': ga, 'gd': gd, 'wins': wins})
+            for name, (points, gd, gf, wins, ga) in zip(names, table[g].tolist())
+        ]
+        results[grupo] = {
             'standings': sorted_teams,
-            'first': sorted_teams[0][0],
-            'second': sorted_teams[1][0],
-            'third': sorted_teams[2][0],
-            'fourth': sorted_teams[3][0]
+            'first': names[0],
+            'second': names[1],
+            'third': names[2],
+            'fourth': names[3]
         }
+    return results
+
+def simulate_group_stage(team_stats_dict):
+    """
+    Simula toda a fase de grupos
+    Retorna classificação de cada grupo
+    """
+    registry = build_registry(team_stats_dict)
+    letters, group_ids = registry.group_ids()
+    order, table = _simulate_group_ids(registry, group_ids, _group_fixtures(group_ids))
+    group_results = _group_results_from_ids(registry, letters, order, table)
     
-    return group_results
+    return {grupo: group_results[grupo] for grupo in GRUPOS_COPA_2026}
+
+def simulate_group_stage_exact(team_stats_dict, max_goals=2):
+    """
+    Distribuição exata das posições de cada grupo (sem amostragem)
+    Mesmos critérios de desempate de simulate_group_stage
+    """
+    from group_exact import exact_group_stage
+    return exact_group_stage(team_stats_dict, max_goals=max_goals, default_stats=get_default_stats())
 
 def get_default_stats():
     """Retorna estatísticas padrão para times sem dados"""
@@ -103,155 +148,73 @@ def get_default_stats():
         'total_games': 50
     }
 
-def simulate_knockout_stage(group_results, team_stats_dict):
+def _bracket_plan(letters):
     """
-    Simula fase de mata-mata
+    Chaveamento oficial em índices, calculado uma vez por simulação completa
+    
+    Returns:
+        (grupo, posição, coluna da vaga de 3º) de cada slot + tabela de alocação
     """
-    # Oitavas de final (32 times -> 16 times)
-    round_of_16 = []
+    from knockout_exact import bracket_layout
+    return bracket_layout(letters) + (allocation_table(),)
+
+def _bracket_ids(order, third_stats, plan):
+    """
+    Classificados ao mata-mata em IDs, na ordem do chaveamento oficial
+    8 melhores terceiros por pontos, saldo, gols (empate = ordem dos grupos),
+    colocados nas vagas com uma consulta à tabela pela máscara dos grupos
     
-    # Pegar os 2 primeiros de cada grupo (24 times)
-    # + 8 melhores terceiros colocados
-    qualified = []
-    for grupo in sorted(group_results.keys()):
-        qualified.append(group_results[grupo]['first'])
-        qualified.append(group_results[grupo]['second'])
+    Args:
+        order: (grupos, 4) IDs na ordem de classificação
+        third_stats: (grupos, 3) [pontos, saldo, gols pró] dos terceiros
+        plan: saída de _bracket_plan()
+    """
+    group, position, third, allocation = plan
+    best = np.lexsort((-third_stats[:, 2], -third_stats[:, 1], -third_stats[:, 0]))[:8]
+    slot_group = np.where(group >= 0, group, allocation[(1 << best).sum()][np.maximum(third, 0)])
+    return order[slot_group, position].tolist()
+
+def _play_knockout_match(registry, strength, team1, team2):
+    """
+    Jogo eliminatório entre IDs
+    Em caso de empate, vence quem tem maior força (team1 se igual)
     
-    # Adicionar melhores terceiros (simplificado - pegar 8 primeiros)
-    thirds = []
-    for grupo in sorted(group_results.keys()):
-        third_team = group_results[grupo]['third']
-        third_stats = group_results[grupo]['standings'][2][1]
-        thirds.append((third_team, third_stats))
-    
-    # Ordenar terceiros por pontos, saldo, gols
-    thirds_sorted = sorted(
-        thirds,
-        key=lambda x: (x[1]['points'], x[1]['gd'], x[1]['gf']),
-        reverse=True
-    )[:8]
-    
-    for team, _ in thirds_sorted:
-        qualified.append(team)
-    
-    # Simular oitavas (32 times -> 16)
-    quarters = []
-    for i in range(0, len(qualified), 2):
-        if i + 1 < len(qualified):
-            team1 = qualified[i]
-            team2 = qualified[i + 1]
-            
-            stats1 = team_stats_dict.get(team1, get_default_stats())
-            stats2 = team_stats_dict.get(team2, get_default_stats())
-            
-            goals1, goals2 = simulate_match(stats1, stats2)
-            
-            # Em caso de empate, vence quem tem melhor ranking
-            if goals1 > goals2:
-                quarters.append(team1)
-            elif goals2 > goals1:
-                quarters.append(team2)
-            else:
-                # Empate - usar força do time
-                if stats1['strength'] >= stats2['strength']:
-                    quarters.append(team1)
-                else:
-                    quarters.append(team2)
-    
-    # Simular quartas (16 -> 8)
-    semis = []
-    for i in range(0, len(quarters), 2):
-        if i + 1 < len(quarters):
-            team1 = quarters[i]
-            team2 = quarters[i + 1]
-            
-            stats1 = team_stats_dict.get(team1, get_default_stats())
-            stats2 = team_stats_dict.get(team2, get_default_stats())
-            
-            goals1, goals2 = simulate_match(stats1, stats2)
-            
-            if goals1 > goals2:
-                semis.append(team1)
-            elif goals2 > goals1:
-                semis.append(team2)
-            else:
-                if stats1['strength'] >= stats2['strength']:
-                    semis.append(team1)
-                else:
-                    semis.append(team2)
-    
-    # Simular semifinais (8 -> 4)
-    finals = []
-    third_place_match = []
-    for i in range(0, len(semis), 2):
-        if i + 1 < len(semis):
-            team1 = semis[i]
-            team2 = semis[i + 1]
-            
-            stats1 = team_stats_dict.get(team1, get_default_stats())
-            stats2 = team_stats_dict.get(team2, get_default_stats())
-            
-            goals1, goals2 = simulate_match(stats1, stats2)
-            
-            if goals1 > goals2:
-                finals.append(team1)
-                third_place_match.append(team2)
-            elif goals2 > goals1:
-                finals.append(team2)
-                third_place_match.append(team1)
-            else:
-                if stats1['strength'] >= stats2['strength']:
-                    finals.append(team1)
-                    third_place_match.append(team2)
-                else:
-                    finals.append(team2)
-                    third_place_match.append(team1)
-    
-    # Simular disputa de 3º lugar
+    Returns:
+        (vencedor, perdedor)
+    """
+    goals1, goals2 = registry.goals(team1, team2)
+    if goals1 > goals2 or (goals1 == goals2 and strength[team1] >= strength[team2]):
+        return team1, team2
+    return team2, team1
+
+def _simulate_knockout_ids(registry, bracket, strength):
+    """
+    Mata-mata sobre IDs: slots vizinhos se enfrentam a cada rodada
+    
+    Returns:
+        dict com IDs (ou None) e listas de IDs por fase
+    """
+    def play_round(teams):
+        winners, losers = [], []
+        for i in range(0, len(teams) - 1, 2):
+            winner, loser = _play_knockout_match(registry, strength, teams[i], teams[i + 1])
+            winners.append(winner)
+            losers.append(loser)
+        return winners, losers
+    
+    # 16-avos (32 -> 16), oitavas (16 -> 8), quartas (8 -> 4) e semifinais (4 -> 2)
+    round_of_16, _ = play_round(bracket)
+    quarters, _ = play_round(round_of_16)
+    semis, _ = play_round(quarters)
+    finals, third_place_match = play_round(semis)
+    
+    third_place = None
     if len(third_place_match) >= 2:
-        team1 = third_place_match[0]
-        team2 = third_place_match[1]
-        
-        stats1 = team_stats_dict.get(team1, get_default_stats())
-        stats2 = team_stats_dict.get(team2, get_default_stats())
-        
-        goals1, goals2 = simulate_match(stats1, stats2)
-        
-        if goals1 > goals2:
-            third_place = team1
-        elif goals2 > goals1:
-            third_place = team2
-        else:
-            third_place = team1 if stats1['strength'] >= stats2['strength'] else team2
-    else:
-        third_place = None
+        third_place, _ = _play_knockout_match(registry, strength, third_place_match[0], third_place_match[1])
     
-    # Simular final
+    champion = runner_up = None
     if len(finals) >= 2:
-        team1 = finals[0]
-        team2 = finals[1]
-        
-        stats1 = team_stats_dict.get(team1, get_default_stats())
-        stats2 = team_stats_dict.get(team2, get_default_stats())
-        
-        goals1, goals2 = simulate_match(stats1, stats2)
-        
-        if goals1 > goals2:
-            champion = team1
-            runner_up = team2
-        elif goals2 > goals1:
-            champion = team2
-            runner_up = team1
-        else:
-            if stats1['strength'] >= stats2['strength']:
-                champion = team1
-                runner_up = team2
-            else:
-                champion = team2
-                runner_up = team1
-    else:
-        champion = None
-        runner_up = None
+        champion, runner_up = _play_knockout_match(registry, strength, finals[0], finals[1])
     
     return {
         'champion': champion,
@@ -259,36 +222,142 @@ def simulate_knockout_stage(group_results, team_stats_dict):
         'third_place': third_place,
         'semi_finalists': semis,
         'quarter_finalists': quarters,
-        'round_of_16': qualified
+        'round_of_16': round_of_16,
+        'round_of_32': bracket
     }
 
-def simulate_full_tournament(team_stats_dict, n_simulations=1000):
+def simulate_knockout_stage(group_results, team_stats_dict):
+    """
+    Simula fase de mata-mata no chaveamento oficial
+    (1º e 2º de cada grupo + 8 melhores terceiros, ver third_place_allocation)
+    """
+    registry = build_registry(team_stats_dict)
+    letters = sorted(group_results.keys())
+    
+    position_keys = ('first', 'second', 'third', 'fourth')
+    order = np.array([[registry.id(group_results[grupo][key]) for key in position_keys]
+                      for grupo in letters], dtype=np.intp)
+    third_stats = np.array([[group_results[grupo]['standings'][2][1][key] for key in ('points', 'gd', 'gf')]
+                            for grupo in letters])
+    
+    bracket = _bracket_ids(order, third_stats, _bracket_plan(letters))
+    result = _simulate_knockout_ids(registry, bracket, registry.stats['strength'].tolist())
+    
+    return {
+        key: [registry.names[team] for team in value] if isinstance(value, list) else registry.name(value)
+        for key, value in result.items()
+    }
+
+def simulate_knockout_exact(group_results, team_stats_dict, shootout=0.5):
+    """
+    Calcula probabilidades exatas do mata-mata para um chaveamento fixo
+    (sem ruído de Monte Carlo), usando o layout de get_knockout_structure()
+    
+    Args:
+        group_results: saída de simulate_group_stage()
+        team_stats_dict: estatísticas por time
+        shootout: P(time 1 vencer nos pênaltis) - float ou função (stats1, stats2)
+    
+    Returns:
+        dict com probabilidades de campeão, pódio e de cada fase por time
+    """
+    from knockout_exact import (get_bracket_slots, resolve_bracket_teams,
+                                pairwise_win_matrix, exact_knockout_probabilities)
+    
+    bracket = resolve_bracket_teams(get_bracket_slots(), group_results)
+    stats_list = [team_stats_dict.get(team, get_default_stats()) for team in bracket]
+    win_matrix = pairwise_win_matrix(stats_list, predict_match, shootout=shootout)
+    round_probs = exact_knockout_probabilities(bracket, win_matrix)
+    
+    champion_probs = {team: p['prob_champion'] for team, p in round_probs.items()}
+    podium_probs = {team: p['prob_podium'] for team, p in round_probs.items()}
+    
+    return {
+        'champion_probabilities': dict(sorted(champion_probs.items(), key=lambda x: x[1], reverse=True)),
+        'podium_probabilities': dict(sorted(podium_probs.items(), key=lambda x: x[1], reverse=True)),
+        'round_probabilities': round_probs
+    }
+
+def _stage_reached(n_teams, knockout_results):
+    """Fase alcançada por time (índice em tournament_sampler.STAGE_NAMES)"""
+    stage = np.zeros(n_teams, dtype=np.uint8)
+    for value, key in enumerate(('round_of_32', 'round_of_16', 'quarter_finalists', 'semi_finalists'), 1):
+        stage[knockout_results[key]] = value
+    for team, value in ((knockout_results['runner_up'], 5), (knockout_results['champion'], 6)):
+        if team is not None:
+            stage[team] = value
+    return stage
+
+def simulate_full_tournament(team_stats_dict, n_simulations=1000, store=None):
     """
     Simula o torneio completo N vezes e retorna probabilidades
+    Trabalha só com IDs e arrays; nomes apenas no resultado final
+    
+    Args:
+        store: outcome_store.OutcomeStore opcional (mesmos times do registro)
+               que recebe posição, fase e pódio de cada simulação
     """
-    champions_count = {}
-    podium_count = {}
+    registry = build_registry(team_stats_dict)
+    letters, group_ids = registry.group_ids()
+    fixtures = _group_fixtures(group_ids)
+    plan = _bracket_plan(letters)
+    strength = registry.stats['strength'].tolist()
+    
+    champions_count = [0] * len(registry)
+    podium_count = [0] * len(registry)
+    # Ordem de primeira ocorrência (desempate na ordenação final)
+    champions_seen, podium_seen = [], []
+    
+    if store is not None:
+        n_teams = group_ids.size
+        batch = min(n_simulations, STORE_BATCH)
+        positions = np.empty((batch, n_teams), dtype=np.uint8)
+        stages = np.empty((batch, n_teams), dtype=np.uint8)
+        podiums = np.empty((batch, 3), dtype=np.int16)
+        group_position = np.tile(np.arange(group_ids.shape[1], dtype=np.uint8), len(group_ids))
+        filled = 0
     
     for _ in range(n_simulations):
-        # Simular fase de grupos
-        group_results = simulate_group_stage(team_stats_dict)
-        
-        # Simular mata-mata
-        knockout_results = simulate_knockout_stage(group_results, team_stats_dict)
+        with span("simulation.round"):
+            # Simular fase de grupos
+            order, table = _simulate_group_ids(registry, group_ids, fixtures)
+            
+            # Simular mata-mata
+            bracket = _bracket_ids(order, table[:, 2, :3], plan)
+            knockout_results = _simulate_knockout_ids(registry, bracket, strength)
         
         # Contar campeão
         champion = knockout_results['champion']
-        if champion:
-            champions_count[champion] = champions_count.get(champion, 0) + 1
+        if champion is not None:
+            if not champions_count[champion]:
+                champions_seen.append(champion)
+            champions_count[champion] += 1
         
         # Contar pódio
-        for team in [knockout_results['champion'], knockout_results['runner_up'], knockout_results['third_place']]:
-            if team:
-                podium_count[team] = podium_count.get(team, 0) + 1
+        podium = (champion, knockout_results['runner_up'], knockout_results['third_place'])
+        for team in podium:
+            if team is not None:
+                if not podium_count[team]:
+                    podium_seen.append(team)
+                podium_count[team] += 1
+        
+        # Gravar o resultado completo da simulação
+        if store is not None:
+            positions[filled, order.ravel()] = group_position
+            stages[filled] = _stage_reached(n_teams, knockout_results)
+            podiums[filled] = [-1 if team is None else team for team in podium]
+            filled += 1
+            if filled == batch:
+                store.append(positions, stages, podiums)
+                filled = 0
+    
+    if store is not None:
+        store.append(positions[:filled], stages[:filled], podiums[:filled])
+        store.flush()
     
     # Calcular probabilidades
-    champion_probs = {team: count / n_simulations for team, count in champions_count.items()}
-    podium_probs = {team: count / n_simulations for team, count in podium_count.items()}
+    champion_probs = {registry.names[team]: champions_count[team] / n_simulations for team in champions_seen}
+    podium_probs = {registry.names[team]: podium_count[team] / n_simulations for team in podium_seen}
     
     # Ordenar por probabilidade
     champion_probs = dict(sorted(champion_probs.items(), key=lambda x: x[1], reverse=True))
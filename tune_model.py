@@ -0,0 +1,265 @@
+"""
+Ajuste de Hiperparâmetros - Constantes de model_optimized.calculate_lambdas
+Avalia milhares de combinações de parâmetros contra o histórico com
+broadcasting sobre a grade (parâmetros × jogos)
+
+LÓGICA:
+1. Conjunto de avaliação montado uma vez (evaluate_models.build_eval_set);
+   jogos após o corte divididos em ajuste (1ª metade) e validação (2ª)
+2. Candidatos amostrados em PARAM_SPACE (+ os valores atuais)
+3. Successive halving: cada rodada avalia os sobreviventes em uma amostra
+   maior de jogos e mantém o melhor 1/eta
+4. Candidatos divididos entre processos (shards) em cada rodada
+5. Vencedor comparado com os valores atuais no conjunto de validação
+
+Uso:
+    python tune_model.py                              # 2000 candidatos
+    python tune_model.py --candidates 10000 --workers 8
+    python tune_model.py --strategy expected_points
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from model_optimized import (
+    DEFAULT_LAMBDA_PARAMS, calculate_lambdas, conservative_picks,
+    score_probability_matrix, optimize_picks, bolao_points
+)
+
+DEFAULT_OUTPUT_DIR = Path(__file__).parent / "data" / "processed" / "tuning"
+
+# Intervalos de busca (uniforme) de cada constante
+PARAM_SPACE = {
+    'fifa_scale': (0.0, 0.6),
+    'fifa_factor_min': (0.6, 1.0),
+    'fifa_factor_max': (1.0, 1.5),
+    'regression': (0.0, 0.4),
+    'mean_goals': (1.0, 1.6),
+    'lambda_min': (0.1, 0.6),
+    'lambda_max': (2.0, 4.0),
+}
+PARAM_NAMES = list(PARAM_SPACE)
+
+# Placares por jogo na matriz de probabilidades montada por cada estratégia
+# (conservative: 0..2 gols; expected_points: 0..6, padrão de score_probability_matrix)
+SCORE_CELLS = {'conservative': 3 ** 2, 'expected_points': 7 ** 2}
+
+# Limite de células (parâmetros × jogos × placares) por bloco e por processo:
+# ~64 MB por matriz float64
+MAX_CELLS = 8_000_000
+
+# Conjunto de avaliação compartilhado pelos workers
+_EVAL = None
+
+
+def sample_candidates(n_candidates, seed=2026):
+    """
+    Matriz (n, K) de candidatos; a linha 0 são os valores atuais
+
+    Returns:
+        np.ndarray com colunas na ordem de PARAM_NAMES
+    """
+    rng = np.random.default_rng(seed)
+    low = np.array([PARAM_SPACE[k][0] for k in PARAM_NAMES])
+    high = np.array([PARAM_SPACE[k][1] for k in PARAM_NAMES])
+    candidates = low + rng.random((n_candidates, len(PARAM_NAMES))) * (high - low)
+    candidates[0] = [DEFAULT_LAMBDA_PARAMS[k] for k in PARAM_NAMES]
+    return candidates
+
+
+def params_dict(row):
+    """Linha da matriz de candidatos -> dict de parâmetros"""
+    return {k: float(v) for k, v in zip(PARAM_NAMES, row)}
+
+
+def score_candidates(candidates, eval_data, idx, strategy='conservative'):
+    """
+    Pontos médios do Bolão de cada candidato nos jogos idx
+
+    Returns:
+        np.ndarray (n_candidates,)
+    """
+    home, away = eval_data['home'], eval_data['away']
+    real_home, real_away = eval_data['real_home'][idx], eval_data['real_away'][idx]
+    n_matches = len(idx)
+
+    chunk = max(1, MAX_CELLS // (max(n_matches, 1) * SCORE_CELLS[strategy]))
+    scores = np.empty(len(candidates))
+
+    for start in range(0, len(candidates), chunk):
+        block = candidates[start:start + chunk]
+        params = {k: block[:, j][:, None] for j, k in enumerate(PARAM_NAMES)}
+
+        # (P, N) lambdas por broadcasting
+        lambda_home, lambda_away = calculate_lambdas(
+            home['avg_goals_scored'][idx], home['avg_goals_conceded'][idx], home['fifa_ranking'][idx],
+            away['avg_goals_scored'][idx], away['avg_goals_conceded'][idx], away['fifa_ranking'][idx],
+            params=params
+        )
+        lambda_home = np.broadcast_to(lambda_home, (len(block), n_matches)).ravel()
+        lambda_away = np.broadcast_to(lambda_away, (len(block), n_matches)).ravel()
+
+        if strategy == 'conservative':
+            picks = conservative_picks(lambda_home, lambda_away)
+        else:
+            picks = optimize_picks(score_probability_matrix(lambda_home, lambda_away))
+
+        points = bolao_points(
+            picks['home_goals'].reshape(len(block), n_matches),
+            picks['away_goals'].reshape(len(block), n_matches),
+            real_home[None, :], real_away[None, :]
+        )
+        scores[start:start + chunk] = points.mean(axis=1)
+
+    return scores
+
+
+def _init_worker(eval_data):
+    global _EVAL
+    _EVAL = eval_data
+
+
+def _score_worker(args):
+    candidates, idx, strategy = args
+    return score_candidates(candidates, _EVAL, idx, strategy)
+
+
+def _score_sharded(pool, workers, candidates, eval_data, idx, strategy):
+    """Divide os candidatos entre os processos do pool"""
+    if pool is None or len(candidates) < 2 * workers:
+        return score_candidates(candidates, eval_data, idx, strategy)
+
+    shards = np.array_split(candidates, workers)
+    return np.concatenate(list(pool.map(_score_worker, [(shard, idx, strategy) for shard in shards])))
+
+
+def successive_halving(eval_data, tune_idx, candidates, strategy='conservative', eta=3,
+                       min_matches=500, workers=1, seed=2026, verbose=True):
+    """
+    Successive halving sobre os candidatos
+
+    Returns:
+        (índices dos candidatos finais ordenados, pontuação no ajuste completo)
+    """
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(tune_idx)  # subconjuntos aninhados
+    alive = np.arange(len(candidates))
+
+    pool = None
+    if workers and workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(eval_data,))
+
+    try:
+        budget = min(min_matches, len(order))
+        round_number = 0
+        while True:
+            idx = order[:budget]
+            scores = _score_sharded(pool, workers, candidates[alive], eval_data, idx, strategy)
+            if verbose:
+                print(f"  Rodada {round_number}: {len(alive):6d} candidatos × {budget:6d} jogos "
+                      f"| melhor {scores.max():.3f} pts/jogo")
+
+            if budget >= len(order) or len(alive) <= eta:
+                ranking = np.argsort(-scores, kind='stable')
+                if budget < len(order):
+                    # Sobreviventes finais avaliados em todos os jogos de ajuste
+                    scores = _score_sharded(pool, workers, candidates[alive], eval_data, order, strategy)
+                    ranking = np.argsort(-scores, kind='stable')
+                return alive[ranking], scores[ranking]
+
+            keep = max(1, int(np.ceil(len(alive) / eta)))
+            alive = alive[np.argsort(-scores, kind='stable')[:keep]]
+            budget = min(budget * eta, len(order))
+            round_number += 1
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ajuste das constantes de calculate_lambdas")
+    parser.add_argument('--candidates', type=int, default=2000)
+    parser.add_argument('--eta', type=int, default=3, help="fator de redução por rodada")
+    parser.add_argument('--min-matches', type=int, default=500, help="jogos na primeira rodada")
+    parser.add_argument('--strategy', choices=('conservative', 'expected_points'), default='conservative')
+    parser.add_argument('--cutoff', default=None, help="corte treino/teste (padrão: 70/30)")
+    parser.add_argument('--train-years', type=int, default=4)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=2026)
+    parser.add_argument('--output', type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    from walk_forward import build_dataset
+    from evaluate_models import build_eval_set
+    from match_cache import load_matches, MISSING_GOALS
+
+    print("=" * 80)
+    print("AJUSTE DE HIPERPARÂMETROS - MODELO OTIMIZADO")
+    print("=" * 80)
+
+    matches = load_matches()
+    finished = (matches['home_goals'] != MISSING_GOALS) & (matches['away_goals'] != MISSING_GOALS)
+    dataset = build_dataset(
+        matches['date'][finished], matches['home_team_id'][finished], matches['away_team_id'][finished],
+        matches['home_goals'][finished], matches['away_goals'][finished], matches['neutral'][finished]
+    )
+    eval_data = build_eval_set(dataset, args.cutoff, args.train_years, matches['team_names'])
+
+    # Ordem temporal: 1ª metade para ajuste, 2ª para validação
+    n_test = len(eval_data['real_home'])
+    tune_idx = np.arange(n_test // 2)
+    holdout_idx = np.arange(n_test // 2, n_test)
+    print(f"\n📊 Ajuste: {len(tune_idx)} jogos | Validação: {len(holdout_idx)} jogos")
+
+    candidates = sample_candidates(args.candidates, args.seed)
+
+    print(f"\n🔍 Successive halving ({args.candidates} candidatos, eta={args.eta}, {args.workers} processos):")
+    start = time.perf_counter()
+    ranking, tune_scores = successive_halving(
+        eval_data, tune_idx, candidates, args.strategy, args.eta, args.min_matches, args.workers, args.seed
+    )
+    elapsed = time.perf_counter() - start
+
+    best = candidates[ranking[0]]
+    holdout = score_candidates(np.stack([candidates[0], best]), eval_data, holdout_idx, args.strategy)
+
+    print(f"\n⏱️  Busca concluída em {elapsed:.1f} s")
+    print("\n🏆 Melhores parâmetros:")
+    for name, value in params_dict(best).items():
+        print(f"  {name:18s} {value:8.3f}  (atual {DEFAULT_LAMBDA_PARAMS[name]:.3f})")
+    print(f"\n📈 Validação: atual {holdout[0]:.3f} -> ajustado {holdout[1]:.3f} pts/jogo "
+          f"({holdout[1] - holdout[0]:+.3f})")
+
+    result = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'strategy': args.strategy,
+        'candidates': args.candidates,
+        'eta': args.eta,
+        'tune_matches': int(len(tune_idx)),
+        'holdout_matches': int(len(holdout_idx)),
+        'best_params': params_dict(best),
+        'tune_points_per_match': float(tune_scores[0]),
+        'holdout_default_points_per_match': float(holdout[0]),
+        'holdout_best_points_per_match': float(holdout[1]),
+    }
+
+    output = args.output
+    if output is None:
+        DEFAULT_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+        output = DEFAULT_OUTPUT_DIR / f"lambda_params_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output, 'w') as f:
+        json.dump(result, f, indent=2)
+    print(f"\n💾 Resultado salvo em: {output}")
+    print("=" * 80)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
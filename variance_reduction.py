@@ -0,0 +1,210 @@
+"""
+Redução de Variância na Simulação do Torneio - Copa do Mundo 2026
+Mede quanto cada esquema de amostragem de tournament_sampler reduz a
+variância das probabilidades de campeão, e compara dois modelos com
+números aleatórios comuns
+
+LÓGICA:
+1. R réplicas independentes de n/R torneios com o esquema escolhido:
+   'plain', 'antithetic', 'stratified' (uniformes de tournament_sampler) ou
+   'conditional' (grupos sorteados e mata-mata exato por amostra)
+2. Variância do estimador = variância entre as médias das réplicas / R
+   (somada sobre os 48 times)
+3. Referência: variância binomial da amostragem independente, p(1-p)/n
+4. Redução = referência / variância do esquema; "amostras equivalentes" =
+   n × redução (quantas simulações independentes dariam a mesma precisão)
+5. Comparação de modelos: os dois modelos usam os mesmos uniformes em cada
+   réplica (números aleatórios comuns), e a variância da diferença é
+   comparada com a de duas amostras independentes
+
+Uso:
+    python variance_reduction.py --samples 20000
+    python variance_reduction.py --compare-shootout 0.6
+"""
+
+import argparse
+
+import numpy as np
+
+from tournament_sampler import (KNOCKOUT_DRAWS, SCHEMES, TournamentModel, draw_uniforms,
+                                knockout_probabilities, rank_groups, sample_cells, simulate_outcomes)
+
+# Esquemas avaliados: os de tournament_sampler + Monte Carlo condicional
+# (grupos sorteados, mata-mata exato)
+ESTIMATORS = SCHEMES + ('conditional',)
+
+# Estatísticas estimadas
+STATISTICS = ('champion', 'podium')
+
+# Réplicas usadas para estimar a variância
+DEFAULT_REPLICATES = 20
+
+
+def estimate(model, group_uniforms, knockout_uniforms, statistic='champion', conditional=False):
+    """
+    Probabilidade de campeão (ou pódio) de cada time a partir dos uniformes
+
+    Args:
+        conditional: True = mata-mata exato por amostra (knockout_uniforms
+                     não são usados)
+
+    Returns:
+        np.ndarray (times,) na ordem do registro
+    """
+    if statistic not in STATISTICS:
+        raise ValueError(f"Estatística desconhecida: {statistic}")
+
+    if conditional:
+        cells = sample_cells(model.score_probs, group_uniforms)
+        champion, podium = knockout_probabilities(model, *rank_groups(model, cells))
+        return (champion if statistic == 'champion' else podium).mean(axis=0, dtype=float)
+
+    outcomes = simulate_outcomes(model, group_uniforms, knockout_uniforms)
+    teams = outcomes.champion if statistic == 'champion' else \
+        np.concatenate([outcomes.champion, outcomes.runner_up, outcomes.third])
+    return np.bincount(teams, minlength=len(model.registry)) / len(outcomes)
+
+
+def _draw(model, rng, size, scheme):
+    """Uniformes de grupos e mata-mata ('conditional' sorteia os grupos sem esquema)"""
+    n_fixtures = len(model.fixture_teams)
+    uniforms = draw_uniforms(rng, size, n_fixtures + KNOCKOUT_DRAWS, 'plain' if scheme == 'conditional' else scheme)
+    return uniforms[:, :n_fixtures], uniforms[:, n_fixtures:]
+
+
+def replicate_estimates(model, n_samples, scheme='plain', n_replicates=DEFAULT_REPLICATES,
+                        rng=None, statistic='champion'):
+    """
+    Estimativas de R réplicas independentes
+
+    Returns:
+        np.ndarray (R, times)
+    """
+    rng = np.random.default_rng(rng)
+    size = max(n_samples // n_replicates, 2)
+    return np.stack([estimate(model, *_draw(model, rng, size, scheme), statistic, scheme == 'conditional')
+                     for _ in range(n_replicates)])
+
+
+def variance_report(model, n_samples=20000, schemes=ESTIMATORS, n_replicates=DEFAULT_REPLICATES,
+                    seed=None, statistic='champion'):
+    """
+    Variância das probabilidades de campeão (ou pódio) por esquema
+
+    Returns:
+        dict {esquema: {'probabilities', 'variance', 'plain_variance',
+                        'variance_reduction', 'effective_samples'}}
+    """
+    rng = np.random.default_rng(seed)
+    names = model.registry.names
+    report = {}
+
+    for scheme in schemes:
+        estimates = replicate_estimates(model, n_samples, scheme, n_replicates, rng, statistic)
+        n_total = (n_samples // n_replicates) * n_replicates
+        probs = estimates.mean(axis=0)
+        variance = float(estimates.var(axis=0, ddof=1).sum() / n_replicates)
+        # Pódio: 3 indicadores por torneio, Σ p(1-p) continua sendo a referência
+        plain_variance = float((probs * (1 - probs)).sum() / n_total)
+        reduction = plain_variance / variance if variance > 0 else float('inf')
+
+        report[scheme] = {
+            'probabilities': dict(sorted(((names[i], float(p)) for i, p in enumerate(probs) if p > 0),
+                                         key=lambda x: x[1], reverse=True)),
+            'variance': variance,
+            'plain_variance': plain_variance,
+            'variance_reduction': reduction,
+            'effective_samples': n_total * reduction,
+        }
+
+    return report
+
+
+def compare_models(model_a, model_b, n_samples=20000, n_replicates=DEFAULT_REPLICATES, seed=None,
+                   scheme='plain', statistic='champion'):
+    """
+    Diferença de probabilidades entre dois modelos (mesmos times)
+
+    Com números aleatórios comuns, o ruído de amostragem é o mesmo nos dois
+    lados e quase se cancela na diferença.
+
+    Returns:
+        dict com 'difference' {time: P_b - P_a} (ordenado por |diferença|),
+        'variance_crn', 'variance_independent' e 'variance_reduction'
+    """
+    if model_a.registry.names != model_b.registry.names:
+        raise ValueError("Modelos com times diferentes não podem ser comparados")
+
+    rng = np.random.default_rng(seed)
+    size = max(n_samples // n_replicates, 2)
+    conditional = scheme == 'conditional'
+
+    diffs, estimates_a, estimates_b = [], [], []
+    for _ in range(n_replicates):
+        uniforms = _draw(model_a, rng, size, scheme)
+        a = estimate(model_a, *uniforms, statistic, conditional)
+        b = estimate(model_b, *uniforms, statistic, conditional)
+        estimates_a.append(a)
+        estimates_b.append(b)
+        diffs.append(b - a)
+
+    diffs, estimates_a, estimates_b = np.array(diffs), np.array(estimates_a), np.array(estimates_b)
+    variance_crn = float(diffs.var(axis=0, ddof=1).sum() / n_replicates)
+    # Amostras independentes: as variâncias dos dois lados se somam
+    variance_independent = float((estimates_a.var(axis=0, ddof=1) + estimates_b.var(axis=0, ddof=1)).sum()
+                                 / n_replicates)
+
+    names = model_a.registry.names
+    mean_diff = diffs.mean(axis=0)
+    return {
+        'difference': dict(sorted(((names[i], float(d)) for i, d in enumerate(mean_diff) if d != 0),
+                                  key=lambda x: abs(x[1]), reverse=True)),
+        'variance_crn': variance_crn,
+        'variance_independent': variance_independent,
+        'variance_reduction': variance_independent / variance_crn if variance_crn > 0 else float('inf'),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Redução de variância da simulação do torneio")
+    parser.add_argument('--samples', type=int, default=20000, help='torneios por esquema')
+    parser.add_argument('--replicates', type=int, default=DEFAULT_REPLICATES, help='réplicas')
+    parser.add_argument('--seed', type=int, default=None, help='semente')
+    parser.add_argument('--statistic', choices=STATISTICS, default='champion', help='probabilidade avaliada')
+    parser.add_argument('--scheme', choices=ESTIMATORS, default='plain', help='esquema da comparação de modelos')
+    parser.add_argument('--compare-shootout', type=float, default=None,
+                        help='comparar com P(pênaltis) alternativa usando números aleatórios comuns')
+    args = parser.parse_args(argv)
+
+    from snapshot_builder import build_team_stats
+
+    print("=" * 80)
+    print("📉 REDUÇÃO DE VARIÂNCIA - SIMULAÇÃO DA COPA 2026")
+    print("=" * 80)
+
+    team_stats, _ = build_team_stats()
+    model = TournamentModel.from_stats(team_stats)
+    report = variance_report(model, args.samples, n_replicates=args.replicates, seed=args.seed,
+                             statistic=args.statistic)
+
+    print(f"\n{'Esquema':15s} {'Variância':>12s} {'Redução':>10s} {'Amostras equiv.':>18s}")
+    for scheme, row in report.items():
+        print(f"{scheme:15s} {row['variance']:12.3e} {row['variance_reduction']:9.2f}x "
+              f"{row['effective_samples']:18,.0f}")
+
+    if args.compare_shootout is not None:
+        other = TournamentModel.from_stats(team_stats, shootout=args.compare_shootout)
+        comparison = compare_models(model, other, args.samples, args.replicates, args.seed,
+                                    scheme=args.scheme, statistic=args.statistic)
+        print(f"\n🔀 Pênaltis {args.compare_shootout:.2f} vs padrão (números aleatórios comuns)")
+        print(f"   Variância da diferença: {comparison['variance_crn']:.3e} "
+              f"(independente: {comparison['variance_independent']:.3e}, "
+              f"redução {comparison['variance_reduction']:.1f}x)")
+        for team, diff in list(comparison['difference'].items())[:10]:
+            print(f"   {team:30s} {diff:+8.2%}")
+
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+"""
+Backtest Walk-Forward - Validação com Cortes Temporais Deslizantes
+Substitui o split único 70/30 por vários cortes: para cada corte, as
+estatísticas dos times usam apenas jogos anteriores e a previsão é feita
+para a janela seguinte
+
+LÓGICA:
+1. Jogos carregados uma única vez em arrays ordenados por data
+   (IDs dos times remapeados para índices densos)
+2. Cada fold = (início da janela de treino, corte, fim do teste) em
+   índices do array, via searchsorted
+3. Estatísticas por fold com np.bincount sobre a fatia de treino
+4. Previsão vetorizada (Poisson) de todos os jogos de teste do fold
+5. Folds distribuídos em um pool de processos; o dataset vai para cada
+   worker uma única vez (initializer)
+
+Uso:
+    python walk_forward.py                               # 10 anos, cortes trimestrais
+    python walk_forward.py --start 2016-01-01 --step-months 1 --workers 8
+    python walk_forward.py --strategy expected_points
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from model_optimized import score_probability_matrix, optimize_picks, bolao_points
+
+DEFAULT_OUTPUT_DIR = Path(__file__).parent / "data" / "processed" / "walk_forward"
+
+# Mesmo modelo de backtesting_neon.py
+DEFAULT_GOALS = 1.5      # média para times sem jogos na janela
+HOME_ADVANTAGE = 0.3     # gols extras do mandante (jogos não neutros)
+LAMBDA_MIN, LAMBDA_MAX = 0.5, 4.0
+MAX_GOALS = 6
+
+CALIBRATION_BINS = np.linspace(0, 1, 11)
+
+STRATEGIES = ('rounded', 'expected_points', 'conservative')
+
+# Dataset compartilhado pelos workers (definido em _init_worker)
+_DATASET = None
+
+
+def build_dataset(date, home_team_id, away_team_id, home_goals, away_goals, neutral=None):
+    """
+    Monta o dataset compartilhado (ordenado por data, times com índice denso)
+
+    Returns:
+        dict de arrays: date, home, away, home_goals, away_goals, neutral,
+        team_ids (índice denso -> ID original)
+    """
+    date = np.asarray(date, dtype='datetime64[D]')
+    order = np.argsort(date, kind='stable')
+
+    team_ids, dense = np.unique(
+        np.concatenate([np.asarray(home_team_id), np.asarray(away_team_id)]), return_inverse=True
+    )
+    n = len(date)
+    home, away = dense[:n].astype(np.int32), dense[n:].astype(np.int32)
+
+    if neutral is None:
+        neutral = np.zeros(n, dtype=bool)
+
+    return {
+        'date': date[order],
+        'home': home[order],
+        'away': away[order],
+        'home_goals': np.asarray(home_goals, dtype=np.int16)[order],
+        'away_goals': np.asarray(away_goals, dtype=np.int16)[order],
+        'neutral': np.asarray(neutral, dtype=bool)[order],
+        'team_ids': team_ids,
+    }
+
+
+def load_dataset(cache_dir=None, refresh=False):
+    """Dataset a partir do cache colunar local (match_cache.py)"""
+    from match_cache import load_matches, refresh_cache, MISSING_GOALS
+
+    if refresh:
+        refresh_cache(cache_dir)
+
+    matches = load_matches(cache_dir)
+    finished = (matches['home_goals'] != MISSING_GOALS) & (matches['away_goals'] != MISSING_GOALS)
+    return build_dataset(
+        matches['date'][finished], matches['home_team_id'][finished], matches['away_team_id'][finished],
+        matches['home_goals'][finished], matches['away_goals'][finished], matches['neutral'][finished]
+    )
+
+
+def make_folds(dates, start, end=None, step_months=3, test_months=3, train_years=4):
+    """
+    Define os folds walk-forward em índices do array ordenado
+
+    Args:
+        dates: datas ordenadas (datetime64[D])
+        start: primeiro corte (ex.: '2016-01-01')
+        end: último corte (padrão: última data)
+        step_months: distância entre cortes
+        test_months: tamanho da janela de teste
+        train_years: janela de treino (None = todo o histórico anterior)
+
+    Returns:
+        lista de dicts com 'cutoff', 'train_start', 'train_end', 'test_end'
+    """
+    dates = np.asarray(dates, dtype='datetime64[D]')
+    end = np.datetime64(end, 'D') if end is not None else dates[-1]
+
+    cutoff = np.datetime64(start, 'M')
+    folds = []
+    while cutoff.astype('datetime64[D]') <= end:
+        cutoff_day = cutoff.astype('datetime64[D]')
+        test_end_day = (cutoff + test_months).astype('datetime64[D]')
+        train_start_day = (cutoff - 12 * train_years).astype('datetime64[D]') if train_years else dates[0]
+
+        fold = {
+            'cutoff': str(cutoff_day),
+            'train_start': int(np.searchsorted(dates, train_start_day, side='left')),
+            'train_end': int(np.searchsorted(dates, cutoff_day, side='left')),
+            'test_end': int(np.searchsorted(dates, test_end_day, side='left')),
+        }
+        if fold['test_end'] > fold['train_end'] and fold['train_end'] > fold['train_start']:
+            folds.append(fold)
+        cutoff += step_months
+
+    return folds
+
+
+def team_features(dataset, train_start, train_end):
+    """
+    Médias de gols feitos/sofridos por time na janela de treino
+
+    Returns:
+        (avg_for, avg_against, n_games) - arrays indexados pelo índice denso
+    """
+    n_teams = len(dataset['team_ids'])
+    sl = slice(train_start, train_end)
+    home, away = dataset['home'][sl], dataset['away'][sl]
+    home_goals, away_goals = dataset['home_goals'][sl], dataset['away_goals'][sl]
+
+    games = np.bincount(home, minlength=n_teams) + np.bincount(away, minlength=n_teams)
+    goals_for = np.bincount(home, home_goals, n_teams) + np.bincount(away, away_goals, n_teams)
+    goals_against = np.bincount(home, away_goals, n_teams) + np.bincount(away, home_goals, n_teams)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        avg_for = np.where(games > 0, goals_for / games, DEFAULT_GOALS)
+        avg_against = np.where(games > 0, goals_against / games, DEFAULT_GOALS)
+
+    return avg_for, avg_against, games
+
+
+def predict_fold(dataset, fold, strategy='rounded'):
+    """
+    Previsões vetorizadas para os jogos de teste de um fold
+
+    Returns:
+        dict com arrays pred_home, pred_away, prob (n, 3) [mandante, empate, visitante]
+    """
+    avg_for, avg_against, _ = team_features(dataset, fold['train_start'], fold['train_end'])
+
+    sl = slice(fold['train_end'], fold['test_end'])
+    home, away = dataset['home'][sl], dataset['away'][sl]
+
+    home_expected = (avg_for[home] + avg_against[away]) / 2 + HOME_ADVANTAGE * ~dataset['neutral'][sl]
+    away_expected = (avg_for[away] + avg_against[home]) / 2
+    home_expected = np.clip(home_expected, LAMBDA_MIN, LAMBDA_MAX)
+    away_expected = np.clip(away_expected, LAMBDA_MIN, LAMBDA_MAX)
+
+    probs = score_probability_matrix(home_expected, away_expected, MAX_GOALS)
+    lower = np.tril(np.ones((MAX_GOALS + 1, MAX_GOALS + 1)), k=-1)
+    prob = np.stack([
+        (probs * lower).sum(axis=(1, 2)),
+        np.trace(probs, axis1=1, axis2=2),
+        (probs * lower.T).sum(axis=(1, 2)),
+    ], axis=1)
+
+    if strategy == 'rounded':
+        pred_home, pred_away = np.rint(home_expected), np.rint(away_expected)
+    elif strategy == 'expected_points':
+        picks = optimize_picks(probs)
+        pred_home, pred_away = picks['home_goals'], picks['away_goals']
+    elif strategy == 'conservative':
+        picks = optimize_picks(probs, pick_max_goals=2)
+        pred_home, pred_away = picks['home_goals'], picks['away_goals']
+    else:
+        raise ValueError(f"Estratégia desconhecida: {strategy}")
+
+    return {
+        'pred_home': pred_home.astype(np.int16),
+        'pred_away': pred_away.astype(np.int16),
+        'prob': prob,
+    }
+
+
+def evaluate_fold(dataset, fold, strategy='rounded'):
+    """
+    Métricas de um fold: pontos do Bolão, acurácia e calibração (1X2)
+
+    Returns:
+        dict com métricas e contagens por faixa de probabilidade
+    """
+    pred = predict_fold(dataset, fold, strategy)
+    sl = slice(fold['train_end'], fold['test_end'])
+    real_home, real_away = dataset['home_goals'][sl], dataset['away_goals'][sl]
+
+    points = bolao_points(pred['pred_home'], pred['pred_away'], real_home, real_away)
+
+    # Resultado real one-hot: [mandante, empate, visitante]
+    outcome = 1 - np.sign(real_home.astype(int) - real_away.astype(int))
+    observed = np.eye(3)[outcome]
+    prob = pred['prob']
+
+    # Calibração: todas as probabilidades previstas vs. frequência observada
+    bins = np.clip(np.digitize(prob.ravel(), CALIBRATION_BINS) - 1, 0, len(CALIBRATION_BINS) - 2)
+    n_bins = len(CALIBRATION_BINS) - 1
+
+    return {
+        'cutoff': fold['cutoff'],
+        'n_train': fold['train_end'] - fold['train_start'],
+        'n_test': fold['test_end'] - fold['train_end'],
+        'points_total': int(points.sum()),
+        'points_per_match': float(points.mean()),
+        'exact_rate': float((points == 20).mean()),
+        'result_accuracy': float((np.argmax(prob, axis=1) == outcome).mean()),
+        'pick_result_accuracy': float(
+            (np.sign(pred['pred_home'] - pred['pred_away']) == np.sign(real_home - real_away)).mean()),
+        'brier': float(((prob - observed) ** 2).sum(axis=1).mean()),
+        'log_loss': float(-np.log(np.clip(prob[np.arange(len(outcome)), outcome], 1e-12, 1)).mean()),
+        'calib_count': np.bincount(bins, minlength=n_bins),
+        'calib_prob': np.bincount(bins, prob.ravel(), n_bins),
+        'calib_hits': np.bincount(bins, observed.ravel(), n_bins),
+    }
+
+
+def _init_worker(dataset):
+    global _DATASET
+    _DATASET = dataset
+
+
+def _evaluate_fold_worker(args):
+    fold, strategy = args
+    return evaluate_fold(_DATASET, fold, strategy)
+
+
+def run_walk_forward(dataset, folds, strategy='rounded', workers=None):
+    """
+    Executa todos os folds (em paralelo se workers > 1)
+
+    Returns:
+        (DataFrame por fold, DataFrame de calibração agregada)
+    """
+    if workers == 1 or len(folds) <= 1:
+        results = [evaluate_fold(dataset, fold, strategy) for fold in folds]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(dataset,)) as pool:
+            results = list(pool.map(_evaluate_fold_worker, [(fold, strategy) for fold in folds],
+                                    chunksize=max(1, len(folds) // (4 * (workers or 4)))))
+
+    calib_keys = ('calib_count', 'calib_prob', 'calib_hits')
+    # Começa em zeros: período sem folds vira calibração vazia
+    empty = np.zeros(len(CALIBRATION_BINS) - 1)
+    count = sum((r['calib_count'] for r in results), empty)
+    prob = sum((r['calib_prob'] for r in results), empty)
+    hits = sum((r['calib_hits'] for r in results), empty)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        calibration = pd.DataFrame({
+            'bin_low': CALIBRATION_BINS[:-1],
+            'bin_high': CALIBRATION_BINS[1:],
+            'count': count,
+            'mean_predicted': prob / count,
+            'observed_rate': hits / count,
+        })
+
+    folds_df = pd.DataFrame([{k: v for k, v in r.items() if k not in calib_keys} for r in results])
+    return folds_df, calibration
+
+
+def summarize(folds_df):
+    """Métricas agregadas ponderadas pelo número de jogos de teste"""
+    if len(folds_df) == 0:
+        return {'folds': 0, 'matches': 0}
+    weights = folds_df['n_test']
+    weighted = lambda col: float(np.average(folds_df[col], weights=weights))
+    return {
+        'folds': len(folds_df),
+        'matches': int(weights.sum()),
+        'points_per_match': weighted('points_per_match'),
+        'exact_rate': weighted('exact_rate'),
+        'result_accuracy': weighted('result_accuracy'),
+        'pick_result_accuracy': weighted('pick_result_accuracy'),
+        'brier': weighted('brier'),
+        'log_loss': weighted('log_loss'),
+        'points_per_match_std': float(folds_df['points_per_match'].std()),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backtest walk-forward do modelo de placares")
+    parser.add_argument('--start', default='2016-01-01', help="primeiro corte")
+    parser.add_argument('--end', default=None, help="último corte")
+    parser.add_argument('--step-months', type=int, default=3)
+    parser.add_argument('--test-months', type=int, default=3)
+    parser.add_argument('--train-years', type=int, default=4, help="0 = todo o histórico")
+    parser.add_argument('--strategy', choices=STRATEGIES, default='rounded')
+    parser.add_argument('--workers', type=int, default=None, help="processos (padrão: núcleos)")
+    parser.add_argument('--refresh', action='store_true', help="sincronizar cache com o Neon antes")
+    parser.add_argument('--output', type=Path, default=None, help="CSV de saída por fold")
+    args = parser.parse_args(argv)
+
+    print("=" * 80)
+    print("BACKTEST WALK-FORWARD")
+    print("=" * 80)
+
+    start = time.perf_counter()
+    dataset = load_dataset(refresh=args.refresh)
+    folds = make_folds(dataset['date'], args.start, args.end, args.step_months,
+                       args.test_months, args.train_years or None)
+    print(f"\n📊 {len(dataset['date'])} jogos | {len(dataset['team_ids'])} seleções | {len(folds)} folds")
+
+    folds_df, calibration = run_walk_forward(dataset, folds, args.strategy, args.workers)
+    elapsed = time.perf_counter() - start
+    summary = summarize(folds_df)
+
+    print(f"\n⏱️  Concluído em {elapsed:.1f} s (estratégia: {args.strategy})")
+    if summary['folds'] == 0:
+        print("\n⚠️  Nenhum fold no período (jogos insuficientes após o primeiro corte)")
+        print("=" * 80)
+        return 0
+    print(f"\n📈 Resultado agregado ({summary['matches']} jogos de teste):")
+    print(f"  ✅ Pontos médios: {summary['points_per_match']:.2f} pts/jogo "
+          f"(desvio entre folds {summary['points_per_match_std']:.2f})")
+    print(f"  ✅ Placar exato: {summary['exact_rate']:.1%}")
+    print(f"  ✅ Resultado (prob. máxima): {summary['result_accuracy']:.1%}")
+    print(f"  ✅ Resultado (palpite): {summary['pick_result_accuracy']:.1%}")
+    print(f"  ✅ Brier 1X2: {summary['brier']:.4f} | Log loss: {summary['log_loss']:.4f}")
+
+    print("\n🎯 Calibração (1X2):")
+    for _, row in calibration[calibration['count'] > 0].iterrows():
+        print(f"  {row['bin_low']:.0%}-{row['bin_high']:.0%}: previsto {row['mean_predicted']:6.1%} | "
+              f"observado {row['observed_rate']:6.1%} ({int(row['count'])})")
+
+    output = args.output
+    if output is None:
+        DEFAULT_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+        output = DEFAULT_OUTPUT_DIR / f"walk_forward_{args.strategy}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    folds_df.to_csv(output, index=False)
+    print(f"\n💾 Resultados por fold salvos em: {output}")
+    print("=" * 80)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())